@@ -4,8 +4,58 @@ __author__ = """Qiusheng Wu"""
 __email__ = "giswqs@gmail.com"
 __version__ = "0.42.9"
 
+import importlib
 import os
-from .report import Report
+import sys
+import types
+
+# Submodules are imported on first attribute access (PEP 562), so that
+# `import leafmap` does not pull in the widget stack or build the basemaps.
+_SUBMODULES = [
+    "arraytiles",
+    "bandstats",
+    "basemaps",
+    "bokehmap",
+    "colormaps",
+    "common",
+    "core",
+    "deck",
+    "deckgl",
+    "examples",
+    "foliumap",
+    "heremap",
+    "kepler",
+    "leafmap",
+    "legends",
+    "map_widgets",
+    "mapbox",
+    "maplibregl",
+    "osm",
+    "pc",
+    "playback",
+    "plot",
+    "plotlymap",
+    "report",
+    "stac",
+    "tiles",
+    "toolbar",
+]
+
+_backend = None
+
+
+class _Package(types.ModuleType):
+    """The leafmap package, which keeps `leafmap.basemaps` for the basemap registry."""
+
+    def __setattr__(self, name, value):
+        # Importing the basemaps submodule binds it on the package. Skip that, so that
+        # `leafmap.basemaps` loads the backend and returns its basemaps instead.
+        if name == "basemaps" and isinstance(value, types.ModuleType):
+            return
+        super().__setattr__(name, value)
+
+
+sys.modules[__name__].__class__ = _Package
 
 
 def _in_colab_shell():
@@ -135,18 +185,76 @@ def view_pmtiles(
     return m
 
 
-if _use_folium():
-    from .foliumap import *
-else:
-    try:
-        from .leafmap import *
-    except Exception as e:
-        if _in_colab_shell():
-            print(
-                "Please restart Colab runtime after installation if you encounter any errors when importing leafmap."
-            )
-        else:
-            print(
-                "Please restart Jupyter kernel after installation if you encounter any errors when importing leafmap."
-            )
-        raise Exception(e)
+def _load_backend():
+    """Imports the plotting backend module and exposes its public names.
+
+    The backend (foliumap or leafmap) is imported the first time one of its
+    attributes is requested, e.g., `leafmap.Map` or `leafmap.basemaps`.
+
+    Returns:
+        module: The backend module.
+    """
+    global _backend
+
+    if _backend is not None:
+        return _backend
+
+    if _use_folium():
+        from . import foliumap as backend
+    else:
+        try:
+            from . import leafmap as backend
+        except Exception as e:
+            if _in_colab_shell():
+                print(
+                    "Please restart Colab runtime after installation if you encounter any errors when importing leafmap."
+                )
+            else:
+                print(
+                    "Please restart Jupyter kernel after installation if you encounter any errors when importing leafmap."
+                )
+            raise Exception(e)
+
+    # Equivalent to `from .backend import *`, performed on first use.
+    namespace = globals()
+    for key, value in vars(backend).items():
+        if not key.startswith("_"):
+            namespace[key] = value
+    # The basemaps submodule may have been bound before the backend was loaded.
+    namespace["basemaps"] = backend.basemaps
+
+    _backend = backend
+    return backend
+
+
+def __getattr__(name):
+    """Resolves submodules and backend attributes lazily (PEP 562)."""
+    if name == "Report":
+        from .report import Report
+
+        return Report
+    elif name in _SUBMODULES and name != "basemaps":
+        # `leafmap.basemaps` refers to the backend's basemap Box, not the module.
+        return importlib.import_module(f".{name}", __name__)
+    elif name == "__all__":
+        backend = _load_backend()
+        names = set(key for key in globals() if not key.startswith("_"))
+        names.update(key for key in vars(backend) if not key.startswith("_"))
+        names.add("Report")
+        return sorted(names)
+    elif name.startswith("__"):
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    _load_backend()
+    if name in globals():
+        return globals()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    names = set(globals())
+    names.update(_SUBMODULES)
+    names.add("Report")
+    if _backend is not None:
+        names.update(key for key in vars(_backend) if not key.startswith("_"))
+    return sorted(names)
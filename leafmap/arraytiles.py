@@ -0,0 +1,797 @@
+"""This module renders XYZ map tiles directly from in-memory arrays and serves them to the map backends.
+
+Arrays and xarray DataArrays (including lazily chunked ones) are cut into Web Mercator
+tiles on request, without writing them to a GeoTIFF first. Rendered tiles are kept in
+an LRU cache, and a lightweight HTTP server in a background thread serves the tiles to
+ipyleaflet and MapLibre maps.
+"""
+
+import collections
+import http.server
+import io
+import math
+import os
+import threading
+import uuid
+import weakref
+from typing import Optional, List, Union, Any
+
+from .tiles import WEB_MERCATOR_EXTENT
+
+# The arguments of array_to_memory_file() that describe the array itself.
+ARRAY_ARGS = ("source", "crs", "transform", "cellsize", "transpose")
+
+# The latitude of the northern edge of the Web Mercator extent.
+MAX_LATITUDE = 85.0511287798066
+
+
+class ArrayTileRenderer:
+    """Renders XYZ map tiles from a georeferenced array.
+
+    Only the part of the array that covers a tile is read and reprojected to Web
+    Mercator, and lower zoom levels read a decimated subset, so lazily chunked
+    DataArrays are never loaded in full. Rendered tiles are kept in an LRU cache.
+
+    Args:
+        array (numpy.ndarray | xarray.DataArray): The array. A NumPy array has the
+            shape (rows, columns) or (bands, rows, columns). A DataArray with rioxarray
+            georeferencing provides its own crs and transform.
+        source (str, optional): Path to a raster file whose crs and transform are used
+            for a NumPy array. Defaults to None.
+        crs (str, optional): The coordinate reference system of the array if source is
+            not provided, e.g., "EPSG:4326". Defaults to None.
+        transform (tuple, optional): The affine transformation matrix if source is not
+            provided. Can be rio.transform() or a tuple like
+            (0.5, 0.0, -180.25, 0.0, -0.5, 83.780361). Defaults to None.
+        cellsize (float, optional): The cell size of the array if neither source nor
+            transform is provided. Defaults to None.
+        transpose (bool, optional): Whether a 3D NumPy array has the shape
+            (bands, rows, columns). Set it to False for (rows, columns, bands).
+            Defaults to True.
+        indexes (int | list, optional): The band(s) to render. Band indexing starts
+            at 1. Defaults to the first band for single-band arrays and the first three
+            bands otherwise.
+        colormap (str, optional): The name of the matplotlib colormap used for a single
+            band. Defaults to None (greyscale).
+        vmin (float, optional): The value mapped to the lowest color. Defaults to the
+            minimum of a sample of the array.
+        vmax (float, optional): The value mapped to the highest color. Defaults to the
+            maximum of a sample of the array.
+        nodata (float, optional): The value that marks invalid pixels. NaN values are
+            always invalid. Defaults to None.
+        tile_size (int, optional): The tile size in pixels. Defaults to 256.
+        tile_format (str, optional): The tile image format, "png" or "webp".
+            Defaults to "png".
+        cache_size (int, optional): The number of rendered tiles to keep. Defaults to 512.
+    """
+
+    def __init__(
+        self,
+        array: Any,
+        source: Optional[str] = None,
+        crs: Optional[str] = None,
+        transform: Optional[Any] = None,
+        cellsize: Optional[float] = None,
+        transpose: bool = True,
+        indexes: Optional[Union[int, List[int]]] = None,
+        colormap: Optional[str] = None,
+        vmin: Optional[float] = None,
+        vmax: Optional[float] = None,
+        nodata: Optional[float] = None,
+        tile_size: int = 256,
+        tile_format: str = "png",
+        cache_size: int = 512,
+    ):
+        self.array, self.crs, self.transform = self._prepare(
+            array, source, crs, transform, cellsize, transpose
+        )
+        self.count, self.height, self.width = self.array.shape
+        self.band_names = self._band_names(array, self.count)
+        self._configure(
+            indexes, colormap, vmin, vmax, nodata, tile_size, tile_format, cache_size
+        )
+
+    def _configure(
+        self, indexes, colormap, vmin, vmax, nodata, tile_size, tile_format, cache_size
+    ):
+        """Sets the rendering options once the array is known."""
+        if tile_format.lower() not in ("png", "webp"):
+            raise ValueError("tile_format must be either png or webp.")
+
+        if indexes is None:
+            indexes = [1] if self.count < 3 else [1, 2, 3]
+        elif isinstance(indexes, int):
+            indexes = [indexes]
+        self.indexes = list(indexes)
+        self.colormap = colormap
+        self.nodata = nodata
+        self.tile_size = tile_size
+        self.tile_format = tile_format.lower()
+        self.cache_size = cache_size
+        self.hits = 0
+        self.misses = 0
+        self._cache = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self._empty_tile = None
+
+        if vmin is None or vmax is None:
+            sample_min, sample_max = self._sample_range()
+            vmin = sample_min if vmin is None else vmin
+            vmax = sample_max if vmax is None else vmax
+        self.vmin = vmin
+        self.vmax = vmax
+
+    @staticmethod
+    def _prepare(array, source, crs, transform, cellsize, transpose):
+        """Returns the array with the shape (bands, rows, columns), its CRS and transform."""
+        import numpy as np
+        import rasterio
+        from rasterio.transform import Affine
+
+        try:
+            import xarray as xr
+        except ImportError:
+            xr = None
+
+        if xr is not None and isinstance(array, xr.DataArray):
+            if "time" in array.dims:
+                array = array.isel(time=0)
+            if "latitude" in array.dims and "longitude" in array.dims:
+                array = array.rename({"latitude": "y", "longitude": "x"})
+            elif "lat" in array.dims and "lon" in array.dims:
+                array = array.rename({"lat": "y", "lon": "x"})
+            if hasattr(array, "rio"):
+                if crs is None and array.rio.crs is not None:
+                    crs = array.rio.crs
+                if transform is None and "x" in array.dims and "y" in array.dims:
+                    transform = array.rio.transform()
+            if source is None and "source" in array.encoding:
+                source = array.encoding["source"]
+            if array.ndim == 2:
+                array = array.expand_dims("band")
+            if "x" in array.dims and "y" in array.dims:
+                other = [dim for dim in array.dims if dim not in ("y", "x")]
+                array = array.transpose(*other, "y", "x")
+        else:
+            array = np.asarray(array)
+            if array.ndim == 2:
+                array = array[np.newaxis]
+            elif not transpose:
+                array = np.moveaxis(array, -1, 0)
+
+        if array.ndim != 3:
+            raise ValueError("The array must have two or three dimensions.")
+
+        if (crs is None or transform is None) and source is not None:
+            with rasterio.open(source) as src:
+                crs = crs or src.crs
+                transform = transform or src.transform
+        if crs is None:
+            raise ValueError(
+                "crs must be provided if source is not provided, such as EPSG:3857"
+            )
+        if transform is None:
+            if cellsize is None:
+                raise ValueError("cellsize must be provided if source is not provided")
+            transform = rasterio.transform.from_bounds(
+                0,
+                0,
+                cellsize * array.shape[2],
+                cellsize * array.shape[1],
+                array.shape[2],
+                array.shape[1],
+            )
+        elif isinstance(transform, (tuple, list)):
+            transform = Affine(*transform)
+
+        return array, rasterio.crs.CRS.from_user_input(crs), transform
+
+    @staticmethod
+    def _band_names(array, count: int) -> List[str]:
+        """Returns the band names of the original array."""
+        import numpy as np
+
+        if hasattr(array, "coords") and "band" in array.coords:
+            values = np.atleast_1d(array.coords["band"].values)
+            if not np.issubdtype(values.dtype, np.number):
+                return [str(value) for value in values]
+        return [f"b{i}" for i in range(1, count + 1)]
+
+    def _read(self, rows: slice, cols: slice):
+        """Reads the selected bands of a window of the array as float32."""
+        import numpy as np
+
+        bands = [index - 1 for index in self.indexes]
+        if hasattr(self.array, "isel"):
+            band_dim = self.array.dims[0]
+            data = self.array.isel(
+                {band_dim: bands, self.array.dims[1]: rows, self.array.dims[2]: cols}
+            ).values
+        else:
+            data = self.array[bands, rows, cols]
+        data = data.astype("float32")
+        if self.nodata is not None:
+            data[data == self.nodata] = np.nan
+        return data
+
+    def _sample_range(self):
+        """Returns the range of the selected bands from a sample of about a million pixels."""
+        import numpy as np
+
+        step = max(1, int(math.sqrt(self.width * self.height / 1e6)))
+        data = self._read(slice(None, None, step), slice(None, None, step))
+        if not np.isfinite(data).any():
+            return 0, 1
+        return float(np.nanmin(data)), float(np.nanmax(data))
+
+    @property
+    def bounds(self) -> List[float]:
+        """The bounds [minx, miny, maxx, maxy] of the array in EPSG:4326."""
+        from rasterio.transform import array_bounds
+        from rasterio.warp import transform_bounds
+
+        west, south, east, north = array_bounds(self.height, self.width, self.transform)
+        return list(transform_bounds(self.crs, "EPSG:4326", west, south, east, north))
+
+    @property
+    def native_zoom(self) -> int:
+        """The lowest zoom level at which a tile pixel is no larger than an array pixel."""
+        from rasterio.transform import array_bounds
+        from rasterio.warp import transform_bounds
+
+        west, south, east, north = array_bounds(self.height, self.width, self.transform)
+        west, _, east, _ = transform_bounds(
+            self.crs, "EPSG:3857", west, south, east, north
+        )
+        resolution = (east - west) / self.width
+        zoom = math.log2(2 * WEB_MERCATOR_EXTENT / (self.tile_size * resolution))
+        return max(0, int(math.ceil(zoom - 1e-6)))
+
+    def tile_bounds(self, x: int, y: int, z: int) -> List[float]:
+        """Returns the bounds of a tile in EPSG:3857.
+
+        Args:
+            x (int): The x tile coordinate.
+            y (int): The y tile coordinate.
+            z (int): The zoom level.
+
+        Returns:
+            list: The bounds [minx, miny, maxx, maxy].
+        """
+        size = 2 * WEB_MERCATOR_EXTENT / 2**z
+        west = -WEB_MERCATOR_EXTENT + x * size
+        north = WEB_MERCATOR_EXTENT - y * size
+        return [west, north - size, west + size, north]
+
+    def render_array(self, x: int, y: int, z: int):
+        """Reprojects the part of the array that covers a tile.
+
+        Args:
+            x (int): The x tile coordinate.
+            y (int): The y tile coordinate.
+            z (int): The zoom level.
+
+        Returns:
+            numpy.ndarray: A float32 array of shape (bands, tile_size, tile_size) with NaN
+                for invalid pixels, or None if the tile does not overlap the array.
+        """
+        import numpy as np
+        from rasterio.transform import Affine, from_bounds
+        from rasterio.warp import Resampling, reproject, transform_bounds
+        from rasterio.windows import from_bounds as window_from_bounds
+
+        size = self.tile_size
+        bounds = self.tile_bounds(x, y, z)
+        if self.crs.to_epsg() != 3857:
+            try:
+                src_bounds = transform_bounds("EPSG:3857", self.crs, *bounds)
+            except Exception:
+                return None
+        else:
+            src_bounds = bounds
+
+        window = window_from_bounds(*src_bounds, transform=self.transform)
+        col0 = max(int(math.floor(window.col_off)) - 1, 0)
+        row0 = max(int(math.floor(window.row_off)) - 1, 0)
+        col1 = min(int(math.ceil(window.col_off + window.width)) + 1, self.width)
+        row1 = min(int(math.ceil(window.row_off + window.height)) + 1, self.height)
+        if col0 >= col1 or row0 >= row1:
+            return None
+
+        # Read every step-th pixel when the window is much larger than the tile.
+        step = max(1, int(min(window.width, window.height) / size))
+        data = self._read(slice(row0, row1, step), slice(col0, col1, step))
+        a, b, c, d, e, f = self.transform[:6]
+        src_transform = Affine(
+            a * step,
+            b * step,
+            c + a * col0 + b * row0,
+            d * step,
+            e * step,
+            f + d * col0 + e * row0,
+        )
+
+        destination = np.full((len(self.indexes), size, size), np.nan, "float32")
+        reproject(
+            data,
+            destination,
+            src_transform=src_transform,
+            src_crs=self.crs,
+            src_nodata=np.nan,
+            dst_transform=from_bounds(*bounds, size, size),
+            dst_crs="EPSG:3857",
+            dst_nodata=np.nan,
+            resampling=Resampling.nearest,
+        )
+        return destination
+
+    def colorize(self, data):
+        """Converts rendered data into an RGBA image.
+
+        Args:
+            data (numpy.ndarray): A float32 array of shape (bands, rows, columns).
+
+        Returns:
+            numpy.ndarray: A uint8 array of shape (rows, columns, 4).
+        """
+        import numpy as np
+
+        valid = np.isfinite(data).all(axis=0)
+        scale = (self.vmax - self.vmin) or 1
+        scaled = np.clip((np.nan_to_num(data) - self.vmin) / scale, 0, 1)
+        scaled = (scaled * 255).astype("uint8")
+
+        if len(self.indexes) == 1:
+            if self.colormap is None:
+                rgba = np.repeat(scaled[0][..., np.newaxis], 4, axis=2)
+            else:
+                rgba = self._lookup_table()[scaled[0]]
+        else:
+            rgba = np.empty(data.shape[1:] + (4,), "uint8")
+            rgba[..., :3] = np.moveaxis(scaled[:3], 0, -1)
+        rgba[..., 3] = np.where(valid, 255, 0)
+        return rgba
+
+    def _lookup_table(self):
+        """Returns the 256 RGBA colors of the colormap."""
+        import numpy as np
+        import matplotlib
+
+        cmap = matplotlib.colormaps[self.colormap]
+        return (cmap(np.linspace(0, 1, 256)) * 255).astype("uint8")
+
+    def _encode(self, rgba) -> bytes:
+        """Encodes an RGBA image in the tile format."""
+        from PIL import Image
+
+        buffer = io.BytesIO()
+        Image.fromarray(rgba, "RGBA").save(buffer, self.tile_format.upper())
+        return buffer.getvalue()
+
+    def render_tile(self, x: int, y: int, z: int) -> Optional[bytes]:
+        """Renders a tile without using the cache.
+
+        Args:
+            x (int): The x tile coordinate.
+            y (int): The y tile coordinate.
+            z (int): The zoom level.
+
+        Returns:
+            bytes: The PNG or WebP tile, or None if the tile has no valid pixels.
+        """
+        import numpy as np
+
+        data = self.render_array(x, y, z)
+        if data is None or not np.isfinite(data).all(axis=0).any():
+            return None
+        return self._encode(self.colorize(data))
+
+    def render(self, x: int, y: int, z: int) -> bytes:
+        """Returns an encoded tile, from the cache if it has been rendered before.
+
+        Args:
+            x (int): The x tile coordinate.
+            y (int): The y tile coordinate.
+            z (int): The zoom level.
+
+        Returns:
+            bytes: The PNG or WebP tile. Tiles outside the array are transparent.
+        """
+        import numpy as np
+
+        key = (z, x, y)
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return self._cache[key]
+            self.misses += 1
+
+        data = self.render_array(x, y, z)
+        if data is None:
+            if self._empty_tile is None:
+                size = self.tile_size
+                self._empty_tile = self._encode(np.zeros((size, size, 4), "uint8"))
+            return self._empty_tile
+
+        tile = self._encode(self.colorize(data))
+        with self._lock:
+            self._cache[key] = tile
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return tile
+
+    def point(self, lon: float, lat: float) -> dict:
+        """Returns the values of all bands at a location.
+
+        Args:
+            lon (float): The longitude.
+            lat (float): The latitude.
+
+        Returns:
+            dict: The value of each band, keyed by band name.
+        """
+        from rasterio.transform import rowcol
+        from rasterio.warp import transform
+
+        xs, ys = transform("EPSG:4326", self.crs, [lon], [lat])
+        row, col = rowcol(self.transform, xs[0], ys[0])
+        if not (0 <= row < self.height and 0 <= col < self.width):
+            raise ValueError("The location is outside the array.")
+
+        return dict(zip(self.band_names, self._pixel(row, col)))
+
+    def _pixel(self, row: int, col: int) -> list:
+        """Returns the values of all bands of a pixel."""
+        import numpy as np
+
+        values = self.array[:, row, col]
+        return np.asarray(getattr(values, "values", values)).tolist()
+
+    def clear_cache(self) -> None:
+        """Removes all rendered tiles from the cache."""
+        with self._lock:
+            self._cache.clear()
+
+    @property
+    def url(self) -> str:
+        """The XYZ URL template of the tiles, served by the shared ArrayTileServer."""
+        return get_array_tile_server().register(self)
+
+
+class RasterTileRenderer(ArrayTileRenderer):
+    """Renders XYZ map tiles from a raster file, such as a GeoTIFF.
+
+    Tiles are rendered from windowed reads, and zoomed-out tiles read decimated
+    windows, for which GDAL uses the overviews of the raster if it has any.
+
+    Args:
+        source (str): The path to the raster file.
+        indexes (int | list, optional): The band(s) to render. Band indexing starts
+            at 1. Defaults to the first band for single-band rasters and the first three
+            bands otherwise.
+        colormap (str, optional): The name of the matplotlib colormap used for a single
+            band. Defaults to None (greyscale).
+        vmin (float, optional): The value mapped to the lowest color. Defaults to the
+            minimum of a sample of the raster.
+        vmax (float, optional): The value mapped to the highest color. Defaults to the
+            maximum of a sample of the raster.
+        nodata (float, optional): The value that marks invalid pixels. Defaults to the
+            nodata value of the raster.
+        tile_size (int, optional): The tile size in pixels. Defaults to 256.
+        tile_format (str, optional): The tile image format, "png" or "webp".
+            Defaults to "png".
+        cache_size (int, optional): The number of rendered tiles to keep. Defaults to 512.
+    """
+
+    def __init__(
+        self,
+        source: str,
+        indexes: Optional[Union[int, List[int]]] = None,
+        colormap: Optional[str] = None,
+        vmin: Optional[float] = None,
+        vmax: Optional[float] = None,
+        nodata: Optional[float] = None,
+        tile_size: int = 256,
+        tile_format: str = "png",
+        cache_size: int = 512,
+    ):
+        import rasterio
+
+        self.source = source
+        self.dataset = rasterio.open(source)
+        self.array = None
+        self.crs = self.dataset.crs
+        self.transform = self.dataset.transform
+        self.count = self.dataset.count
+        self.height, self.width = self.dataset.shape
+        self.band_names = [
+            description or f"b{i}"
+            for i, description in enumerate(self.dataset.descriptions, start=1)
+        ]
+        if nodata is None:
+            nodata = self.dataset.nodata
+        self._configure(
+            indexes, colormap, vmin, vmax, nodata, tile_size, tile_format, cache_size
+        )
+
+    def _read(self, rows: slice, cols: slice):
+        """Reads the selected bands of a window of the raster as float32."""
+        import numpy as np
+        from rasterio.enums import Resampling
+        from rasterio.windows import Window
+
+        row0, row1, step = rows.indices(self.height)
+        col0, col1, _ = cols.indices(self.width)
+        shape = (
+            len(self.indexes),
+            len(range(row0, row1, step)),
+            len(range(col0, col1, step)),
+        )
+        data = self.dataset.read(
+            self.indexes,
+            window=Window(col0, row0, col1 - col0, row1 - row0),
+            out_shape=shape,
+            out_dtype="float32",
+            resampling=Resampling.nearest,
+        )
+        if self.nodata is not None:
+            data[data == self.nodata] = np.nan
+        return data
+
+    def _pixel(self, row: int, col: int) -> list:
+        """Returns the values of all bands of a pixel."""
+        from rasterio.windows import Window
+
+        return self.dataset.read(window=Window(col, row, 1, 1))[:, 0, 0].tolist()
+
+    def _sample_range(self):
+        """Returns the range of the selected bands, estimated from an overview."""
+        from .bandstats import band_min_max
+
+        vmin, vmax = band_min_max(self.dataset, self.indexes, nodata=self.nodata)
+        if vmin is None:
+            return 0, 1
+        return vmin, vmax
+
+    def close(self) -> None:
+        """Closes the raster file."""
+        self.dataset.close()
+
+
+_worker_renderer = None
+
+
+def _init_tile_worker(kwargs: dict) -> None:
+    """Creates the renderer of a process that renders tiles for render_tiles()."""
+    global _worker_renderer
+
+    _worker_renderer = RasterTileRenderer(**kwargs)
+
+
+def _render_tile_batch(tiles: list) -> list:
+    """Renders (z, x, y) tiles with the renderer of the current process."""
+    return [(z, x, y, _worker_renderer.render_tile(x, y, z)) for z, x, y in tiles]
+
+
+def render_tiles(
+    source: str,
+    zooms: List[int],
+    workers: Optional[int] = None,
+    batch_size: int = 64,
+    **kwargs,
+):
+    """Renders all tiles of a raster file at the given zoom levels in a process pool.
+
+    Args:
+        source (str): The path to the raster file.
+        zooms (list): The zoom levels to render.
+        workers (int, optional): The number of processes. Defaults to the number of
+            CPUs. Use 1 to render in the current process.
+        batch_size (int, optional): The number of tiles sent to a process at once.
+            Defaults to 64.
+        **kwargs: Additional arguments for RasterTileRenderer, such as indexes,
+            colormap, vmin, vmax and nodata. vmin and vmax are computed once from the
+            raster if not given, so that all tiles share the same color stretch.
+
+    Yields:
+        tuple: (z, x, y, tile) for each tile with valid pixels, in no particular order
+            within a zoom level.
+    """
+    import collections
+    import concurrent.futures
+    import itertools
+
+    from .tiles import iter_bbox_tiles
+
+    renderer = RasterTileRenderer(source, **kwargs)
+    kwargs.update(
+        source=source,
+        indexes=renderer.indexes,
+        vmin=renderer.vmin,
+        vmax=renderer.vmax,
+        nodata=renderer.nodata,
+    )
+    west, south, east, north = renderer.bounds
+    # Web Mercator does not reach the poles.
+    bounds = [
+        max(west, -180),
+        max(south, -MAX_LATITUDE),
+        min(east, 180),
+        min(north, MAX_LATITUDE),
+    ]
+
+    # The tiles are generated as they are rendered, so memory does not grow with
+    # the size of the pyramid.
+    tiles = ((z, x, y) for z in zooms for x, y in iter_bbox_tiles(bounds, z))
+
+    if workers == 1:
+        try:
+            for z, x, y in tiles:
+                tile = renderer.render_tile(x, y, z)
+                if tile is not None:
+                    yield z, x, y, tile
+        finally:
+            renderer.close()
+        return
+
+    renderer.close()
+    workers = workers or os.cpu_count() or 1
+    batches = iter(lambda: list(itertools.islice(tiles, batch_size)), [])
+    with concurrent.futures.ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_tile_worker, initargs=(kwargs,)
+    ) as executor:
+        # At most two batches per process are in flight, so that rendered tiles do
+        # not pile up when the consumer is slower than the pool.
+        max_in_flight = 2 * workers
+        pending = collections.deque(
+            executor.submit(_render_tile_batch, batch)
+            for batch in itertools.islice(batches, max_in_flight)
+        )
+        while pending:
+            batch = pending.popleft().result()
+            for batch_tiles in itertools.islice(batches, 1):
+                pending.append(executor.submit(_render_tile_batch, batch_tiles))
+            for tile in batch:
+                if tile[3] is not None:
+                    yield tile
+
+
+class _TileRequestHandler(http.server.BaseHTTPRequestHandler):
+    """Serves the tiles of the renderers registered with an ArrayTileServer."""
+
+    def do_GET(self):
+        try:
+            _, name, z, x, y = self.path.split("?")[0].rsplit(".", 1)[0].split("/")
+            renderer = self.server.renderers[name]
+            tile = renderer.render(int(x), int(y), int(z))
+        except (KeyError, ValueError):
+            self.send_error(404)
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", f"image/{renderer.tile_format}")
+        self.send_header("Content-Length", str(len(tile)))
+        self.send_header("Access-Control-Allow-Origin", "*")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        self.wfile.write(tile)
+
+    def log_message(self, *args):
+        pass
+
+
+class ArrayTileServer:
+    """A local HTTP server, running in a background thread, that serves array tiles.
+
+    Each registered renderer gets its own URL template. If the
+    LOCALTILESERVER_CLIENT_PREFIX environment variable is set (e.g., 'proxy/{port}'
+    on JupyterHub), the URLs go through the Jupyter server proxy, as with
+    localtileserver.
+
+    Args:
+        host (str, optional): The address to bind the server to. Defaults to "127.0.0.1".
+        port (int, optional): The port of the server. Defaults to 0 (any free port).
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        self._server = http.server.ThreadingHTTPServer(
+            (host, port), _TileRequestHandler
+        )
+        self._server.daemon_threads = True
+        self._server.renderers = {}
+        self.host = host
+        self.port = self._server.server_port
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name="leafmap-array-tiles", daemon=True
+        )
+        self._thread.start()
+
+    @property
+    def base_url(self) -> str:
+        """The URL of the server as seen by the browser."""
+        prefix = os.environ.get("LOCALTILESERVER_CLIENT_PREFIX")
+        if prefix:
+            return "/" + prefix.format(port=self.port).strip("/")
+        return f"http://{self.host}:{self.port}"
+
+    def register(self, renderer: ArrayTileRenderer) -> str:
+        """Registers a renderer and returns the URL template of its tiles.
+
+        The renderer is unregistered when it is garbage collected.
+
+        Args:
+            renderer (ArrayTileRenderer): The renderer.
+
+        Returns:
+            str: The XYZ URL template.
+        """
+        renderers = self._server.renderers
+        name = getattr(renderer, "_server_name", None)
+        if name is None or name not in renderers:
+            name = uuid.uuid4().hex
+            renderer._server_name = name
+            # Holding a weak reference lets the layer decide the renderer's lifetime.
+            renderers[name] = _WeakRenderer(renderer)
+            weakref.finalize(renderer, renderers.pop, name, None)
+        return f"{self.base_url}/{name}/{{z}}/{{x}}/{{y}}.{renderer.tile_format}"
+
+    def shutdown(self) -> None:
+        """Stops the server."""
+        self._server.shutdown()
+        self._server.server_close()
+
+
+class _WeakRenderer:
+    """A weak reference to a renderer that behaves like the renderer."""
+
+    def __init__(self, renderer: ArrayTileRenderer):
+        self._ref = weakref.ref(renderer)
+
+    def __getattr__(self, name):
+        renderer = self._ref()
+        if renderer is None:
+            raise KeyError("The renderer no longer exists.")
+        return getattr(renderer, name)
+
+
+def array_tile_renderer(
+    array: Any, array_args: Optional[dict] = None, **kwargs
+) -> ArrayTileRenderer:
+    """Creates an ArrayTileRenderer from the array_args used by Map.add_raster().
+
+    Arguments of `array_to_memory_file` that only affect the written file, such as
+    dtype, compress and driver, are ignored.
+
+    Args:
+        array (numpy.ndarray | xarray.DataArray): The array.
+        array_args (dict, optional): Arguments for `array_to_memory_file`, of which
+            source, crs, transform, cellsize and transpose are used. Defaults to None.
+        **kwargs: Additional arguments for ArrayTileRenderer, such as indexes,
+            colormap, vmin, vmax and nodata.
+
+    Returns:
+        ArrayTileRenderer: The renderer.
+    """
+    args = {
+        key: value for key, value in (array_args or {}).items() if key in ARRAY_ARGS
+    }
+    return ArrayTileRenderer(array, **args, **kwargs)
+
+
+_array_tile_server = None
+_array_tile_server_lock = threading.Lock()
+
+
+def get_array_tile_server() -> ArrayTileServer:
+    """Returns the shared ArrayTileServer, starting it if necessary.
+
+    Returns:
+        ArrayTileServer: The shared server.
+    """
+    global _array_tile_server
+
+    with _array_tile_server_lock:
+        if _array_tile_server is None:
+            _array_tile_server = ArrayTileServer()
+        return _array_tile_server
@@ -0,0 +1,339 @@
+"""This module estimates raster band statistics for automatic rescaling.
+
+Picking a stretch for a raster does not need every pixel. The statistics are estimated
+from the coarsest overview that still has enough pixels or, for rasters without
+overviews, from a random sample of internal blocks, so that the cost does not grow with
+the size of the raster. The results are cached in a JSON sidecar file next to the
+raster, keyed by the identity (path, size and modification time) of the file.
+"""
+
+import collections
+import hashlib
+import json
+import math
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+SIDECAR_SUFFIX = ".stats.json"
+
+# The most recently used statistics in least-recently-used order. Local files are
+# invalidated through their identity, while remote rasters expire after MEMORY_TTL.
+MEMORY_ENTRIES = 256
+MEMORY_TTL = 3600
+_memory_cache = collections.OrderedDict()
+_memory_lock = threading.Lock()
+
+
+def _identity(source: str) -> Dict:
+    """Returns the identity of a raster file, which changes when the file changes."""
+    if os.path.isfile(source):
+        stat = os.stat(source)
+        return {
+            "path": os.path.realpath(source),
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+        }
+    return {"path": source}
+
+
+def _memory_get(key) -> Optional[Dict]:
+    """Returns statistics from the in-memory cache, or None if missing or expired."""
+    with _memory_lock:
+        entry = _memory_cache.get(key)
+        if entry is None:
+            return None
+        value, expires = entry
+        if expires is not None and expires <= time.monotonic():
+            del _memory_cache[key]
+            return None
+        _memory_cache.move_to_end(key)
+        return json.loads(value)
+
+
+def _memory_put(key, stats: Dict, local: bool) -> None:
+    """Stores statistics in the in-memory cache, evicting the least recently used."""
+    expires = None if local else time.monotonic() + MEMORY_TTL
+    with _memory_lock:
+        _memory_cache[key] = (json.dumps(stats), expires)
+        _memory_cache.move_to_end(key)
+        while len(_memory_cache) > MEMORY_ENTRIES:
+            _memory_cache.popitem(last=False)
+
+
+def _sidecar_paths(source: str) -> List[str]:
+    """Returns the candidate sidecar files of a local raster, in order of preference."""
+    from .core import get_cache_dir
+
+    if not os.path.isfile(source):
+        return []
+    digest = hashlib.sha1(os.path.realpath(source).encode()).hexdigest()
+    return [
+        source + SIDECAR_SUFFIX,
+        os.path.join(get_cache_dir("stats"), digest + ".json"),
+    ]
+
+
+def _read_sidecar(source: str, identity: Dict) -> Dict:
+    """Returns the cached entries of a raster, or an empty dictionary."""
+    for path in _sidecar_paths(source):
+        try:
+            with open(path) as f:
+                content = json.load(f)
+        except (OSError, ValueError):
+            continue
+        if content.get("identity") == identity:
+            return content.get("entries", {})
+    return {}
+
+
+def _write_sidecar(source: str, identity: Dict, entries: Dict) -> None:
+    """Writes the cached entries of a raster to the first writable sidecar file."""
+    content = {"identity": identity, "entries": entries}
+    for path in _sidecar_paths(source):
+        try:
+            temp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(temp, "w") as f:
+                json.dump(content, f)
+            # Readers never see a partially written file.
+            os.replace(temp, path)
+            return
+        except OSError:
+            continue
+
+
+def _read_sample(src, indexes: List[int], max_size: int, sample_size: int, seed: int):
+    """Reads a sample of the pixels of the bands of a dataset.
+
+    Returns:
+        tuple: The masked sample of shape (bands, rows, columns) and the sampling
+            method, one of "full", "overview", "decimated" and "blocks".
+    """
+    import numpy as np
+    from rasterio.windows import Window
+
+    width, height = src.width, src.height
+    if max(width, height) <= max_size:
+        return src.read(indexes, masked=True), "full"
+
+    # The coarsest overview whose larger side still has at least max_size pixels.
+    factors = [
+        f for f in src.overviews(indexes[0]) if max(width, height) / f >= max_size
+    ]
+    if factors:
+        factor = max(factors)
+        out_shape = (
+            len(indexes),
+            math.ceil(height / factor),
+            math.ceil(width / factor),
+        )
+        return src.read(indexes, out_shape=out_shape, masked=True), "overview"
+
+    if width * height <= 16 * sample_size:
+        scale = max(width, height) / max_size
+        out_shape = (
+            len(indexes),
+            max(1, round(height / scale)),
+            max(1, round(width / scale)),
+        )
+        return src.read(indexes, out_shape=out_shape, masked=True), "decimated"
+
+    # Without overviews, a random sample of internal blocks is read instead of the
+    # whole raster, since reading part of a block costs as much as the block.
+    block_height, block_width = src.block_shapes[indexes[0] - 1]
+    rows = math.ceil(height / block_height)
+    cols = math.ceil(width / block_width)
+    count = min(rows * cols, math.ceil(sample_size / (block_height * block_width)))
+    blocks = np.random.default_rng(seed).choice(rows * cols, count, replace=False)
+    samples = []
+    for block in sorted(blocks):
+        row, col = divmod(int(block), cols)
+        window = Window(
+            col * block_width, row * block_height, block_width, block_height
+        ).intersection(Window(0, 0, width, height))
+        data = src.read(indexes, window=window, masked=True)
+        samples.append(data.reshape(len(indexes), 1, -1))
+    return np.ma.concatenate(samples, axis=2), "blocks"
+
+
+def _summarize(band, percentiles: Sequence[float], method: str) -> Dict:
+    """Returns the statistics of a masked band sample."""
+    import numpy as np
+
+    values = band.compressed().astype("float64")
+    total = band.size
+    stats = {
+        "count": float(len(values)),
+        "valid_pixels": float(len(values)),
+        "masked_pixels": float(total - len(values)),
+        "valid_percent": round(100 * len(values) / total, 2) if total else 0,
+        "method": method,
+        "sample_size": int(total),
+        # The Dvoretzky-Kiefer-Wolfowitz bound on the error of the estimated
+        # quantiles at 95% confidence, as a fraction of the distribution.
+        "rank_error": (
+            0.0
+            if method == "full" or len(values) == 0
+            else math.sqrt(math.log(2 / 0.05) / (2 * len(values)))
+        ),
+    }
+    if len(values) == 0:
+        return stats
+    histogram, edges = np.histogram(values, bins=10)
+    stats.update(
+        {
+            "min": float(values.min()),
+            "max": float(values.max()),
+            "mean": float(values.mean()),
+            "sum": float(values.sum()),
+            "std": float(values.std()),
+            "median": float(np.median(values)),
+            "histogram": [histogram.tolist(), edges.tolist()],
+        }
+    )
+    for p, value in zip(percentiles, np.percentile(values, percentiles)):
+        stats[f"percentile_{p:g}"] = float(value)
+    return stats
+
+
+def band_statistics(
+    source,
+    indexes: Optional[Union[int, List[int]]] = None,
+    max_size: int = 1024,
+    sample_size: Optional[int] = None,
+    percentiles: Sequence[float] = (2, 98),
+    nodata: Optional[float] = None,
+    cache: bool = True,
+    seed: int = 0,
+) -> Dict:
+    """Estimates the statistics of the bands of a raster without reading all of it.
+
+    Rasters whose larger side is at most max_size pixels are read completely. Larger
+    rasters are read from the coarsest overview with at least max_size pixels on its
+    larger side or, without such an overview, from a random sample of sample_size
+    pixels in whole internal blocks (or a decimated read for rasters of less than
+    16 * sample_size pixels).
+
+    The statistics of each band include the "method" used, the "sample_size" and a
+    "rank_error" bound: with 95% confidence, an estimated percentile p lies between the
+    true percentiles p - 100 * rank_error and p + 100 * rank_error. The bound assumes
+    that the sampled pixels are independent, which makes it optimistic for strongly
+    spatially correlated rasters.
+
+    Args:
+        source (str | rasterio.DatasetReader): The path or URL of the raster, or an
+            open rasterio dataset.
+        indexes (int | list, optional): The band indexes, starting at 1. Defaults to
+            None (all bands).
+        max_size (int, optional): The minimum larger side in pixels of the overview
+            the statistics are estimated from. Defaults to 1024.
+        sample_size (int, optional): The number of pixels sampled from rasters without
+            overviews. Defaults to max_size squared.
+        percentiles (list, optional): The percentiles to estimate. Defaults to (2, 98).
+        nodata (float, optional): The nodata value, overriding the nodata value of the
+            raster. Defaults to None.
+        cache (bool, optional): Whether to read and write the results in the sidecar
+            cache, a JSON file next to a local raster (or in the stats folder of the
+            leafmap cache directory if its directory is not writable), and in an
+            in-memory cache of the last MEMORY_ENTRIES results, where the statistics
+            of remote rasters expire after MEMORY_TTL seconds. Defaults to True.
+        seed (int, optional): The seed of the random block sample. Defaults to 0.
+
+    Returns:
+        dict: The statistics of each band, with keys b1, b2, etc., in the format of
+            the titiler statistics endpoint.
+    """
+    import numpy as np
+    import rasterio
+
+    if sample_size is None:
+        sample_size = max_size * max_size
+    if isinstance(indexes, int):
+        indexes = [indexes]
+
+    path = source if isinstance(source, str) else source.name
+    key = json.dumps([indexes, max_size, sample_size, list(percentiles), nodata, seed])
+    if cache:
+        identity = _identity(path)
+        memory_key = (json.dumps(identity, sort_keys=True), key)
+        stats = _memory_get(memory_key)
+        if stats is not None:
+            return stats
+        entries = _read_sidecar(path, identity)
+        if key in entries:
+            _memory_put(memory_key, entries[key], local=True)
+            return entries[key]
+
+    src = rasterio.open(source) if isinstance(source, str) else source
+    try:
+        band_indexes = list(src.indexes) if indexes is None else list(indexes)
+        data, method = _read_sample(src, band_indexes, max_size, sample_size, seed)
+    finally:
+        if isinstance(source, str):
+            src.close()
+    if nodata is not None:
+        data = np.ma.masked_equal(data.filled(nodata), nodata)
+    if np.issubdtype(data.dtype, np.floating):
+        data = np.ma.masked_invalid(data)
+
+    stats = {
+        f"b{index}": _summarize(band, percentiles, method)
+        for index, band in zip(band_indexes, data)
+    }
+
+    if cache:
+        _memory_put(memory_key, stats, local=os.path.isfile(path))
+        if os.path.isfile(path):
+            entries = _read_sidecar(path, identity)
+            entries[key] = stats
+            _write_sidecar(path, identity, entries)
+    return stats
+
+
+def band_min_max(
+    source,
+    indexes: Optional[Union[int, List[int]]] = None,
+    percentile: bool = False,
+    **kwargs,
+) -> Tuple[float, float]:
+    """Estimates the range of the bands of a raster, e.g., to rescale it.
+
+    Args:
+        source (str | rasterio.DatasetReader): The path or URL of the raster, or an
+            open rasterio dataset.
+        indexes (int | list, optional): The band indexes, starting at 1. Defaults to
+            None (all bands).
+        percentile (bool, optional): Whether to return the 2nd and 98th percentiles
+            instead of the minimum and maximum. Defaults to False.
+        **kwargs: Additional keyword arguments for band_statistics().
+
+    Returns:
+        tuple: The minimum and maximum over the bands, or (None, None) if the bands
+            have no valid pixels.
+    """
+    stats = band_statistics(source, indexes, **kwargs).values()
+    low, high = ("percentile_2", "percentile_98") if percentile else ("min", "max")
+    stats = [s for s in stats if low in s]
+    if len(stats) == 0:
+        return None, None
+    return min(s[low] for s in stats), max(s[high] for s in stats)
+
+
+def clear_statistics_cache(source: Optional[str] = None) -> None:
+    """Removes cached statistics.
+
+    Args:
+        source (str, optional): The raster whose statistics are removed, including its
+            sidecar files. Defaults to None (the in-memory cache of all rasters).
+    """
+    with _memory_lock:
+        if source is None:
+            _memory_cache.clear()
+            return
+        identity = json.dumps(_identity(source), sort_keys=True)
+        for key in [k for k in _memory_cache if k[0] == identity]:
+            del _memory_cache[key]
+    for path in _sidecar_paths(source):
+        if os.path.exists(path):
+            os.remove(path)
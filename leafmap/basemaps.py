@@ -19,12 +19,10 @@ More WMS basemaps can be found at the following websites:
 """
 
 import collections
+import json
 import os
 import requests
-import folium
-import ipyleaflet
-import xyzservices
-from .common import check_package, planet_tiles
+from collections.abc import Mapping
 
 GOOGLE_MAPS_API_KEY = os.environ.get("GOOGLE_MAPS_API_KEY", "YOUR-API-KEY")
 
@@ -281,6 +279,144 @@ WMS_TILES = {
 custom_tiles = {"xyz": XYZ_TILES, "wms": WMS_TILES}
 
 
+# Version of the on-disk provider index layout. Bump it when the layout changes.
+PROVIDER_INDEX_VERSION = 1
+
+_provider_index = None
+# The results of the most recent QMS searches, least recently used first.
+_qms_results = collections.OrderedDict()
+_QMS_MAX_RESULTS = 32
+
+
+def _xyzservices_version():
+    """Returns the version of the installed xyzservices package."""
+    from importlib.metadata import version, PackageNotFoundError
+
+    try:
+        return version("xyzservices")
+    except PackageNotFoundError:
+        import xyzservices
+
+        return xyzservices.__version__
+
+
+def build_provider_index():
+    """Builds an index of all tile providers in xyzservices.providers.
+
+    Returns:
+        list: A list of dictionaries in xyzservices order. Each dictionary contains
+            the flattened provider key, the provider definition, whether the provider
+            requires an access token, and the tile URL for free providers.
+    """
+    import xyzservices
+
+    index = []
+    for key, provider in xyzservices.providers.flatten().items():
+        provider = xyzservices.TileProvider(provider)
+        requires_token = provider.requires_token()
+        index.append(
+            {
+                "key": key,
+                "provider": dict(provider),
+                "requires_token": requires_token,
+                "url": None if requires_token else provider.build_url(),
+            }
+        )
+    return index
+
+
+def get_provider_index(refresh=False):
+    """Returns the index of xyzservices tile providers.
+
+    The index is built once per xyzservices version and saved as a JSON file in the
+    leafmap cache directory, so later sessions load it instead of filtering and
+    wrapping every provider again. The index is kept in memory for keyword search.
+
+    Args:
+        refresh (bool, optional): Whether to rebuild the index. Defaults to False.
+
+    Returns:
+        list: A list of provider index entries. See build_provider_index().
+    """
+    global _provider_index
+
+    if _provider_index is not None and not refresh:
+        return _provider_index
+
+    from .core import get_cache_dir
+
+    index = None
+    try:
+        filename = os.path.join(
+            get_cache_dir("basemaps"),
+            f"xyz_index_v{PROVIDER_INDEX_VERSION}_{_xyzservices_version()}.json",
+        )
+    except OSError:
+        filename = None
+
+    if filename is not None and os.path.exists(filename) and not refresh:
+        try:
+            with open(filename) as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            index = None
+
+    if index is None:
+        index = build_provider_index()
+        if filename is not None:
+            tmp_file = f"{filename}.{os.getpid()}.tmp"
+            try:
+                with open(tmp_file, "w") as f:
+                    json.dump(index, f)
+                os.replace(tmp_file, filename)
+            except (OSError, TypeError, ValueError):
+                if os.path.exists(tmp_file):
+                    os.remove(tmp_file)
+
+    for entry in index:
+        entry["search_text"] = "\0".join(
+            value.lower()
+            for value in entry["provider"].values()
+            if isinstance(value, str)
+        )
+
+    _provider_index = index
+    return index
+
+
+def search_provider_index(keyword=None, name=None):
+    """Searches the in-memory provider index.
+
+    Args:
+        keyword (str, optional): A keyword to look for in any text attribute of the
+            provider, e.g., the name, URL or attribution. Defaults to None.
+        name (str, optional): A keyword to look for in the provider name. Defaults to None.
+
+    Returns:
+        list: The matching provider index entries.
+    """
+    entries = get_provider_index()
+    if keyword is not None:
+        keyword = keyword.lower()
+        entries = [entry for entry in entries if keyword in entry["search_text"]]
+    if name is not None:
+        name = name.lower()
+        entries = [
+            entry for entry in entries if name in entry["provider"]["name"].lower()
+        ]
+    return entries
+
+
+def _select_providers(free_only=True, france=False):
+    """Yields the provider index entries matching the filters of get_xyz_dict()."""
+    for entry in sorted(get_provider_index(), key=lambda entry: entry["key"]):
+        if free_only and entry["requires_token"]:
+            continue
+        if not france and "france" in entry["provider"]["name"].lower():
+            continue
+        yield entry
+
+
 def get_xyz_dict(free_only=True, france=False):
     """Returns a dictionary of xyz services.
 
@@ -293,231 +429,341 @@ def get_xyz_dict(free_only=True, france=False):
     Returns:
         dict: A dictionary of xyz services.
     """
-    xyz_bunch = xyzservices.providers
-
-    if free_only:
-        xyz_bunch = xyz_bunch.filter(requires_token=False)
-    if not france:
-        xyz_bunch = xyz_bunch.filter(
-            function=lambda tile: "france" not in dict(tile)["name"].lower()
-        )
-
-    xyz_dict = xyz_bunch.flatten()
+    import xyzservices
 
-    for key, value in xyz_dict.items():
-        tile = xyzservices.TileProvider(value)
+    xyz_dict = collections.OrderedDict()
+    for entry in _select_providers(free_only, france):
+        tile = xyzservices.TileProvider(entry["provider"])
         if "type" not in tile:
             tile["type"] = "xyz"
-        xyz_dict[key] = tile
+        xyz_dict[entry["key"]] = tile
 
-    xyz_dict = collections.OrderedDict(sorted(xyz_dict.items()))
     return xyz_dict
 
 
-def xyz_to_leaflet():
-    """Convert xyz tile services to ipyleaflet tile layers.
+def _provider_spec(entry):
+    """Returns the tile specification of a provider index entry."""
+    spec = dict(entry["provider"])
+    spec.setdefault("type", "xyz")
+    spec["url"] = entry["url"]
+    return spec
 
-    Returns:
-        dict: A dictionary of ipyleaflet tile layers.
-    """
-    leaflet_dict = {}
-    # Ignore Esri basemaps if they are already in the custom XYZ_TILES.
-    ignore_list = [XYZ_TILES[tile]["name"] for tile in XYZ_TILES]
 
-    # Add custom tiles.
-    for tile_type, tile_dict in custom_tiles.items():
-        for _, tile_info in tile_dict.items():
-            tile_info["type"] = tile_type
-            leaflet_dict[tile_info["name"]] = tile_info
+def _planet_specs(tile_format):
+    """Returns the Planet basemaps as prebuilt layers if PLANET_API_KEY is set."""
+    if os.environ.get("PLANET_API_KEY") is None:
+        return {}
 
-    # Add xyzservices.provider tiles.
-    for _, tile_info in get_xyz_dict().items():
-        if tile_info["name"] in ignore_list:
-            continue
-        tile_info["url"] = tile_info.build_url()
-        leaflet_dict[tile_info["name"]] = tile_info
+    from .common import planet_tiles
 
-    return leaflet_dict
+    layers = planet_tiles(tile_format=tile_format)
+    return {key: {"type": "layer", "layer": layer} for key, layer in layers.items()}
 
 
-def xyz_to_folium():
-    """Convert xyz tile services to folium tile layers.
+def get_basemap_specs(backend="ipyleaflet"):
+    """Returns the names and tile specifications of the basemaps of a plotting backend.
+
+    Args:
+        backend (str, optional): The plotting backend. It can be one of "ipyleaflet",
+            "folium", "pydeck", "plotly", and "bokeh". Defaults to "ipyleaflet".
 
     Returns:
-        dict: A dictionary of folium tile layers.
+        dict: An ordered dictionary of basemap names to tile specifications.
     """
-    folium_dict = {}
+    specs = collections.OrderedDict()
     # Ignore Esri basemaps if they are already in the custom XYZ_TILES.
     ignore_list = [XYZ_TILES[tile]["name"] for tile in XYZ_TILES]
 
-    for key, tile in custom_tiles["xyz"].items():
-        folium_dict[key] = folium.TileLayer(
-            tiles=tile["url"],
-            attr=tile["attribution"],
-            name=tile["name"],
-            overlay=True,
-            control=True,
-            max_zoom=22,
+    if backend == "ipyleaflet":
+        for tile_type, tile_dict in custom_tiles.items():
+            for tile_info in tile_dict.values():
+                specs[tile_info["name"]] = dict(tile_info, type=tile_type)
+        for entry in _select_providers():
+            spec = _provider_spec(entry)
+            if spec["name"] not in ignore_list:
+                specs[spec["name"]] = spec
+
+    elif backend == "folium":
+        for tile_type, tile_dict in custom_tiles.items():
+            for key, tile_info in tile_dict.items():
+                specs[key] = dict(tile_info, type=tile_type)
+        for entry in _select_providers():
+            spec = _provider_spec(entry)
+            if spec["name"] not in ignore_list:
+                specs[spec["name"]] = spec
+        specs.update(_planet_specs("folium"))
+
+    elif backend == "pydeck":
+        for key, tile_info in custom_tiles["xyz"].items():
+            specs[key] = dict(tile_info, type="xyz")
+        for entry in _select_providers():
+            spec = _provider_spec(entry)
+            if spec["name"] not in ignore_list:
+                specs[entry["key"]] = spec
+        for key, spec in _planet_specs("ipyleaflet").items():
+            specs[key] = {"type": "xyz", "url": spec["layer"].url}
+
+    elif backend == "plotly":
+        for key, tile_info in custom_tiles["xyz"].items():
+            specs[key] = dict(tile_info, type="xyz", name=key)
+        for entry in _select_providers():
+            spec = _provider_spec(entry)
+            if spec["name"] not in ignore_list:
+                specs[spec["name"]] = spec
+
+    elif backend == "bokeh":
+        for key, tile_info in XYZ_TILES.items():
+            specs[key] = dict(tile_info, type="xyz")
+        for entry in _select_providers():
+            spec = _provider_spec(entry)
+            specs[spec["name"]] = spec
+
+    else:
+        raise ValueError(
+            f"Unsupported backend: {backend}. It must be one of {list(_BASEMAP_BUILDERS)}."
         )
 
-    for key, tile in custom_tiles["wms"].items():
-        folium_dict[key] = folium.WmsTileLayer(
-            url=tile["url"],
-            layers=tile["layers"],
-            name=tile["name"],
-            attr=tile["attribution"],
-            fmt=tile["format"],
-            transparent=tile["transparent"],
+    return specs
+
+
+def _ipyleaflet_basemap(key, spec):
+    """Returns the basemap for the ipyleaflet backend as a frozen Box."""
+    from box import Box
+
+    return Box(spec, frozen_box=True)
+
+
+def _folium_basemap(key, spec):
+    """Returns the basemap for the folium backend as a folium tile layer."""
+    import folium
+
+    if spec["type"] == "layer":
+        return spec["layer"]
+    elif spec["type"] == "wms":
+        return folium.WmsTileLayer(
+            url=spec["url"],
+            layers=spec["layers"],
+            name=spec["name"],
+            attr=spec["attribution"],
+            fmt=spec["format"],
+            transparent=spec["transparent"],
             overlay=True,
             control=True,
         )
-
-    for item in get_xyz_dict().values():
-        if item["name"] in ignore_list:
-            continue
-        folium_dict[item.name] = folium.TileLayer(
-            tiles=item.build_url(),
-            attr=item.attribution,
-            name=item.name,
-            max_zoom=item.get("max_zoom", 22),
+    else:
+        return folium.TileLayer(
+            tiles=spec["url"],
+            attr=spec["attribution"],
+            name=spec["name"],
+            max_zoom=spec.get("max_zoom", 22),
             overlay=True,
             control=True,
         )
 
-    if os.environ.get("PLANET_API_KEY") is not None:
-        planet_dict = planet_tiles(tile_format="folium")
-        folium_dict.update(planet_dict)
-
-    return folium_dict
-
-
-def xyz_to_pydeck():
-    """Convert xyz tile services to pydeck custom tile layers.
 
-    Returns:
-        dict: A dictionary of pydeck tile layers.
-    """
+def _pydeck_basemap(key, spec):
+    """Returns the basemap for the pydeck backend as a custom tile layer."""
+    from .common import check_package
 
     check_package("pydeck", "https://deckgl.readthedocs.io/en/latest/installation.html")
     import pydeck as pdk
 
-    pydeck_dict = {}
-    # Ignore Esri basemaps if they are already in the custom XYZ_TILES.
-    ignore_list = [XYZ_TILES[tile]["name"] for tile in XYZ_TILES]
-
-    for key, tile in custom_tiles["xyz"].items():
-        url = tile["url"]
-        pydeck_dict[key] = url
-
-    for key, item in get_xyz_dict().items():
-        if item["name"] in ignore_list:
-            continue
-        url = item.build_url()
-        pydeck_dict[key] = url
-
-        if os.environ.get("PLANET_API_KEY") is not None:
-            planet_dict = planet_tiles(tile_format="ipyleaflet")
-            for id_, tile in planet_dict.items():
-                pydeck_dict[id_] = tile.url
-
     pdk.settings.custom_libraries = [
         {
             "libraryName": "MyTileLayerLibrary",
             "resourceUri": "https://cdn.jsdelivr.net/gh/giswqs/pydeck_myTileLayer@master/dist/bundle.js",
         }
     ]
+    return pdk.Layer("MyTileLayer", spec["url"], key)
 
-    for key in pydeck_dict:
-        pydeck_dict[key] = pdk.Layer("MyTileLayer", pydeck_dict[key], key)
 
-    return pydeck_dict
+def _plotly_basemap(key, spec):
+    """Returns the basemap for the plotly backend as a mapbox layer dictionary."""
+    return {
+        "below": "traces",
+        "sourcetype": "raster",
+        "sourceattribution": spec["attribution"],
+        "source": [spec["url"]],
+        "name": spec["name"],
+    }
 
 
-def xyz_to_plotly():
-    """Convert xyz tile services to plotly tile layers.
+def _bokeh_basemap(key, spec):
+    """Returns the basemap for the bokeh backend as a WMTS tile source."""
+    from bokeh.models import WMTSTileSource
+
+    return WMTSTileSource(url=spec["url"], attribution=spec["attribution"])
+
+
+_BASEMAP_BUILDERS = {
+    "ipyleaflet": _ipyleaflet_basemap,
+    "folium": _folium_basemap,
+    "pydeck": _pydeck_basemap,
+    "plotly": _plotly_basemap,
+    "bokeh": _bokeh_basemap,
+}
+
+
+class BasemapRegistry(Mapping):
+    """A read-only mapping of basemap names to the tile layers of a plotting backend.
+
+    Basemap names and tile specifications are read from the cached provider index
+    the first time the registry is used. The backend layer object of a basemap is
+    only created the first time the basemap is looked up, and is reused afterwards.
+    Basemaps can be accessed by key or as attributes, e.g., `basemaps["OpenTopoMap"]`
+    or `basemaps.OpenTopoMap`.
+
+    Args:
+        backend (str, optional): The plotting backend. It can be one of "ipyleaflet",
+            "folium", "pydeck", "plotly", and "bokeh". Defaults to "ipyleaflet".
+    """
+
+    def __init__(self, backend="ipyleaflet"):
+        if backend not in _BASEMAP_BUILDERS:
+            raise ValueError(
+                f"Unsupported backend: {backend}. It must be one of {list(_BASEMAP_BUILDERS)}."
+            )
+        self._backend = backend
+        self._specs = None
+        self._layers = {}
+
+    @property
+    def backend(self):
+        """The plotting backend of the registry."""
+        return self._backend
+
+    @property
+    def specs(self):
+        """The ordered dictionary of basemap names to tile specifications."""
+        if self._specs is None:
+            self._specs = get_basemap_specs(self._backend)
+        return self._specs
+
+    def __getitem__(self, key):
+        if key not in self._layers:
+            spec = self.specs[key]
+            self._layers[key] = _BASEMAP_BUILDERS[self._backend](key, spec)
+        return self._layers[key]
+
+    def __contains__(self, key):
+        return key in self.specs
+
+    def __iter__(self):
+        return iter(self.specs)
+
+    def __len__(self):
+        return len(self.specs)
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(
+                f"{type(self).__name__} object has no attribute {name!r}"
+            ) from None
+
+    def __dir__(self):
+        return sorted(set(super().__dir__()) | set(self.specs))
+
+    def __repr__(self):
+        return f"{type(self).__name__}(backend={self._backend!r}, basemaps={len(self)})"
+
+    def search(self, keyword):
+        """Searches the basemaps by keyword.
+
+        Args:
+            keyword (str): The keyword to look for in any text attribute of the basemap.
+
+        Returns:
+            list: The names of the matching basemaps.
+        """
+        keyword = keyword.lower()
+        return [
+            key
+            for key, spec in self.specs.items()
+            if any(
+                isinstance(value, str) and keyword in value.lower()
+                for value in [key] + list(spec.values())
+            )
+        ]
+
+
+def xyz_to_leaflet():
+    """Convert xyz tile services to ipyleaflet tile layers.
 
     Returns:
-        dict: A dictionary of plotly tile layers.
+        dict: A dictionary of ipyleaflet tile layers.
     """
-    plotly_dict = {}
-    # Ignore Esri basemaps if they are already in the custom XYZ_TILES.
-    ignore_list = [XYZ_TILES[tile]["name"] for tile in XYZ_TILES]
+    return dict(get_basemap_specs("ipyleaflet"))
 
-    for key, tile in custom_tiles["xyz"].items():
-        plotly_dict[key] = {
-            "below": "traces",
-            "sourcetype": "raster",
-            "sourceattribution": tile["attribution"],
-            "source": [tile["url"]],
-            "name": key,
-        }
 
-    for item in get_xyz_dict().values():
-        if item["name"] in ignore_list:
-            continue
-        plotly_dict[item.name] = {
-            "below": "traces",
-            "sourcetype": "raster",
-            "sourceattribution": item.attribution,
-            "source": [item.build_url()],
-            "name": item.name,
-        }
+def xyz_to_folium():
+    """Convert xyz tile services to folium tile layers.
 
-    return plotly_dict
+    Returns:
+        dict: A dictionary of folium tile layers.
+    """
+    return dict(BasemapRegistry("folium"))
 
 
-def xyz_to_bokeh():
-    """Convert xyz tile services to bokeh tile layers.
+def xyz_to_pydeck():
+    """Convert xyz tile services to pydeck custom tile layers.
 
     Returns:
-        dict: A dictionary of bokeh tile layers.
+        dict: A dictionary of pydeck tile layers.
     """
-    from bokeh.models import WMTSTileSource
+    return dict(BasemapRegistry("pydeck"))
 
-    bokeh_dict = {}
 
-    for key in XYZ_TILES:
-        url = XYZ_TILES[key]["url"]
-        attribution = XYZ_TILES[key]["attribution"]
-        tile_options = {
-            "url": url,
-            "attribution": attribution,
-        }
-        bokeh_dict[key] = WMTSTileSource(**tile_options)
-
-    xyz_dict = get_xyz_dict()
-    for item in xyz_dict:
-        url = xyz_dict[item].build_url()
-        attribution = xyz_dict[item].attribution
-        key = xyz_dict[item].name
-        tile_options = {
-            "url": url,
-            "attribution": attribution,
-        }
-        bokeh_dict[key] = WMTSTileSource(**tile_options)
+def xyz_to_plotly():
+    """Convert xyz tile services to plotly tile layers.
 
-    return bokeh_dict
+    Returns:
+        dict: A dictionary of plotly tile layers.
+    """
+    return dict(BasemapRegistry("plotly"))
 
 
-def search_qms(keywords, limit=10, timeout=600):
+def xyz_to_bokeh():
+    """Convert xyz tile services to bokeh tile layers.
+
+    Returns:
+        dict: A dictionary of bokeh tile layers.
+    """
+    return dict(BasemapRegistry("bokeh"))
+
+
+def search_qms(keywords, limit=10, timeout=600, refresh=False):
     """Search qms files for keywords. Reference: https://github.com/geopandas/xyzservices/issues/65
 
     Args:
         keywords (str): Keywords to search for.
         limit (int): Number of results to return.
+        refresh (bool, optional): Whether to query the QMS API again instead of
+            returning the results kept in memory from a recent search. Only the last
+            32 searches are kept. Defaults to False.
 
     """
     QMS_API = "https://qms.nextgis.com/api/v1/geoservices"
 
-    services = requests.get(
-        f"{QMS_API}/?search={keywords}&type=tms&epsg=3857&limit={str(limit)}",
-        timeout=timeout,
-    )
-    services = services.json()
+    key = (keywords.lower(), limit)
+    if key not in _qms_results or refresh:
+        services = requests.get(
+            f"{QMS_API}/?search={keywords}&type=tms&epsg=3857&limit={str(limit)}",
+            timeout=timeout,
+        )
+        _qms_results[key] = services.json()
+
+    services = _qms_results[key]
+    _qms_results.move_to_end(key)
+    while len(_qms_results) > _QMS_MAX_RESULTS:
+        _qms_results.popitem(last=False)
     if services["count"] == 0:
         return None
     elif services["count"] <= limit:
-        return services["results"]
+        return list(services["results"])
     else:
         return services["results"][:limit]
 
@@ -537,6 +783,8 @@ def qms_to_geemap(service_id):
     Returns:
         ipyleaflet.TileLayer: An ipyleaflet tile layer.
     """
+    import ipyleaflet
+
     service_details = get_qms(service_id)
     name = service_details["name"]
     url = service_details["url"]
@@ -4,7 +4,7 @@ import xyzservices.providers as xyz
 from bokeh.models import WheelZoomTool, WMTSTileSource, GeoJSONDataSource, HoverTool
 from bokeh.plotting import figure, show, save
 from bokeh.io import output_notebook
-from .basemaps import xyz_to_bokeh
+from .basemaps import BasemapRegistry
 from . import common
 from typing import Optional, List, Dict
 
@@ -52,7 +52,7 @@ from .common import (
 )
 
 os.environ["OUTPUT_NOTEBOOK"] = "False"
-basemaps = Box(xyz_to_bokeh(), frozen_box=True)
+basemaps = BasemapRegistry("bokeh")
 
 
 class Map:
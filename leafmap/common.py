@@ -6,7 +6,10 @@ import os
 import requests
 import shutil
 import tarfile
+import threading
+import time
 import urllib.request
+import weakref
 import warnings
 import zipfile
 import folium
@@ -19,6 +22,7 @@ import subprocess
 from pathlib import Path
 from typing import Union, List, Dict, Optional, Tuple, TYPE_CHECKING, Any
 from .stac import *
+from .core import *
 
 try:
     from IPython.display import display
@@ -1008,28 +1012,35 @@ def local_tile_vmin_vmax(
 ):
     """Get vmin and vmax from COG.
 
+    The values are estimated from an overview and cached in a sidecar file, see
+    bandstats.band_statistics().
+
     Args:
         source (str | TileClient): A local COG file path or TileClient object.
         bands (str | list, optional): A list of band names. Defaults to None.
+        **kwargs: Additional keyword arguments for bandstats.band_statistics().
 
     Raises:
         ValueError: If source is not a TileClient object or a local COG file path.
 
     Returns:
-        tuple: A tuple of vmin and vmax.
+        tuple: A tuple of vmin and vmax, or (None, None) if the bands have no valid
+            pixels.
     """
     check_package("localtileserver", "https://github.com/banesullivan/localtileserver")
     from localtileserver import TileClient
+    from .bandstats import band_statistics
 
     if isinstance(source, str):
-        tile_client = TileClient(source)
+        tile_client = tile_clients.get(source)
+        filename = source if tile_client is None else tile_client.filename
     elif isinstance(source, TileClient):
-        tile_client = source
+        filename = source.filename
     else:
         raise ValueError("source must be a string or TileClient object.")
 
-    bandnames = tile_client.band_names
-    stats = tile_client.reader.statistics()
+    stats = band_statistics(filename, **kwargs)
+    bandnames = list(stats)
 
     if isinstance(bands, str):
         bands = [bands]
@@ -1038,12 +1049,13 @@ def local_tile_vmin_vmax(
     elif bands is None:
         bands = bandnames
 
-    if all(b in bandnames for b in bands):
-        vmin = min([stats[b]["min"] for b in bands])
-        vmax = max([stats[b]["max"] for b in bands])
-    else:
-        vmin = min([stats[b]["min"] for b in bandnames])
-        vmax = max([stats[b]["max"] for b in bandnames])
+    if not all(b in bandnames for b in bands):
+        bands = bandnames
+    bands = [b for b in bands if "min" in stats[b]]
+    if not bands:
+        return None, None
+    vmin = min([stats[b]["min"] for b in bands])
+    vmax = max([stats[b]["max"] for b in bands])
     return vmin, vmax
 
 
@@ -1060,7 +1072,7 @@ def local_tile_bands(source):
     from localtileserver import TileClient
 
     if isinstance(source, str):
-        tile_client = TileClient(source)
+        tile_client = tile_clients.get(source)
     elif isinstance(source, TileClient):
         tile_client = source
     else:
@@ -2462,11 +2474,117 @@ def to_hex_colors(colors):
         return colors
 
 
-def get_census_dict(reset=False):
+def refresh_inventory(
+    keys,
+    fetch,
+    previous=None,
+    versions=None,
+    max_workers=8,
+    timeout=120,
+    verbose=False,
+):
+    """Fetches the entries of an inventory concurrently, reusing unchanged entries.
+
+    Args:
+        keys (list): The keys of the entries, in the order of the inventory.
+        fetch (Callable): A function that takes a key and returns its entry as a dictionary,
+            or None to leave the key out of the inventory.
+        previous (dict, optional): The previous inventory. Entries whose version has not
+            changed are reused without calling fetch, and the previous entry of a key is
+            kept if fetching it fails or times out. Defaults to None.
+        versions (dict, optional): The current version of each key, e.g., the updated
+            timestamp of a STAC collection, which is stored in the "updated" field of
+            its entry. Keys without a version are always fetched. Defaults to None.
+        max_workers (int, optional): The maximum number of concurrent fetches. Defaults to 8.
+        timeout (float, optional): The maximum time in seconds to fetch one key. A fetch
+            that takes longer is abandoned. Defaults to 120.
+        verbose (bool, optional): If True, print progress and errors. Defaults to False.
+
+    Returns:
+        dict: The inventory.
+    """
+    import concurrent.futures
+
+    previous = previous or {}
+    versions = versions or {}
+    results = {}
+    outdated = []
+    for key in keys:
+        entry = previous.get(key)
+        version = versions.get(key)
+        if (
+            version is not None
+            and entry is not None
+            and entry.get("updated") == version
+        ):
+            results[key] = entry
+        else:
+            outdated.append(key)
+    if verbose:
+        print(f"Fetching {len(outdated)} of {len(keys)} entries ...")
+
+    started = {}
+
+    def run(key):
+        started[key] = time.monotonic()
+        entry = fetch(key)
+        if entry is not None and versions.get(key) is not None:
+            entry = dict(entry, updated=versions[key])
+        return entry
+
+    def fallback(key, message):
+        if verbose:
+            print(f"{key}: {message}")
+        if key in previous:
+            results[key] = previous[key]
+
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers)
+    futures = {executor.submit(run, key): key for key in outdated}
+    pending = set(futures)
+    try:
+        while pending:
+            deadlines = [
+                started[futures[f]] + timeout for f in pending if futures[f] in started
+            ]
+            wait = min(deadlines) - time.monotonic() if deadlines else timeout
+            done, pending = concurrent.futures.wait(
+                pending,
+                timeout=max(wait, 0),
+                return_when=concurrent.futures.FIRST_COMPLETED,
+            )
+            for future in done:
+                key = futures[future]
+                try:
+                    entry = future.result()
+                except Exception as e:
+                    fallback(key, e)
+                    continue
+                if entry is not None:
+                    results[key] = entry
+                elif verbose:
+                    print(f"{key}: skipped.")
+            now = time.monotonic()
+            for future in list(pending):
+                key = futures[future]
+                if key in started and now - started[key] >= timeout:
+                    pending.discard(future)
+                    fallback(key, f"timed out after {timeout} seconds.")
+    finally:
+        # Abandoned fetches finish in the background without blocking the caller.
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    return {key: results[key] for key in keys if key in results}
+
+
+def get_census_dict(reset=False, max_workers=8, timeout=300):
     """Returns a dictionary of Census data.
 
     Args:
         reset (bool, optional): Reset the dictionary. Defaults to False.
+        max_workers (int, optional): The maximum number of WMS services requested at once
+            when resetting the dictionary. Defaults to 8.
+        timeout (float, optional): The timeout in seconds of each WMS service. Services that
+            fail keep their previous layers. Defaults to 300.
 
     Returns:
         dict: A dictionary of Census data.
@@ -2483,8 +2601,6 @@ def get_census_dict(reset=False):
         except ImportError:
             raise ImportError("Please install owslib using 'pip install owslib'.")
 
-        census_dict = {}
-
         names = [
             "Current",
             "ACS 2021",
@@ -2507,8 +2623,6 @@ def get_census_dict(reset=False):
         ]
 
         links = {}
-
-        print("Retrieving data. Please wait ...")
         for name in names:
             if "Decennial" not in name:
                 links[name] = (
@@ -2519,16 +2633,27 @@ def get_census_dict(reset=False):
                     f"https://tigerweb.geo.census.gov/arcgis/services/Census2020/tigerWMS_{name.replace('Decennial', '').replace(' ', '')}/MapServer/WMSServer"
                 )
 
-            wms = WebMapService(links[name], timeout=300)
+        def fetch(name):
+            wms = WebMapService(links[name], timeout=timeout)
             layers = list(wms.contents)
             layers.sort()
-            census_dict[name] = {
+            return {
                 "url": links[name],
                 "layers": layers,
                 # "title": wms.identification.title,
                 # "abstract": wms.identification.abstract,
             }
 
+        previous = {}
+        if os.path.exists(census_data):
+            with open(census_data, "r") as f:
+                previous = json.load(f)
+
+        print("Retrieving data. Please wait ...")
+        census_dict = refresh_inventory(
+            names, fetch, previous, max_workers=max_workers, timeout=timeout
+        )
+
         with open(census_data, "w") as f:
             json.dump(census_dict, f, indent=4)
 
@@ -2552,12 +2677,16 @@ def search_xyz_services(keyword, name=None, list_only=True, add_prefix=True):
         list: A list of XYZ tile providers.
     """
 
-    import xyzservices.providers as xyz
+    import xyzservices
+    from .basemaps import search_provider_index
 
     if name is None:
-        providers = xyz.filter(keyword=keyword).flatten()
+        entries = search_provider_index(keyword=keyword)
     else:
-        providers = xyz.filter(name=name).flatten()
+        entries = search_provider_index(name=name)
+    providers = {
+        entry["key"]: xyzservices.TileProvider(entry["provider"]) for entry in entries
+    }
 
     if list_only:
         if add_prefix:
@@ -2581,13 +2710,10 @@ def search_qms(keyword, limit=10, list_only=True, add_prefix=True):
         list: A list of QMS tile providers.
     """
 
-    QMS_API = "https://qms.nextgis.com/api/v1/geoservices"
-    services = requests.get(
-        f"{QMS_API}/?search={keyword}&type=tms&epsg=3857&limit={limit}"
-    )
-    services = services.json()
-    if services["results"]:
-        providers = services["results"]
+    from .basemaps import search_qms as query_qms
+
+    providers = query_qms(keyword, limit=limit)
+    if providers:
         if list_only:
             if add_prefix:
                 return ["qms." + provider["name"] for provider in providers]
@@ -2794,25 +2920,141 @@ def save_data(data, file_ext=None, file_name=None):
         return None
 
 
-def temp_file_path(extension):
-    """Returns a temporary file path.
+class TileClientRegistry:
+    """A process-wide registry of localtileserver TileClients.
 
-    Args:
-        extension (str): The file extension.
+    Creating a TileClient opens the raster dataset and registers it with a tile
+    server. The registry reuses one client per source and set of client options
+    across layers and maps, e.g., when the same raster is added to several maps or
+    restyled. Local files are keyed by their path and modification time, so a
+    rewritten file gets a new client.
 
-    Returns:
-        str: The temporary file path.
+    Clients are released once no layer uses them and they have not been requested
+    for idle_timeout seconds. Layers that use a client are registered with track().
+
+    Args:
+        idle_timeout (float, optional): The time in seconds after which an unused
+            client is released. Defaults to 600.
     """
 
-    import tempfile
-    import uuid
+    def __init__(self, idle_timeout=600):
+        self.idle_timeout = idle_timeout
+        self._clients = {}
+        self._lock = threading.RLock()
+        self._reaper = None
+
+    @staticmethod
+    def _key(source, port, debug, client_args):
+        """Returns the registry key of a source and its client options."""
+        if os.path.exists(source):
+            source = os.path.abspath(source)
+            source = (source, os.stat(source).st_mtime_ns)
+        options = tuple(sorted((k, repr(v)) for k, v in client_args.items()))
+        return (source, str(port), debug, options)
+
+    def get(self, source, port="default", debug=False, cors_all=False, **client_args):
+        """Returns the TileClient of a source, creating it if necessary.
+
+        Args:
+            source (str): The path or URL of the raster dataset.
+            port (str, optional): The port to use for the server. Defaults to "default".
+            debug (bool, optional): If True, the server will be started in debug mode. Defaults to False.
+            cors_all (bool, optional): If True, enable CORS for all origins. Defaults to False.
+            **client_args: Additional arguments to pass to the TileClient, e.g., client_prefix.
+
+        Returns:
+            localtileserver.TileClient: The tile client.
+        """
+        from localtileserver import TileClient
+
+        client_args["cors_all"] = cors_all
+        key = self._key(source, port, debug, client_args)
+        with self._lock:
+            entry = self._clients.get(key)
+            if entry is None:
+                client = TileClient(source, port=port, debug=debug, **client_args)
+                entry = {"client": client, "last_used": 0, "layers": 0}
+                self._clients[key] = entry
+            entry["last_used"] = time.monotonic()
+            self._start_reaper()
+            return entry["client"]
+
+    def track(self, client, layer):
+        """Keeps a client alive for as long as a layer that uses it exists.
+
+        Args:
+            client (localtileserver.TileClient): The tile client.
+            layer (object): The layer that uses the client.
+        """
+        with self._lock:
+            for key, entry in self._clients.items():
+                if entry["client"] is client:
+                    entry["layers"] += 1
+                    weakref.finalize(layer, self._untrack, key)
+                    break
+
+    def _untrack(self, key):
+        """Called when a layer that uses the client of a key is garbage collected."""
+        with self._lock:
+            entry = self._clients.get(key)
+            if entry is not None:
+                entry["layers"] -= 1
+                entry["last_used"] = time.monotonic()
+
+    def close_idle(self, idle_timeout=None):
+        """Releases the clients that no layer uses and that have been idle for a while.
+
+        Args:
+            idle_timeout (float, optional): The idle time in seconds. Defaults to the
+                idle_timeout of the registry.
+
+        Returns:
+            int: The number of released clients.
+        """
+        if idle_timeout is None:
+            idle_timeout = self.idle_timeout
+        now = time.monotonic()
+        with self._lock:
+            idle = [
+                key
+                for key, entry in self._clients.items()
+                if entry["layers"] <= 0 and now - entry["last_used"] >= idle_timeout
+            ]
+            for key in idle:
+                # The tile server is shut down when the client is garbage collected.
+                del self._clients[key]
+        return len(idle)
+
+    def clear(self):
+        """Releases all clients."""
+        with self._lock:
+            self._clients.clear()
+
+    def _start_reaper(self):
+        """Starts the background thread that releases idle clients."""
+        if self._reaper is not None or self.idle_timeout is None:
+            return
+
+        def reap():
+            while True:
+                time.sleep(min(self.idle_timeout, 60))
+                self.close_idle()
+
+        self._reaper = threading.Thread(
+            target=reap, name="leafmap-tile-client-reaper", daemon=True
+        )
+        self._reaper.start()
+
+    def __len__(self):
+        return len(self._clients)
+
+    def __repr__(self):
+        return (
+            f"TileClientRegistry({len(self)} clients, idle_timeout={self.idle_timeout})"
+        )
 
-    if not extension.startswith("."):
-        extension = "." + extension
-    file_id = str(uuid.uuid4())
-    file_path = os.path.join(tempfile.gettempdir(), f"{file_id}{extension}")
 
-    return file_path
+tile_clients = TileClientRegistry()
 
 
 def get_local_tile_layer(
@@ -2951,7 +3193,9 @@ def get_local_tile_layer(
         else:
             layer_name = "LocalTile_" + random_string(3)
 
-    if isinstance(source, str) or isinstance(source, rasterio.io.DatasetReader):
+    if isinstance(source, str):
+        tile_client = tile_clients.get(source, port=port, debug=debug, **client_args)
+    elif isinstance(source, rasterio.io.DatasetReader):
         tile_client = TileClient(source, port=port, debug=debug, **client_args)
     else:
         tile_client = source
@@ -3027,6 +3271,8 @@ def get_local_tile_layer(
                 **kwargs,
             )
 
+    tile_clients.track(tile_client, tile_layer)
+
     if return_client:
         return tile_layer, tile_client
     else:
@@ -3508,43 +3754,6 @@ def geojson_to_gpkg(in_geojson, out_gpkg, **kwargs):
     gdf.to_file(out_gpkg, layer=name, driver="GPKG")
 
 
-def gdf_to_df(gdf, drop_geom=True):
-    """Converts a GeoDataFrame to a pandas DataFrame.
-
-    Args:
-        gdf (gpd.GeoDataFrame): A GeoDataFrame.
-        drop_geom (bool, optional): Whether to drop the geometry column. Defaults to True.
-
-    Returns:
-        pd.DataFrame: A pandas DataFrame containing the GeoDataFrame.
-    """
-    import pandas as pd
-
-    if drop_geom:
-        df = pd.DataFrame(gdf.drop(columns=["geometry"]))
-    else:
-        df = pd.DataFrame(gdf)
-
-    return df
-
-
-def gdf_bounds(gdf, return_geom=False):
-    """Returns the bounding box of a GeoDataFrame.
-
-    Args:
-        gdf (gpd.GeoDataFrame): A GeoDataFrame.
-        return_geom (bool, optional): Whether to return the bounding box as a GeoDataFrame. Defaults to False.
-
-    Returns:
-        list | gpd.GeoDataFrame: A bounding box in the form of a list (minx, miny, maxx, maxy) or GeoDataFrame.
-    """
-    bounds = gdf.total_bounds
-    if return_geom:
-        return bbox_to_gdf(bbox=bounds)
-    else:
-        return bounds
-
-
 def gdf_centroid(gdf, return_geom=False):
     """Returns the centroid of a GeoDataFrame.
 
@@ -3612,68 +3821,6 @@ def vector_geom_type(data, first_only=True, **kwargs):
         return gdf.geometry.type
 
 
-def check_dir(dir_path, make_dirs=True):
-    """Checks if a directory exists and creates it if it does not.
-
-    Args:
-        dir_path ([str): The path to the directory.
-        make_dirs (bool, optional): Whether to create the directory if it does not exist. Defaults to True.
-
-    Raises:
-        FileNotFoundError: If the directory could not be found.
-        TypeError: If the input directory path is not a string.
-
-    Returns:
-        str: The path to the directory.
-    """
-
-    if isinstance(dir_path, str):
-        if dir_path.startswith("~"):
-            dir_path = os.path.expanduser(dir_path)
-        else:
-            dir_path = os.path.abspath(dir_path)
-
-        if not os.path.exists(dir_path) and make_dirs:
-            os.makedirs(dir_path)
-
-        if os.path.exists(dir_path):
-            return dir_path
-        else:
-            raise FileNotFoundError("The provided directory could not be found.")
-    else:
-        raise TypeError("The provided directory path must be a string.")
-
-
-def check_file_path(file_path, make_dirs=True):
-    """Gets the absolute file path.
-
-    Args:
-        file_path (str): The path to the file.
-        make_dirs (bool, optional): Whether to create the directory if it does not exist. Defaults to True.
-
-    Raises:
-        FileNotFoundError: If the directory could not be found.
-        TypeError: If the input directory path is not a string.
-
-    Returns:
-        str: The absolute path to the file.
-    """
-    if isinstance(file_path, str):
-        if file_path.startswith("~"):
-            file_path = os.path.expanduser(file_path)
-        else:
-            file_path = os.path.abspath(file_path)
-
-        file_dir = os.path.dirname(file_path)
-        if not os.path.exists(file_dir) and make_dirs:
-            os.makedirs(file_dir)
-
-        return file_path
-
-    else:
-        raise TypeError("The provided file path must be a string.")
-
-
 def dict_to_json(data, file_path, indent=4):
     """Writes a dictionary to a JSON file.
 
@@ -3740,111 +3887,6 @@ def image_to_geotiff(image, dst_path, dtype=None, to_cog=True, **kwargs) -> None
         image_to_cog(dst_path, dst_path)
 
 
-def image_to_cog(source, dst_path=None, profile="deflate", BIGTIFF=None, **kwargs):
-    """Converts an image to a COG file.
-
-    Args:
-        source (str): A dataset path, URL or rasterio.io.DatasetReader object.
-        dst_path (str, optional): An output dataset path or or PathLike object. Defaults to None.
-        profile (str, optional): COG profile. More at https://cogeotiff.github.io/rio-cogeo/profile. Defaults to "deflate".
-        BIGTIFF (str, optional): Create a BigTIFF file. Can be "IF_SAFER" or "YES". Defaults to None.
-
-    Raises:
-        ImportError: If rio-cogeo is not installed.
-        FileNotFoundError: If the source file could not be found.
-    """
-    try:
-        from rio_cogeo.cogeo import cog_translate
-        from rio_cogeo.profiles import cog_profiles
-
-    except ImportError:
-        raise ImportError(
-            "The rio-cogeo package is not installed. Please install it with `pip install rio-cogeo` or `conda install rio-cogeo -c conda-forge`."
-        )
-
-    if not source.startswith("http"):
-        source = check_file_path(source)
-
-        if not os.path.exists(source):
-            raise FileNotFoundError("The provided input file could not be found.")
-
-    if dst_path is None:
-        if not source.startswith("http"):
-            dst_path = os.path.splitext(source)[0] + "_cog.tif"
-        else:
-            dst_path = temp_file_path(extension=".tif")
-
-    dst_path = check_file_path(dst_path)
-
-    dst_profile = cog_profiles.get(profile)
-    if "dst_kwargs" in kwargs:
-        dst_profile.update(kwargs.pop("dst_kwargs"))
-
-    if BIGTIFF is not None:
-        dst_profile.update({"BIGTIFF": BIGTIFF})
-    cog_translate(source, dst_path, dst_profile, **kwargs)
-
-
-def cog_validate(source, verbose=False):
-    """Validate Cloud Optimized Geotiff.
-
-    Args:
-        source (str): A dataset path or URL. Will be opened in "r" mode.
-        verbose (bool, optional): Whether to print the output of the validation. Defaults to False.
-
-    Raises:
-        ImportError: If the rio-cogeo package is not installed.
-        FileNotFoundError: If the provided file could not be found.
-
-    Returns:
-        tuple: A tuple containing the validation results (True is src_path is a valid COG, List of validation errors, and a list of validation warnings).
-    """
-    try:
-        from rio_cogeo.cogeo import cog_validate, cog_info
-    except ImportError:
-        raise ImportError(
-            "The rio-cogeo package is not installed. Please install it with `pip install rio-cogeo` or `conda install rio-cogeo -c conda-forge`."
-        )
-
-    if not source.startswith("http"):
-        source = check_file_path(source)
-
-        if not os.path.exists(source):
-            raise FileNotFoundError("The provided input file could not be found.")
-
-    if verbose:
-        return cog_info(source)
-    else:
-        return cog_validate(source)
-
-
-def image_to_numpy(image):
-    """Converts an image to a numpy array.
-
-    Args:
-        image (str): A dataset path, URL or rasterio.io.DatasetReader object.
-
-    Raises:
-        FileNotFoundError: If the provided file could not be found.
-
-    Returns:
-        np.array: A numpy array.
-    """
-    import rasterio
-
-    from osgeo import gdal
-
-    # ... and suppress errors
-    gdal.PushErrorHandler("CPLQuietErrorHandler")
-
-    try:
-        with rasterio.open(image, "r") as ds:
-            arr = ds.read()  # read all raster values
-        return arr
-    except Exception as e:
-        raise Exception(e)
-
-
 def numpy_to_image(
     np_array,
     filename: str,
@@ -3923,124 +3965,6 @@ def numpy_to_image(
     img.save(filename, **kwargs)
 
 
-def numpy_to_cog(
-    np_array,
-    out_cog,
-    bounds=None,
-    profile=None,
-    dtype=None,
-    dst_crs=None,
-    coord_crs=None,
-):
-    """Converts a numpy array to a COG file.
-
-    Args:
-        np_array (np.array): A numpy array representing an image or an HTTP URL to an image.
-        out_cog (str): The output COG file path.
-        bounds (tuple, optional): The bounds of the image in the format of (minx, miny, maxx, maxy). Defaults to None.
-        profile (str | dict, optional): File path to an existing COG file or a dictionary representing the profile. Defaults to None.
-        dtype (str, optional): The data type of the output COG file. Defaults to None.
-        dst_crs (str, optional): The coordinate reference system of the output COG file. Defaults to "epsg:4326".
-        coord_crs (str, optional): The coordinate reference system of bbox coordinates. Defaults to None.
-
-    """
-
-    import numpy as np
-    import rasterio
-    from rasterio.io import MemoryFile
-    from rasterio.transform import from_bounds
-
-    from rio_cogeo.cogeo import cog_translate
-    from rio_cogeo.profiles import cog_profiles
-
-    warnings.filterwarnings("ignore")
-
-    if isinstance(np_array, str):
-        with rasterio.open(np_array, "r") as ds:
-            np_array = ds.read()
-
-    if not isinstance(np_array, np.ndarray):
-        raise TypeError("The input array must be a numpy array.")
-
-    out_dir = os.path.dirname(out_cog)
-    check_dir(out_dir)
-
-    if profile is not None:
-        if isinstance(profile, str):
-            if (not profile.startswith("http")) and (not os.path.exists(profile)):
-                raise FileNotFoundError("The provided file could not be found.")
-            with rasterio.open(profile) as ds:
-                dst_crs = ds.crs
-                if bounds is None:
-                    bounds = ds.bounds
-
-        elif isinstance(profile, rasterio.profiles.Profile):
-            profile = dict(profile)
-        elif not isinstance(profile, dict):
-            raise TypeError("The provided profile must be a file path or a dictionary.")
-
-    if bounds is None:
-        print(
-            "warning: bounds is not set. Using the default bounds (-180.0, -85.0511, 180.0, 85.0511)"
-        )
-        bounds = (-180.0, -85.0511287798066, 180.0, 85.0511287798066)
-
-    if not isinstance(bounds, tuple) and len(bounds) != 4:
-        raise TypeError("The provided bounds must be a tuple of length 4.")
-
-    # Rasterio uses numpy array of shape of `(bands, height, width)`
-
-    if len(np_array.shape) == 3:
-        nbands = np_array.shape[0]
-        height = np_array.shape[1]
-        width = np_array.shape[2]
-    elif len(np_array.shape) == 2:
-        nbands = 1
-        height = np_array.shape[0]
-        width = np_array.shape[1]
-        np_array = np_array.reshape((1, height, width))
-    else:
-        raise ValueError("The input array must be a 2D or 3D numpy array.")
-
-    if coord_crs is not None and dst_crs is not None:
-        bounds = transform_bbox_coords(bounds, coord_crs, dst_crs)
-
-    src_transform = from_bounds(*bounds, width=width, height=height)
-    if dtype is None:
-        dtype = str(np_array.dtype)
-
-    if dst_crs is None:
-        dst_crs = "epsg:4326"
-
-    if isinstance(profile, dict):
-        src_profile = profile
-        src_profile["count"] = nbands
-    else:
-        src_profile = dict(
-            driver="GTiff",
-            dtype=dtype,
-            count=nbands,
-            height=height,
-            width=width,
-            crs=dst_crs,
-            transform=src_transform,
-        )
-
-    with MemoryFile() as memfile:
-        with memfile.open(**src_profile) as mem:
-            # Populate the input file with numpy array
-            mem.write(np_array)
-
-            dst_profile = cog_profiles.get("deflate")
-            cog_translate(
-                mem,
-                out_cog,
-                dst_profile,
-                in_memory=True,
-                quiet=True,
-            )
-
-
 def get_stac_collections(url, **kwargs):
     """Retrieve a list of STAC collections from a URL.
     This function is adapted from https://github.com/mykolakozyr/stacdiscovery/blob/a5d1029aec9c428a7ce7ae615621ea8915162824/app.py#L31.
@@ -4531,9 +4455,10 @@ def write_lidar(source, destination, do_compress=None, laz_backend=None):
     source.write(destination, do_compress=do_compress, laz_backend=laz_backend)
 
 
-def download_file(
-    url=None,
-    output=None,
+def download_files(
+    urls,
+    out_dir=None,
+    filenames=None,
     quiet=False,
     proxy=None,
     speed=None,
@@ -4545,155 +4470,51 @@ def download_file(
     unzip=True,
     overwrite=False,
     subfolder=False,
+    multi_part=False,
 ):
-    """Download a file from URL, including Google Drive shared URL.
+    """Download files from URLs, including Google Drive shared URL.
 
     Args:
-        url (str, optional): Google Drive URL is also supported. Defaults to None.
-        output (str, optional): Output filename. Default is basename of URL.
+        urls (list): The list of urls to download. Google Drive URL is also supported.
+        out_dir (str, optional): The output directory. Defaults to None.
+        filenames (list, optional): Output filename. Default is basename of URL.
         quiet (bool, optional): Suppress terminal output. Default is False.
         proxy (str, optional): Proxy. Defaults to None.
         speed (float, optional): Download byte size per second (e.g., 256KB/s = 256 * 1024). Defaults to None.
         use_cookies (bool, optional): Flag to use cookies. Defaults to True.
-        verify (bool | str, optional): Either a bool, in which case it controls whether the server's TLS certificate is verified, or a string,
-            in which case it must be a path to a CA bundle to use. Default is True.. Defaults to True.
+        verify (bool | str, optional): Either a bool, in which case it controls whether the server's TLS certificate is verified, or a string, in which case it must be a path to a CA bundle to use. Default is True.. Defaults to True.
         id (str, optional): Google Drive's file ID. Defaults to None.
         fuzzy (bool, optional): Fuzzy extraction of Google Drive's file Id. Defaults to False.
         resume (bool, optional): Resume the download from existing tmp file if possible. Defaults to False.
         unzip (bool, optional): Unzip the file. Defaults to True.
         overwrite (bool, optional): Overwrite the file if it already exists. Defaults to False.
         subfolder (bool, optional): Create a subfolder with the same name as the file. Defaults to False.
+        multi_part (bool, optional): If the file is a multi-part file. Defaults to False.
 
-    Returns:
-        str: The output file path.
+    Examples:
+
+        files = ["sam_hq_vit_tiny.zip", "sam_hq_vit_tiny.z01", "sam_hq_vit_tiny.z02", "sam_hq_vit_tiny.z03"]
+        base_url = "https://github.com/opengeos/datasets/releases/download/models/"
+        urls = [base_url + f for f in files]
+        leafmap.download_files(urls, out_dir="models", multi_part=True)
     """
-    try:
-        import gdown
-    except ImportError:
-        print(
-            "The gdown package is required for this function. Use `pip install gdown` to install it."
-        )
-        return
 
-    if output is None:
-        if isinstance(url, str) and url.startswith("http"):
-            output = os.path.basename(url)
+    if out_dir is None:
+        out_dir = os.getcwd()
 
-    out_dir = os.path.abspath(os.path.dirname(output))
-    if not os.path.exists(out_dir):
-        os.makedirs(out_dir)
+    if filenames is None:
+        filenames = [None] * len(urls)
 
-    if isinstance(url, str):
-        if os.path.exists(os.path.abspath(output)) and (not overwrite):
-            print(
-                f"{output} already exists. Skip downloading. Set overwrite=True to overwrite."
-            )
-            return os.path.abspath(output)
+    filepaths = []
+    for url, output in zip(urls, filenames):
+        if output is None:
+            filename = os.path.join(out_dir, os.path.basename(url))
         else:
-            url = github_raw_url(url)
-
-    if "https://drive.google.com/file/d/" in url:
-        fuzzy = True
+            filename = os.path.join(out_dir, output)
 
-    output = gdown.download(
-        url, output, quiet, proxy, speed, use_cookies, verify, id, fuzzy, resume
-    )
-
-    if unzip:
-        if output.endswith(".zip"):
-            with zipfile.ZipFile(output, "r") as zip_ref:
-                if not quiet:
-                    print("Extracting files...")
-                if subfolder:
-                    basename = os.path.splitext(os.path.basename(output))[0]
-
-                    output = os.path.join(out_dir, basename)
-                    if not os.path.exists(output):
-                        os.makedirs(output)
-                    zip_ref.extractall(output)
-                else:
-                    zip_ref.extractall(os.path.dirname(output))
-        elif output.endswith(".tar.gz") or output.endswith(".tar"):
-            if output.endswith(".tar.gz"):
-                mode = "r:gz"
-            else:
-                mode = "r"
-
-            with tarfile.open(output, mode) as tar_ref:
-                if not quiet:
-                    print("Extracting files...")
-                if subfolder:
-                    basename = os.path.splitext(os.path.basename(output))[0]
-                    output = os.path.join(out_dir, basename)
-                    if not os.path.exists(output):
-                        os.makedirs(output)
-                    tar_ref.extractall(output)
-                else:
-                    tar_ref.extractall(os.path.dirname(output))
-
-    return os.path.abspath(output)
-
-
-def download_files(
-    urls,
-    out_dir=None,
-    filenames=None,
-    quiet=False,
-    proxy=None,
-    speed=None,
-    use_cookies=True,
-    verify=True,
-    id=None,
-    fuzzy=False,
-    resume=False,
-    unzip=True,
-    overwrite=False,
-    subfolder=False,
-    multi_part=False,
-):
-    """Download files from URLs, including Google Drive shared URL.
-
-    Args:
-        urls (list): The list of urls to download. Google Drive URL is also supported.
-        out_dir (str, optional): The output directory. Defaults to None.
-        filenames (list, optional): Output filename. Default is basename of URL.
-        quiet (bool, optional): Suppress terminal output. Default is False.
-        proxy (str, optional): Proxy. Defaults to None.
-        speed (float, optional): Download byte size per second (e.g., 256KB/s = 256 * 1024). Defaults to None.
-        use_cookies (bool, optional): Flag to use cookies. Defaults to True.
-        verify (bool | str, optional): Either a bool, in which case it controls whether the server's TLS certificate is verified, or a string, in which case it must be a path to a CA bundle to use. Default is True.. Defaults to True.
-        id (str, optional): Google Drive's file ID. Defaults to None.
-        fuzzy (bool, optional): Fuzzy extraction of Google Drive's file Id. Defaults to False.
-        resume (bool, optional): Resume the download from existing tmp file if possible. Defaults to False.
-        unzip (bool, optional): Unzip the file. Defaults to True.
-        overwrite (bool, optional): Overwrite the file if it already exists. Defaults to False.
-        subfolder (bool, optional): Create a subfolder with the same name as the file. Defaults to False.
-        multi_part (bool, optional): If the file is a multi-part file. Defaults to False.
-
-    Examples:
-
-        files = ["sam_hq_vit_tiny.zip", "sam_hq_vit_tiny.z01", "sam_hq_vit_tiny.z02", "sam_hq_vit_tiny.z03"]
-        base_url = "https://github.com/opengeos/datasets/releases/download/models/"
-        urls = [base_url + f for f in files]
-        leafmap.download_files(urls, out_dir="models", multi_part=True)
-    """
-
-    if out_dir is None:
-        out_dir = os.getcwd()
-
-    if filenames is None:
-        filenames = [None] * len(urls)
-
-    filepaths = []
-    for url, output in zip(urls, filenames):
-        if output is None:
-            filename = os.path.join(out_dir, os.path.basename(url))
-        else:
-            filename = os.path.join(out_dir, output)
-
-        filepaths.append(filename)
-        if multi_part:
-            unzip = False
+        filepaths.append(filename)
+        if multi_part:
+            unzip = False
 
         download_file(
             url,
@@ -4760,86 +4581,6 @@ def download_folder(
     return files
 
 
-def clip_image(image, mask, output, to_cog=True):
-    """Clip an image by mask.
-
-    Args:
-        image (str): Path to the image file in GeoTIFF format.
-        mask (str | list | dict): The mask used to extract the image. It can be a path to vector datasets (e.g., GeoJSON, Shapefile), a list of coordinates, or m.user_roi.
-        output (str): Path to the output file.
-        to_cog (bool, optional): Flags to indicate if you want to convert the output to COG. Defaults to True.
-
-    Raises:
-        ImportError: If the fiona or rasterio package is not installed.
-        FileNotFoundError: If the image is not found.
-        ValueError: If the mask is not a valid GeoJSON or raster file.
-        FileNotFoundError: If the mask file is not found.
-    """
-    try:
-        import json
-        import fiona
-        import rasterio
-        import rasterio.mask
-    except ImportError as e:
-        raise ImportError(e)
-
-    if not os.path.exists(image):
-        raise FileNotFoundError(f"{image} does not exist.")
-
-    if not output.endswith(".tif"):
-        raise ValueError("Output must be a tif file.")
-
-    output = check_file_path(output)
-
-    if isinstance(mask, str):
-        if mask.startswith("http"):
-            mask = download_file(mask, output)
-        if not os.path.exists(mask):
-            raise FileNotFoundError(f"{mask} does not exist.")
-    elif isinstance(mask, list) or isinstance(mask, dict):
-        if isinstance(mask, list):
-            geojson = {
-                "type": "FeatureCollection",
-                "features": [
-                    {
-                        "type": "Feature",
-                        "properties": {},
-                        "geometry": {"type": "Polygon", "coordinates": [mask]},
-                    }
-                ],
-            }
-        else:
-            geojson = {
-                "type": "FeatureCollection",
-                "features": [mask],
-            }
-        mask = temp_file_path(".geojson")
-        with open(mask, "w") as f:
-            json.dump(geojson, f)
-
-    with fiona.open(mask, "r") as shapefile:
-        shapes = [feature["geometry"] for feature in shapefile]
-
-    with rasterio.open(image) as src:
-        out_image, out_transform = rasterio.mask.mask(src, shapes, crop=True)
-        out_meta = src.meta
-
-    out_meta.update(
-        {
-            "driver": "GTiff",
-            "height": out_image.shape[1],
-            "width": out_image.shape[2],
-            "transform": out_transform,
-        }
-    )
-
-    with rasterio.open(output, "w", **out_meta) as dest:
-        dest.write(out_image)
-
-    if to_cog:
-        image_to_cog(output, output)
-
-
 def netcdf_to_tif(
     filename,
     output=None,
@@ -5461,21 +5202,6 @@ def plot_raster_3d(
     mesh.warp_by_scalar(**mesh_kwargs).plot(**kwargs)
 
 
-def github_raw_url(url):
-    """Get the raw URL for a GitHub file.
-
-    Args:
-        url (str): The GitHub URL.
-    Returns:
-        str: The raw URL.
-    """
-    if isinstance(url, str) and url.startswith("https://github.com/") and "blob" in url:
-        url = url.replace("github.com", "raw.githubusercontent.com").replace(
-            "blob/", ""
-        )
-    return url
-
-
 def get_direct_url(url):
     """Get the direct URL for a given URL.
 
@@ -5853,163 +5579,6 @@ def download_ned(
     )
 
 
-def mosaic(
-    images,
-    output,
-    ext="tif",
-    recursive=True,
-    merge_args={},
-    to_cog=True,
-    verbose=True,
-    **kwargs,
-):
-    """Mosaics a list of images into a single image. Inspired by https://bit.ly/3A6roDK.
-
-    Args:
-        images (str | list): An input directory containing images or a list of images.
-        output (str): The output image filepath.
-        ext (str, optional): The file extension of the images. Defaults to 'tif'.
-        recursive (bool, optional): Whether to recursively search for images in the input directory. Defaults to True.
-        merge_args (dict, optional): A dictionary of arguments to pass to the rasterio.merge function. Defaults to {}.
-        to_cog (bool, optional): Whether to convert the output image to a Cloud Optimized GeoTIFF. Defaults to True.
-        verbose (bool, optional): Whether to print progress. Defaults to True.
-
-    """
-    from rasterio.merge import merge
-    import rasterio as rio
-    from pathlib import Path
-
-    output = os.path.abspath(output)
-
-    if isinstance(images, str):
-        raster_files = find_files(images, ext=ext, recursive=recursive)
-    elif isinstance(images, list):
-        raster_files = images
-    else:
-        raise ValueError("images must be a list of raster files.")
-
-    raster_to_mosiac = []
-
-    if not os.path.exists(os.path.dirname(output)):
-        os.makedirs(os.path.dirname(output))
-
-    for index, p in enumerate(raster_files):
-        if verbose:
-            print(f"Reading {index+1}/{len(raster_files)}: {os.path.basename(p)}")
-        raster = rio.open(p, **kwargs)
-        raster_to_mosiac.append(raster)
-
-    if verbose:
-        print("Merging rasters...")
-    arr, transform = merge(raster_to_mosiac, **merge_args)
-
-    output_meta = raster.meta.copy()
-    output_meta.update(
-        {
-            "driver": "GTiff",
-            "height": arr.shape[1],
-            "width": arr.shape[2],
-            "transform": transform,
-        }
-    )
-
-    with rio.open(output, "w", **output_meta) as m:
-        m.write(arr)
-
-    if to_cog:
-        if verbose:
-            print("Converting to COG...")
-        image_to_cog(output, output)
-
-    if verbose:
-        print(f"Saved mosaic to {output}")
-
-
-def geometry_bounds(geometry, decimals=4):
-    """Returns the bounds of a geometry.
-
-    Args:
-        geometry (dict): A GeoJSON geometry.
-        decimals (int, optional): The number of decimal places to round the bounds to. Defaults to 4.
-
-    Returns:
-        list: A list of bounds in the form of [minx, miny, maxx, maxy].
-    """
-    if isinstance(geometry, dict):
-        if "geometry" in geometry:
-            coords = geometry["geometry"]["coordinates"][0]
-        else:
-            coords = geometry["coordinates"][0]
-
-    else:
-        raise ValueError("geometry must be a GeoJSON-like dictionary.")
-
-    x = [p[0] for p in coords]
-    y = [p[1] for p in coords]
-    west = round(min(x), decimals)
-    east = round(max(x), decimals)
-    south = round(min(y), decimals)
-    north = round(max(y), decimals)
-    return [west, south, east, north]
-
-
-def reproject(
-    image, output, dst_crs="EPSG:4326", resampling="nearest", to_cog=True, **kwargs
-):
-    """Reprojects an image.
-
-    Args:
-        image (str): The input image filepath.
-        output (str): The output image filepath.
-        dst_crs (str, optional): The destination CRS. Defaults to "EPSG:4326".
-        resampling (Resampling, optional): The resampling method. Defaults to "nearest".
-        to_cog (bool, optional): Whether to convert the output image to a Cloud Optimized GeoTIFF. Defaults to True.
-        **kwargs: Additional keyword arguments to pass to rasterio.open.
-
-    """
-    import rasterio as rio
-    from rasterio.warp import calculate_default_transform, reproject, Resampling
-
-    if isinstance(resampling, str):
-        resampling = getattr(Resampling, resampling)
-
-    image = os.path.abspath(image)
-    output = os.path.abspath(output)
-
-    if not os.path.exists(os.path.dirname(output)):
-        os.makedirs(os.path.dirname(output))
-
-    with rio.open(image, **kwargs) as src:
-        transform, width, height = calculate_default_transform(
-            src.crs, dst_crs, src.width, src.height, *src.bounds
-        )
-        kwargs = src.meta.copy()
-        kwargs.update(
-            {
-                "crs": dst_crs,
-                "transform": transform,
-                "width": width,
-                "height": height,
-            }
-        )
-
-        with rio.open(output, "w", **kwargs) as dst:
-            for i in range(1, src.count + 1):
-                reproject(
-                    source=rio.band(src, i),
-                    destination=rio.band(dst, i),
-                    src_transform=src.transform,
-                    src_crs=src.crs,
-                    dst_transform=transform,
-                    dst_crs=dst_crs,
-                    resampling=resampling,
-                    **kwargs,
-                )
-
-    if to_cog:
-        image_to_cog(output, output)
-
-
 def image_check(image):
     from localtileserver import TileClient
 
@@ -6151,21 +5720,6 @@ def image_projection(image, **kwargs):
     return client.metadata()["Projection"]
 
 
-def image_set_crs(image, epsg):
-    """Define the CRS of an image.
-
-    Args:
-        image (str): The input image filepath
-        epsg (int): The EPSG code of the CRS to set.
-    """
-
-    from rasterio.crs import CRS
-    import rasterio
-
-    with rasterio.open(image, "r+") as rds:
-        rds.crs = CRS.from_epsg(epsg)
-
-
 def image_geotransform(image, **kwargs):
     """Get the geotransform of an image.
 
@@ -6202,45 +5756,6 @@ def image_resolution(image, **kwargs):
     return client.metadata()["GeoTransform"][1]
 
 
-def find_files(input_dir, ext=None, fullpath=True, recursive=True):
-    """Find files in a directory.
-
-    Args:
-        input_dir (str): The input directory.
-        ext (str, optional): The file extension to match. Defaults to None.
-        fullpath (bool, optional): Whether to return the full path. Defaults to True.
-        recursive (bool, optional): Whether to search recursively. Defaults to True.
-
-    Returns:
-        list: A list of matching files.
-    """
-
-    from pathlib import Path
-
-    files = []
-
-    if ext is None:
-        ext = "*"
-    else:
-        ext = ext.replace(".", "")
-
-    ext = f"*.{ext}"
-
-    if recursive:
-        if fullpath:
-            files = [str(path.joinpath()) for path in Path(input_dir).rglob(ext)]
-        else:
-            files = [str(path.name) for path in Path(input_dir).rglob(ext)]
-    else:
-        if fullpath:
-            files = [str(path.joinpath()) for path in Path(input_dir).glob(ext)]
-        else:
-            files = [path.name for path in Path(input_dir).glob(ext)]
-
-    files.sort()
-    return files
-
-
 def zoom_level_resolution(zoom, latitude=0):
     """Returns the approximate pixel scale based on zoom level and latutude.
         See https://blogs.bing.com/maps/2006/02/25/map-control-zoom-levels-gt-resolution
@@ -6617,25 +6132,6 @@ def is_studio_lab():
     return on_studio_lab
 
 
-def bbox_to_gdf(bbox, crs="epsg:4326"):
-    """Convert a bounding box to a GeoPandas GeoDataFrame.
-
-    Args:
-        bbox (list): A bounding box in the format of [minx, miny, maxx, maxy].
-        crs (str, optional): The CRS of the bounding box. Defaults to 'epsg:4326'.
-
-    Returns:
-        GeoDataFrame: A GeoDataFrame with a single polygon.
-    """
-    import geopandas as gpd
-    from shapely.geometry import Polygon
-
-    return gpd.GeoDataFrame(
-        geometry=[Polygon.from_bounds(*bbox)],
-        crs=crs,
-    )
-
-
 def bbox_to_polygon(bbox):
     """Convert a bounding box to a shapely Polygon.
 
@@ -8358,80 +7854,6 @@ def arc_zoom_to_bounds(bounds):
     arc_zoom_to_extent(xmin, ymin, xmax, ymax)
 
 
-def vector_to_raster(
-    vector,
-    output,
-    field="FID",
-    assign="last",
-    nodata=True,
-    cell_size=None,
-    base=None,
-    callback=None,
-    verbose=False,
-    to_epsg=None,
-):
-    """Convert a vector to a raster.
-
-    Args:
-        vector (str | GeoPandas.GeoDataFrame): The input vector data, can be a file path or a GeoDataFrame.
-        output (str): The output raster file path.
-        field (str, optional): Input field name in attribute table. Defaults to 'FID'.
-        assign (str, optional): Assignment operation, where multiple points are in the same grid cell; options
-            include 'first', 'last' (default), 'min', 'max', 'sum', 'number'. Defaults to 'last'.
-        nodata (bool, optional): Background value to set to NoData. Without this flag, it will be set to 0.0.
-        cell_size (float, optional): Optionally specified cell size of output raster. Not used when base raster is specified
-        base (str, optional): Optionally specified input base raster file. Not used when a cell size is specified. Defaults to None.
-        callback (fuct, optional): A callback function to report progress. Defaults to None.
-        verbose (bool, optional): Whether to print progress to the console. Defaults to False.
-        to_epsg (integer, optional): Optionally specified the EPSG code to reproject the raster to. Defaults to None.
-
-    """
-    import geopandas as gpd
-    import whitebox
-
-    output = os.path.abspath(output)
-
-    if isinstance(vector, str):
-        gdf = gpd.read_file(vector)
-    elif isinstance(vector, gpd.GeoDataFrame):
-        gdf = vector
-    else:
-        raise TypeError("vector must be a file path or a GeoDataFrame")
-
-    if to_epsg is None:
-        to_epsg = 3857
-
-    if to_epsg == 4326:
-        raise ValueError("to_epsg cannot be 4326")
-
-    if gdf.crs.is_geographic:
-        gdf = gdf.to_crs(epsg=to_epsg)
-        vector = temp_file_path(extension=".shp")
-        gdf.to_file(vector)
-    else:
-        to_epsg = gdf.crs.to_epsg()
-
-    wbt = whitebox.WhiteboxTools()
-    wbt.verbose = verbose
-
-    goem_type = gdf.geom_type[0]
-
-    if goem_type == "LineString":
-        wbt.vector_lines_to_raster(
-            vector, output, field, nodata, cell_size, base, callback
-        )
-    elif goem_type == "Polygon":
-        wbt.vector_polygons_to_raster(
-            vector, output, field, nodata, cell_size, base, callback
-        )
-    else:
-        wbt.vector_points_to_raster(
-            vector, output, field, assign, nodata, cell_size, base, callback
-        )
-
-    image_set_crs(output, to_epsg)
-
-
 def show_youtube_video(url, width=800, height=450, allow_autoplay=False, **kwargs):
     """
     Displays a Youtube video in a Jupyter notebook.
@@ -8523,7 +7945,8 @@ def filter_bounds(data, bbox, within=False, align=True, **kwargs):
     """Filters a GeoDataFrame or GeoSeries by a bounding box.
 
     Args:
-        data (str | GeoDataFrame): The input data to filter. Can be a file path or a GeoDataFrame.
+        data (str | GeoDataFrame | StacItemIndex): The input data to filter. Can be a file path
+            or a GeoDataFrame, or a StacItemIndex of STAC items to avoid scanning all of them.
         bbox (list | GeoDataFrame): The bounding box to filter by. Can be a list of 4 coordinates or a file path or a GeoDataFrame.
         within (bool, optional): Whether to filter by the bounding box or the bounding box's interior. Defaults to False.
         align (bool, optional): If True, automatically aligns GeoSeries based on their indices. If False, the order of elements is preserved.
@@ -8533,7 +7956,13 @@ def filter_bounds(data, bbox, within=False, align=True, **kwargs):
     """
     import geopandas as gpd
 
-    if isinstance(data, str):
+    if isinstance(data, StacItemIndex):
+        if isinstance(bbox, str):
+            bbox = gpd.read_file(bbox, **kwargs)
+        if isinstance(bbox, list):
+            return data.search(bbox=bbox, within=within)
+        return data.search(intersects=bbox, within=within)
+    elif isinstance(data, str):
         data = gpd.read_file(data, **kwargs)
     elif not isinstance(data, (gpd.GeoDataFrame, gpd.GeoSeries)):
         raise TypeError("data must be a file path or a GeoDataFrame or GeoSeries")
@@ -8559,7 +7988,9 @@ def filter_date(
     """Filters a DataFrame, GeoDataFrame or GeoSeries by a date range.
 
     Args:
-        data (str | DataFrame | GeoDataFrame): The input data to filter. Can be a file path or a DataFrame or GeoDataFrame.
+        data (str | DataFrame | GeoDataFrame | StacItemIndex): The input data to filter. Can be a file path
+            or a DataFrame or GeoDataFrame, or a StacItemIndex of STAC items, which is filtered by its
+            datetime column.
         start_date (str, optional): The start date, e.g., 2023-01-01. Defaults to None.
         end_date (str, optional): The end date, e.g., 2023-12-31. Defaults to None.
         date_field (str, optional): The name of the date field. Defaults to "date".
@@ -8573,7 +8004,11 @@ def filter_date(
     import pandas as pd
     import geopandas as gpd
 
-    if isinstance(data, str):
+    if isinstance(data, StacItemIndex):
+        if end_date is None:
+            end_date = datetime.datetime.now().strftime("%Y-%m-%d")
+        return data.search(start_date=start_date, end_date=end_date)
+    elif isinstance(data, str):
         data = gpd.read_file(data, **kwargs)
     elif not isinstance(
         data, (gpd.GeoDataFrame, gpd.GeoSeries, pd.DataFrame, pd.Series)
@@ -8647,152 +8082,17 @@ def disjoint(input_features, selecting_features, output=None, **kwargs):
         return results
 
 
-def zonal_stats(
-    vectors,
-    raster,
-    layer=0,
-    band_num=1,
-    nodata=None,
-    affine=None,
-    stats=None,
-    all_touched=False,
-    categorical=False,
-    category_map=None,
-    add_stats=None,
-    raster_out=False,
+def s3_list_objects(
+    bucket,
     prefix=None,
-    geojson_out=False,
-    gdf_out=False,
-    dst_crs=None,
-    open_vector_args={},
-    open_raster_args={},
+    limit=None,
+    ext=None,
+    fullpath=True,
+    request_payer="bucket-owner",
+    client_args={},
     **kwargs,
 ):
-    """This function wraps rasterstats.zonal_stats and performs reprojection if necessary.
-        See https://pythonhosted.org/rasterstats/rasterstats.html.
-
-    Args:
-        vectors (str | list | GeoDataFrame): path to an vector source or geo-like python objects.
-        raster (str | ndarray): ndarray or path to a GDAL raster source.
-        layer (int, optional): If vectors is a path to an fiona source, specify the vector layer to
-            use either by name or number. Defaults to 0
-        band_num (int | str, optional): If raster is a GDAL source, the band number to use (counting from 1). defaults to 1.
-        nodata (float, optional): If raster is a GDAL source, this value overrides any NODATA value
-            specified in the file’s metadata. If None, the file’s metadata’s NODATA value (if any)
-            will be used. defaults to None.
-        affine (Affine, optional): required only for ndarrays, otherwise it is read from src. Defaults to None.
-        stats (str | list, optional): Which statistics to calculate for each zone.
-            It can be ['min', 'max', 'mean', 'count']. For more, see https://pythonhosted.org/rasterstats/manual.html#zonal-statistics
-            Defaults to None.
-        all_touched (bool, optional): Whether to include every raster cell touched by a geometry, or only those having
-            a center point within the polygon. defaults to False
-        categorical (bool, optional): If True, the raster values will be treated as categorical.
-        category_map (dict, optional):A dictionary mapping raster values to human-readable categorical names.
-            Only applies when categorical is True
-        add_stats (dict, optional): with names and functions of additional stats to compute. Defaults to None.
-        raster_out (bool, optional): Include the masked numpy array for each feature?. Defaults to False.
-        prefix (str, optional): add a prefix to the keys. Defaults to None.
-        geojson_out (bool, optional): Return list of GeoJSON-like features (default: False)
-            Original feature geometry and properties will be retained with zonal stats
-            appended as additional properties. Use with prefix to ensure unique and
-            meaningful property names.. Defaults to False.
-        gdf_out (bool, optional): Return a GeoDataFrame. Defaults to False.
-        dst_crs (str, optional): The destination CRS. Defaults to None.
-        open_vector_args (dict, optional): Pass additional arguments to geopandas.open_file(). Defaults to {}.
-        open_raster_args (dict, optional): Pass additional arguments to rasterio.open(). Defaults to {}.
-
-    Returns:
-        dict | list | GeoDataFrame: The zonal statistics results
-    """
-
-    import geopandas as gpd
-    import rasterio
-
-    try:
-        import rasterstats
-    except ImportError:
-        raise ImportError(
-            "rasterstats is not installed. Install it with pip install rasterstats"
-        )
-    try:
-        if isinstance(raster, str):
-            with rasterio.open(raster, **open_raster_args) as src:
-                affine = src.transform
-                nodata = src.nodata
-                array = src.read(band_num, masked=True)
-                raster_crs = src.crs
-        elif isinstance(raster, rasterio.io.DatasetReader):
-            affine = raster.transform
-            nodata = raster.nodata
-            array = raster.read(band_num, masked=True)
-            raster_crs = raster.crs
-        else:
-            array = raster
-
-        if isinstance(vectors, str):
-            gdf = gpd.read_file(vectors, **open_vector_args)
-        elif isinstance(vectors, list):
-            gdf = gpd.GeoDataFrame.from_features(vectors)
-        else:
-            gdf = vectors
-
-        vector_crs = gdf.crs
-
-        if gdf.crs.is_geographic:
-            if not raster_crs.is_geographic:
-                gdf = gdf.to_crs(raster_crs)
-        elif gdf.crs != raster_crs:
-            if not raster_crs.is_geographic:
-                gdf = gdf.to_crs(raster_crs)
-            else:
-                raise ValueError("The vector and raster CRSs are not compatible")
-
-        if gdf_out is True:
-            geojson_out = True
-
-        result = rasterstats.zonal_stats(
-            gdf,
-            array,
-            layer=layer,
-            band_num=band_num,
-            nodata=nodata,
-            affine=affine,
-            stats=stats,
-            all_touched=all_touched,
-            categorical=categorical,
-            category_map=category_map,
-            add_stats=add_stats,
-            raster_out=raster_out,
-            prefix=prefix,
-            geojson_out=geojson_out,
-            **kwargs,
-        )
-
-        if gdf_out is True:
-            if dst_crs is None:
-                dst_crs = vector_crs
-
-            out_gdf = gpd.GeoDataFrame.from_features(result)
-            out_gdf.crs = raster_crs
-            return out_gdf.to_crs(dst_crs)
-        else:
-            return result
-
-    except Exception as e:
-        raise Exception(e)
-
-
-def s3_list_objects(
-    bucket,
-    prefix=None,
-    limit=None,
-    ext=None,
-    fullpath=True,
-    request_payer="bucket-owner",
-    client_args={},
-    **kwargs,
-):
-    """List objects in a S3 bucket
+    """List objects in a S3 bucket
 
     Args:
         bucket (str): The name of the bucket.
@@ -9034,57 +8334,6 @@ def s3_get_objects(
         )
 
 
-def read_raster(
-    source,
-    window=None,
-    return_array=True,
-    coord_crs=None,
-    request_payer="bucket-owner",
-    env_args={},
-    open_args={},
-    **kwargs,
-):
-    """Read a raster from S3.
-
-    Args:
-        source (str): The path to the raster on S3.
-        window (tuple, optional): The window (col_off, row_off, width, height) to read. Defaults to None.
-        return_array (bool, optional): Whether to return a numpy array. Defaults to True.
-        coord_crs (str, optional): The coordinate CRS of the input coordinates. Defaults to None.
-        request_payer (str, optional): Specifies who pays for the download from S3.
-            Can be "bucket-owner" or "requester". Defaults to "bucket-owner".
-        env_args (dict, optional): Additional arguments to pass to rasterio.Env(). Defaults to {}.
-        open_args (dict, optional): Additional arguments to pass to rasterio.open(). Defaults to {}.
-
-    Returns:
-        np.ndarray: The raster as a numpy array.
-    """
-    import rasterio
-    from rasterio.windows import Window
-
-    with rasterio.Env(AWS_REQUEST_PAYER=request_payer, **env_args):
-        src = rasterio.open(source, **open_args)
-        if not return_array:
-            return src
-        else:
-            if window is None:
-                window = Window(0, 0, src.width, src.height)
-            else:
-                if isinstance(window, list):
-                    coords = coords_to_xy(
-                        source,
-                        window,
-                        coord_crs,
-                        env_args=env_args,
-                        open_args=open_args,
-                    )
-                    window = xy_to_window(coords)
-                window = Window(*window)
-
-            array = src.read(window=window, **kwargs)
-            return array
-
-
 def read_rasters(
     sources,
     window=None,
@@ -9132,187 +8381,16 @@ def read_rasters(
     return result
 
 
-def transform_coords(x, y, src_crs, dst_crs, **kwargs):
-    """Transform coordinates from one CRS to another.
+def _tile_source_url(source):
+    """Returns the URL template of a tile source for downloading map tiles.
 
     Args:
-        x (float): The x coordinate.
-        y (float): The y coordinate.
-        src_crs (str): The source CRS, e.g., "EPSG:4326".
-        dst_crs (str): The destination CRS, e.g., "EPSG:3857".
+        source (str): The tile source. It can be one of "OPENSTREETMAP", "ROADMAP",
+            "SATELLITE", "TERRAIN", "HYBRID", the name of an xyzservices basemap, or an HTTP URL.
 
     Returns:
-        dict: The transformed coordinates in the format of (x, y)
+        str: The URL template of the tile source.
     """
-    import pyproj
-
-    transformer = pyproj.Transformer.from_crs(
-        src_crs, dst_crs, always_xy=True, **kwargs
-    )
-    return transformer.transform(x, y)
-
-
-def transform_bbox_coords(bbox, src_crs, dst_crs, **kwargs):
-    """Transforms the coordinates of a bounding box [x1, y1, x2, y2] from one CRS to another.
-
-    Args:
-        bbox (list | tuple): The bounding box [x1, y1, x2, y2] coordinates.
-        src_crs (str): The source CRS, e.g., "EPSG:4326".
-        dst_crs (str): The destination CRS, e.g., "EPSG:3857".
-
-    Returns:
-        list: The transformed bounding box [x1, y1, x2, y2] coordinates.
-    """
-    x1, y1, x2, y2 = bbox
-
-    x1, y1 = transform_coords(
-        x1, y1, src_crs, dst_crs, **kwargs
-    )  # pylint: disable=E0633
-    x2, y2 = transform_coords(
-        x2, y2, src_crs, dst_crs, **kwargs
-    )  # pylint: disable=E0633
-
-    return [x1, y1, x2, y2]
-
-
-def coords_to_xy(
-    src_fp: str,
-    coords: list,
-    coord_crs: str = "epsg:4326",
-    request_payer="bucket-owner",
-    env_args={},
-    open_args={},
-    **kwargs,
-) -> list:
-    """Converts a list of coordinates to pixel coordinates, i.e., (col, row) coordinates.
-
-    Args:
-        src_fp: The source raster file path.
-        coords: A list of coordinates in the format of [[x1, y1], [x2, y2], ...]
-        coord_crs: The coordinate CRS of the input coordinates. Defaults to "epsg:4326".
-        request_payer: Specifies who pays for the download from S3.
-            Can be "bucket-owner" or "requester". Defaults to "bucket-owner".
-        env_args: Additional keyword arguments to pass to rasterio.Env.
-        open_args: Additional keyword arguments to pass to rasterio.open.
-        **kwargs: Additional keyword arguments to pass to rasterio.transform.rowcol.
-
-    Returns:
-        A list of pixel coordinates in the format of [[x1, y1], [x2, y2], ...]
-    """
-    import numpy as np
-    import rasterio
-
-    if isinstance(coords, np.ndarray):
-        coords = coords.tolist()
-
-    if len(coords) == 4 and all([isinstance(c, (int, float)) for c in coords]):
-        coords = [[coords[0], coords[1]], [coords[2], coords[3]]]
-
-    xs, ys = zip(*coords)
-    with rasterio.Env(AWS_REQUEST_PAYER=request_payer, **env_args):
-        with rasterio.open(src_fp, **open_args) as src:
-            width = src.width
-            height = src.height
-            if coord_crs != src.crs:
-                xs, ys = transform_coords(
-                    xs, ys, coord_crs, src.crs, **kwargs
-                )  # pylint: disable=E0633
-            rows, cols = rasterio.transform.rowcol(src.transform, xs, ys, **kwargs)
-        result = [[col, row] for col, row in zip(cols, rows)]
-
-        result = [
-            [x, y] for x, y in result if x >= 0 and y >= 0 and x < width and y < height
-        ]
-        if len(result) == 0:
-            print("No valid pixel coordinates found.")
-        elif len(result) < len(coords):
-            print("Some coordinates are out of the image boundary.")
-
-        return result
-
-
-def xy_to_window(xy):
-    """Converts a list of coordinates to a rasterio window.
-
-    Args:
-        xy (list): A list of coordinates in the format of [[x1, y1], [x2, y2]]
-
-    Returns:
-        tuple: The rasterio window in the format of (col_off, row_off, width, height)
-    """
-
-    x1, y1 = xy[0]
-    x2, y2 = xy[1]
-
-    left = min(x1, x2)
-    right = max(x1, x2)
-    top = min(y1, y2)
-    bottom = max(y1, y2)
-
-    width = right - left
-    height = bottom - top
-
-    return (left, top, width, height)
-
-
-def map_tiles_to_geotiff(
-    output,
-    bbox,
-    zoom=None,
-    resolution=None,
-    source="OpenStreetMap",
-    crs="EPSG:3857",
-    to_cog=False,
-    quiet=False,
-    **kwargs,
-):
-    """Download map tiles and convert them to a GeoTIFF. The source is adapted from https://github.com/gumblex/tms2geotiff.
-        Credits to the GitHub user @gumblex.
-
-    Args:
-        output (str): The output GeoTIFF file.
-        bbox (list): The bounding box [minx, miny, maxx, maxy] coordinates in EPSG:4326, e.g., [-122.5216, 37.733, -122.3661, 37.8095]
-        zoom (int, optional): The map zoom level. Defaults to None.
-        resolution (float, optional): The resolution in meters. Defaults to None.
-        source (str, optional): The tile source. It can be one of the following: "OPENSTREETMAP", "ROADMAP",
-            "SATELLITE", "TERRAIN", "HYBRID", or an HTTP URL. Defaults to "OpenStreetMap".
-        crs (str, optional): The coordinate reference system. Defaults to "EPSG:3857".
-        to_cog (bool, optional): Convert to Cloud Optimized GeoTIFF. Defaults to False.
-        quiet (bool, optional): Suppress output. Defaults to False.
-        **kwargs: Additional arguments to pass to gdal.GetDriverByName("GTiff").Create().
-
-    """
-    import re
-    import io
-    import math
-    import itertools
-    import concurrent.futures
-
-    import numpy
-    from PIL import Image
-
-    try:
-        from osgeo import gdal, osr
-    except ImportError:
-        raise ImportError("GDAL is not installed. Install it with pip install GDAL")
-
-    try:
-        import httpx
-
-        SESSION = httpx.Client()
-    except ImportError:
-        import requests
-
-        SESSION = requests.Session()
-
-    SESSION.headers.update(
-        {
-            "Accept": "*/*",
-            "Accept-Encoding": "gzip, deflate",
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; rv:91.0) Gecko/20100101 Firefox/91.0",
-        }
-    )
-
     xyz_tiles = {
         "OPENSTREETMAP": {
             "url": "https://tile.openstreetmap.org/{z}/{x}/{y}.png",
@@ -9354,6 +8432,66 @@ def map_tiles_to_geotiff(
             'source must be one of "OpenStreetMap", "ROADMAP", "SATELLITE", "TERRAIN", "HYBRID", or a URL'
         )
 
+    return source
+
+
+def map_tiles_to_geotiff(
+    output,
+    bbox,
+    zoom=None,
+    resolution=None,
+    source="OpenStreetMap",
+    crs="EPSG:3857",
+    to_cog=False,
+    quiet=False,
+    fetcher=None,
+    cache=None,
+    resume=False,
+    min_zoom=None,
+    **kwargs,
+):
+    """Download map tiles and convert them to a GeoTIFF. The source is adapted from https://github.com/gumblex/tms2geotiff.
+        Credits to the GitHub user @gumblex.
+
+    Args:
+        output (str): The output GeoTIFF file.
+        bbox (list): The bounding box [minx, miny, maxx, maxy] coordinates in EPSG:4326, e.g., [-122.5216, 37.733, -122.3661, 37.8095]
+        zoom (int, optional): The map zoom level. Defaults to None.
+        resolution (float, optional): The resolution in meters. Defaults to None.
+        source (str, optional): The tile source. It can be one of the following: "OPENSTREETMAP", "ROADMAP",
+            "SATELLITE", "TERRAIN", "HYBRID", or an HTTP URL. Defaults to "OpenStreetMap".
+        crs (str, optional): The coordinate reference system. Defaults to "EPSG:3857".
+        to_cog (bool, optional): Convert to Cloud Optimized GeoTIFF. Defaults to False.
+        quiet (bool, optional): Suppress output. Defaults to False.
+        fetcher (TileFetcher | dict, optional): The fetcher used to download the tiles, or a
+            dictionary of arguments for creating one, e.g., {"max_workers": 32, "rate_limit": 50}.
+            See leafmap.tiles.TileFetcher. Defaults to None, which creates a TileFetcher
+            with the default settings.
+        cache (bool | str | TileCache, optional): The persistent tile cache, so that tiles
+            downloaded before are read from disk. It can be a leafmap.tiles.TileCache, the
+            path to a cache database, or True for the default cache in the leafmap cache
+            directory. Ignored if fetcher is a TileFetcher, which has its own cache.
+            Defaults to None (no cache).
+        resume (bool, optional): Make the download resumable. The completed tiles are
+            recorded in a manifest next to the output (output + ".manifest"), and rerunning
+            an interrupted download with the same arguments only fetches the missing tiles.
+            The manifest is removed when the download is complete. Defaults to False.
+        min_zoom (int, optional): Download the zoom levels from min_zoom to zoom and write
+            them into a Cloud Optimized GeoTIFF in one pass. The tiles of the lower zoom levels
+            become the overviews of the COG instead of resampling the full-resolution image,
+            and to_cog is implied. See leafmap.tiles.CogPyramidWriter. Only supported for
+            crs="EPSG:3857". Defaults to None.
+        **kwargs: Additional creation options passed to rasterio.open(), e.g., compress="jpeg".
+            GDAL-style options such as options=["COMPRESS=DEFLATE", "TILED=YES"] are also accepted.
+            If min_zoom is set, these are options of the COG driver, e.g., compress="webp".
+
+    """
+    import math
+
+    from .tiles import CogPyramidWriter, GeoTiffTileWriter, TileFetcher, bbox_to_tiles
+
+    source = _tile_source_url(source)
+
     def resolution_to_zoom_level(resolution):
         """
         Convert map resolution in meters to zoom level for Web Mercator (EPSG:3857) tiles.
@@ -9381,192 +8519,369 @@ def map_tiles_to_geotiff(
     if resolution is not None:
         zoom = resolution_to_zoom_level(resolution)
 
-    EARTH_EQUATORIAL_RADIUS = 6378137.0
-
-    Image.MAX_IMAGE_PIXELS = None
-
-    gdal.UseExceptions()
-    web_mercator = osr.SpatialReference()
-    try:
-        web_mercator.ImportFromEPSG(3857)
-    except RuntimeError as e:
-        # https://github.com/PDAL/PDAL/issues/2544#issuecomment-637995923
-        if "PROJ" in str(e):
-            pattern = r"/[\w/]+"
-            match = re.search(pattern, str(e))
-            if match:
-                file_path = match.group(0)
-                os.environ["PROJ_LIB"] = file_path
-                os.environ["GDAL_DATA"] = file_path.replace("proj", "gdal")
-                web_mercator.ImportFromEPSG(3857)
-
-    WKT_3857 = web_mercator.ExportToWkt()
-
-    def from4326_to3857(lat, lon):
-        xtile = math.radians(lon) * EARTH_EQUATORIAL_RADIUS
-        ytile = (
-            math.log(math.tan(math.radians(45 + lat / 2.0))) * EARTH_EQUATORIAL_RADIUS
-        )
-        return (xtile, ytile)
-
-    def deg2num(lat, lon, zoom):
-        lat_r = math.radians(lat)
-        n = 2**zoom
-        xtile = (lon + 180) / 360 * n
-        ytile = (1 - math.log(math.tan(lat_r) + 1 / math.cos(lat_r)) / math.pi) / 2 * n
-        return (xtile, ytile)
-
-    def is_empty(im):
-        extrema = im.getextrema()
-        if len(extrema) >= 3:
-            if len(extrema) > 3 and extrema[-1] == (0, 0):
-                return True
-            for ext in extrema[:3]:
-                if ext != (0, 0):
-                    return False
-            return True
-        else:
-            return extrema[0] == (0, 0)
-
-    def paste_tile(bigim, base_size, tile, corner_xy, bbox):
-        if tile is None:
-            return bigim
-        im = Image.open(io.BytesIO(tile))
-        mode = "RGB" if im.mode == "RGB" else "RGBA"
-        size = im.size
-        if bigim is None:
-            base_size[0] = size[0]
-            base_size[1] = size[1]
-            newim = Image.new(
-                mode, (size[0] * (bbox[2] - bbox[0]), size[1] * (bbox[3] - bbox[1]))
+    if min_zoom is not None:
+        if not 0 <= min_zoom <= zoom:
+            raise ValueError("min_zoom must be between 0 and zoom")
+        if crs.upper() != "EPSG:3857":
+            raise ValueError("min_zoom is only supported for EPSG:3857 output")
+
+    def draw_tile(source, bbox, zoom, filename, quiet=False, **kwargs):
+        if min_zoom is None:
+            writer = GeoTiffTileWriter(
+                filename,
+                bbox,
+                zoom,
+                resume=resume,
+                metadata={"source": source},
+                **kwargs,
             )
         else:
-            newim = bigim
-
-        dx = abs(corner_xy[0] - bbox[0])
-        dy = abs(corner_xy[1] - bbox[1])
-        xy0 = (size[0] * dx, size[1] * dy)
-        if mode == "RGB":
-            newim.paste(im, xy0)
-        else:
-            if im.mode != mode:
-                im = im.convert(mode)
-            if not is_empty(im):
-                newim.paste(im, xy0)
-        im.close()
-        return newim
-
-    def finish_picture(bigim, base_size, bbox, x0, y0, x1, y1):
-        xfrac = x0 - bbox[0]
-        yfrac = y0 - bbox[1]
-        x2 = round(base_size[0] * xfrac)
-        y2 = round(base_size[1] * yfrac)
-        imgw = round(base_size[0] * (x1 - x0))
-        imgh = round(base_size[1] * (y1 - y0))
-        retim = bigim.crop((x2, y2, x2 + imgw, y2 + imgh))
-        if retim.mode == "RGBA" and retim.getextrema()[3] == (255, 255):
-            retim = retim.convert("RGB")
-        bigim.close()
-        return retim
-
-    def get_tile(url):
-        retry = 3
-        while 1:
-            try:
-                r = SESSION.get(url, timeout=60)
-                break
-            except Exception:
-                retry -= 1
-                if not retry:
-                    raise
-        if r.status_code == 404:
-            return None
-        elif not r.content:
-            return None
-        r.raise_for_status()
-        return r.content
-
-    def draw_tile(
-        source, lat0, lon0, lat1, lon1, zoom, filename, quiet=False, **kwargs
-    ):
-        x0, y0 = deg2num(lat0, lon0, zoom)
-        x1, y1 = deg2num(lat1, lon1, zoom)
-        x0, x1 = sorted([x0, x1])
-        y0, y1 = sorted([y0, y1])
-        corners = tuple(
-            itertools.product(
-                range(math.floor(x0), math.ceil(x1)),
-                range(math.floor(y0), math.ceil(y1)),
+            writer = CogPyramidWriter(
+                filename,
+                bbox,
+                zoom,
+                min_zoom,
+                resume=resume,
+                metadata={"source": source},
+                **kwargs,
             )
-        )
-        totalnum = len(corners)
-        futures = []
-        with concurrent.futures.ThreadPoolExecutor(5) as executor:
-            for x, y in corners:
-                futures.append(
-                    executor.submit(get_tile, source.format(z=zoom, x=x, y=y))
-                )
-            bbox = (math.floor(x0), math.floor(y0), math.ceil(x1), math.ceil(y1))
-            bigim = None
-            base_size = [256, 256]
-            for k, (fut, corner_xy) in enumerate(zip(futures, corners), 1):
-                bigim = paste_tile(bigim, base_size, fut.result(), corner_xy, bbox)
-                if not quiet:
-                    print("Downloaded image %d/%d" % (k, totalnum))
-
-        if not quiet:
-            print("Saving GeoTIFF. Please wait...")
-        img = finish_picture(bigim, base_size, bbox, x0, y0, x1, y1)
-        imgbands = len(img.getbands())
-        driver = gdal.GetDriverByName("GTiff")
-
-        if "options" not in kwargs:
-            kwargs["options"] = [
-                "COMPRESS=DEFLATE",
-                "PREDICTOR=2",
-                "ZLEVEL=9",
-                "TILED=YES",
-            ]
-
-        kwargs.pop("overwrite", None)
-        gtiff = driver.Create(
-            filename,
-            img.size[0],
-            img.size[1],
-            imgbands,
-            gdal.GDT_Byte,
-            **kwargs,
-        )
-        xp0, yp0 = from4326_to3857(lat0, lon0)
-        xp1, yp1 = from4326_to3857(lat1, lon1)
-        pwidth = abs(xp1 - xp0) / img.size[0]
-        pheight = abs(yp1 - yp0) / img.size[1]
-        gtiff.SetGeoTransform((min(xp0, xp1), pwidth, 0, max(yp0, yp1), 0, -pheight))
-        gtiff.SetProjection(WKT_3857)
-        for band in range(imgbands):
-            array = np.array(img.getdata(band), dtype="u8")
-            array = array.reshape((img.size[1], img.size[0]))
-            band = gtiff.GetRasterBand(band + 1)
-            band.WriteArray(array)
-        gtiff.FlushCache()
+        totalnum = sum(len(bbox_to_tiles(bbox, z)) for z in writer.zooms)
+        if fetcher.cache is not None:
+            hits = fetcher.cache.hits
+        with writer:
+            corners = {z: writer.missing_tiles(z) for z in writer.zooms}
+            done = totalnum - sum(len(tiles) for tiles in corners.values())
+            if done and not quiet:
+                print(f"Resuming download: {done}/{totalnum} tiles already downloaded")
+            k = done
+            for z in writer.zooms:
+                for (x, y), tile in fetcher.fetch_tiles(source, corners[z], z):
+                    writer.write_tile(x, y, tile, z)
+                    k += 1
+                    if not quiet:
+                        print("Downloaded image %d/%d" % (k, totalnum))
+
+            if writer.tiles_written == 0:
+                raise ValueError("No tiles were downloaded for the given bbox.")
 
         if not quiet:
+            if fetcher.cache is not None:
+                hits = fetcher.cache.hits - hits
+                print(f"{hits}/{totalnum} tiles were read from the tile cache")
             print(f"Image saved to {filename}")
-        return img
+
+    close_fetcher = not isinstance(fetcher, TileFetcher)
+    if fetcher is None:
+        fetcher = TileFetcher(cache=cache)
+    elif isinstance(fetcher, dict):
+        fetcher = TileFetcher(**{"cache": cache, **fetcher})
 
     try:
-        draw_tile(source, south, west, north, east, zoom, output, quiet, **kwargs)
+        draw_tile(source, [west, south, east, north], zoom, output, quiet, **kwargs)
         if crs.upper() != "EPSG:3857":
             reproject(output, output, crs, to_cog=to_cog)
-        elif to_cog:
+        elif to_cog and min_zoom is None:
             image_to_cog(output, output)
     except Exception as e:
         raise Exception(e)
+    finally:
+        if close_fetcher:
+            fetcher.close()
 
 
 tms_to_geotiff = map_tiles_to_geotiff
 
 
+def map_tiles_to_mbtiles(
+    output,
+    bbox,
+    max_zoom,
+    min_zoom=0,
+    source="OpenStreetMap",
+    name=None,
+    attribution=None,
+    quiet=False,
+    fetcher=None,
+    cache=None,
+):
+    """Download the map tiles of a bounding box and zoom range into an MBTiles archive.
+
+    Identical tiles, e.g., ocean or empty tiles, are stored only once.
+
+    Args:
+        output (str): The output MBTiles file.
+        bbox (list): The bounding box [minx, miny, maxx, maxy] coordinates in EPSG:4326, e.g., [-122.5216, 37.733, -122.3661, 37.8095]
+        max_zoom (int): The highest zoom level to download.
+        min_zoom (int, optional): The lowest zoom level to download. Defaults to 0.
+        source (str, optional): The tile source. It can be one of the following: "OPENSTREETMAP", "ROADMAP",
+            "SATELLITE", "TERRAIN", "HYBRID", the name of an xyzservices basemap, or an HTTP URL. Defaults to "OpenStreetMap".
+        name (str, optional): The name of the tileset. Defaults to None, which uses the output file name.
+        attribution (str, optional): The attribution of the tile source. Defaults to None.
+        quiet (bool, optional): Suppress output. Defaults to False.
+        fetcher (TileFetcher | dict, optional): The fetcher used to download the tiles, or a
+            dictionary of arguments for creating one. See leafmap.tiles.TileFetcher. Defaults to None.
+        cache (bool | str | TileCache, optional): The persistent tile cache. See map_tiles_to_geotiff().
+            Defaults to None (no cache).
+
+    Returns:
+        str: The path to the output MBTiles file.
+    """
+    from .tiles import MBTilesWriter, TileFetcher, bbox_to_tiles
+
+    if not (isinstance(bbox, list) and len(bbox) == 4):
+        raise ValueError(
+            "bbox must be a list of 4 coordinates in the format of [xmin, ymin, xmax, ymax]"
+        )
+    if not 0 <= min_zoom <= max_zoom:
+        raise ValueError("min_zoom must be between 0 and max_zoom")
+
+    source = _tile_source_url(source)
+    metadata = {
+        "bounds": bbox,
+        "center": f"{(bbox[0] + bbox[2]) / 2},{(bbox[1] + bbox[3]) / 2},{min_zoom}",
+    }
+    if name is not None:
+        metadata["name"] = name
+    if attribution is not None:
+        metadata["attribution"] = attribution
+
+    close_fetcher = not isinstance(fetcher, TileFetcher)
+    if fetcher is None:
+        fetcher = TileFetcher(cache=cache)
+    elif isinstance(fetcher, dict):
+        fetcher = TileFetcher(**{"cache": cache, **fetcher})
+
+    zooms = range(min_zoom, max_zoom + 1)
+    totalnum = sum(len(bbox_to_tiles(bbox, zoom)) for zoom in zooms)
+    try:
+        with MBTilesWriter(output, metadata) as writer:
+            k = 0
+            for zoom in zooms:
+                tiles = bbox_to_tiles(bbox, zoom)
+                for (x, y), tile in fetcher.fetch_tiles(source, tiles, zoom):
+                    writer.write_tile(x, y, tile, zoom)
+                    k += 1
+                    if not quiet:
+                        print("Downloaded image %d/%d" % (k, totalnum))
+    finally:
+        if close_fetcher:
+            fetcher.close()
+
+    if writer.tiles_written == 0:
+        os.remove(writer.filename)
+        raise ValueError("No tiles were downloaded for the given bbox.")
+    if not quiet:
+        print(
+            f"{writer.tiles_written} tiles ({writer.unique_tiles} unique) saved to {output}"
+        )
+    return output
+
+
+def map_tiles_to_pmtiles(
+    output,
+    bbox,
+    max_zoom,
+    min_zoom=0,
+    source="OpenStreetMap",
+    name=None,
+    attribution=None,
+    quiet=False,
+    fetcher=None,
+    cache=None,
+):
+    """Download the map tiles of a bounding box and zoom range into a PMTiles archive.
+
+    The tiles are collected in a temporary MBTiles archive, which is converted with
+    mbtiles_to_pmtiles(). Identical tiles, e.g., ocean or empty tiles, are stored only
+    once. The archive can be served offline, e.g., with add_pmtiles().
+
+    Args:
+        output (str): The output PMTiles file.
+        bbox (list): The bounding box [minx, miny, maxx, maxy] coordinates in EPSG:4326, e.g., [-122.5216, 37.733, -122.3661, 37.8095]
+        max_zoom (int): The highest zoom level to download.
+        min_zoom (int, optional): The lowest zoom level to download. Defaults to 0.
+        source (str, optional): The tile source. It can be one of the following: "OPENSTREETMAP", "ROADMAP",
+            "SATELLITE", "TERRAIN", "HYBRID", the name of an xyzservices basemap, or an HTTP URL. Defaults to "OpenStreetMap".
+        name (str, optional): The name of the tileset. Defaults to None, which uses the output file name.
+        attribution (str, optional): The attribution of the tile source. Defaults to None.
+        quiet (bool, optional): Suppress output. Defaults to False.
+        fetcher (TileFetcher | dict, optional): The fetcher used to download the tiles, or a
+            dictionary of arguments for creating one. See leafmap.tiles.TileFetcher. Defaults to None.
+        cache (bool | str | TileCache, optional): The persistent tile cache. See map_tiles_to_geotiff().
+            Defaults to None (no cache).
+
+    Returns:
+        str: The path to the output PMTiles file.
+    """
+    import sqlite3
+
+    if not output.endswith(".pmtiles"):
+        raise ValueError("The output file must be a .pmtiles file.")
+    if name is None:
+        name = os.path.splitext(os.path.basename(output))[0]
+
+    mbtiles = temp_file_path(".mbtiles")
+    try:
+        map_tiles_to_mbtiles(
+            mbtiles,
+            bbox,
+            max_zoom,
+            min_zoom,
+            source,
+            name,
+            attribution,
+            quiet=quiet,
+            fetcher=fetcher,
+            cache=cache,
+        )
+        # The MBTiles spec calls JPEG tiles "jpg", whereas pmtiles expects "jpeg".
+        with sqlite3.connect(mbtiles) as conn:
+            conn.execute(
+                "UPDATE metadata SET value = 'jpeg' WHERE name = 'format' AND value = 'jpg'"
+            )
+        conn.close()
+        mbtiles_to_pmtiles(mbtiles, output, max_zoom=max_zoom)
+    finally:
+        if os.path.exists(mbtiles):
+            os.remove(mbtiles)
+
+    if not quiet:
+        print(f"PMTiles saved to {output}")
+    return output
+
+
+def raster_to_tiles(
+    source: str,
+    output: str,
+    min_zoom: int = 0,
+    max_zoom: Optional[int] = None,
+    indexes: Optional[Union[int, List[int]]] = None,
+    colormap: Optional[str] = None,
+    vmin: Optional[float] = None,
+    vmax: Optional[float] = None,
+    nodata: Optional[float] = None,
+    tile_format: str = "png",
+    tile_size: int = 256,
+    workers: Optional[int] = None,
+    name: Optional[str] = None,
+    attribution: Optional[str] = None,
+    quiet: bool = False,
+) -> str:
+    """Renders a static tile pyramid from a local raster to an XYZ directory, an MBTiles or a PMTiles file.
+
+    The tiles are styled like get_local_tile_layer() styles them, but they are rendered
+    once, in parallel across a process pool, so that they can be hosted on any static
+    file server or object storage and added to a map without a tile server. An XYZ
+    directory can be added with `Map.add_tile_layer(url + "/{z}/{x}/{y}.png")` and a
+    PMTiles file with `Map.add_pmtiles()`. Tiles without valid pixels are not written.
+
+    Args:
+        source (str): The path to the raster file, e.g., a GeoTIFF.
+        output (str): The output. A path ending with .pmtiles or .mbtiles creates a
+            single file, and any other path a directory of {z}/{x}/{y} tiles.
+        min_zoom (int, optional): The lowest zoom level to render. Defaults to 0.
+        max_zoom (int, optional): The highest zoom level to render. Defaults to the
+            zoom level that matches the resolution of the raster.
+        indexes (int | list, optional): The band(s) to use. Band indexing starts at 1.
+            Defaults to None.
+        colormap (str, optional): The name of the colormap from `matplotlib` to use
+            when plotting a single band. Default is greyscale.
+        vmin (float, optional): The minimum value to use when colormapping the palette.
+            Defaults to the minimum of the raster.
+        vmax (float, optional): The maximum value to use when colormapping the palette.
+            Defaults to the maximum of the raster.
+        nodata (float, optional): The value to interpret as not valid data. Defaults to
+            the nodata value of the raster.
+        tile_format (str, optional): The tile format, "png" or "webp". Defaults to "png".
+        tile_size (int, optional): The tile size in pixels. Defaults to 256.
+        workers (int, optional): The number of processes that render tiles. Defaults to
+            the number of CPUs.
+        name (str, optional): The name of the tileset in the MBTiles/PMTiles metadata.
+            Defaults to None, which uses the output file name.
+        attribution (str, optional): The attribution in the MBTiles/PMTiles metadata.
+            Defaults to None.
+        quiet (bool, optional): Suppress output. Defaults to False.
+
+    Returns:
+        str: The path to the output.
+    """
+    from .arraytiles import RasterTileRenderer, render_tiles
+    from .tiles import MBTilesWriter
+
+    source = os.path.abspath(source)
+    if not os.path.exists(source):
+        raise FileNotFoundError(f"{source} does not exist.")
+
+    renderer = RasterTileRenderer(
+        source, indexes, colormap, vmin, vmax, nodata, tile_size, tile_format
+    )
+    renderer.close()
+    if max_zoom is None:
+        max_zoom = max(renderer.native_zoom, min_zoom)
+    if not 0 <= min_zoom <= max_zoom:
+        raise ValueError("min_zoom must be between 0 and max_zoom")
+
+    tiles = render_tiles(
+        source,
+        range(min_zoom, max_zoom + 1),
+        workers=workers,
+        indexes=renderer.indexes,
+        colormap=colormap,
+        vmin=renderer.vmin,
+        vmax=renderer.vmax,
+        nodata=renderer.nodata,
+        tile_size=tile_size,
+        tile_format=tile_format,
+    )
+
+    ext = tile_format.lower()
+    if not output.endswith((".pmtiles", ".mbtiles")):
+        count = 0
+        for z, x, y, tile in tiles:
+            filename = os.path.join(output, str(z), str(x), f"{y}.{ext}")
+            os.makedirs(os.path.dirname(filename), exist_ok=True)
+            with open(filename, "wb") as f:
+                f.write(tile)
+            count += 1
+        if not quiet:
+            print(f"{count} tiles saved to {output}")
+        return output
+
+    if name is None:
+        name = os.path.splitext(os.path.basename(output))[0]
+    bbox = renderer.bounds
+    metadata = {
+        "name": name,
+        "bounds": bbox,
+        "center": f"{(bbox[0] + bbox[2]) / 2},{(bbox[1] + bbox[3]) / 2},{min_zoom}",
+        "minzoom": min_zoom,
+        "maxzoom": max_zoom,
+        "format": ext,
+    }
+    if attribution is not None:
+        metadata["attribution"] = attribution
+
+    mbtiles = output if output.endswith(".mbtiles") else temp_file_path(".mbtiles")
+    try:
+        with MBTilesWriter(mbtiles, metadata) as writer:
+            for z, x, y, tile in tiles:
+                writer.write_tile(x, y, tile, z)
+        if writer.tiles_written == 0:
+            os.remove(writer.filename)
+            raise ValueError("No tiles with valid pixels were rendered.")
+        if mbtiles != output:
+            mbtiles_to_pmtiles(mbtiles, output, max_zoom=max_zoom)
+    finally:
+        if mbtiles != output and os.path.exists(mbtiles):
+            os.remove(mbtiles)
+
+    if not quiet:
+        print(
+            f"{writer.tiles_written} tiles ({writer.unique_tiles} unique) saved to {output}"
+        )
+    return output
+
+
 def tif_to_jp2(filename, output, creationOptions=None):
     """Converts a GeoTIFF to JPEG2000.
 
@@ -10042,156 +9357,39 @@ def coords_to_vector(coords, output=None, crs="EPSG:4326", **kwargs):
     # convert the points to a GeoDataFrame
     geometry = [Point(xy) for xy in coords]
     gdf = gpd.GeoDataFrame(geometry=geometry, crs="EPSG:4326")
-    gdf.to_crs(crs, inplace=True)
-
-    if output is not None:
-        gdf.to_file(output, **kwargs)
-    else:
-        return gdf
-
-
-def check_html_string(html_string):
-    """Check if an HTML string contains local images and convert them to base64.
-
-    Args:
-        html_string (str): The HTML string.
-
-    Returns:
-        str: The HTML string with local images converted to base64.
-    """
-    import re
-    import base64
-
-    # Search for img tags with src attribute
-    img_regex = r'<img[^>]+src\s*=\s*["\']([^"\':]+)["\'][^>]*>'
-
-    for match in re.findall(img_regex, html_string):
-        with open(match, "rb") as img_file:
-            img_data = img_file.read()
-            base64_data = base64.b64encode(img_data).decode("utf-8")
-            html_string = html_string.replace(
-                'src="{}"'.format(match),
-                'src="data:image/png;base64,' + base64_data + '"',
-            )
-
-    return html_string
-
-
-def split_raster(filename, out_dir, tile_size=256, overlap=0, prefix="tile"):
-    """Split a raster into tiles.
-
-    Args:
-        filename (str): The path or http URL to the raster file.
-        out_dir (str): The path to the output directory.
-        tile_size (int | tuple, optional): The size of the tiles. Can be an integer or a tuple of (width, height). Defaults to 256.
-        overlap (int, optional): The number of pixels to overlap between tiles. Defaults to 0.
-        prefix (str, optional): The prefix of the output tiles. Defaults to "tile".
-
-    Raises:
-        ImportError: Raised if GDAL is not installed.
-    """
-
-    try:
-        from osgeo import gdal
-    except ImportError:
-        raise ImportError(
-            "GDAL is required to use this function. Install it with `conda install gdal -c conda-forge`"
-        )
-
-    if isinstance(filename, str):
-        if filename.startswith("http"):
-            output = filename.split("/")[-1]
-            download_file(filename, output)
-            filename = output
-
-    # Open the input GeoTIFF file
-    ds = gdal.Open(filename)
-
-    if not os.path.exists(out_dir):
-        os.makedirs(out_dir)
+    gdf.to_crs(crs, inplace=True)
 
-    if isinstance(tile_size, int):
-        tile_width = tile_size
-        tile_height = tile_size
-    elif isinstance(tile_size, tuple):
-        tile_width = tile_size[0]
-        tile_height = tile_size[1]
+    if output is not None:
+        gdf.to_file(output, **kwargs)
     else:
-        raise ValueError("tile_size must be an integer or a tuple of (width, height)")
-
-    # Get the size of the input raster
-    width = ds.RasterXSize
-    height = ds.RasterYSize
+        return gdf
 
-    # Calculate the number of tiles needed in both directions, taking into account the overlap
-    num_tiles_x = (width - overlap) // (tile_width - overlap) + int(
-        (width - overlap) % (tile_width - overlap) > 0
-    )
-    num_tiles_y = (height - overlap) // (tile_height - overlap) + int(
-        (height - overlap) % (tile_height - overlap) > 0
-    )
 
-    # Get the georeferencing information of the input raster
-    geotransform = ds.GetGeoTransform()
-
-    # Loop over all the tiles
-    for i in range(num_tiles_x):
-        for j in range(num_tiles_y):
-            # Calculate the pixel coordinates of the tile, taking into account the overlap and clamping to the edge of the raster
-            x_min = i * (tile_width - overlap)
-            y_min = j * (tile_height - overlap)
-            x_max = min(x_min + tile_width, width)
-            y_max = min(y_min + tile_height, height)
-
-            # Adjust the size of the last tile in each row and column to include any remaining pixels
-            if i == num_tiles_x - 1:
-                x_min = max(x_max - tile_width, 0)
-            if j == num_tiles_y - 1:
-                y_min = max(y_max - tile_height, 0)
-
-            # Calculate the size of the tile, taking into account the overlap
-            tile_width = x_max - x_min
-            tile_height = y_max - y_min
-
-            # Set the output file name
-            output_file = f"{out_dir}/{prefix}_{i}_{j}.tif"
-
-            # Create a new dataset for the tile
-            driver = gdal.GetDriverByName("GTiff")
-            tile_ds = driver.Create(
-                output_file,
-                tile_width,
-                tile_height,
-                ds.RasterCount,
-                ds.GetRasterBand(1).DataType,
-            )
+def check_html_string(html_string):
+    """Check if an HTML string contains local images and convert them to base64.
 
-            # Calculate the georeferencing information for the output tile
-            tile_geotransform = (
-                geotransform[0] + x_min * geotransform[1],
-                geotransform[1],
-                0,
-                geotransform[3] + y_min * geotransform[5],
-                0,
-                geotransform[5],
-            )
+    Args:
+        html_string (str): The HTML string.
 
-            # Set the geotransform and projection of the tile
-            tile_ds.SetGeoTransform(tile_geotransform)
-            tile_ds.SetProjection(ds.GetProjection())
+    Returns:
+        str: The HTML string with local images converted to base64.
+    """
+    import re
+    import base64
 
-            # Read the data from the input raster band(s) and write it to the tile band(s)
-            for k in range(ds.RasterCount):
-                band = ds.GetRasterBand(k + 1)
-                tile_band = tile_ds.GetRasterBand(k + 1)
-                tile_data = band.ReadAsArray(x_min, y_min, tile_width, tile_height)
-                tile_band.WriteArray(tile_data)
+    # Search for img tags with src attribute
+    img_regex = r'<img[^>]+src\s*=\s*["\']([^"\':]+)["\'][^>]*>'
 
-            # Close the tile dataset
-            tile_ds = None
+    for match in re.findall(img_regex, html_string):
+        with open(match, "rb") as img_file:
+            img_data = img_file.read()
+            base64_data = base64.b64encode(img_data).decode("utf-8")
+            html_string = html_string.replace(
+                'src="{}"'.format(match),
+                'src="data:image/png;base64,' + base64_data + '"',
+            )
 
-    # Close the input dataset
-    ds = None
+    return html_string
 
 
 def merge_rasters(
@@ -10467,335 +9665,6 @@ def is_array(x):
     return False
 
 
-def array_to_memory_file(
-    array,
-    source: str = None,
-    dtype: str = None,
-    compress: str = "deflate",
-    transpose: bool = True,
-    cellsize: float = None,
-    crs: str = None,
-    transform: tuple = None,
-    driver="COG",
-    colormap: dict = None,
-    **kwargs,
-):
-    """Convert a NumPy array to a memory file.
-
-    Args:
-        array (numpy.ndarray): The input NumPy array.
-        source (str, optional): Path to the source file to extract metadata from. Defaults to None.
-        dtype (str, optional): The desired data type of the array. Defaults to None.
-        compress (str, optional): The compression method for the output file. Defaults to "deflate".
-        transpose (bool, optional): Whether to transpose the array from (bands, rows, columns) to (rows, columns, bands). Defaults to True.
-        cellsize (float, optional): The cell size of the array if source is not provided. Defaults to None.
-        crs (str, optional): The coordinate reference system of the array if source is not provided. Defaults to None.
-        transform (tuple, optional): The affine transformation matrix if source is not provided.
-            Can be rio.transform() or a tuple like (0.5, 0.0, -180.25, 0.0, -0.5, 83.780361). Defaults to None.
-        driver (str, optional): The driver to use for creating the output file, such as 'GTiff'. Defaults to "COG".
-        colormap (dict, optional): A dictionary defining the colormap (value: (R, G, B, A)).
-        **kwargs: Additional keyword arguments to be passed to the rasterio.open() function.
-
-    Returns:
-        rasterio.DatasetReader: The rasterio dataset reader object for the converted array.
-    """
-    import rasterio
-    import numpy as np
-    import xarray as xr
-    from rasterio.transform import Affine
-
-    if isinstance(array, xr.DataArray):
-        coords = [coord for coord in array.coords]
-        if coords[0] == "time":
-            x_dim = coords[1]
-            y_dim = coords[2]
-            array = (
-                array.isel(time=0).rename({y_dim: "y", x_dim: "x"}).transpose("y", "x")
-            )
-        if hasattr(array, "rio"):
-            if hasattr(array.rio, "crs"):
-                if array.rio.crs is not None:
-                    crs = array.rio.crs
-            if transform is None and hasattr(array.rio, "transform"):
-                transform = array.rio.transform()
-        elif source is None:
-            if hasattr(array, "encoding"):
-                if "source" in array.encoding:
-                    source = array.encoding["source"]
-        array = array.values
-
-    if array.ndim == 3 and transpose:
-        array = np.transpose(array, (1, 2, 0))
-    if source is not None:
-        with rasterio.open(source) as src:
-            crs = src.crs
-            transform = src.transform
-            if compress is None:
-                compress = src.compression
-    else:
-        if crs is None:
-            raise ValueError(
-                "crs must be provided if source is not provided, such as EPSG:3857"
-            )
-
-        if transform is None:
-            if cellsize is None:
-                raise ValueError("cellsize must be provided if source is not provided")
-            # Define the geotransformation parameters
-            xmin, ymin, xmax, ymax = (
-                0,
-                0,
-                cellsize * array.shape[1],
-                cellsize * array.shape[0],
-            )
-            # (west, south, east, north, width, height)
-            transform = rasterio.transform.from_bounds(
-                xmin, ymin, xmax, ymax, array.shape[1], array.shape[0]
-            )
-        elif isinstance(transform, Affine):
-            pass
-        elif isinstance(transform, (tuple, list)):
-            transform = Affine(*transform)
-
-        kwargs["transform"] = transform
-
-    if dtype is None:
-        # Determine the minimum and maximum values in the array
-        min_value = np.min(array)
-        max_value = np.max(array)
-        # Determine the best dtype for the array
-        if min_value >= 0 and max_value <= 1:
-            dtype = np.float32
-        elif min_value >= 0 and max_value <= 255:
-            dtype = np.uint8
-        elif min_value >= -128 and max_value <= 127:
-            dtype = np.int8
-        elif min_value >= 0 and max_value <= 65535:
-            dtype = np.uint16
-        elif min_value >= -32768 and max_value <= 32767:
-            dtype = np.int16
-        else:
-            dtype = np.float64
-
-    # Convert the array to the best dtype
-    array = array.astype(dtype)
-    # Define the GeoTIFF metadata
-    metadata = {
-        "driver": driver,
-        "height": array.shape[0],
-        "width": array.shape[1],
-        "dtype": array.dtype,
-        "crs": crs,
-        "transform": transform,
-    }
-
-    if array.ndim == 2:
-        metadata["count"] = 1
-    elif array.ndim == 3:
-        metadata["count"] = array.shape[2]
-    if compress is not None:
-        metadata["compress"] = compress
-
-    metadata.update(**kwargs)
-
-    # Create a new memory file and write the array to it
-    memory_file = rasterio.MemoryFile()
-    dst = memory_file.open(**metadata)
-
-    if array.ndim == 2:
-        dst.write(array, 1)
-        if colormap:
-            dst.write_colormap(1, colormap)
-    elif array.ndim == 3:
-        for i in range(array.shape[2]):
-            dst.write(array[:, :, i], i + 1)
-            if colormap:
-                dst.write_colormap(i + 1, colormap)
-
-    dst.close()
-    # Read the dataset from memory
-    dataset_reader = rasterio.open(dst.name, mode="r")
-
-    return dataset_reader
-
-
-def array_to_image(
-    array,
-    output: str = None,
-    source: str = None,
-    dtype: str = None,
-    compress: str = "deflate",
-    transpose: bool = True,
-    cellsize: float = None,
-    crs: str = None,
-    transform: tuple = None,
-    driver: str = "COG",
-    colormap: dict = None,
-    **kwargs,
-) -> str:
-    """Save a NumPy array as a GeoTIFF using the projection information from an existing GeoTIFF file.
-
-    Args:
-        array (np.ndarray): The NumPy array to be saved as a GeoTIFF.
-        output (str): The path to the output image. If None, a temporary file will be created. Defaults to None.
-        source (str, optional): The path to an existing GeoTIFF file with map projection information. Defaults to None.
-        dtype (np.dtype, optional): The data type of the output array. Defaults to None.
-        compress (str, optional): The compression method. Can be one of the following: "deflate", "lzw", "packbits", "jpeg". Defaults to "deflate".
-        transpose (bool, optional): Whether to transpose the array from (bands, rows, columns) to (rows, columns, bands). Defaults to True.
-        cellsize (float, optional): The resolution of the output image in meters. Defaults to None.
-        crs (str, optional): The CRS of the output image. Defaults to None.
-        transform (tuple, optional): The affine transformation matrix, can be rio.transform() or a tuple like (0.5, 0.0, -180.25, 0.0, -0.5, 83.780361).
-            Defaults to None.
-        driver (str, optional): The driver to use for creating the output file, such as 'GTiff'. Defaults to "COG".
-        colormap (dict, optional): A dictionary defining the colormap (value: (R, G, B, A)).
-        **kwargs: Additional keyword arguments to be passed to the rasterio.open() function.
-    """
-
-    import numpy as np
-    import rasterio
-    import xarray as xr
-    import rioxarray
-    from rasterio.transform import Affine
-
-    if output is None:
-        return array_to_memory_file(
-            array,
-            source,
-            dtype,
-            compress,
-            transpose,
-            cellsize,
-            crs=crs,
-            transform=transform,
-            driver=driver,
-            colormap=colormap,
-            **kwargs,
-        )
-
-    if isinstance(array, xr.DataArray):
-        if (
-            hasattr(array, "rio")
-            and (array.rio.crs is not None)
-            and (array.rio.transform() is not None)
-        ):
-
-            if "latitude" in array.dims and "longitude" in array.dims:
-                array = array.rename({"latitude": "y", "longitude": "x"})
-            elif "lat" in array.dims and "lon" in array.dims:
-                array = array.rename({"lat": "y", "lon": "x"})
-
-            if array.ndim == 2 and ("x" in array.dims) and ("y" in array.dims):
-                array = array.transpose("y", "x")
-            elif array.ndim == 3 and ("x" in array.dims) and ("y" in array.dims):
-                dims = list(array.dims)
-                dims.remove("x")
-                dims.remove("y")
-                array = array.transpose(dims[0], "y", "x")
-            if "long_name" in array.attrs:
-                array.attrs.pop("long_name")
-
-            array.rio.to_raster(
-                output, driver=driver, compress=compress, dtype=dtype, **kwargs
-            )
-            if colormap:
-                write_image_colormap(output, colormap, output)
-            return output
-
-    if array.ndim == 3 and transpose:
-        array = np.transpose(array, (1, 2, 0))
-
-    out_dir = os.path.dirname(os.path.abspath(output))
-    if not os.path.exists(out_dir):
-        os.makedirs(out_dir)
-
-    if not output.endswith(".tif"):
-        output += ".tif"
-
-    if source is not None:
-        with rasterio.open(source) as src:
-            crs = src.crs
-            transform = src.transform
-            if compress is None:
-                compress = src.compression
-    else:
-        if cellsize is None:
-            raise ValueError("resolution must be provided if source is not provided")
-        if crs is None:
-            raise ValueError(
-                "crs must be provided if source is not provided, such as EPSG:3857"
-            )
-
-        if transform is None:
-            # Define the geotransformation parameters
-            xmin, ymin, xmax, ymax = (
-                0,
-                0,
-                cellsize * array.shape[1],
-                cellsize * array.shape[0],
-            )
-            transform = rasterio.transform.from_bounds(
-                xmin, ymin, xmax, ymax, array.shape[1], array.shape[0]
-            )
-        elif isinstance(transform, Affine):
-            pass
-        elif isinstance(transform, (tuple, list)):
-            transform = Affine(*transform)
-
-        kwargs["transform"] = transform
-
-    if dtype is None:
-        # Determine the minimum and maximum values in the array
-        min_value = np.min(array)
-        max_value = np.max(array)
-        # Determine the best dtype for the array
-        if min_value >= 0 and max_value <= 1:
-            dtype = np.float32
-        elif min_value >= 0 and max_value <= 255:
-            dtype = np.uint8
-        elif min_value >= -128 and max_value <= 127:
-            dtype = np.int8
-        elif min_value >= 0 and max_value <= 65535:
-            dtype = np.uint16
-        elif min_value >= -32768 and max_value <= 32767:
-            dtype = np.int16
-        else:
-            dtype = np.float64
-
-    # Convert the array to the best dtype
-    array = array.astype(dtype)
-
-    # Define the GeoTIFF metadata
-    metadata = {
-        "driver": driver,
-        "height": array.shape[0],
-        "width": array.shape[1],
-        "dtype": array.dtype,
-        "crs": crs,
-        "transform": transform,
-    }
-
-    if array.ndim == 2:
-        metadata["count"] = 1
-    elif array.ndim == 3:
-        metadata["count"] = array.shape[2]
-    if compress is not None:
-        metadata["compress"] = compress
-
-    metadata.update(**kwargs)
-    # Create a new GeoTIFF file and write the array to it
-    with rasterio.open(output, "w", **metadata) as dst:
-        if array.ndim == 2:
-            dst.write(array, 1)
-            if colormap:
-                dst.write_colormap(1, colormap)
-        elif array.ndim == 3:
-            for i in range(array.shape[2]):
-                dst.write(array[:, :, i], i + 1)
-                if colormap:
-                    dst.write_colormap(i + 1, colormap)
-    return output
-
-
 def images_to_tiles(
     images: Union[str, List[str]], names: List[str] = None, **kwargs
 ) -> Dict[str, ipyleaflet.TileLayer]:
@@ -10938,68 +9807,6 @@ def get_solar_data(
     return filenames
 
 
-def merge_vector(
-    files: Union[str, List[str]],
-    output: str,
-    crs: str = None,
-    ext: str = "geojson",
-    recursive: bool = False,
-    quiet: bool = False,
-    return_gdf: bool = False,
-    **kwargs,
-) -> Optional["gpd.GeoDataFrame"]:
-    """
-    Merge vector files into a single GeoDataFrame.
-
-    Args:
-        files: A string or a list of file paths to be merged.
-        output: The file path to save the merged GeoDataFrame.
-        crs: Optional. The coordinate reference system (CRS) of the output GeoDataFrame.
-        ext: Optional. The file extension of the input files. Default is 'geojson'.
-        recursive: Optional. If True, search for files recursively in subdirectories. Default is False.
-        quiet: Optional. If True, suppresses progress messages. Default is False.
-        return_gdf: Optional. If True, returns the merged GeoDataFrame. Default is False.
-        **kwargs: Additional keyword arguments to be passed to the `gpd.read_file` function.
-
-    Returns:
-        If `return_gdf` is True, returns the merged GeoDataFrame. Otherwise, returns None.
-
-    Raises:
-        TypeError: If `files` is not a list of file paths.
-
-    """
-
-    import pandas as pd
-    import geopandas as gpd
-
-    if isinstance(files, str):
-        files = find_files(files, ext=ext, recursive=recursive)
-
-    if not isinstance(files, list):
-        raise TypeError("files must be a list of file paths")
-
-    gdfs = []
-    for index, filename in enumerate(files):
-        if not quiet:
-            print(f"Reading {index+1} of {len(files)}: {filename}")
-        gdf = gpd.read_file(filename, **kwargs)
-        if crs is None:
-            crs = gdf.crs
-        gdfs.append(gdf)
-
-    if not quiet:
-        print("Merging GeoDataFrames ...")
-    gdf = gpd.GeoDataFrame(pd.concat(gdfs, ignore_index=True), crs=crs)
-
-    if not quiet:
-        print(f"Saving merged file to {output} ...")
-    gdf.to_file(output)
-    print(f"Saved merged file to {output}")
-
-    if return_gdf:
-        return gdf
-
-
 def download_ms_buildings(
     location: str,
     out_dir: Optional[str] = None,
@@ -11917,46 +10724,6 @@ def pmtiles_style(
     return style
 
 
-def raster_to_vector(
-    source, output, simplify_tolerance=None, dst_crs=None, open_args={}, **kwargs
-):
-    """Vectorize a raster dataset.
-
-    Args:
-        source (str): The path to the tiff file.
-        output (str): The path to the vector file.
-        simplify_tolerance (float, optional): The maximum allowed geometry displacement.
-            The higher this value, the smaller the number of vertices in the resulting geometry.
-    """
-    import rasterio
-    import shapely
-    import geopandas as gpd
-    from rasterio import features
-
-    with rasterio.open(source, **open_args) as src:
-        band = src.read()
-
-        mask = band != 0
-        shapes = features.shapes(band, mask=mask, transform=src.transform)
-
-    fc = [
-        {"geometry": shapely.geometry.shape(shape), "properties": {"value": value}}
-        for shape, value in shapes
-    ]
-    if simplify_tolerance is not None:
-        for i in fc:
-            i["geometry"] = i["geometry"].simplify(tolerance=simplify_tolerance)
-
-    gdf = gpd.GeoDataFrame.from_features(fc)
-    if src.crs is not None:
-        gdf.set_crs(crs=src.crs, inplace=True)
-
-    if dst_crs is not None:
-        gdf = gdf.to_crs(dst_crs)
-
-    gdf.to_file(output, **kwargs)
-
-
 def overlay_images(
     image1,
     image2,
@@ -12348,33 +11115,6 @@ def vector_to_parquet(
     gdf.to_parquet(output, **kwargs)
 
 
-def df_to_gdf(df, geometry="geometry", src_crs="EPSG:4326", dst_crs=None, **kwargs):
-    """
-    Converts a pandas DataFrame to a GeoPandas GeoDataFrame.
-
-    Args:
-        df (pandas.DataFrame): The pandas DataFrame to convert.
-        geometry (str): The name of the geometry column in the DataFrame.
-        src_crs (str): The coordinate reference system (CRS) of the GeoDataFrame. Default is "EPSG:4326".
-        dst_crs (str): The target CRS of the GeoDataFrame. Default is None
-
-    Returns:
-        geopandas.GeoDataFrame: The converted GeoPandas GeoDataFrame.
-    """
-    import geopandas as gpd
-    from shapely import wkt
-
-    # Convert the geometry column to Shapely geometry objects
-    df[geometry] = df[geometry].apply(lambda x: wkt.loads(x))
-
-    # Convert the pandas DataFrame to a GeoPandas GeoDataFrame
-    gdf = gpd.GeoDataFrame(df, geometry=geometry, crs=src_crs, **kwargs)
-    if dst_crs is not None and dst_crs != src_crs:
-        gdf = gdf.to_crs(dst_crs)
-
-    return gdf
-
-
 def check_url(url: str) -> bool:
     """Check if an HTTP URL is working.
 
@@ -12394,116 +11134,6 @@ def check_url(url: str) -> bool:
         return False
 
 
-def read_parquet(
-    source: str,
-    geometry: Optional[str] = None,
-    columns: Optional[Union[str, list]] = None,
-    exclude: Optional[Union[str, list]] = None,
-    db: Optional[str] = None,
-    table_name: Optional[str] = None,
-    sql: Optional[str] = None,
-    limit: Optional[int] = None,
-    src_crs: Optional[str] = None,
-    dst_crs: Optional[str] = None,
-    return_type: str = "gdf",
-    **kwargs,
-):
-    """
-    Read Parquet data from a source and return a GeoDataFrame or DataFrame.
-
-    Args:
-        source (str): The path to the Parquet file or directory containing Parquet files.
-        geometry (str, optional): The name of the geometry column. Defaults to None.
-        columns (str or list, optional): The columns to select. Defaults to None (select all columns).
-        exclude (str or list, optional): The columns to exclude from the selection. Defaults to None.
-        db (str, optional): The DuckDB database path or alias. Defaults to None.
-        table_name (str, optional): The name of the table in the DuckDB database. Defaults to None.
-        sql (str, optional): The SQL query to execute. Defaults to None.
-        limit (int, optional): The maximum number of rows to return. Defaults to None (return all rows).
-        src_crs (str, optional): The source CRS (Coordinate Reference System) of the geometries. Defaults to None.
-        dst_crs (str, optional): The target CRS to reproject the geometries. Defaults to None.
-        return_type (str, optional): The type of object to return:
-            - 'gdf': GeoDataFrame (default)
-            - 'df': DataFrame
-            - 'numpy': NumPy array
-            - 'arrow': Arrow Table
-            - 'polars': Polars DataFrame
-        **kwargs: Additional keyword arguments that are passed to the DuckDB connection.
-
-    Returns:
-        Union[gpd.GeoDataFrame, pd.DataFrame, np.ndarray]: The loaded data.
-
-    Raises:
-        ValueError: If the columns or exclude arguments are not of the correct type.
-
-    """
-    import duckdb
-
-    if isinstance(db, str):
-        con = duckdb.connect(db)
-    else:
-        con = duckdb.connect()
-
-    con.install_extension("httpfs")
-    con.load_extension("httpfs")
-
-    con.install_extension("spatial")
-    con.load_extension("spatial")
-
-    if columns is None:
-        columns = "*"
-    elif isinstance(columns, list):
-        columns = ", ".join(columns)
-    elif not isinstance(columns, str):
-        raise ValueError("columns must be a list or a string.")
-
-    if exclude is not None:
-        if isinstance(exclude, list):
-            exclude = ", ".join(exclude)
-        elif not isinstance(exclude, str):
-            raise ValueError("exclude_columns must be a list or a string.")
-        columns = f"{columns} EXCLUDE {exclude}"
-
-    result = None
-    if return_type in ["df", "numpy", "arrow", "polars"]:
-        if sql is None:
-            sql = f"SELECT {columns} FROM '{source}'"
-        if limit is not None:
-            sql += f" LIMIT {limit}"
-
-        if return_type == "df":
-            result = con.sql(sql, **kwargs).df()
-        elif return_type == "numpy":
-            result = con.sql(sql, **kwargs).fetchnumpy()
-        elif return_type == "arrow":
-            result = con.sql(sql, **kwargs).arrow()
-        elif return_type == "polars":
-            result = con.sql(sql, **kwargs).pl()
-
-        if table_name is not None:
-            con.sql(f"CREATE OR REPLACE TABLE {table_name} AS FROM result", **kwargs)
-
-    elif return_type == "gdf":
-        if geometry is None:
-            geometry = "geometry"
-        if sql is None:
-            # if src_crs is not None and dst_crs is not None:
-            #     geom_sql = f"ST_AsText(ST_Transform(ST_GeomFromWKB({geometry}), '{src_crs}', '{dst_crs}', true)) AS {geometry}"
-            # else:
-            geom_sql = f"ST_AsText(ST_GeomFromWKB(ST_AsWKB({geometry}))) AS {geometry}"
-            sql = f"SELECT {columns} EXCLUDE {geometry}, {geom_sql} FROM '{source}'"
-        if limit is not None:
-            sql += f" LIMIT {limit}"
-
-        df = con.sql(sql, **kwargs).df()
-        if table_name is not None:
-            con.sql(f"CREATE OR REPLACE TABLE {table_name} AS FROM df", **kwargs)
-        result = df_to_gdf(df, geometry=geometry, src_crs=src_crs, dst_crs=dst_crs)
-
-    con.close()
-    return result
-
-
 def assign_discrete_colors(df, column, cmap, to_rgb=True, return_type="array"):
     """
     Assigns unique colors to each category in a categorical column of a dataframe.
@@ -13544,39 +12174,6 @@ def extract_archive(archive, outdir=None, **kwargs) -> None:
         return
 
 
-def image_min_max(
-    image: str, bands: Optional[Union[int, list]] = None
-) -> Tuple[float, float]:
-    """
-    Computes the minimum and maximum pixel values of an image.
-
-    This function opens an image file using xarray and rasterio, optionally
-        selects specific bands, and then computes the minimum and maximum pixel
-        values in the image.
-
-    Args:
-        image (str): The path to the image file.
-        bands (int or list, optional): The band or list of bands to select. If
-            None, all bands are used.
-
-    Returns:
-        Tuple[float, float]: The minimum and maximum pixel values in the image.
-    """
-
-    import rioxarray
-    import xarray as xr
-
-    dataset = xr.open_dataset(image, engine="rasterio")
-
-    if bands is not None:
-        dataset = dataset.sel(band=bands)
-
-    vmin = dataset["band_data"].min().values.item()
-    vmax = dataset["band_data"].max().values.item()
-
-    return vmin, vmax
-
-
 def pandas_to_geojson(
     df,
     coordinates=["lng", "lat"],
@@ -15625,74 +14222,3 @@ def get_image_colormap(image, index=1):
 
     if dataset:
         return dataset.colormap(index) if dataset.count > 0 else None
-
-
-def write_image_colormap(image, colormap, output_path=None):
-    """
-    Apply or update a colormap to a raster image.
-
-    Args:
-        image (str, rasterio.io.DatasetReader, rioxarray.DataArray):
-            The input image. It can be:
-            - A file path to a raster image (string).
-            - A rasterio dataset.
-            - A rioxarray DataArray.
-        colormap (dict): A dictionary defining the colormap (value: (R, G, B, A)).
-        output_path (str, optional): Path to save the updated raster image.
-            If None, the original file is updated in-memory.
-
-    Returns:
-        str: Path to the updated raster image.
-
-    Raises:
-        ValueError: If the input image type is unsupported.
-    """
-    import rasterio
-    import rioxarray
-    import xarray as xr
-
-    dataset = None
-    src_profile = None
-    src_data = None
-
-    if isinstance(image, str):  # File path
-        with rasterio.open(image) as ds:
-            dataset = ds
-            src_profile = ds.profile
-            src_data = ds.read(1)  # Assuming single-band
-    elif isinstance(image, rasterio.io.DatasetReader):  # rasterio dataset
-        dataset = image
-        src_profile = dataset.profile
-        src_data = dataset.read(1)  # Assuming single-band
-    elif isinstance(image, xr.DataArray):  # rioxarray DataArray
-        source = image.encoding.get("source")
-        if source:
-            with rasterio.open(source) as ds:
-                dataset = ds
-                src_profile = ds.profile
-                src_data = ds.read(1)  # Assuming single-band
-        else:
-            raise ValueError("Cannot apply colormap: DataArray does not have a source.")
-    else:
-        raise ValueError(
-            "Unsupported input type. Provide a file path, rasterio dataset, or rioxarray DataArray."
-        )
-
-    # Ensure the dataset is single-band
-    if dataset.count != 1:
-        raise ValueError(
-            "Colormaps can only be applied to single-band raster datasets."
-        )
-
-    # Update the profile and colormap
-    src_profile.update(dtype=src_data.dtype, count=1)
-
-    if not output_path:
-        output_path = "output_with_colormap.tif"
-
-    # Write the updated dataset with the colormap
-    with rasterio.open(output_path, "w", **src_profile) as dst:
-        dst.write(src_data, 1)
-        dst.write_colormap(1, colormap)
-
-    return output_path
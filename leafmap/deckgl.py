@@ -1,7 +1,7 @@
 from box import Box
 
 from typing import Union, List, Dict, Optional, Tuple, Any
-from .basemaps import xyz_to_leaflet
+from .basemaps import BasemapRegistry
 from . import common
 from . import map_widgets
 from . import plot
@@ -72,7 +72,7 @@ except ImportError:
         "lonboard needs to be installed to use this module. Use 'pip install lonboard' to install the package."
     )
 
-basemaps = Box(xyz_to_leaflet(), frozen_box=True)
+basemaps = BasemapRegistry("ipyleaflet")
 
 
 class Map(lonboard.Map):
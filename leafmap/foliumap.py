@@ -4,7 +4,7 @@ import folium.plugins as plugins
 from box import Box
 
 from .legends import builtin_legends
-from .basemaps import xyz_to_folium
+from .basemaps import BasemapRegistry
 from . import common
 from . import osm
 from . import examples
@@ -81,7 +81,7 @@ from folium.elements import JSCSSMixin
 from folium.map import Layer
 from jinja2 import Template
 
-basemaps = Box(xyz_to_folium(), frozen_box=True)
+basemaps = BasemapRegistry("folium")
 import pandas as pd
 from typing import Optional, Union, Any, Callable, Dict, Tuple, List
 
@@ -10,7 +10,7 @@ import pandas as pd
 from box import Box
 from IPython.display import display
 
-from .basemaps import xyz_to_leaflet
+from .basemaps import BasemapRegistry
 from .legends import builtin_legends
 from . import common
 from . import examples
@@ -21,7 +21,7 @@ from . import plot
 from .common import *
 
 
-basemaps = Box(xyz_to_leaflet(), frozen_box=True)
+basemaps = BasemapRegistry("ipyleaflet")
 
 
 class Map(ipyleaflet.Map):
@@ -2372,13 +2372,31 @@ class Map(ipyleaflet.Map):
             zoom_to_layer (bool, optional): Whether to zoom to the extent of the layer. Defaults to True.
             visible (bool, optional): Whether the layer is visible. Defaults to True.
             opacity (float, optional): The opacity of the layer. Defaults to 1.0.
-            array_args (dict, optional): Additional arguments to pass to `array_to_memory_file` when reading the raster. Defaults to {}.
+            array_args (dict, optional): Additional arguments to pass to `array_to_memory_file` when reading the raster. NumPy arrays and xarray DataArrays are rendered in-process unless an `output` file is given. Defaults to {}.
             client_args (dict, optional): Additional arguments to pass to localtileserver.TileClient. Defaults to { "cors_all": False }.
         """
         import numpy as np
         import xarray as xr
 
         if isinstance(source, np.ndarray) or isinstance(source, xr.DataArray):
+            if "output" not in array_args:
+                self._add_array_layer(
+                    source,
+                    indexes=indexes,
+                    colormap=colormap,
+                    vmin=vmin,
+                    vmax=vmax,
+                    nodata=nodata,
+                    attribution=attribution,
+                    layer_name=layer_name,
+                    layer_index=layer_index,
+                    zoom_to_layer=zoom_to_layer,
+                    visible=visible,
+                    opacity=opacity,
+                    array_args=array_args,
+                    **kwargs,
+                )
+                return
             source = common.array_to_image(source, **array_args)
 
         tile_layer, tile_client = common.get_local_tile_layer(
@@ -2437,6 +2455,92 @@ class Map(ipyleaflet.Map):
 
     add_local_tile = add_raster
 
+    def _add_array_layer(
+        self,
+        array,
+        indexes: Optional[Union[int, List[int]]] = None,
+        colormap: Optional[str] = None,
+        vmin: Optional[float] = None,
+        vmax: Optional[float] = None,
+        nodata: Optional[float] = None,
+        attribution: Optional[str] = None,
+        layer_name: Optional[str] = "Raster",
+        layer_index: Optional[int] = None,
+        zoom_to_layer: Optional[bool] = True,
+        visible: Optional[bool] = True,
+        opacity: Optional[float] = 1.0,
+        array_args: Optional[Dict] = {},
+        **kwargs,
+    ) -> None:
+        """Adds a NumPy array or xarray DataArray rendered in-process as a tile layer.
+
+        Args:
+            array (numpy.ndarray | xarray.DataArray): The array to add.
+            **kwargs: Additional keyword arguments to pass to ipyleaflet.TileLayer, with the
+                same legacy aliases (cmap, palette, band, bands) as get_local_tile_layer().
+            See add_raster() for the other arguments.
+        """
+        from .arraytiles import array_tile_renderer
+
+        if "cmap" in kwargs:
+            colormap = kwargs.pop("cmap")
+        if "palette" in kwargs:
+            colormap = kwargs.pop("palette")
+        if "band" in kwargs:
+            indexes = kwargs.pop("band")
+        if "bands" in kwargs:
+            indexes = kwargs.pop("bands")
+        kwargs.setdefault("max_zoom", 30)
+        kwargs.setdefault("max_native_zoom", 30)
+
+        renderer = array_tile_renderer(
+            array,
+            array_args,
+            indexes=indexes,
+            colormap=colormap,
+            vmin=vmin,
+            vmax=vmax,
+            nodata=nodata,
+        )
+        tile_layer = ipyleaflet.TileLayer(
+            url=renderer.url,
+            name=layer_name,
+            attribution=attribution or "leafmap",
+            opacity=opacity,
+            visible=visible,
+            **kwargs,
+        )
+        # The layer keeps the renderer alive for as long as it is used.
+        tile_layer.renderer = renderer
+
+        self.add(tile_layer, index=layer_index)
+        if zoom_to_layer:
+            self.zoom_to_bounds(renderer.bounds)
+
+        common.arc_add_layer(tile_layer.url, layer_name, True, 1.0)
+
+        if not hasattr(self, "cog_layer_dict"):
+            self.cog_layer_dict = {}
+
+        params = {
+            "tile_layer": tile_layer,
+            "renderer": renderer,
+            "array": array,
+            "array_args": array_args,
+            "indexes": renderer.indexes,
+            "vis_bands": [renderer.band_names[i - 1] for i in renderer.indexes],
+            "band_names": renderer.band_names,
+            "vmin": renderer.vmin,
+            "vmax": renderer.vmax,
+            "nodata": nodata,
+            "colormap": colormap,
+            "opacity": opacity,
+            "layer_name": layer_name,
+            "bounds": renderer.bounds,
+            "type": "ARRAY",
+        }
+        self.cog_layer_dict[layer_name] = params
+
     def add_remote_tile(
         self,
         source: str,
@@ -3706,6 +3810,7 @@ class Map(ipyleaflet.Map):
         position: str = "bottomright",
         slider_length: str = "150px",
         zoom_to_layer: Optional[bool] = False,
+        preload: Optional[int] = 2,
         **kwargs,
     ) -> None:
         """Adds a time slider to the map.
@@ -3713,10 +3818,11 @@ class Map(ipyleaflet.Map):
         Args:
             layers (dict, optional): The dictionary containing a set of XYZ tile layers.
             labels (list, optional): The list of labels to be used for the time series. Defaults to None.
-            time_interval (int, optional): Time interval in seconds. Defaults to 1.
+            time_interval (int, optional): Minimum time interval in seconds. Playback slows down if tiles take longer to load. Defaults to 1.
             position (str, optional): Position to place the time slider, can be any of ['topleft', 'topright', 'bottomleft', 'bottomright']. Defaults to "bottomright".
             slider_length (str, optional): Length of the time slider. Defaults to "150px".
             zoom_to_layer (bool, optional): Whether to zoom to the extent of the selected layer. Defaults to False.
+            preload (int, optional): The number of time steps to load ahead of the current one. Defaults to 2.
 
         """
         from .toolbar import time_slider
@@ -3729,6 +3835,7 @@ class Map(ipyleaflet.Map):
             position,
             slider_length,
             zoom_to_layer,
+            preload,
             **kwargs,
         )
 
@@ -5703,6 +5810,7 @@ class Map(ipyleaflet.Map):
         widget_width: str = "70px",
         add_legend: bool = True,
         add_layer_control: bool = True,
+        prefetch: bool = False,
         **kwargs: Any,
     ) -> None:
         """
@@ -5714,11 +5822,16 @@ class Map(ipyleaflet.Map):
             widget_width (str, optional): The width of the dropdown widgets. Defaults to "70px".
             add_legend (bool, optional): If True, adds a legend to the map. Defaults to True.
             add_layer_control (bool, optional): If True, adds a layer control to the map. Defaults to True.
+            prefetch (bool, optional): If True, resolve the tile URLs of the other years in a background
+                thread with up to 4 concurrent requests, so that changing the year in a dropdown is served
+                from the metadata cache. Errors are logged. Defaults to False.
             **kwargs (Any): Additional keyword arguments to pass to the cog_tile function.
 
         Returns:
             None
         """
+        import logging
+        import threading
 
         allowed_years = list(range(1985, 2024, 1))
 
@@ -5769,10 +5882,29 @@ class Map(ipyleaflet.Map):
             "90": "#b8d9eb",
             "95": "#6c9fb8",
         }
-        left_url = url.format(left_year)
-        right_url = url.format(right_layer)
-        left_tile = common.cog_tile(left_url, colormap=colormap, **kwargs)
-        right_tile = common.cog_tile(right_url, colormap=colormap, **kwargs)
+        left_tile, right_tile = common.cog_tiles(
+            [url.format(left_year), url.format(right_layer)],
+            colormap=colormap,
+            **kwargs,
+        )
+
+        def prefetch_years():
+            years = [y for y in allowed_years if y not in (left_year, right_layer)]
+            try:
+                common.cog_tiles(
+                    [url.format(year) for year in years],
+                    colormap=colormap,
+                    max_workers=4,
+                    **kwargs,
+                )
+            except Exception as e:
+                logging.getLogger(__name__).warning(
+                    "Failed to prefetch the NLCD tile URLs: %s", e
+                )
+
+        if prefetch:
+            threading.Thread(target=prefetch_years, daemon=True).start()
+
         left_layer = ipyleaflet.TileLayer(url=left_tile, name=f"NLCD {left_year}")
         right_layer = ipyleaflet.TileLayer(url=right_tile, name=f"NLCD {right_layer}")
         split_control = ipyleaflet.SplitMapControl(
@@ -443,7 +443,7 @@ class LayerEditor(ipywidgets.VBox):
         )
         self._embedded_widget = ipywidgets.Label(value="Vis params are uneditable")
         if layer_dict is not None:
-            if layer_dict["type"] in ["LOCAL", "COG", "STAC", "XARRAY"]:
+            if layer_dict["type"] in ["LOCAL", "ARRAY", "COG", "STAC", "XARRAY"]:
                 self._embedded_widget = RasterLayerEditor(
                     host_map=host_map, layer_dict=layer_dict
                 )
@@ -925,6 +925,21 @@ class RasterLayerEditor(ipywidgets.VBox):
                 layer_index=layer_index,
             )
 
+        elif self._layer_dict["type"] == "ARRAY":
+            self._host_map.add_raster(
+                self._layer_dict["array"],
+                indexes=vis["indexes"],
+                colormap=vis["colormap"],
+                vmin=vis["vmin"],
+                vmax=vis["vmax"],
+                opacity=vis["opacity"],
+                nodata=self._nodata,
+                layer_name=self._layer_name,
+                zoom_to_layer=False,
+                layer_index=layer_index,
+                array_args=self._layer_dict["array_args"],
+            )
+
         elif self._layer_dict["type"] == "COG":
             self._host_map.add_cog_layer(
                 self._layer_dict["url"],
@@ -26,7 +26,7 @@ from maplibre.controls import (
     Marker,
 )
 
-from .basemaps import xyz_to_leaflet
+from .basemaps import BasemapRegistry
 from . import common
 from .common import (
     download_file,
@@ -48,7 +48,7 @@ from .common import (
     start_server,
 )
 
-basemaps = Box(xyz_to_leaflet(), frozen_box=True)
+basemaps = BasemapRegistry("ipyleaflet")
 
 
 class Map(MapWidget):
@@ -1331,7 +1331,9 @@ class Map(MapWidget):
             visible (bool, optional): Whether the layer is visible. Defaults to True.
             opacity (float, optional): The opacity of the layer. Defaults to 1.0.
             array_args (dict, optional): Additional arguments to pass to
-                `array_to_memory_file` when reading the raster. Defaults to {}.
+                `array_to_memory_file` when reading the raster. NumPy arrays and
+                xarray DataArrays are rendered in-process unless an `output`
+                file is given. Defaults to {}.
             client_args (dict, optional): Additional arguments to pass to
                 localtileserver.TileClient. Defaults to { "cors_all": False }.
         """
@@ -1339,6 +1341,43 @@ class Map(MapWidget):
         import xarray as xr
 
         if isinstance(source, np.ndarray) or isinstance(source, xr.DataArray):
+            if "output" not in array_args:
+                from .arraytiles import array_tile_renderer
+
+                # The same legacy aliases as get_local_tile_layer().
+                if "cmap" in kwargs:
+                    colormap = kwargs.pop("cmap")
+                if "palette" in kwargs:
+                    colormap = kwargs.pop("palette")
+                if "band" in kwargs:
+                    indexes = kwargs.pop("band")
+                if "bands" in kwargs:
+                    indexes = kwargs.pop("bands")
+                renderer = array_tile_renderer(
+                    source,
+                    array_args,
+                    indexes=indexes,
+                    colormap=colormap,
+                    vmin=vmin,
+                    vmax=vmax,
+                    nodata=nodata,
+                )
+                self.add_tile_layer(
+                    renderer.url,
+                    name=name,
+                    opacity=opacity,
+                    visible=visible,
+                    attribution=attribution,
+                    before_id=before_id,
+                )
+                # Keep the renderer alive for as long as the map uses its tiles.
+                if not hasattr(self, "array_renderers"):
+                    self.array_renderers = {}
+                self.array_renderers[name] = renderer
+                if fit_bounds:
+                    bounds = renderer.bounds
+                    self.fit_bounds([[bounds[0], bounds[1]], [bounds[2], bounds[3]]])
+                return
             source = common.array_to_image(source, **array_args)
 
         tile_layer, tile_client = common.get_local_tile_layer(
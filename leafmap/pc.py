@@ -63,50 +63,110 @@ def get_bands(collection: str, item: Optional[str] = None) -> List[str]:
     return stac_bands(collection=collection, items=item)
 
 
+def _pc_collections(timeout: Optional[float] = None) -> List[dict]:
+    """Get the collection JSON of all collections, following the pagination links."""
+    from . import stac
+
+    collections = []
+    url = f"{PC_ENDPOINT}/collections"
+    while url is not None:
+        r = stac.http_client.get(url, timeout=timeout)
+        r.raise_for_status()
+        data = r.json()
+        collections.extend(data.get("collections", []))
+        url = next(
+            (l["href"] for l in data.get("links", []) if l.get("rel") == "next"), None
+        )
+    return collections
+
+
+def _pc_inventory_entry(collection: dict, timeout: Optional[float] = None):
+    """Get the inventory entry of a collection, with bands None if it has no bands.
+
+    The entries without bands are kept in the inventory file, so that a refresh does
+    not request the collection again until it is updated.
+    """
+    from . import stac
+
+    r = stac.http_client.get(
+        f"{PC_ENDPOINT}/collections/{collection['id']}/items",
+        params={"limit": 1},
+        timeout=timeout,
+    )
+    r.raise_for_status()
+    features = r.json().get("features", [])
+    if len(features) == 0:
+        return {"title": collection.get("title"), "first_item": None, "bands": None}
+    first_item = features[0]["id"]
+    bands = stac_assets(collection=collection["id"], item=first_item)
+    if not isinstance(bands, list):
+        bands = None
+    return {"title": collection.get("title"), "first_item": first_item, "bands": bands}
+
+
 def get_pc_inventory(
-    refresh: Optional[bool] = False, verbose: Optional[bool] = False
+    refresh: Optional[bool] = False,
+    verbose: Optional[bool] = False,
+    max_workers: Optional[int] = 8,
+    timeout: Optional[float] = 120,
 ) -> dict[str, dict[str, Union[str, list, str]]]:
     """Get the inventory of the Microsoft Planetary Computer catalog.
 
+    The refresh requests the collections concurrently, and only the collections whose
+    updated timestamp changed since the previous inventory are requested again. A
+    collection that fails or times out keeps its previous entry. Collections without
+    items or bands are left out.
+
     Args:
         refresh (bool, optional): If True, refresh the inventory.
         verbose (bool, optional): If True, print the collections to the console.
+        max_workers (int, optional): The maximum number of collections requested at once.
+            Defaults to 8.
+        timeout (float, optional): The maximum time in seconds to request one collection.
+            Defaults to 120.
 
     Returns:
         dict: A dictionary of collections and their bands.
     """
     import importlib.resources
+    from .common import refresh_inventory
 
     pkg_dir = os.path.dirname(importlib.resources.files("leafmap") / "leafmap.py")
     filepath = os.path.join(pkg_dir, "data/pc_inventory.json")
 
+    previous = {}
+    if os.path.exists(filepath):
+        with open(filepath, "r") as f:
+            previous = json.load(f)
+
     if refresh:
-        catalog = Client.open(PC_ENDPOINT)
-        collections = catalog.get_children()
-        data = {}
-        for collection in collections:
-            try:
-                if verbose:
-                    print(f"{collection.id} - {collection.title}")
-                first_item = get_first_item(collection.id, return_id=True)
-                bands = stac_assets(collection=collection.id, item=first_item)
-                if isinstance(bands, list):
-                    data[collection.id] = {}
-                    data[collection.id]["title"] = collection.title
-                    data[collection.id]["first_item"] = first_item
-                    data[collection.id]["bands"] = bands
-            except Exception as e:
-                if verbose:
-                    print(f"{collection.id} has no bands.")
+        collections = {c["id"]: c for c in _pc_collections(timeout)}
+        if verbose:
+            for collection in collections.values():
+                print(f"{collection['id']} - {collection.get('title')}")
+        versions = {
+            key: collection.get("updated")
+            for key, collection in collections.items()
+            if collection.get("updated") is not None
+        }
+        data = refresh_inventory(
+            list(collections),
+            lambda key: _pc_inventory_entry(collections[key], timeout),
+            previous,
+            versions,
+            max_workers=max_workers,
+            timeout=timeout,
+            verbose=verbose,
+        )
 
         with open(filepath, "w") as f:
             json.dump(data, f, indent=4)
 
     else:
-        with open(filepath, "r") as f:
-            data = json.load(f)
+        data = previous
 
-    return data
+    # Collections without bands are only recorded to skip them in the next refresh.
+    return {key: entry for key, entry in data.items() if entry.get("bands") is not None}
 
 
 def get_pc_collection_list() -> List[str]:
@@ -0,0 +1,225 @@
+"""This module provides a playback engine for time series of tile layers on ipyleaflet maps.
+
+Instead of swapping the URL of a single layer, which makes every frame a cold tile load,
+each frame keeps its own layer. The frames that come next are added to the map fully
+transparent so that the browser loads their tiles in advance, and showing a frame only
+changes the opacity of two layers.
+"""
+
+import threading
+import time
+from typing import Callable, List, Optional
+
+
+class FramePlayer:
+    """Plays a list of tile layers as the frames of an animation.
+
+    The player keeps the current frame and the next `preload` frames on the map, the
+    latter with zero opacity, and removes the other frames. While playing, it waits for
+    the next frame to finish loading its tiles before showing it, and it slows down to
+    the measured tile load time when that is longer than the interval. If a wait times
+    out, the following frames are shown without waiting until the front end reports
+    tile loading again.
+
+    Args:
+        m (ipyleaflet.Map): The map.
+        layers (list): The tile layers, one per frame.
+        interval (float, optional): The minimum time in seconds between frames.
+            Defaults to 1.
+        preload (int, optional): The number of frames to load ahead of the current
+            frame. Defaults to 2.
+        opacity (float, optional): The opacity of the visible frame. Defaults to 1.
+        max_wait (float, optional): The longest time in seconds to wait for a frame to
+            load before showing it anyway, e.g., when the front end does not report
+            tile loading. Defaults to 10.
+    """
+
+    def __init__(
+        self,
+        m,
+        layers: List,
+        interval: float = 1,
+        preload: int = 2,
+        opacity: float = 1,
+        max_wait: float = 10,
+    ):
+        if len(layers) == 0:
+            raise ValueError("At least one layer is required.")
+
+        self.m = m
+        self.layers = list(layers)
+        self.interval = interval
+        self.preload = min(preload, len(self.layers) - 1)
+        self.opacity = opacity
+        self.max_wait = max_wait
+        self.index = None
+        self.load_time = 0
+        self._observers = []
+        self._loaded = [threading.Event() for _ in self.layers]
+        self._load_start = {}
+        self._wait_for_loads = True
+        self._playing = threading.Event()
+        self._lock = threading.RLock()
+        self._thread = None
+
+        for index, layer in enumerate(self.layers):
+            layer.observe(self._loading_changed(index), "loading")
+
+        self.show(0)
+
+    def _loading_changed(self, index: int) -> Callable:
+        """Returns the observer that tracks the tile loading of a frame."""
+
+        def observer(change):
+            self._wait_for_loads = True
+            if change["new"]:
+                self._loaded[index].clear()
+                self._load_start[index] = time.monotonic()
+            elif change["old"]:
+                # Only the end of a load reported by the front end marks the frame as
+                # loaded, since the trait is still False right after adding the layer.
+                self._loaded[index].set()
+                start = self._load_start.pop(index, None)
+                if start is not None:
+                    elapsed = time.monotonic() - start
+                    # An exponential moving average smooths out single slow frames.
+                    self.load_time = 0.7 * self.load_time + 0.3 * elapsed
+
+        return observer
+
+    @property
+    def frame_interval(self) -> float:
+        """The time between frames while playing, adapted to the tile load time."""
+        return max(self.interval, self.load_time)
+
+    @property
+    def playing(self) -> bool:
+        """Whether the player is playing."""
+        return self._playing.is_set()
+
+    def window(self, index: int) -> List[int]:
+        """Returns the frames that are kept on the map while a frame is shown.
+
+        Args:
+            index (int): The index of the shown frame.
+
+        Returns:
+            list: The indexes of the shown frame and the frames that are preloaded.
+        """
+        return [(index + i) % len(self.layers) for i in range(self.preload + 1)]
+
+    def show(self, index: int) -> None:
+        """Shows a frame and preloads the frames after it.
+
+        Args:
+            index (int): The index of the frame.
+        """
+        index = index % len(self.layers)
+        with self._lock:
+            if index == self.index:
+                return
+            window = self.window(index)
+            for i in window:
+                layer = self.layers[i]
+                if layer not in self.m.layers:
+                    if i != index:
+                        layer.opacity = 0
+                    # Leaflet loads the tiles of a transparent layer, but not of a
+                    # hidden one, so opacity is used rather than visibility.
+                    self._loaded[i].clear()
+                    self.m.add(layer)
+            # Show the new frame before hiding the old one to avoid a blank map.
+            self.layers[index].opacity = self.opacity
+            for i, layer in enumerate(self.layers):
+                if i == index:
+                    continue
+                layer.opacity = 0
+                if i not in window and layer in self.m.layers:
+                    self.m.remove(layer)
+            self.index = index
+
+        for observer in self._observers:
+            observer(index)
+
+    def next(self) -> None:
+        """Shows the next frame, wrapping around after the last one."""
+        self.show(self.index + 1)
+
+    def previous(self) -> None:
+        """Shows the previous frame, wrapping around before the first one."""
+        self.show(self.index - 1)
+
+    def wait_until_loaded(self, index: int, timeout: Optional[float] = None) -> bool:
+        """Waits for a frame to finish loading its tiles.
+
+        A frame is loaded once the front end reports the end of its tile loading. If it
+        never does, e.g., without a front end, the wait ends after the timeout.
+
+        Args:
+            index (int): The index of the frame.
+            timeout (float, optional): The longest time in seconds to wait.
+                Defaults to max_wait.
+
+        Returns:
+            bool: Whether the frame finished loading.
+        """
+        if timeout is None:
+            timeout = self.max_wait
+        return self._loaded[index % len(self.layers)].wait(timeout)
+
+    def on_frame(self, callback: Callable[[int], None]) -> None:
+        """Registers a function that is called with the index of every shown frame.
+
+        Args:
+            callback (Callable): The function.
+        """
+        self._observers.append(callback)
+
+    def play(self) -> None:
+        """Starts playing the frames in a background thread."""
+        if self.playing:
+            return
+        # Each playback thread gets its own event, so that a thread that is still
+        # waiting after a pause cannot be resumed by the next play().
+        self._playing = threading.Event()
+        self._playing.set()
+        self._thread = threading.Thread(
+            target=self._run, args=(self._playing,), daemon=True
+        )
+        self._thread.start()
+
+    def _run(self, playing: threading.Event) -> None:
+        """Advances the frames until the player is paused."""
+        while playing.is_set():
+            start = time.monotonic()
+            index = (self.index + 1) % len(self.layers)
+            # Without loading reports from the front end, every wait would time out.
+            if self._wait_for_loads and not self.wait_until_loaded(index):
+                self._wait_for_loads = False
+            remaining = self.frame_interval - (time.monotonic() - start)
+            if remaining > 0 and not self._sleep(playing, remaining):
+                break
+            if playing.is_set():
+                self.show(index)
+
+    @staticmethod
+    def _sleep(playing: threading.Event, timeout: float) -> bool:
+        """Sleeps while playing, returning False if the player was paused."""
+        deadline = time.monotonic() + timeout
+        while playing.is_set():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return True
+            time.sleep(min(remaining, 0.05))
+        return False
+
+    def pause(self) -> None:
+        """Stops playing."""
+        self._playing.clear()
+
+    def close(self) -> None:
+        """Stops playing and removes the preloaded frames, leaving the current frame on the map."""
+        self.pause()
+        for i, layer in enumerate(self.layers):
+            if i != self.index and layer in self.m.layers:
+                self.m.remove(layer)
@@ -4,7 +4,7 @@ import pandas as pd
 import ipywidgets as widgets
 from IPython.display import display
 
-from .basemaps import xyz_to_plotly
+from .basemaps import BasemapRegistry
 from . import common
 from . import osm
 from . import examples
@@ -20,7 +20,7 @@ except ImportError:
     )
 
 
-basemaps = xyz_to_plotly()
+basemaps = BasemapRegistry("plotly")
 
 
 class Canvas:
@@ -1,10 +1,440 @@
+import collections
+import copy
+import json
 import os
+import sqlite3
+import threading
+import time
+import urllib.parse
 import pystac
 import requests
-from typing import Optional, Dict, List, Callable, Tuple, Union
+from typing import Optional, Dict, List, Callable, Tuple, Union, Any
 import pandas as pd
 
 
+class HttpClient:
+    """A pooled HTTP client with keep-alive, timeouts and retries for TiTiler and STAC requests.
+
+    All requests share one requests.Session, so connections to an endpoint are reused
+    instead of being set up for every call. Idempotent requests that fail with a
+    connection error or a 429/5xx status are retried with exponential backoff,
+    honoring Retry-After.
+
+    Args:
+        timeout (float | tuple, optional): The connect and read timeout in seconds,
+            either one number for both or a (connect, read) tuple. Defaults to (5, 60).
+        retries (int, optional): The maximum number of retries. Defaults to 3.
+        backoff_factor (float, optional): The backoff factor between retries in
+            seconds. Defaults to 0.5.
+        pool_size (int, optional): The maximum number of connections kept open per
+            host. Defaults to 16.
+        headers (dict, optional): Headers sent with every request. Defaults to None.
+    """
+
+    def __init__(
+        self,
+        timeout: Union[float, Tuple[float, float]] = (5, 60),
+        retries: int = 3,
+        backoff_factor: float = 0.5,
+        pool_size: int = 16,
+        headers: Optional[Dict] = None,
+    ):
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self.session = requests.Session()
+        if headers:
+            self.session.headers.update(headers)
+        retry = Retry(
+            total=retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=(429, 500, 502, 503, 504),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """Sends a request with the default timeout unless another one is given.
+
+        Args:
+            method (str): The HTTP method, e.g., "GET".
+            url (str): The URL.
+            **kwargs: Additional arguments for requests.Session.request().
+
+        Returns:
+            requests.Response: The response.
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        return self.session.request(method, url, **kwargs)
+
+    def get(
+        self, url: str, params: Optional[Dict] = None, **kwargs
+    ) -> requests.Response:
+        """Sends a GET request. See request()."""
+        return self.request("GET", url, params=params, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        """Sends a POST request. POST requests are not retried. See request()."""
+        return self.request("POST", url, **kwargs)
+
+    def close(self) -> None:
+        """Closes the pooled connections."""
+        self.session.close()
+
+
+http_client = HttpClient()
+
+
+def set_http_client(
+    timeout: Union[float, Tuple[float, float]] = (5, 60),
+    retries: int = 3,
+    backoff_factor: float = 0.5,
+    pool_size: int = 16,
+    headers: Optional[Dict] = None,
+) -> HttpClient:
+    """Replaces the HTTP client used by the functions of this module.
+
+    Args:
+        timeout (float | tuple, optional): The connect and read timeout in seconds.
+            Defaults to (5, 60).
+        retries (int, optional): The maximum number of retries. Defaults to 3.
+        backoff_factor (float, optional): The backoff factor between retries in
+            seconds. Defaults to 0.5.
+        pool_size (int, optional): The maximum number of connections kept open per
+            host. Defaults to 16.
+        headers (dict, optional): Headers sent with every request, e.g., for
+            authentication. Defaults to None.
+
+    Returns:
+        HttpClient: The new client.
+    """
+    global http_client
+
+    http_client.close()
+    http_client = HttpClient(timeout, retries, backoff_factor, pool_size, headers)
+    return http_client
+
+
+class MetadataCache:
+    """A TTL-bounded cache of JSON responses from TiTiler and STAC metadata requests.
+
+    Responses are kept in memory in least-recently-used order, and optionally in a
+    SQLite database on disk so that they survive restarts. Entries are keyed by the
+    URL and the normalized query parameters, so the same request made with the
+    parameters in a different order is served from the cache.
+
+    Args:
+        ttl (float, optional): The time in seconds for which a response is valid.
+            Defaults to 3600.
+        max_entries (int, optional): The maximum number of responses kept in memory.
+            Defaults to 1024.
+        path (str | bool, optional): The path to the SQLite database of the disk tier,
+            or True to use titiler.sqlite in the leafmap cache directory. Defaults to
+            None (memory only).
+        max_disk_entries (int, optional): The maximum number of responses kept on
+            disk. Expired responses, and then the ones that expire first, are deleted
+            when the cache is opened and every PRUNE_INTERVAL writes. Defaults to
+            100000.
+    """
+
+    PRUNE_INTERVAL = 256
+
+    def __init__(
+        self,
+        ttl: float = 3600,
+        max_entries: int = 1024,
+        path: Optional[Union[str, bool]] = None,
+        max_disk_entries: int = 100000,
+    ):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_disk_entries = max_disk_entries
+        self.hits = 0
+        self.misses = 0
+        self._memory = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = None
+        self._writes = 0
+        self.path = None
+
+        if path:
+            if path is True:
+                from .core import get_cache_dir
+
+                path = os.path.join(get_cache_dir("titiler"), "titiler.sqlite")
+            self.path = os.path.abspath(path)
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses "
+                "(key TEXT PRIMARY KEY, value TEXT, expires REAL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS responses_expires ON responses (expires)"
+            )
+            self._prune()
+
+    @staticmethod
+    def key(url: str, params: Optional[Dict] = None) -> str:
+        """Returns the cache key of a request.
+
+        Parameters are sorted by name, while the order of the values of a parameter,
+        such as the bands in bidx, is kept. Parameters whose value is None are
+        dropped, as requests does.
+
+        Args:
+            url (str): The URL.
+            params (dict, optional): The query parameters. Defaults to None.
+
+        Returns:
+            str: The key.
+        """
+        items = []
+        for name, value in sorted((params or {}).items()):
+            if value is None:
+                continue
+            if not isinstance(value, (list, tuple)):
+                value = [value]
+            items.extend((name, str(v)) for v in value)
+        query = urllib.parse.urlencode(items)
+        return f"{url.rstrip('/')}?{query}" if query else url.rstrip("/")
+
+    def get(self, key: str) -> Any:
+        """Returns a cached response, or None if it is missing or expired.
+
+        Args:
+            key (str): The cache key.
+
+        Returns:
+            Any: The decoded JSON response.
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and entry[1] > now:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            if self._conn is not None:
+                row = self._conn.execute(
+                    "SELECT value, expires FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None and row[1] > now:
+                    value = json.loads(row[0])
+                    self._remember(key, value, row[1])
+                    self.hits += 1
+                    return value
+            self.misses += 1
+            return None
+
+    def put(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """Stores a response.
+
+        Args:
+            key (str): The cache key.
+            value (Any): The decoded JSON response.
+            ttl (float, optional): The time in seconds for which the response is
+                valid. Defaults to the ttl of the cache.
+        """
+        expires = time.time() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._remember(key, value, expires)
+            if self._conn is not None:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO responses VALUES (?, ?, ?)",
+                    (key, json.dumps(value), expires),
+                )
+                self._writes += 1
+                if self._writes % self.PRUNE_INTERVAL == 0:
+                    self._prune()
+                else:
+                    self._conn.commit()
+
+    def _prune(self) -> None:
+        """Deletes the expired responses on disk and keeps at most max_disk_entries."""
+        self._conn.execute("DELETE FROM responses WHERE expires < ?", (time.time(),))
+        self._conn.execute(
+            "DELETE FROM responses WHERE key IN "
+            "(SELECT key FROM responses ORDER BY expires DESC LIMIT -1 OFFSET ?)",
+            (self.max_disk_entries,),
+        )
+        self._conn.commit()
+
+    def _remember(self, key: str, value: Any, expires: float) -> None:
+        """Stores a response in memory, evicting the least recently used ones."""
+        self._memory[key] = (value, expires)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def clear(self) -> None:
+        """Removes all responses from memory and disk."""
+        with self._lock:
+            self._memory.clear()
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM responses")
+                self._conn.commit()
+
+    def __len__(self) -> int:
+        return len(self._memory)
+
+    def close(self) -> None:
+        """Closes the disk tier."""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+metadata_cache = MetadataCache()
+
+
+def set_metadata_cache(
+    ttl: float = 3600,
+    max_entries: int = 1024,
+    path: Optional[Union[str, bool]] = None,
+    max_disk_entries: int = 100000,
+) -> MetadataCache:
+    """Replaces the cache used for TiTiler and STAC metadata requests.
+
+    Args:
+        ttl (float, optional): The time in seconds for which a response is valid. Use 0
+            to disable caching. Defaults to 3600.
+        max_entries (int, optional): The maximum number of responses kept in memory.
+            Defaults to 1024.
+        path (str | bool, optional): The path to a SQLite database for caching
+            responses on disk, or True for the default location in the leafmap cache
+            directory. Defaults to None (memory only).
+        max_disk_entries (int, optional): The maximum number of responses kept on
+            disk. Defaults to 100000.
+
+    Returns:
+        MetadataCache: The new cache.
+    """
+    global metadata_cache
+
+    metadata_cache.close()
+    metadata_cache = MetadataCache(ttl, max_entries, path, max_disk_entries)
+    return metadata_cache
+
+
+# The requests that are being sent by fetch_json(), keyed by cache key.
+_inflight = {}
+_inflight_lock = threading.Lock()
+
+
+def fetch_json(
+    url: str, params: Optional[Dict] = None, cache: Optional[MetadataCache] = None
+) -> Any:
+    """Sends a GET request for JSON metadata, using the metadata cache.
+
+    Only successful responses are cached, so errors such as timeouts are retried
+    on the next call. Identical requests made concurrently from several threads are
+    sent once, and all callers receive its response. A local file path is read
+    directly, without caching.
+
+    Args:
+        url (str): The URL or the path of a local JSON file.
+        params (dict, optional): The query parameters. Defaults to None.
+        cache (MetadataCache, optional): The cache. Defaults to the module-level
+            metadata cache (see set_metadata_cache()).
+
+    Returns:
+        Any: The decoded JSON response.
+    """
+    import concurrent.futures
+
+    if os.path.isfile(url):
+        with open(url) as f:
+            return json.load(f)
+
+    if cache is None:
+        cache = metadata_cache
+    key = cache.key(url, params)
+    if cache.ttl > 0:
+        value = cache.get(key)
+        if value is not None:
+            # Callers may modify the response, which must not change the cached copy.
+            return copy.deepcopy(value)
+
+    with _inflight_lock:
+        future = _inflight.get(key)
+        owner = future is None
+        if owner:
+            future = _inflight[key] = concurrent.futures.Future()
+    if not owner:
+        return copy.deepcopy(future.result())
+
+    try:
+        response = http_client.get(url, params=params)
+        value = response.json()
+        if response.ok and cache.ttl > 0:
+            cache.put(key, copy.deepcopy(value))
+        future.set_result(copy.deepcopy(value))
+        return value
+    except Exception as e:
+        future.set_exception(e)
+        raise
+    finally:
+        with _inflight_lock:
+            del _inflight[key]
+
+
+async def fetch_json_async(
+    url: str, params: Optional[Dict] = None, cache: Optional[MetadataCache] = None
+) -> Any:
+    """Awaitable version of fetch_json().
+
+    The request runs in a worker thread on the pooled HTTP client, so many requests
+    can be awaited concurrently, e.g., with asyncio.gather().
+
+    Args:
+        url (str): The URL.
+        params (dict, optional): The query parameters. Defaults to None.
+        cache (MetadataCache, optional): The cache. Defaults to the module-level
+            metadata cache.
+
+    Returns:
+        Any: The decoded JSON response.
+    """
+    import asyncio
+
+    return await asyncio.to_thread(fetch_json, url, params, cache)
+
+
+async def fetch_json_many(
+    requests_list: List[Union[str, Tuple[str, Dict]]], concurrency: int = 16
+) -> List:
+    """Sends many metadata requests concurrently.
+
+    Args:
+        requests_list (list): The requests, each a URL or a (URL, params) tuple.
+        concurrency (int, optional): The maximum number of requests in flight.
+            Defaults to 16.
+
+    Returns:
+        list: The decoded JSON responses, in the order of the requests. A request
+            that failed returns its exception instead.
+    """
+    import asyncio
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def fetch(request):
+        url, params = (request, None) if isinstance(request, str) else request
+        async with semaphore:
+            return await fetch_json_async(url, params)
+
+    return await asyncio.gather(
+        *(fetch(request) for request in requests_list), return_exceptions=True
+    )
+
+
 class TitilerEndpoint:
     """This class contains the methods for the titiler endpoint."""
 
@@ -25,6 +455,18 @@ class TitilerEndpoint:
         self.name = name
         self.TileMatrixSetId = TileMatrixSetId
 
+    def get(self, url: str, params: Optional[Dict] = None) -> Any:
+        """Requests one of the url_for_* URLs of the endpoint through the metadata cache.
+
+        Args:
+            url (str): The URL, e.g., the result of url_for_stac_info().
+            params (dict, optional): The query parameters. Defaults to None.
+
+        Returns:
+            Any: The decoded JSON response.
+        """
+        return fetch_json(url, params)
+
     def url_for_stac_item(self):
         return f"{self.endpoint}/{self.name}/{self.TileMatrixSetId}/tilejson.json"
 
@@ -107,22 +549,279 @@ class PlanetaryComputerEndpoint(TitilerEndpoint):
         return f"{self.endpoint}/mosaic/{searchid}/{lon},{lat}/assets"
 
 
-def check_titiler_endpoint(titiler_endpoint: Optional[str] = None):
+class LocalEndpoint(TitilerEndpoint):
+    """This class answers titiler metadata requests in-process with rasterio.
+
+    It implements the cog and stac bounds, info, info.geojson, statistics, point and
+    assets requests for local paths, /vsicurl/ URLs and HTTP URLs that GDAL can read,
+    so that these functions work without a titiler server, e.g., in air-gapped jobs,
+    and without an HTTP hop for local files. Statistics are estimated with
+    bandstats.band_statistics() from an overview with about max_size pixels on its
+    larger side, like titiler does, and cached in a sidecar file.
+    """
+
+    def __init__(
+        self,
+        endpoint: Optional[str] = "local",
+        name: Optional[str] = "stac",
+        TileMatrixSetId: Optional[str] = "WebMercatorQuad",
+        max_size: Optional[int] = 1024,
+    ):
+        """Initialize the LocalEndpoint object.
+
+        Args:
+            endpoint (str, optional): The prefix of the request URLs. Defaults to "local".
+            name (str, optional): The name to be used in the file path. Defaults to "stac".
+            TileMatrixSetId (str, optional): The TileMatrixSetId to be used in the file path. Defaults to "WebMercatorQuad".
+            max_size (int, optional): The maximum width or height of the data read to
+                compute statistics. Defaults to 1024.
+        """
+        super().__init__(endpoint, name, TileMatrixSetId)
+        self.max_size = max_size
+
+    def __str__(self):
+        return self.endpoint
+
+    def get(self, url: str, params: Optional[Dict] = None) -> Any:
+        """Answers a request for one of the url_for_* URLs of the endpoint.
+
+        Args:
+            url (str): The URL, e.g., the result of url_for_stac_info() or "local/cog/info".
+            params (dict, optional): The query parameters. Defaults to None.
+
+        Returns:
+            Any: The response, or a dictionary with a "detail" key if the request failed.
+        """
+        params = dict(params or {})
+        path = url[len(self.endpoint) :] if url.startswith(self.endpoint) else url
+        kind, _, route = path.strip("/").partition("/")
+        try:
+            if kind == "cog":
+                return self._cog(route, params["url"], params)
+            elif kind == self.name and "url" in params:
+                return self._stac(route, params["url"], params)
+            return {"detail": f"{path} is not supported by the local endpoint."}
+        except Exception as e:
+            return {"detail": str(e)}
+
+    @staticmethod
+    def _indexes(src, bidx) -> List[int]:
+        """Returns the band indexes selected by a bidx parameter."""
+        if bidx is None:
+            return list(src.indexes)
+        if isinstance(bidx, (int, str)):
+            bidx = str(bidx).split(",")
+        return [int(b) for b in bidx]
+
+    def _cog(self, route: str, url: str, params: Dict) -> Any:
+        """Answers a cog request for a raster."""
+        import rasterio
+
+        with rasterio.open(url) as src:
+            indexes = self._indexes(src, params.get("bidx"))
+            if route == "bounds":
+                return {"bounds": self._bounds(src)}
+            elif route == "info":
+                return self._info(src)
+            elif route == "info.geojson":
+                return self._feature(self._bounds(src), self._info(src))
+            elif route == "statistics":
+                return self._statistics(src, indexes, params.get("max_size"))
+            elif route.startswith("point/"):
+                lon, lat = [float(v) for v in route[len("point/") :].split(",")]
+                return {
+                    "coordinates": [lon, lat],
+                    "values": self._point(src, indexes, lon, lat),
+                    "band_names": [f"b{i}" for i in indexes],
+                }
+        raise ValueError(f"cog/{route} is not supported by the local endpoint.")
+
+    def _stac(self, route: str, url: str, params: Dict) -> Any:
+        """Answers a stac request for the raster assets of a STAC item."""
+        item = fetch_json(url)
+        hrefs = {}
+        for name, asset in item.get("assets", {}).items():
+            href = asset["href"]
+            if url.startswith("http"):
+                href = urllib.parse.urljoin(url, href)
+            elif "://" not in href and not os.path.isabs(href):
+                href = os.path.join(os.path.dirname(url), href)
+            hrefs[name] = href
+
+        if route == "assets":
+            return list(hrefs)
+        elif route == "bounds":
+            return {"bounds": item["bbox"]}
+
+        assets = params.get("assets") or list(hrefs)
+        if isinstance(assets, str):
+            assets = assets.split(",")
+        if route == "info":
+            return {asset: self._cog("info", hrefs[asset], {}) for asset in assets}
+        elif route == "info.geojson":
+            info = {asset: self._cog("info", hrefs[asset], {}) for asset in assets}
+            return self._feature(item["bbox"], info)
+        elif route == "statistics":
+            stats = {}
+            for asset in assets:
+                result = self._cog("statistics", hrefs[asset], params)
+                for band, value in result.items():
+                    stats[f"{asset}_{band}"] = value
+            return stats
+        elif route.startswith("point/"):
+            values, band_names = [], []
+            for asset in assets:
+                result = self._cog(route, hrefs[asset], {})
+                values.append(result["values"])
+                band_names.append([f"{asset}_{b}" for b in result["band_names"]])
+            return {
+                "coordinates": result["coordinates"],
+                "values": values,
+                "band_names": band_names,
+            }
+        raise ValueError(f"stac/{route} is not supported by the local endpoint.")
+
+    @staticmethod
+    def _bounds(src) -> List[float]:
+        """Returns the bounds of a dataset in EPSG:4326."""
+        from rasterio.warp import transform_bounds
+
+        if src.crs is None:
+            return list(src.bounds)
+        return list(transform_bounds(src.crs, "EPSG:4326", *src.bounds, densify_pts=21))
+
+    @staticmethod
+    def _feature(bounds: List[float], properties: Dict) -> Dict:
+        """Returns a GeoJSON feature of a bounding box."""
+        west, south, east, north = bounds
+        return {
+            "type": "Feature",
+            "bbox": bounds,
+            "geometry": {
+                "type": "Polygon",
+                "coordinates": [
+                    [
+                        [west, south],
+                        [east, south],
+                        [east, north],
+                        [west, north],
+                        [west, south],
+                    ]
+                ],
+            },
+            "properties": properties,
+        }
+
+    def _info(self, src) -> Dict:
+        """Returns the titiler info of a dataset."""
+        import math
+
+        from rasterio.enums import MaskFlags
+
+        bounds = self._bounds(src)
+        # The resolution in Web Mercator meters at the equator.
+        resolution = math.radians(bounds[2] - bounds[0]) * 6378137 / src.width
+        maxzoom = math.log2(2 * math.pi * 6378137 / (256 * max(resolution, 1e-9)))
+        maxzoom = max(0, math.ceil(maxzoom))
+        minzoom = max(
+            0, maxzoom - math.ceil(math.log2(max(src.width, src.height) / 256))
+        )
+
+        flags = src.mask_flag_enums[0]
+        if MaskFlags.nodata in flags:
+            nodata_type = "Nodata"
+        elif MaskFlags.alpha in flags:
+            nodata_type = "Alpha"
+        elif MaskFlags.per_dataset in flags:
+            nodata_type = "Mask"
+        else:
+            nodata_type = "None"
+
+        return {
+            "bounds": bounds,
+            "minzoom": minzoom,
+            "maxzoom": maxzoom,
+            "band_metadata": [[f"b{i}", src.tags(i)] for i in src.indexes],
+            "band_descriptions": [
+                [f"b{i}", src.descriptions[i - 1] or ""] for i in src.indexes
+            ],
+            "dtype": src.dtypes[0],
+            "nodata_type": nodata_type,
+            "nodata_value": src.nodata,
+            "colorinterp": [c.name for c in src.colorinterp],
+            "scales": list(src.scales),
+            "offsets": list(src.offsets),
+            "driver": src.driver,
+            "count": src.count,
+            "width": src.width,
+            "height": src.height,
+            "overviews": src.overviews(1),
+            "crs": src.crs.to_string() if src.crs else None,
+        }
+
+    def _statistics(self, src, indexes: List[int], max_size=None) -> Dict:
+        """Returns the titiler statistics of the bands of a dataset."""
+        from .bandstats import band_statistics
+
+        return band_statistics(src, indexes, max_size=int(max_size or self.max_size))
+
+    @staticmethod
+    def _point(src, indexes: List[int], lon: float, lat: float) -> List:
+        """Returns the values of the bands of a dataset at a point."""
+        import numpy as np
+        from rasterio.transform import rowcol
+        from rasterio.warp import transform
+        from rasterio.windows import Window
+
+        if src.crs is not None and src.crs.to_epsg() != 4326:
+            (x,), (y,) = transform("EPSG:4326", src.crs, [lon], [lat])
+        else:
+            x, y = lon, lat
+        row, col = rowcol(src.transform, x, y)
+        if not (0 <= row < src.height and 0 <= col < src.width):
+            raise ValueError("Point is outside the dataset bounds.")
+        data = src.read(indexes, window=Window(col, row, 1, 1), masked=True)
+        return [None if v is np.ma.masked else v.item() for v in data[:, 0, 0]]
+
+
+def _titiler_get(titiler_endpoint, path: str, params: Optional[Dict] = None) -> Any:
+    """Requests a path of a titiler endpoint, which may be a URL or an endpoint object."""
+    if isinstance(titiler_endpoint, TitilerEndpoint):
+        return titiler_endpoint.get(f"{titiler_endpoint.endpoint}/{path}", params)
+    return fetch_json(f"{titiler_endpoint}/{path}", params)
+
+
+def check_titiler_endpoint(
+    titiler_endpoint: Optional[str] = None, url: Optional[str] = None
+):
     """Returns the default titiler endpoint.
 
+    Args:
+        titiler_endpoint (str, optional): Titiler endpoint, e.g., "https://titiler.xyz",
+            "planetary-computer", "pc" or "local". Defaults to None.
+        url (str, optional): The path or URL of the requested dataset. If the endpoint
+            is not specified and the path is a local file, which a remote titiler
+            cannot read, the local endpoint is used. Defaults to None.
+
     Returns:
         object: A titiler endpoint.
     """
     if titiler_endpoint is None:
-        if os.environ.get("TITILER_ENDPOINT") is not None:
+        if isinstance(url, str) and os.path.exists(url):
+            titiler_endpoint = LocalEndpoint()
+        elif os.environ.get("TITILER_ENDPOINT") is not None:
             titiler_endpoint = os.environ.get("TITILER_ENDPOINT")
 
             if titiler_endpoint == "planetary-computer":
                 titiler_endpoint = PlanetaryComputerEndpoint()
+            elif titiler_endpoint == "local":
+                titiler_endpoint = LocalEndpoint()
         else:
             titiler_endpoint = "https://titiler.xyz"
     elif titiler_endpoint in ["planetary-computer", "pc"]:
         titiler_endpoint = PlanetaryComputerEndpoint()
+    elif titiler_endpoint == "local":
+        titiler_endpoint = LocalEndpoint()
 
     return titiler_endpoint
 
@@ -209,9 +908,9 @@ def cog_tile(
     if "default_vis" in kwargs.keys() and kwargs["default_vis"]:
         kwargs = {"url": url}
 
-    r = requests.get(
+    r = fetch_json(
         f"{titiler_endpoint}/cog/{TileMatrixSetId}/tilejson.json", params=kwargs
-    ).json()
+    )
     return r["tiles"][0]
 
 
@@ -287,14 +986,14 @@ def cog_mosaic(
             print("Creating COG masaic ...")
 
         # Create token
-        r = requests.post(
+        r = http_client.post(
             f"{titiler_endpoint}/tokens/create",
             json={"username": username, "scope": ["mosaic:read", "mosaic:create"]},
         ).json()
         token = r["token"]
 
         # Create mosaic
-        requests.post(
+        http_client.post(
             f"{titiler_endpoint}/mosaicjson/create",
             json={
                 "username": username,
@@ -307,7 +1006,7 @@ def cog_mosaic(
             },
         ).json()
 
-        r2 = requests.get(
+        r2 = http_client.get(
             f"{titiler_endpoint}/mosaicjson/{username}.{layername}/tilejson.json",
         ).json()
 
@@ -341,14 +1040,12 @@ def cog_mosaic_from_file(
     Returns:
         str: The tile URL for the COG mosaic.
     """
-    import urllib
-
     titiler_endpoint = check_titiler_endpoint(titiler_endpoint)
     links = []
     if filepath.startswith("http"):
-        data = urllib.request.urlopen(filepath)
-        for line in data:
-            links.append(line.decode("utf-8").strip())
+        data = http_client.get(filepath).text
+        for line in data.splitlines():
+            links.append(line.strip())
 
     else:
         with open(filepath) as f:
@@ -376,8 +1073,8 @@ def cog_bounds(
         list: A list of values representing [left, bottom, right, top]
     """
 
-    titiler_endpoint = check_titiler_endpoint(titiler_endpoint)
-    r = requests.get(f"{titiler_endpoint}/cog/bounds", params={"url": url}).json()
+    titiler_endpoint = check_titiler_endpoint(titiler_endpoint, url)
+    r = _titiler_get(titiler_endpoint, "cog/bounds", params={"url": url})
 
     if "bounds" in r.keys():
         bounds = r["bounds"]
@@ -399,7 +1096,7 @@ def cog_center(
     Returns:
         tuple: A tuple representing (longitude, latitude)
     """
-    titiler_endpoint = check_titiler_endpoint(titiler_endpoint)
+    titiler_endpoint = check_titiler_endpoint(titiler_endpoint, url)
     bounds = cog_bounds(url, titiler_endpoint)
     center = ((bounds[0] + bounds[2]) / 2, (bounds[1] + bounds[3]) / 2)  # (lat, lon)
     return center
@@ -419,13 +1116,14 @@ def cog_bands(
         list: A list of band names
     """
 
-    titiler_endpoint = check_titiler_endpoint(titiler_endpoint)
-    r = requests.get(
-        f"{titiler_endpoint}/cog/info",
+    titiler_endpoint = check_titiler_endpoint(titiler_endpoint, url)
+    r = _titiler_get(
+        titiler_endpoint,
+        "cog/info",
         params={
             "url": url,
         },
-    ).json()
+    )
 
     bands = [b[0] for b in r["band_descriptions"]]
     return bands
@@ -445,13 +1143,14 @@ def cog_stats(
         list: A dictionary of band statistics.
     """
 
-    titiler_endpoint = check_titiler_endpoint(titiler_endpoint)
-    r = requests.get(
-        f"{titiler_endpoint}/cog/statistics",
+    titiler_endpoint = check_titiler_endpoint(titiler_endpoint, url)
+    r = _titiler_get(
+        titiler_endpoint,
+        "cog/statistics",
         params={
             "url": url,
         },
-    ).json()
+    )
 
     return r
 
@@ -471,17 +1170,18 @@ def cog_info(
         list: A dictionary of band info.
     """
 
-    titiler_endpoint = check_titiler_endpoint(titiler_endpoint)
+    titiler_endpoint = check_titiler_endpoint(titiler_endpoint, url)
     info = "info"
     if return_geojson:
         info = "info.geojson"
 
-    r = requests.get(
-        f"{titiler_endpoint}/cog/{info}",
+    r = _titiler_get(
+        titiler_endpoint,
+        f"cog/{info}",
         params={
             "url": url,
         },
-    ).json()
+    )
 
     return r
 
@@ -509,12 +1209,12 @@ def cog_pixel_value(
         list: A dictionary of band info.
     """
 
-    titiler_endpoint = check_titiler_endpoint(titiler_endpoint)
+    titiler_endpoint = check_titiler_endpoint(titiler_endpoint, url)
     kwargs["url"] = url
     if bidx is not None:
         kwargs["bidx"] = bidx
 
-    r = requests.get(f"{titiler_endpoint}/cog/point/{lon},{lat}", params=kwargs).json()
+    r = _titiler_get(titiler_endpoint, f"cog/point/{lon},{lat}", params=kwargs)
     bands = cog_bands(url, titiler_endpoint)
     # if isinstance(titiler_endpoint, str):
     #     r = requests.get(f"{titiler_endpoint}/cog/point/{lon},{lat}", params=kwargs).json()
@@ -638,7 +1338,7 @@ def stac_tile(
                 print(stats["detail"])  # When operation times out.
 
     else:
-        data = requests.get(url).json()
+        data = fetch_json(url)
         if "mosaicjson" in data:
             mosaic_json = True
 
@@ -703,22 +1403,129 @@ def stac_tile(
         kwargs.pop("TileMatrixSetId")
 
     if mosaic_json:
-        r = requests.get(
+        r = fetch_json(
             f"{titiler_endpoint}/mosaicjson/{TileMatrixSetId}/tilejson.json",
             params=kwargs,
-        ).json()
+        )
     else:
         if isinstance(titiler_endpoint, str):
-            r = requests.get(
+            r = fetch_json(
                 f"{titiler_endpoint}/stac/{TileMatrixSetId}/tilejson.json",
                 params=kwargs,
-            ).json()
+            )
         else:
-            r = requests.get(titiler_endpoint.url_for_stac_item(), params=kwargs).json()
+            r = titiler_endpoint.get(
+                titiler_endpoint.url_for_stac_item(), params=kwargs
+            )
 
     return r["tiles"][0]
 
 
+def _map_unique(func: Callable, keys: List, max_workers: int) -> List:
+    """Calls a function once per unique key in a thread pool, returning results in key order."""
+    import concurrent.futures
+
+    unique = list(dict.fromkeys(keys))
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = dict(zip(unique, executor.map(func, unique)))
+    return [results[key] for key in keys]
+
+
+def cog_tiles(
+    urls: List[str],
+    bands: Optional[List] = None,
+    titiler_endpoint: Optional[str] = None,
+    max_workers: int = 16,
+    **kwargs,
+) -> List[str]:
+    """Get tile layer URLs for many Cloud Optimized GeoTIFFs (COGs) at once.
+
+    The band names, statistics and TileJSON of the COGs are requested concurrently.
+    Each distinct COG is resolved once, and identical metadata requests are sent
+    once and cached (see fetch_json()).
+
+    Args:
+        urls (list): HTTP URLs to the COGs.
+        bands (list, optional): List of bands to use. Defaults to None.
+        titiler_endpoint (str, optional): TiTiler endpoint. Defaults to "https://titiler.xyz".
+        max_workers (int, optional): The maximum number of COGs resolved at the same
+            time. Defaults to 16.
+        **kwargs: Additional arguments to pass to cog_tile(), e.g., colormap or rescale.
+
+    Returns:
+        list: The tile layer URLs, in the order of urls.
+    """
+
+    def tile(url):
+        return cog_tile(url, bands, titiler_endpoint, **copy.deepcopy(kwargs))
+
+    return _map_unique(tile, list(urls), max_workers)
+
+
+def stac_tiles(
+    urls: Optional[List] = None,
+    collection: Optional[str] = None,
+    items: Optional[List[str]] = None,
+    assets: Union[str, List] = None,
+    bands: list = None,
+    titiler_endpoint: Optional[str] = None,
+    max_workers: int = 16,
+    **kwargs,
+) -> List[str]:
+    """Get tile layer URLs for many SpatialTemporal Asset Catalog (STAC) items at once.
+
+    The items are either STAC item URLs (or pystac.Item objects), or the IDs of items
+    of a Microsoft Planetary Computer collection. Their metadata is requested
+    concurrently, each distinct item is resolved once, and identical metadata
+    requests are sent once and cached (see fetch_json()).
+
+    Args:
+        urls (list, optional): HTTP URLs to STAC items or pystac.Item objects.
+            Defaults to None.
+        collection (str, optional): The Microsoft Planetary Computer STAC collection
+            ID, e.g., landsat-8-c2-l2. Defaults to None.
+        items (list, optional): The IDs of the items of the collection. Defaults to None.
+        assets (str | list): The STAC asset IDs, e.g., ["SR_B7", "SR_B5", "SR_B4"].
+        bands (list): A list of band names, e.g., ["SR_B7", "SR_B5", "SR_B4"]
+        titiler_endpoint (str, optional): Titiler endpoint, e.g., "https://titiler.xyz", "planetary-computer", "pc". Defaults to None.
+        max_workers (int, optional): The maximum number of items resolved at the same
+            time. Defaults to 16.
+        **kwargs: Additional arguments to pass to stac_tile().
+
+    Returns:
+        list: The tile layer URLs, in the order of urls or items.
+    """
+    if urls is not None:
+        keys = [url.self_href if isinstance(url, pystac.Item) else url for url in urls]
+
+        def tile(url):
+            return stac_tile(
+                url=url,
+                assets=assets,
+                bands=bands,
+                titiler_endpoint=titiler_endpoint,
+                **copy.deepcopy(kwargs),
+            )
+
+    elif collection is not None and items is not None:
+        keys = list(items)
+
+        def tile(item):
+            return stac_tile(
+                collection=collection,
+                item=item,
+                assets=assets,
+                bands=bands,
+                titiler_endpoint=titiler_endpoint,
+                **copy.deepcopy(kwargs),
+            )
+
+    else:
+        raise ValueError("Either urls or collection and items must be specified.")
+
+    return _map_unique(tile, keys, max_workers)
+
+
 def stac_bounds(
     url: str = None,
     collection: str = None,
@@ -752,8 +1559,7 @@ def stac_bounds(
 
     if url is not None:
         kwargs["url"] = url
-        response = requests.get(url)
-        r = response.json()
+        r = fetch_json(url)
         if "mosaicjson" in r:
             if "bounds" in r:
                 return r["bounds"]
@@ -763,12 +1569,12 @@ def stac_bounds(
     if item is not None:
         kwargs["item"] = item
 
-    titiler_endpoint = check_titiler_endpoint(titiler_endpoint)
+    titiler_endpoint = check_titiler_endpoint(titiler_endpoint, url)
 
     if isinstance(titiler_endpoint, str):
-        r = requests.get(f"{titiler_endpoint}/stac/bounds", params=kwargs).json()
+        r = fetch_json(f"{titiler_endpoint}/stac/bounds", params=kwargs)
     else:
-        r = requests.get(titiler_endpoint.url_for_stac_bounds(), params=kwargs).json()
+        r = titiler_endpoint.get(titiler_endpoint.url_for_stac_bounds(), params=kwargs)
 
     bounds = r["bounds"]
     return bounds
@@ -842,11 +1648,11 @@ def stac_bands(
     if item is not None:
         kwargs["item"] = item
 
-    titiler_endpoint = check_titiler_endpoint(titiler_endpoint)
+    titiler_endpoint = check_titiler_endpoint(titiler_endpoint, url)
     if isinstance(titiler_endpoint, str):
-        r = requests.get(f"{titiler_endpoint}/stac/assets", params=kwargs).json()
+        r = fetch_json(f"{titiler_endpoint}/stac/assets", params=kwargs)
     else:
-        r = requests.get(titiler_endpoint.url_for_stac_assets(), params=kwargs).json()
+        r = titiler_endpoint.get(titiler_endpoint.url_for_stac_assets(), params=kwargs)
 
     return r
 
@@ -893,13 +1699,13 @@ def stac_stats(
     if assets is not None:
         kwargs["assets"] = assets
 
-    titiler_endpoint = check_titiler_endpoint(titiler_endpoint)
+    titiler_endpoint = check_titiler_endpoint(titiler_endpoint, url)
     if isinstance(titiler_endpoint, str):
-        r = requests.get(f"{titiler_endpoint}/stac/statistics", params=kwargs).json()
+        r = fetch_json(f"{titiler_endpoint}/stac/statistics", params=kwargs)
     else:
-        r = requests.get(
+        r = titiler_endpoint.get(
             titiler_endpoint.url_for_stac_statistics(), params=kwargs
-        ).json()
+        )
 
     return r
 
@@ -980,11 +1786,11 @@ def stac_info(
     if assets is not None:
         kwargs["assets"] = assets
 
-    titiler_endpoint = check_titiler_endpoint(titiler_endpoint)
+    titiler_endpoint = check_titiler_endpoint(titiler_endpoint, url)
     if isinstance(titiler_endpoint, str):
-        r = requests.get(f"{titiler_endpoint}/stac/info", params=kwargs).json()
+        r = fetch_json(f"{titiler_endpoint}/stac/info", params=kwargs)
     else:
-        r = requests.get(titiler_endpoint.url_for_stac_info(), params=kwargs).json()
+        r = titiler_endpoint.get(titiler_endpoint.url_for_stac_info(), params=kwargs)
 
     return r
 
@@ -1031,13 +1837,13 @@ def stac_info_geojson(
     if assets is not None:
         kwargs["assets"] = assets
 
-    titiler_endpoint = check_titiler_endpoint(titiler_endpoint)
+    titiler_endpoint = check_titiler_endpoint(titiler_endpoint, url)
     if isinstance(titiler_endpoint, str):
-        r = requests.get(f"{titiler_endpoint}/stac/info.geojson", params=kwargs).json()
+        r = fetch_json(f"{titiler_endpoint}/stac/info.geojson", params=kwargs)
     else:
-        r = requests.get(
+        r = titiler_endpoint.get(
             titiler_endpoint.url_for_stac_info_geojson(), params=kwargs
-        ).json()
+        )
 
     return r
 
@@ -1080,11 +1886,11 @@ def stac_assets(
     if item is not None:
         kwargs["item"] = item
 
-    titiler_endpoint = check_titiler_endpoint(titiler_endpoint)
+    titiler_endpoint = check_titiler_endpoint(titiler_endpoint, url)
     if isinstance(titiler_endpoint, str):
-        r = requests.get(f"{titiler_endpoint}/stac/assets", params=kwargs).json()
+        r = fetch_json(f"{titiler_endpoint}/stac/assets", params=kwargs)
     else:
-        r = requests.get(titiler_endpoint.url_for_stac_assets(), params=kwargs).json()
+        r = titiler_endpoint.get(titiler_endpoint.url_for_stac_assets(), params=kwargs)
 
     return r
 
@@ -1113,7 +1919,8 @@ def stac_pixel_value(
         verbose (bool, optional): Print out the error message. Defaults to True.
 
     Returns:
-        list: A dictionary of pixel values for each asset.
+        dict: The pixel value of each asset, or a list of band values for
+            multi-band assets.
     """
 
     if url is None and collection is None:
@@ -1144,44 +1951,282 @@ def stac_pixel_value(
         )
     kwargs["assets"] = assets
 
-    titiler_endpoint = check_titiler_endpoint(titiler_endpoint)
+    titiler_endpoint = check_titiler_endpoint(titiler_endpoint, url)
     if isinstance(titiler_endpoint, str):
 
-        r = requests.get(
-            f"{titiler_endpoint}/stac/point/{lon},{lat}", params=kwargs
-        ).json()
+        r = fetch_json(f"{titiler_endpoint}/stac/point/{lon},{lat}", params=kwargs)
     else:
-        r = requests.get(
+        r = titiler_endpoint.get(
             titiler_endpoint.url_for_stac_pixel_value(lon, lat), params=kwargs
-        ).json()
+        )
 
     if "detail" in r:
         if verbose:
             print(r["detail"])
         return None
     else:
-        values = r["values"]
         if isinstance(assets, str):
             assets = assets.split(",")
-        result = dict(zip(assets, values))
+        result = {}
+        # TiTiler returns a list of band values per asset.
+        for asset, values in zip(assets, r["values"]):
+            if isinstance(values, list) and len(values) == 1:
+                values = values[0]
+            result[asset] = values
         return result
 
 
-def stac_object_type(url: str, **kwargs) -> str:
-    """Get the STAC object type.
+def _points_lon_lat(points, x: Optional[str] = None, y: Optional[str] = None):
+    """Returns the points as a DataFrame and their longitudes and latitudes."""
+    import numpy as np
+
+    if hasattr(points, "geometry") and hasattr(points, "to_crs"):
+        if points.crs is not None and points.crs.to_epsg() != 4326:
+            geometry = points.geometry.to_crs(epsg=4326)
+        else:
+            geometry = points.geometry
+        return points, np.asarray(geometry.x), np.asarray(geometry.y)
+
+    if not isinstance(points, pd.DataFrame):
+        array = np.asarray(points, dtype="float64")
+        if array.ndim != 2 or array.shape[1] != 2:
+            raise ValueError("points must be an array of (lon, lat) pairs.")
+        points = pd.DataFrame(array, columns=[x or "longitude", y or "latitude"])
+
+    if x is None or y is None:
+        for names in [("longitude", "latitude"), ("lon", "lat"), ("x", "y")]:
+            if all(name in points.columns for name in names):
+                x, y = names
+                break
+        else:
+            raise ValueError("x and y must be specified for the point coordinates.")
+    return points, points[x].to_numpy("float64"), points[y].to_numpy("float64")
 
-    Args:
-        url (str): The STAC object URL.
-        **kwargs: Keyword arguments for pystac.STACObject.from_file(). Defaults to None.
+
+def _sample_raster(source: str, lons, lats, bidx=None, max_workers: int = 16):
+    """Samples a raster at many points with windowed reads.
+
+    Points are grouped by the internal block of the raster they fall in, and each
+    group is read with one window, so nearby points share a read. Groups are read
+    concurrently, each thread with its own dataset handle.
 
     Returns:
-        str: The STAC object type, can be catalog, collection, or item.
+        tuple: The band names and a float64 array of shape (points, bands), which is
+            NaN for points outside the raster or on nodata.
     """
-    try:
-        obj = pystac.STACObject.from_file(url, **kwargs)
+    import concurrent.futures
+
+    import numpy as np
+    import rasterio
+    from rasterio.transform import rowcol
+    from rasterio.warp import transform
+    from rasterio.windows import Window
+
+    with rasterio.open(source) as src:
+        crs = src.crs
+        affine = src.transform
+        height, width = src.height, src.width
+        block_height, block_width = src.block_shapes[0]
+        if bidx is None:
+            indexes = list(src.indexes)
+        else:
+            indexes = [bidx] if isinstance(bidx, int) else list(bidx)
+        names = [src.descriptions[i - 1] or f"b{i}" for i in indexes]
 
-        if isinstance(obj, pystac.Collection):
-            return "collection"
+    if crs is not None and crs.to_epsg() != 4326:
+        xs, ys = transform("EPSG:4326", crs, list(lons), list(lats))
+    else:
+        xs, ys = lons, lats
+    rows, cols = rowcol(affine, xs, ys)
+    rows, cols = np.asarray(rows, dtype="int64"), np.asarray(cols, dtype="int64")
+    values = np.full((len(rows), len(indexes)), np.nan)
+
+    inside = np.flatnonzero(
+        (rows >= 0) & (rows < height) & (cols >= 0) & (cols < width)
+    )
+    if len(inside) == 0:
+        return names, values
+    blocks = np.stack([rows[inside] // block_height, cols[inside] // block_width], 1)
+    _, groups = np.unique(blocks, axis=0, return_inverse=True)
+    groups = groups.ravel()
+
+    local = threading.local()
+    datasets = []
+    datasets_lock = threading.Lock()
+
+    def read(group):
+        if not hasattr(local, "dataset"):
+            local.dataset = rasterio.open(source)
+            with datasets_lock:
+                datasets.append(local.dataset)
+        points = inside[groups == group]
+        r, c = rows[points], cols[points]
+        row0, col0 = r.min(), c.min()
+        window = Window(col0, row0, c.max() - col0 + 1, r.max() - row0 + 1)
+        data = local.dataset.read(indexes, window=window, masked=True)
+        sampled = data[:, r - row0, c - col0]
+        values[points] = np.ma.filled(sampled.astype("float64"), np.nan).T
+
+    try:
+        with concurrent.futures.ThreadPoolExecutor(max_workers) as executor:
+            list(executor.map(read, range(groups.max() + 1)))
+    finally:
+        for dataset in datasets:
+            dataset.close()
+    return names, values
+
+
+def sample_pixel_values(
+    points,
+    url: Optional[str] = None,
+    collection: Optional[str] = None,
+    item: Optional[str] = None,
+    assets: Union[str, List] = None,
+    bidx: Optional[Union[int, List[int]]] = None,
+    titiler_endpoint: Optional[str] = None,
+    method: str = "auto",
+    source_column: Optional[str] = None,
+    x: Optional[str] = None,
+    y: Optional[str] = None,
+    max_workers: int = 16,
+) -> pd.DataFrame:
+    """Samples the pixel values of a COG or STAC item at many points.
+
+    Local rasters and COG URLs are read directly with rasterio, grouping the points
+    by the internal blocks of the raster so that nearby points share one windowed
+    read. STAC items, and COGs with method="titiler", are sampled with concurrent
+    TiTiler point requests instead of one request after another.
+
+    Args:
+        points (array | pd.DataFrame | gpd.GeoDataFrame): The points, as an array of
+            (lon, lat) pairs, a DataFrame with coordinate columns, or a GeoDataFrame of
+            points.
+        url (str, optional): The path or HTTP URL of a raster (e.g., a COG), or the
+            HTTP URL of a STAC item. Defaults to None.
+        collection (str, optional): The Microsoft Planetary Computer STAC collection
+            ID, e.g., landsat-8-c2-l2. Defaults to None.
+        item (str, optional): The Microsoft Planetary Computer STAC item ID. Defaults to None.
+        assets (str | list, optional): The STAC assets to sample. Defaults to None
+            (all assets).
+        bidx (int | list, optional): The raster bands to sample. Band indexing starts
+            at 1. Defaults to None (all bands).
+        titiler_endpoint (str, optional): Titiler endpoint, e.g., "https://titiler.xyz",
+            "planetary-computer", "pc". Defaults to None.
+        method (str, optional): "rasterio" to read rasters directly, "titiler" to use
+            TiTiler point requests, or "auto" to read rasters directly and sample STAC
+            items with TiTiler. Defaults to "auto".
+        source_column (str, optional): The column of points that holds the raster path or
+            STAC item URL of each point, to sample many sources at once. Points without a
+            source are skipped. Defaults to None.
+        x (str, optional): The column with the longitudes of the points. Defaults to
+            "longitude", "lon" or "x", whichever exists.
+        y (str, optional): The column with the latitudes of the points. Defaults to
+            "latitude", "lat" or "y", whichever exists.
+        max_workers (int, optional): The maximum number of concurrent reads or
+            requests. Defaults to 16.
+
+    Returns:
+        pd.DataFrame: The points with one column per band or asset, where the bands
+            of a multi-band asset get "<asset>_b<n>" columns. For a GeoDataFrame, a
+            GeoDataFrame. Points without a value get NaN.
+    """
+    import concurrent.futures
+
+    import numpy as np
+
+    points, lons, lats = _points_lon_lat(points, x, y)
+
+    if source_column is not None:
+        sources = points[source_column].to_numpy()
+    elif url is not None or collection is not None:
+        sources = np.full(len(points), None if url is None else url, dtype=object)
+    else:
+        raise ValueError("Either url, collection or source_column must be specified.")
+
+    result = pd.DataFrame(index=range(len(points)))
+    # Points without a source keep NaN values.
+    valid = sources if source_column is None else sources[~pd.isna(sources)]
+    for source in pd.unique(valid):
+        selected = np.flatnonzero(sources == source)
+        extension = os.path.splitext(source.lower().split("?")[0])[1] if source else ""
+        is_raster = (
+            collection is None
+            and extension != ".json"
+            and (
+                source.startswith("/vsi")
+                or extension in (".tif", ".tiff", ".vrt")
+                or os.path.exists(source)
+            )
+        )
+        if method == "rasterio" or (method == "auto" and is_raster):
+            names, values = _sample_raster(
+                source, lons[selected], lats[selected], bidx, max_workers
+            )
+            for i, name in enumerate(names):
+                result.loc[selected, name] = values[:, i]
+            continue
+
+        def sample(index):
+            if collection is None and is_raster:
+                return cog_pixel_value(
+                    lons[index],
+                    lats[index],
+                    source,
+                    bidx,
+                    titiler_endpoint,
+                    verbose=False,
+                )
+            return stac_pixel_value(
+                lons[index],
+                lats[index],
+                url=source,
+                collection=collection,
+                item=item,
+                assets=assets,
+                titiler_endpoint=titiler_endpoint,
+                verbose=False,
+            )
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers) as executor:
+            responses = list(executor.map(sample, selected))
+
+        # Multi-band assets come back as lists and get one column per band.
+        columns = {}
+        for i, values in enumerate(responses):
+            for name, value in (values or {}).items():
+                if np.ndim(value) == 0 or len(value) == 1:
+                    bands = {name: np.ravel(value)[0]}
+                else:
+                    bands = {f"{name}_b{n}": v for n, v in enumerate(value, start=1)}
+                for column, v in bands.items():
+                    if column not in columns:
+                        columns[column] = np.full(len(selected), np.nan)
+                    columns[column][i] = np.nan if v is None else v
+        for column, values in columns.items():
+            result.loc[selected, column] = values
+
+    result.index = points.index
+    output = points.copy()
+    for column in result.columns:
+        output[column] = result[column].to_numpy()
+    return output
+
+
+def stac_object_type(url: str, **kwargs) -> str:
+    """Get the STAC object type.
+
+    Args:
+        url (str): The STAC object URL.
+        **kwargs: Keyword arguments for pystac.STACObject.from_file(). Defaults to None.
+
+    Returns:
+        str: The STAC object type, can be catalog, collection, or item.
+    """
+    try:
+        obj = pystac.STACObject.from_file(url, **kwargs)
+
+        if isinstance(obj, pystac.Collection):
+            return "collection"
         elif isinstance(obj, pystac.Item):
             return "item"
         elif isinstance(obj, pystac.Catalog):
@@ -1363,6 +2408,9 @@ def stac_search(
     get_gdf: Optional[bool] = False,
     get_info: Optional[bool] = False,
     get_root: Optional[bool] = True,
+    get_arrow: Optional[bool] = False,
+    get_index: Optional[bool] = False,
+    output: Optional[str] = None,
     **kwargs,
 ) -> List:
     """Search a STAC API. The function wraps the pysatc_client.Client.search() method. See
@@ -1421,6 +2469,13 @@ def stac_search(
         get_gdf (bool, optional): True to return a GeoDataFrame. Defaults to False.
         get_info (bool, optional): True to return a dictionary of STAC items. Defaults to False.
         get_root (bool, optional): Get the root link of the STAC object. Defaults to True.
+        get_arrow (bool, optional): True to return an iterator of pyarrow.RecordBatch, one
+            per page of results, so that memory use is bounded by the page size. Defaults to False.
+        get_index (bool, optional): True to return a StacItemIndex of the results for fast
+            local bbox, date and geometry queries. If output is specified, the index is
+            persisted next to the GeoParquet file. Defaults to False.
+        output (str, optional): The path of a GeoParquet file to write the results to,
+            one page at a time. If specified, the path is returned. Defaults to None.
         **kwargs: Additional keyword arguments to pass to the stac_client() function.
 
     Returns:
@@ -1456,17 +2511,27 @@ def stac_search(
             fields=fields,
         )
 
-        if get_collection:
+        if output is not None:
+            output = stac_search_to_parquet(search, output)
+            if get_index:
+                return StacItemIndex.from_parquet(output)
+            return output
+        elif get_index:
+            return StacItemIndex(search)
+        elif get_arrow:
+            return stac_search_to_arrow(search)
+        elif get_collection:
             return search.item_collection()
         elif get_items:
             return list(search.items())
         elif get_assets:
-            assets = {}
-            for item in search.items():
-                assets[item.id] = {}
-                for key, value in item.get_assets().items():
-                    assets[item.id][key] = value.href
-            return assets
+            # Plain dictionaries avoid creating a pystac.Item for every item.
+            return {
+                item["id"]: {
+                    key: value["href"] for key, value in item.get("assets", {}).items()
+                }
+                for item in search.items_as_dicts()
+            }
         elif get_links:
             return [item.get_self_href() for item in search.items()]
         elif get_gdf:
@@ -1563,6 +2628,531 @@ def stac_search_to_list(search, **kwargs) -> List:
     return search.item_collections()
 
 
+STAC_DATETIME_PROPERTIES = [
+    "datetime",
+    "start_datetime",
+    "end_datetime",
+    "created",
+    "updated",
+]
+
+
+def _stac_property_array(key: str, values: List, type=None):
+    """Converts the values of a STAC item property to an Arrow array.
+
+    Nested values are stored as JSON strings and datetime properties as timestamps.
+    With a type, values that cannot be converted raise an Arrow error.
+    """
+    import pyarrow as pa
+
+    if key in STAC_DATETIME_PROPERTIES and (
+        type is None or pa.types.is_timestamp(type)
+    ):
+        dates = pd.to_datetime(
+            pd.Series(values, dtype=object), utc=True, errors="coerce", format="ISO8601"
+        )
+        return pa.array(dates, type=pa.timestamp("us", tz="UTC"))
+    if type is None or pa.types.is_string(type):
+        if any(isinstance(v, (dict, list)) for v in values):
+            values = [v if v is None else json.dumps(v) for v in values]
+        if type is None:
+            try:
+                return pa.array(values)
+            except (pa.ArrowInvalid, pa.ArrowTypeError):
+                type = pa.string()
+        values = [
+            v if v is None or isinstance(v, str) else json.dumps(v) for v in values
+        ]
+    return pa.array(values, type=type)
+
+
+def _geoparquet_metadata(
+    crs: Any = "EPSG:4326", covering: Optional[str] = None
+) -> Dict:
+    """Returns the GeoParquet metadata of a table with a WKB geometry column.
+
+    Args:
+        crs (str | pyproj.CRS, optional): The CRS of the geometries. Defaults to "EPSG:4326".
+        covering (str, optional): The name of a struct column with the xmin, ymin, xmax
+            and ymax of each geometry. Defaults to None.
+
+    Returns:
+        dict: The metadata, to be stored as JSON under the "geo" key.
+    """
+    from pyproj import CRS
+
+    column = {
+        "encoding": "WKB",
+        "geometry_types": [],
+        "crs": CRS.from_user_input(crs).to_json_dict(),
+    }
+    if covering is not None:
+        column["covering"] = {
+            "bbox": {
+                name: [covering, name] for name in ["xmin", "ymin", "xmax", "ymax"]
+            }
+        }
+    return {
+        "version": "1.1.0",
+        "primary_column": "geometry",
+        "columns": {"geometry": column},
+    }
+
+
+def stac_items_to_arrow(items: List[Dict], schema=None):
+    """Converts STAC items to an Arrow record batch in the GeoParquet layout.
+
+    The batch has id, collection, href (the self link), geometry (WKB), bbox and
+    assets (JSON) columns, followed by one column per item property. With a schema,
+    e.g., the one of the first batch of a search, the batch has the same columns, and
+    the properties that do not fit in them are stored as JSON in the extra_properties
+    column, so that all the batches of a search can be written to one file.
+
+    Args:
+        items (list): The STAC items as dictionaries.
+        schema (pyarrow.Schema, optional): The schema of the batch. Defaults to None.
+
+    Returns:
+        pyarrow.RecordBatch: The record batch.
+    """
+    import numpy as np
+    import pyarrow as pa
+    import shapely
+
+    properties = [item.get("properties") or {} for item in items]
+    geometries = shapely.from_geojson(
+        np.array(
+            [
+                None if item.get("geometry") is None else json.dumps(item["geometry"])
+                for item in items
+            ],
+            dtype=object,
+        )
+    )
+    bounds = shapely.bounds(geometries)
+    hrefs = [
+        next(
+            (
+                link.get("href")
+                for link in item.get("links", [])
+                if link.get("rel") == "self"
+            ),
+            None,
+        )
+        for item in items
+    ]
+    columns = {
+        "id": pa.array([item.get("id") for item in items], pa.string()),
+        "collection": pa.array([item.get("collection") for item in items], pa.string()),
+        "href": pa.array(hrefs, pa.string()),
+        "geometry": pa.array(shapely.to_wkb(geometries), pa.binary()),
+        "bbox": pa.StructArray.from_arrays(
+            [pa.array(bounds[:, i], pa.float64()) for i in range(4)],
+            names=["xmin", "ymin", "xmax", "ymax"],
+        ),
+        "assets": pa.array(
+            [json.dumps(item.get("assets") or {}) for item in items], pa.string()
+        ),
+    }
+    extra = [{} for _ in items]
+
+    if schema is None:
+        keys = list(dict.fromkeys(key for p in properties for key in p))
+        for key in keys:
+            if key not in columns:
+                values = [p.get(key) for p in properties]
+                columns[key] = _stac_property_array(key, values)
+    else:
+        for field in schema:
+            if field.name in columns or field.name == "extra_properties":
+                continue
+            values = [p.get(field.name) for p in properties]
+            try:
+                columns[field.name] = _stac_property_array(
+                    field.name, values, field.type
+                )
+            except (pa.ArrowInvalid, pa.ArrowTypeError, OverflowError):
+                # Move the values of another type to the extra properties.
+                for i, value in enumerate(values):
+                    try:
+                        _stac_property_array(field.name, [value], field.type)
+                    except (pa.ArrowInvalid, pa.ArrowTypeError, OverflowError):
+                        extra[i][field.name] = value
+                        values[i] = None
+                columns[field.name] = _stac_property_array(
+                    field.name, values, field.type
+                )
+        for i, p in enumerate(properties):
+            for key, value in p.items():
+                if key not in schema.names:
+                    extra[i][key] = value
+
+    columns["extra_properties"] = pa.array(
+        [json.dumps(e) if e else None for e in extra], pa.string()
+    )
+    if schema is None:
+        schema = pa.schema(
+            [pa.field(name, array.type) for name, array in columns.items()],
+            metadata={"geo": json.dumps(_geoparquet_metadata(covering="bbox"))},
+        )
+    return pa.RecordBatch.from_arrays(list(columns.values()), schema=schema)
+
+
+def stac_search_to_arrow(search):
+    """Converts STAC search results to Arrow record batches, one page at a time.
+
+    Only one page of items is held in memory at a time, so searches with millions
+    of items can be processed. All batches have the schema of the first one (see
+    stac_items_to_arrow()).
+
+    Args:
+        search (pystac_client.ItemSearch): The search result returned by leafmap.stac_search().
+
+    Yields:
+        pyarrow.RecordBatch: The items of a page of search results.
+    """
+    schema = None
+    for page in search.pages_as_dicts():
+        items = page.get("features", [])
+        if len(items) == 0:
+            continue
+        batch = stac_items_to_arrow(items, schema)
+        schema = batch.schema
+        yield batch
+
+
+def stac_search_to_parquet(
+    search, output: str, compression: Optional[str] = "zstd", **kwargs
+) -> str:
+    """Writes STAC search results to a GeoParquet file, one page at a time.
+
+    Args:
+        search (pystac_client.ItemSearch): The search result returned by leafmap.stac_search().
+        output (str): The output GeoParquet file path.
+        compression (str, optional): The compression of the file. Defaults to "zstd".
+        **kwargs: Additional keyword arguments to pass to pyarrow.parquet.ParquetWriter().
+
+    Returns:
+        str: The output file path.
+    """
+    import pyarrow.parquet as pq
+
+    output = os.path.abspath(output)
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    writer = None
+    try:
+        for batch in stac_search_to_arrow(search):
+            if writer is None:
+                writer = pq.ParquetWriter(
+                    output, batch.schema, compression=compression, **kwargs
+                )
+            writer.write_batch(batch)
+        if writer is None:
+            batch = stac_items_to_arrow([])
+            writer = pq.ParquetWriter(
+                output, batch.schema, compression=compression, **kwargs
+            )
+    finally:
+        if writer is not None:
+            writer.close()
+    return output
+
+
+class StacItemIndex:
+    """A spatio-temporal index of STAC items for repeated bbox and date queries.
+
+    The footprints are indexed with a shapely STRtree and the datetimes are kept as a
+    sorted array, so a query looks up the candidates in the tree, checks the
+    predicate on the candidates only and finds the date range by binary search,
+    instead of scanning every item.
+
+    Args:
+        data (GeoDataFrame | list | pystac.ItemCollection | pystac_client.ItemSearch): The
+            items, e.g., a GeoDataFrame returned by stac_search(get_gdf=True) or
+            maxar_items(), a list of item dictionaries or a search result.
+        datetime_column (str, optional): The column with the datetimes of the items.
+            Items without a datetime fall back to the start_datetime column if it
+            exists. Defaults to "datetime".
+    """
+
+    VERSION = 1
+    SUFFIX = ".index.npz"
+
+    def __init__(self, data, datetime_column: Optional[str] = "datetime", **kwargs):
+        import numpy as np
+        import geopandas as gpd
+        import shapely
+
+        if not isinstance(data, gpd.GeoDataFrame):
+            if hasattr(data, "items_as_dicts"):
+                data = list(data.items_as_dicts())
+            elif isinstance(data, pystac.ItemCollection):
+                data = data.to_dict()["features"]
+            ids = [item.get("id") for item in data]
+            data = gpd.GeoDataFrame.from_features(data, crs="EPSG:4326")
+            if "id" not in data.columns:
+                data.insert(0, "id", ids)
+        self.data = data
+        self.datetime_column = datetime_column
+        self.geometries = np.asarray(data.geometry.values)
+
+        bounds = kwargs.get("bounds")
+        if bounds is None:
+            bounds = shapely.bounds(self.geometries)
+        self.bounds = bounds
+        # The tree is built from the envelopes, which are all it uses, so a persisted
+        # index does not need to parse the footprints again.
+        valid = ~np.isnan(bounds).any(axis=1)
+        envelopes = np.full(len(bounds), None, dtype=object)
+        envelopes[valid] = shapely.box(*bounds[valid].T)
+        self.tree = shapely.STRtree(envelopes)
+
+        if "times" in kwargs:
+            self.times, self.order = kwargs["times"], kwargs["order"]
+        else:
+            times = pd.Series(pd.NaT, index=data.index, dtype="datetime64[ns, UTC]")
+            for column in [datetime_column, "start_datetime"]:
+                if column in data.columns:
+                    values = pd.to_datetime(data[column], utc=True, errors="coerce")
+                    times = times.fillna(values.astype("datetime64[ns, UTC]"))
+            times = times.to_numpy(dtype="datetime64[ns]").astype("int64")
+            dated = np.flatnonzero(times != np.iinfo("int64").min)
+            self.order = dated[np.argsort(times[dated], kind="stable")]
+            self.times = times[self.order]
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    @staticmethod
+    def _timestamp(value) -> int:
+        """Converts a date to nanoseconds since the epoch, assuming UTC if naive."""
+        value = pd.Timestamp(value)
+        if value.tzinfo is None:
+            value = value.tz_localize("UTC")
+        return value.value
+
+    def query(
+        self,
+        bbox: Optional[List[float]] = None,
+        start_date=None,
+        end_date=None,
+        intersects=None,
+        within: Optional[bool] = False,
+    ):
+        """Returns the positions of the items that match a query.
+
+        Args:
+            bbox (list, optional): The bounding box [xmin, ymin, xmax, ymax]. Defaults to None.
+            start_date (str, optional): The start date, e.g., 2023-01-01. Defaults to None.
+            end_date (str, optional): The end date, e.g., 2023-12-31, inclusive. Defaults to None.
+            intersects (dict | shapely.Geometry | GeoDataFrame, optional): A GeoJSON
+                geometry or feature, a shapely geometry or a GeoDataFrame or GeoSeries in
+                EPSG:4326. Defaults to None.
+            within (bool, optional): Whether the footprints must be within the bbox and
+                the geometry rather than intersect them. Defaults to False.
+
+        Returns:
+            np.ndarray: The sorted positions of the matching items.
+        """
+        import numpy as np
+        import shapely
+        import shapely.geometry
+
+        positions = np.arange(len(self.data))
+        geometries = []
+        if bbox is not None:
+            geometries.append(shapely.box(*bbox))
+        if intersects is not None:
+            if isinstance(intersects, dict):
+                intersects = intersects.get("geometry", intersects)
+                intersects = shapely.geometry.shape(intersects)
+            elif hasattr(intersects, "union_all"):
+                intersects = intersects.to_crs("EPSG:4326").union_all()
+            geometries.append(intersects)
+
+        for geometry in geometries:
+            candidates = self.tree.query(geometry)
+            predicate = shapely.within if within else shapely.intersects
+            matches = candidates[predicate(self.geometries[candidates], geometry)]
+            positions = np.intersect1d(positions, matches, assume_unique=True)
+
+        if start_date is not None or end_date is not None:
+            start = 0
+            end = len(self.times)
+            if start_date is not None:
+                start = np.searchsorted(self.times, self._timestamp(start_date), "left")
+            if end_date is not None:
+                end = np.searchsorted(self.times, self._timestamp(end_date), "right")
+            matches = np.sort(self.order[start:end])
+            positions = np.intersect1d(positions, matches, assume_unique=True)
+        return positions
+
+    def search(self, *args, **kwargs):
+        """Returns the items that match a query, in their original order.
+
+        Args:
+            *args: Positional arguments for StacItemIndex.query().
+            **kwargs: Keyword arguments for StacItemIndex.query().
+
+        Returns:
+            GeoDataFrame: The matching rows of the indexed data.
+        """
+        return self.data.iloc[self.query(*args, **kwargs)]
+
+    def save(self, path: str, identity: Optional[str] = None) -> str:
+        """Persists the index, which is much smaller than the items.
+
+        Args:
+            path (str): The file path, usually ending with .index.npz.
+            identity (str, optional): An identity of the indexed data, e.g., the size and
+                modification time of its file, which load() checks. Defaults to None.
+
+        Returns:
+            str: The file path.
+        """
+        import numpy as np
+
+        temp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp, "wb") as f:
+            np.savez(
+                f,
+                version=self.VERSION,
+                identity=json.dumps(identity),
+                datetime_column=self.datetime_column,
+                bounds=self.bounds,
+                times=self.times,
+                order=self.order,
+            )
+        os.replace(temp, path)
+        return path
+
+    @classmethod
+    def load(cls, path: str, data, identity: Optional[str] = None):
+        """Loads a persisted index of some items.
+
+        Args:
+            path (str): The file path.
+            data (GeoDataFrame): The indexed items.
+            identity (str, optional): The identity the index was saved with. Defaults to None.
+
+        Returns:
+            StacItemIndex: The index, or None if the file does not exist or is stale.
+        """
+        import numpy as np
+
+        try:
+            with np.load(path) as f:
+                content = {key: f[key] for key in f.files}
+        except (OSError, ValueError):
+            return None
+        if (
+            int(content["version"]) != cls.VERSION
+            or json.loads(str(content["identity"])) != identity
+            or len(content["bounds"]) != len(data)
+        ):
+            return None
+        return cls(
+            data,
+            str(content["datetime_column"]),
+            bounds=content["bounds"],
+            times=content["times"],
+            order=content["order"],
+        )
+
+    @classmethod
+    def concat(cls, indexes: List["StacItemIndex"]):
+        """Combines the indexes of several sets of items without rebuilding them.
+
+        Args:
+            indexes (list): The indexes, with the same datetime column.
+
+        Returns:
+            StacItemIndex: The index of the concatenated items.
+        """
+        import numpy as np
+        import geopandas as gpd
+
+        if len(indexes) == 0:
+            return cls(gpd.GeoDataFrame(geometry=[], crs="EPSG:4326"))
+        offsets = np.cumsum([0] + [len(index) for index in indexes[:-1]])
+        times = np.concatenate([index.times for index in indexes])
+        order = np.concatenate(
+            [index.order + offset for index, offset in zip(indexes, offsets)]
+        )
+        sort = np.argsort(times, kind="stable")
+        return cls(
+            pd.concat([index.data for index in indexes], ignore_index=True),
+            indexes[0].datetime_column,
+            bounds=np.concatenate([index.bounds for index in indexes]),
+            times=times[sort],
+            order=order[sort],
+        )
+
+    @classmethod
+    def from_parquet(cls, path: str, datetime_column="datetime", **kwargs):
+        """Returns the index of a GeoParquet file of items, persisted next to the file.
+
+        The index is saved as a .index.npz file next to the GeoParquet file and reused
+        until the file changes. Within a process, the INDEX_MEMORY_ENTRIES most recently
+        used indexes are also kept in memory.
+
+        Args:
+            path (str): The GeoParquet file, e.g., written by stac_search(output=...).
+            datetime_column (str, optional): The column with the datetimes of the items.
+                Defaults to "datetime".
+            **kwargs: Additional keyword arguments for geopandas.read_parquet(), e.g.,
+                columns.
+
+        Returns:
+            StacItemIndex: The index.
+        """
+        import geopandas as gpd
+
+        stat = os.stat(path)
+        identity = f"{stat.st_size}-{stat.st_mtime_ns}"
+        key = (os.path.realpath(path), datetime_column, json.dumps(kwargs))
+        cached = _recall_index(_index_memory, key)
+        if cached is not None and cached[0] == identity:
+            return cached[1]
+
+        data = gpd.read_parquet(path, **kwargs)
+        index_path = os.path.splitext(path)[0] + cls.SUFFIX
+        index = cls.load(index_path, data, identity)
+        if index is None or index.datetime_column != datetime_column:
+            index = cls(data, datetime_column)
+            try:
+                index.save(index_path, identity)
+            except OSError:
+                pass
+        _remember_index(_index_memory, key, (identity, index))
+        return index
+
+
+# The most recently used indexes, in least-recently-used order, so that long sessions
+# do not keep every indexed GeoDataFrame alive.
+INDEX_MEMORY_ENTRIES = 16
+_index_memory = collections.OrderedDict()
+_index_lock = threading.Lock()
+
+
+def _recall_index(memory: collections.OrderedDict, key):
+    """Returns an entry of an in-memory index cache, or None if it is missing."""
+    with _index_lock:
+        entry = memory.get(key)
+        if entry is not None:
+            memory.move_to_end(key)
+        return entry
+
+
+def _remember_index(memory: collections.OrderedDict, key, entry) -> None:
+    """Stores an entry in an in-memory index cache, evicting the least recently used."""
+    with _index_lock:
+        memory[key] = entry
+        memory.move_to_end(key)
+        while len(memory) > INDEX_MEMORY_ENTRIES:
+            memory.popitem(last=False)
+
+
 def download_data_catalogs(
     out_dir: Optional[str] = None,
     quiet: Optional[bool] = True,
@@ -1654,53 +3244,505 @@ def set_default_bands(bands):
         return bands[:3]
 
 
+def _resolve_href(base: str, href: str) -> str:
+    """Returns the absolute form of a link href relative to the file it appears in."""
+    if "://" in href or os.path.isabs(href):
+        return href
+    if "://" in base:
+        return urllib.parse.urljoin(base, href)
+    return os.path.normpath(os.path.join(os.path.dirname(base), href))
+
+
+def _self_href(obj: Dict) -> Optional[str]:
+    """Returns the self link of a STAC object dictionary."""
+    for link in obj.get("links", []):
+        if link.get("rel") == "self":
+            return link.get("href")
+    return None
+
+
+def stac_crawl(
+    url: str,
+    max_depth: Optional[int] = None,
+    get_items: Optional[bool] = True,
+    max_workers: Optional[int] = 16,
+    stac_io=None,
+) -> Tuple[List[Dict], List[Dict]]:
+    """Crawls a static STAC catalog, fetching the child catalogs and items concurrently.
+
+    Unlike pystac's get_all_items(), which requests one JSON file after another, the
+    crawler keeps up to max_workers requests in flight. The results are returned in
+    the order of the links in the catalog, regardless of the order they arrive in.
+    The self links and the asset hrefs of the results are made absolute.
+
+    Args:
+        url (str): The URL or path of the catalog or collection JSON.
+        max_depth (int, optional): The maximum depth of the catalogs to crawl, where
+            the children of the catalog are at depth 1. Defaults to None (no limit).
+        get_items (bool, optional): Whether to fetch the items, or only the catalogs.
+            Defaults to True.
+        max_workers (int, optional): The maximum number of concurrent requests.
+            Defaults to 16.
+        stac_io (pystac.StacIO, optional): The StacIO used to read the JSON files, e.g.,
+            for authentication. Defaults to None (the pooled HTTP client).
+
+    Returns:
+        tuple: The catalogs and collections (including the one at url) and the items,
+            as lists of dictionaries.
+    """
+    import concurrent.futures
+
+    # The crawled files are not cached, as most of them are only read once.
+    cache = MetadataCache(ttl=0)
+    catalogs, items = [], []
+
+    def fetch(href):
+        if stac_io is None:
+            obj = fetch_json(href, cache=cache)
+        else:
+            obj = stac_io.read_json(href)
+        if not isinstance(obj, dict) or "links" not in obj:
+            raise ValueError(f"{href} is not a STAC object: {obj}")
+        if _self_href(obj) != href:
+            obj["links"] = [l for l in obj["links"] if l.get("rel") != "self"]
+            obj["links"].append({"rel": "self", "href": href})
+        for asset in obj.get("assets", {}).values():
+            if "href" in asset:
+                asset["href"] = _resolve_href(href, asset["href"])
+        return obj
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers) as executor:
+        pending = {executor.submit(fetch, url): ((), 0)}
+        while pending:
+            done, _ = concurrent.futures.wait(
+                pending, return_when=concurrent.futures.FIRST_COMPLETED
+            )
+            for future in done:
+                key, depth = pending.pop(future)
+                obj = future.result()
+                if obj.get("type") == "Feature":
+                    items.append((key, obj))
+                    continue
+                catalogs.append((key, obj))
+                href = _self_href(obj)
+                for index, link in enumerate(obj["links"]):
+                    rel = link.get("rel")
+                    if rel == "child" and (max_depth is None or depth < max_depth):
+                        child_depth = depth + 1
+                    elif rel == "item" and get_items:
+                        child_depth = depth
+                    else:
+                        continue
+                    child = _resolve_href(href, link["href"])
+                    future = executor.submit(fetch, child)
+                    pending[future] = (key + (index,), child_depth)
+
+    catalogs.sort(key=lambda result: result[0])
+    items.sort(key=lambda result: result[0])
+    return [obj for _, obj in catalogs], [obj for _, obj in items]
+
+
+def _stac_child(
+    url: str, child_id: str, max_workers: Optional[int] = 16, stac_io=None
+) -> str:
+    """Returns the URL of the child catalog of a static catalog with an ID."""
+    read = fetch_json if stac_io is None else stac_io.read_json
+    parent = read(url)
+    links = [l for l in parent.get("links", []) if l.get("rel") == "child"]
+    # Static catalogs usually name the folder of a child after its ID.
+    for link in links:
+        if f"/{child_id}/" in link["href"] or f"/{child_id}." in link["href"]:
+            href = _resolve_href(url, link["href"])
+            if read(href).get("id") == child_id:
+                return href
+    catalogs, _ = stac_crawl(
+        url, max_depth=1, get_items=False, max_workers=max_workers, stac_io=stac_io
+    )
+    for catalog in catalogs[1:]:
+        if catalog.get("id") == child_id:
+            return _self_href(catalog)
+    raise ValueError(f"{child_id} is not a child of {url}.")
+
+
+def _maxar_stac_io(kwargs: Dict):
+    """Returns the stac_io keyword argument of the Maxar functions.
+
+    The Maxar functions used to pass their keyword arguments to pystac's
+    Catalog.from_file(), whose only keyword argument is stac_io.
+    """
+    kwargs = dict(kwargs)
+    stac_io = kwargs.pop("stac_io", None)
+    if kwargs:
+        raise TypeError(f"Unexpected keyword arguments: {', '.join(kwargs)}")
+    return stac_io
+
+
+def _maxar_catalog_url() -> str:
+    """Returns the URL of the root catalog of Maxar Open Data."""
+    return os.environ.get(
+        "MAXAR_STAC_API", "https://maxar-opendata.s3.amazonaws.com/events/catalog.json"
+    )
+
+
+def _maxar_items_to_gdf(items: List[Dict], assets: Optional[List] = None):
+    """Converts Maxar STAC item dictionaries to a GeoDataFrame with asset links."""
+    import geopandas as gpd
+
+    gdf = gpd.GeoDataFrame.from_features(items, crs="EPSG:4326")
+    if "proj:bbox" in gdf.columns:
+        # convert bbox column type from list to string
+        gdf["proj:bbox"] = [",".join(map(str, l)) for l in gdf["proj:bbox"]]
+    if assets is not None:
+        if isinstance(assets, str):
+            assets = [assets]
+        elif not isinstance(assets, list):
+            raise ValueError("assets must be a list or a string.")
+
+        for asset in assets:
+            gdf[asset] = [
+                item.get("assets", {}).get(asset, {}).get("href", "") for item in items
+            ]
+    return gdf
+
+
+class StacItemCache:
+    """A cache of the items of static STAC catalogs as GeoParquet files.
+
+    Each entry is one GeoParquet file in a per-user cache directory, with the items
+    as rows, their asset hrefs as "asset:<name>" columns and the item JSON in a
+    "stac_item" column. The file metadata records the URL of the catalog and its
+    validator, i.e., the ETag or Last-Modified header (or the size and modification
+    time of a local file), and an entry is invalid once the validator of the catalog
+    changes. Files are written atomically, so concurrent processes never read a
+    partial entry.
+
+    Args:
+        name (str, optional): The name of the cache directory within the leafmap
+            cache directory. Defaults to "stac-items".
+        max_size (int, optional): The maximum total size of the cache in bytes. The
+            least recently used entries are removed after writing an entry that makes
+            the cache larger. Defaults to None (no limit).
+    """
+
+    VERSION = 1
+
+    def __init__(self, name: str = "stac-items", max_size: Optional[int] = None):
+        self.name = name
+        self.max_size = max_size
+
+    @property
+    def directory(self) -> str:
+        """The cache directory."""
+        from .core import get_cache_dir
+
+        return get_cache_dir(self.name)
+
+    def path(self, key: str) -> str:
+        """Returns the GeoParquet file of an entry.
+
+        The parts of a key separated by "/" are subdirectories of the cache directory.
+        """
+        import re
+
+        parts = [re.sub(r"[^\w.-]", "_", part) for part in key.split("/")]
+        return os.path.join(self.directory, *parts) + ".parquet"
+
+    def _files(self) -> List[str]:
+        """Returns the files of the cache, relative to the cache directory, with "/"."""
+        files = []
+        for root, _, names in os.walk(self.directory):
+            relative = os.path.relpath(root, self.directory)
+            for name in sorted(names):
+                path = name if relative == "." else os.path.join(relative, name)
+                files.append(path.replace(os.sep, "/"))
+        return files
+
+    @staticmethod
+    def validator(url: str) -> Optional[str]:
+        """Returns the current validator of a catalog, or None if it is not available.
+
+        Args:
+            url (str): The URL or path of the catalog JSON.
+
+        Returns:
+            str: The ETag or Last-Modified header, or the size and modification time of a
+                local file.
+        """
+        if os.path.isfile(url):
+            stat = os.stat(url)
+            return f"{stat.st_size}-{stat.st_mtime_ns}"
+        try:
+            response = http_client.request("HEAD", url)
+            return response.headers.get("ETag") or response.headers.get("Last-Modified")
+        except Exception:
+            return None
+
+    def info(self, key: str) -> Optional[Dict]:
+        """Returns the metadata of an entry, or None if there is no valid entry.
+
+        Args:
+            key (str): The entry key.
+
+        Returns:
+            dict: The version, url, validator and created time of the entry.
+        """
+        try:
+            import pyarrow.parquet as pq
+
+            metadata = pq.read_schema(self.path(key)).metadata or {}
+            info = json.loads(metadata[b"leafmap"])
+        except Exception:
+            return None
+        if info.get("version") != self.VERSION:
+            return None
+        return info
+
+    def valid(self, key: str, validate: Optional[bool] = True) -> bool:
+        """Returns whether there is a valid entry, without reading it.
+
+        Args:
+            key (str): The entry key.
+            validate (bool, optional): Whether to check that the catalog has not
+                changed. If the validator cannot be requested, e.g., offline, the entry
+                is valid. Defaults to True.
+
+        Returns:
+            bool: Whether the entry exists, has the current version and, if validate is
+                True, the current validator of its catalog.
+        """
+        info = self.info(key)
+        if info is None:
+            return False
+        if validate and info.get("url") is not None:
+            validator = self.validator(info["url"])
+            if validator is not None and validator != info.get("validator"):
+                return False
+        return True
+
+    def get(
+        self,
+        key: str,
+        columns: Optional[List[str]] = None,
+        exclude: Optional[List[str]] = None,
+        validate: Optional[bool] = True,
+    ):
+        """Reads an entry.
+
+        Args:
+            key (str): The entry key.
+            columns (list, optional): The columns to read. Defaults to None (all columns).
+            exclude (list, optional): The columns not to read. Defaults to None.
+            validate (bool, optional): Whether to check that the catalog has not
+                changed. If the validator cannot be requested, e.g., offline, the entry
+                is used. Defaults to True.
+
+        Returns:
+            GeoDataFrame: The items, or None if there is no valid entry. Entries written
+                from a DataFrame without geometries are read as a DataFrame.
+        """
+        import geopandas as gpd
+
+        if not self.valid(key, validate):
+            return None
+        import pyarrow.parquet as pq
+
+        path = self.path(key)
+        schema = pq.read_schema(path)
+        if exclude is not None:
+            names = columns or schema.names
+            columns = [c for c in names if c not in exclude]
+        if b"geo" in (schema.metadata or {}):
+            gdf = gpd.read_parquet(path, columns=columns)
+        else:
+            gdf = pd.read_parquet(path, columns=columns)
+        # The access time orders the entries for pruning.
+        os.utime(path, (time.time(), os.stat(path).st_mtime))
+        return gdf
+
+    def put(self, key: str, gdf, url: Optional[str] = None) -> Optional[str]:
+        """Writes an entry.
+
+        Args:
+            key (str): The entry key.
+            gdf (GeoDataFrame | pd.DataFrame): The items, or other rows to cache.
+            url (str, optional): The URL or path of the catalog the items come from,
+                used to invalidate the entry when the catalog changes. Defaults to None.
+
+        Returns:
+            str: The path of the GeoParquet file, or None if pyarrow is not installed.
+        """
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            return None
+
+        info = {
+            "version": self.VERSION,
+            "url": url,
+            "validator": None if url is None else self.validator(url),
+            "created": time.time(),
+        }
+        if hasattr(gdf, "to_arrow"):
+            table = pa.table(gdf.to_arrow(index=False, geometry_encoding="WKB"))
+            metadata = dict(table.schema.metadata or {})
+            crs = gdf.crs or "EPSG:4326"
+            metadata[b"geo"] = json.dumps(_geoparquet_metadata(crs))
+        else:
+            table = pa.Table.from_pandas(gdf, preserve_index=False)
+            metadata = dict(table.schema.metadata or {})
+        metadata[b"leafmap"] = json.dumps(info)
+        table = table.replace_schema_metadata(metadata)
+
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        pq.write_table(table, temp, compression="zstd")
+        os.replace(temp, path)
+        if self.max_size is not None:
+            self.prune(max_size=self.max_size)
+        return path
+
+    def index(self, key: str, datetime_column: Optional[str] = "datetime"):
+        """Returns the spatio-temporal index of an entry, persisted next to its file.
+
+        Args:
+            key (str): The entry key.
+            datetime_column (str, optional): The column with the datetimes of the items.
+                Defaults to "datetime".
+
+        Returns:
+            StacItemIndex: The index of the entry without its stac_item column, or None
+                if there is no entry.
+        """
+        import pyarrow.parquet as pq
+
+        if self.info(key) is None:
+            return None
+        path = self.path(key)
+        columns = [c for c in pq.read_schema(path).names if c != "stac_item"]
+        return StacItemIndex.from_parquet(path, datetime_column, columns=columns)
+
+    def list(self) -> pd.DataFrame:
+        """Lists the entries.
+
+        Returns:
+            pd.DataFrame: The key, url, size in bytes, created and accessed times and
+                validator of each entry, the most recently used first.
+        """
+        rows = []
+        for name in self._files():
+            if not name.endswith(".parquet"):
+                continue
+            key = name[: -len(".parquet")]
+            info = self.info(key) or {}
+            stat = os.stat(self.path(key))
+            rows.append(
+                {
+                    "key": key,
+                    "url": info.get("url"),
+                    "size": stat.st_size,
+                    "created": pd.to_datetime(info.get("created"), unit="s"),
+                    "accessed": pd.to_datetime(stat.st_atime, unit="s"),
+                    "validator": info.get("validator"),
+                }
+            )
+        columns = ["key", "url", "size", "created", "accessed", "validator"]
+        df = pd.DataFrame(rows, columns=columns)
+        return df.sort_values("accessed", ascending=False, ignore_index=True)
+
+    def size(self) -> int:
+        """Returns the total size of the entries in bytes."""
+        return int(self.list()["size"].sum())
+
+    def prune(
+        self, max_size: Optional[int] = None, max_age: Optional[float] = None
+    ) -> List[str]:
+        """Removes the entries that were not used recently.
+
+        Args:
+            max_size (int, optional): Remove the least recently used entries until the
+                cache is no larger than this many bytes. Defaults to None.
+            max_age (float, optional): Remove the entries that were not used in this
+                many seconds. Defaults to None.
+
+        Returns:
+            list: The keys of the removed entries.
+        """
+        entries = self.list()
+        removed = []
+        total = entries["size"].sum()
+        now = pd.Timestamp.now(tz="UTC").tz_localize(None)
+        for entry in entries.iloc[::-1].itertuples():
+            too_old = max_age is not None and (
+                (now - entry.accessed).total_seconds() > max_age
+            )
+            too_large = max_size is not None and total > max_size
+            if too_old or too_large:
+                os.remove(self.path(entry.key))
+                index_path = self.path(entry.key)[: -len(".parquet")]
+                if os.path.exists(index_path + StacItemIndex.SUFFIX):
+                    os.remove(index_path + StacItemIndex.SUFFIX)
+                total -= entry.size
+                removed.append(entry.key)
+        return removed
+
+    def clear(self, prefix: Optional[str] = None) -> List[str]:
+        """Removes the entries and other files of the cache.
+
+        Args:
+            prefix (str, optional): Only remove the files whose name starts with the
+                prefix. Defaults to None (all files).
+
+        Returns:
+            list: The names of the removed files.
+        """
+        removed = []
+        for name in self._files():
+            if prefix is None or name.startswith(prefix):
+                os.remove(os.path.join(self.directory, *name.split("/")))
+                removed.append(name)
+        # Remove the subdirectories that are left empty.
+        for root, _, _ in os.walk(self.directory, topdown=False):
+            if root != self.directory and not os.listdir(root):
+                os.rmdir(root)
+        return removed
+
+
+maxar_cache = StacItemCache("maxar")
+
+
 def maxar_collections(return_ids: Optional[bool] = True, **kwargs) -> List:
     """Get a list of Maxar collections.
 
     Args:
         return_ids (bool, optional): Whether to return the collection ids. Defaults to True.
-        **kwargs: Additional keyword arguments to pass to the pystac Catalog.from_file() method.
+        **kwargs: The stac_io keyword argument of pystac's Catalog.from_file(), used to
+            read the catalogs.
 
     Returns:
         list : A list of Maxar collections.
     """
 
-    import tempfile
-    from pystac import Catalog
     import pandas as pd
 
+    stac_io = _maxar_stac_io(kwargs)
     if return_ids:
         url = "https://raw.githubusercontent.com/giswqs/maxar-open-data/master/datasets.csv"
         df = pd.read_csv(url)
         return df["dataset"].tolist()
 
-    file_path = os.path.join(tempfile.gettempdir(), "maxar-collections.txt")
-    if return_ids:
-        if os.path.exists(file_path):
-            with open(file_path, "r") as f:
-                return [line.strip() for line in f.readlines()]
-
-    if "MAXAR_STAC_API" in os.environ:
-        url = os.environ["MAXAR_STAC_API"]
-    else:
-        url = "https://maxar-opendata.s3.amazonaws.com/events/catalog.json"
-
-    root_catalog = Catalog.from_file(url, **kwargs)
-
-    collections = root_catalog.get_collections()
-
-    # if return_ids:
-    #     collection_ids = [collection.id for collection in collections]
-    #     with open(file_path, "w") as f:
-    #         f.write("\n".join(collection_ids))
-
-    #     return collection_ids
-    # else:
-    return collections
+    catalogs, _ = stac_crawl(
+        _maxar_catalog_url(), max_depth=1, get_items=False, stac_io=stac_io
+    )
+    return [pystac.read_dict(c, href=_self_href(c)) for c in catalogs[1:]]
 
 
 def maxar_child_collections(
-    collection_id: str, return_ids: Optional[bool] = True, **kwargs
+    collection_id: str,
+    return_ids: Optional[bool] = True,
+    max_workers: Optional[int] = 16,
+    **kwargs,
 ) -> List:
     """Get a list of Maxar child collections.
 
@@ -1708,49 +3750,110 @@ def maxar_child_collections(
         collection_id (str): The collection ID, e.g., Kahramanmaras-turkey-earthquake-23
             Use maxar_collections() to retrieve all available collection IDs.
         return_ids (bool, optional): Whether to return the collection ids. Defaults to True.
-        **kwargs: Additional keyword arguments to pass to the pystac Catalog.from_file() method.
+        max_workers (int, optional): The maximum number of concurrent requests. Defaults to 16.
+        **kwargs: The stac_io keyword argument of pystac's Catalog.from_file(), used to
+            read the catalogs and items.
 
     Returns:
         list: A list of Maxar child collections.
     """
 
-    import tempfile
-    from pystac import Catalog
-
-    file_path = os.path.join(tempfile.gettempdir(), f"maxar-{collection_id}.txt")
+    stac_io = _maxar_stac_io(kwargs)
+    # The IDs are cached like the items, and invalidated when the collection changes.
+    key = f"{collection_id}/.children"
     if return_ids:
-        if os.path.exists(file_path):
-            with open(file_path, "r") as f:
-                return [line.strip() for line in f.readlines()]
-
-    if "MAXAR_STAC_API" in os.environ:
-        url = os.environ["MAXAR_STAC_API"]
-    else:
-        url = "https://maxar-opendata.s3.amazonaws.com/events/catalog.json"
-
-    root_catalog = Catalog.from_file(url, **kwargs)
+        cached = maxar_cache.get(key)
+        if cached is not None:
+            return cached["id"].tolist()
 
-    collections = root_catalog.get_child(collection_id).get_collections()
+    collection_url = _stac_child(
+        _maxar_catalog_url(), collection_id, max_workers, stac_io
+    )
+    catalogs, _ = stac_crawl(
+        collection_url,
+        max_depth=1,
+        get_items=False,
+        max_workers=max_workers,
+        stac_io=stac_io,
+    )
+    collections = [pystac.read_dict(c, href=_self_href(c)) for c in catalogs[1:]]
 
     if return_ids:
         collection_ids = [collection.id for collection in collections]
-        with open(file_path, "w") as f:
-            f.write("\n".join(collection_ids))
+        maxar_cache.put(key, pd.DataFrame({"id": collection_ids}), url=collection_url)
         return collection_ids
 
     else:
         return collections
 
 
+def _maxar_child_items(
+    collection_id: str,
+    child_id: str,
+    max_workers: Optional[int] = 16,
+    collection_url: Optional[str] = None,
+    stac_items: Optional[bool] = False,
+    stac_io=None,
+):
+    """Returns the items of a Maxar child collection from the cache, crawling on a miss.
+
+    The cached frame has the properties of the items, an "asset:<name>" column with
+    the href of each asset and, if stac_items is True, the item JSON in a "stac_item"
+    column.
+    """
+    key = f"{collection_id}/{child_id}"
+    exclude = None if stac_items else ["stac_item"]
+    gdf = maxar_cache.get(key, exclude=exclude)
+    if gdf is not None:
+        return gdf
+
+    if collection_url is None:
+        collection_url = _stac_child(
+            _maxar_catalog_url(), collection_id, max_workers, stac_io
+        )
+    child_url = _stac_child(collection_url, child_id, max_workers, stac_io)
+    _, items = stac_crawl(child_url, max_workers=max_workers, stac_io=stac_io)
+
+    gdf = _maxar_items_to_gdf(items)
+    names = sorted({name for item in items for name in item.get("assets", {})})
+    for name in names:
+        gdf[f"asset:{name}"] = [
+            item.get("assets", {}).get(name, {}).get("href", "") for item in items
+        ]
+    gdf["stac_item"] = [json.dumps(item) for item in items]
+    maxar_cache.put(key, gdf, url=child_url)
+    return gdf if stac_items else gdf.drop(columns=["stac_item"])
+
+
+def _maxar_select_assets(gdf, assets: Optional[List] = None):
+    """Replaces the "asset:<name>" columns of cached Maxar items with the given assets."""
+    if isinstance(assets, str):
+        assets = [assets]
+    elif assets is not None and not isinstance(assets, list):
+        raise ValueError("assets must be a list or a string.")
+
+    columns = [c for c in gdf.columns if c.startswith("asset:") or c == "stac_item"]
+    result = gdf.drop(columns=columns)
+    for asset in assets or []:
+        column = f"asset:{asset}"
+        result[asset] = gdf[column].fillna("") if column in gdf.columns else ""
+    return result
+
+
 def maxar_items(
     collection_id: str,
     child_id: str,
     return_gdf: Optional[bool] = True,
     assets: Optional[List] = ["visual"],
+    max_workers: Optional[int] = 16,
     **kwargs,
 ):
     """Retrieve STAC items from Maxar's public STAC API.
 
+    The items are cached as a GeoParquet file per child collection (see maxar_refresh()),
+    which is reused until the ETag or Last-Modified header of the child catalog
+    changes, so a cache hit is a single Parquet read.
+
     Args:
         collection_id (str): The collection ID, e.g., Kahramanmaras-turkey-earthquake-23
             Use maxar_collections() to retrieve all available collection IDs.
@@ -1759,95 +3862,27 @@ def maxar_items(
         return_gdf (bool, optional): If True, return a GeoDataFrame. Defaults to True.
         assets (list, optional): A list of asset names to include in the GeoDataFrame.
             It can be "visual", "ms_analytic", "pan_analytic", "data-mask". Defaults to ['visual'].
-        **kwargs: Additional keyword arguments to pass to the pystac Catalog.from_file() method.
+        max_workers (int, optional): The maximum number of concurrent requests. Defaults to 16.
+        **kwargs: The stac_io keyword argument of pystac's Catalog.from_file(), used to
+            read the catalogs and items.
 
     Returns:
         GeoDataFrame | pystac.ItemCollection: If return_gdf is True, return a GeoDataFrame.
     """
 
-    import pickle
-    import tempfile
-    from pystac import Catalog, ItemCollection
-
-    file_path = os.path.join(
-        tempfile.gettempdir(), f"maxar-{collection_id}-{child_id}.pkl"
+    gdf = _maxar_child_items(
+        collection_id,
+        child_id,
+        max_workers,
+        stac_items=not return_gdf,
+        stac_io=_maxar_stac_io(kwargs),
     )
-
-    if os.path.exists(file_path):
-        with open(file_path, "rb") as f:
-            items = pickle.load(f)
-        if return_gdf:
-            import geopandas as gpd
-
-            gdf = gpd.GeoDataFrame.from_features(
-                pystac.ItemCollection(items).to_dict(), crs="EPSG:4326"
-            )
-            # convert bbox column type from list to string
-            gdf["proj:bbox"] = [",".join(map(str, l)) for l in gdf["proj:bbox"]]
-            if assets is not None:
-                if isinstance(assets, str):
-                    assets = [assets]
-                elif not isinstance(assets, list):
-                    raise ValueError("assets must be a list or a string.")
-
-                for asset in assets:
-                    links = []
-                    for item in items:
-                        if asset in item.get_assets():
-                            link = item.get_assets()[asset].get_absolute_href()
-                            links.append(link)
-                        else:
-                            links.append("")
-
-                    gdf[asset] = links
-
-            return gdf
-        else:
-            return items
-
-    if "MAXAR_STAC_API" in os.environ:
-        url = os.environ["MAXAR_STAC_API"]
-    else:
-        url = "https://maxar-opendata.s3.amazonaws.com/events/catalog.json"
-
-    root_catalog = Catalog.from_file(url, **kwargs)
-
-    collection = root_catalog.get_child(collection_id)
-    child = collection.get_child(child_id)
-
-    items = ItemCollection(child.get_all_items())
-
-    with open(file_path, "wb") as f:
-        pickle.dump(items, f)
-
     if return_gdf:
-        import geopandas as gpd
-
-        gdf = gpd.GeoDataFrame.from_features(
-            pystac.ItemCollection(items).to_dict(), crs="EPSG:4326"
-        )
-        # convert bbox column type from list to string
-        gdf["proj:bbox"] = [",".join(map(str, l)) for l in gdf["proj:bbox"]]
-        if assets is not None:
-            if isinstance(assets, str):
-                assets = [assets]
-            elif not isinstance(assets, list):
-                raise ValueError("assets must be a list or a string.")
-
-            for asset in assets:
-                links = []
-                for item in items:
-                    if asset in item.get_assets():
-                        link = item.get_assets()[asset].get_absolute_href()
-                        links.append(link)
-                    else:
-                        links.append("")
-
-                gdf[asset] = links
-
-        return gdf
+        return _maxar_select_assets(gdf, assets)
     else:
-        return items
+        return pystac.ItemCollection(
+            [pystac.Item.from_dict(json.loads(item)) for item in gdf["stac_item"]]
+        )
 
 
 def maxar_all_items(
@@ -1855,10 +3890,15 @@ def maxar_all_items(
     return_gdf: Optional[bool] = True,
     assets: Optional[List] = ["visual"],
     verbose: Optional[bool] = True,
+    max_workers: Optional[int] = 16,
     **kwargs,
 ):
     """Retrieve STAC items from Maxar's public STAC API.
 
+    The child collections are read from the cache of maxar_items(), and those that are
+    not cached are crawled concurrently. The items are collected into one GeoDataFrame
+    at the end.
+
     Args:
         collection_id (str): The collection ID, e.g., Kahramanmaras-turkey-earthquake-23
             Use maxar_collections() to retrieve all available collection IDs.
@@ -1866,50 +3906,179 @@ def maxar_all_items(
         assets (list, optional): A list of asset names to include in the GeoDataFrame.
             It can be "visual", "ms_analytic", "pan_analytic", "data-mask". Defaults to ['visual'].
         verbose (bool, optional): If True, print progress. Defaults to True.
-        **kwargs: Additional keyword arguments to pass to the pystac Catalog.from_file() method.
+        max_workers (int, optional): The maximum number of concurrent requests. Defaults to 16.
+        **kwargs: The stac_io keyword argument of pystac's Catalog.from_file(), used to
+            read the catalogs and items.
 
     Returns:
         GeoDataFrame | pystac.ItemCollection: If return_gdf is True, return a GeoDataFrame.
     """
+    from concurrent.futures import ThreadPoolExecutor
 
-    child_ids = maxar_child_collections(collection_id, **kwargs)
-    for index, child_id in enumerate(child_ids):
-        if verbose:
-            print(
-                f"Processing ({str(index+1).zfill(len(str(len(child_ids))))} out of {len(child_ids)}): {child_id} ..."
-            )
-        items = maxar_items(collection_id, child_id, return_gdf, assets, **kwargs)
-        if return_gdf:
-            if child_id == child_ids[0]:
-                gdf = items
-            else:
-                gdf = pd.concat([gdf, items], ignore_index=True)
-        else:
-            if child_id == child_ids[0]:
-                items_all = items
-            else:
-                items_all.extend(items)
+    stac_io = _maxar_stac_io(kwargs)
+    collection_url = _stac_child(
+        _maxar_catalog_url(), collection_id, max_workers, stac_io
+    )
+    child_ids = maxar_child_collections(
+        collection_id, max_workers=max_workers, stac_io=stac_io
+    )
+    if verbose:
+        print(f"Retrieving items of {len(child_ids)} child collections ...")
+
+    def child_items(child_id):
+        return _maxar_child_items(
+            collection_id,
+            child_id,
+            max_workers,
+            collection_url=collection_url,
+            stac_items=not return_gdf,
+            stac_io=stac_io,
+        )
+
+    # Each child crawl is concurrent as well, so only a few run at once.
+    with ThreadPoolExecutor(max_workers=max(1, min(4, len(child_ids)))) as executor:
+        frames = list(executor.map(child_items, child_ids))
+    frames = [frame for frame in frames if len(frame) > 0]
+    if len(frames) == 0:
+        gdf = _maxar_items_to_gdf([])
+    else:
+        gdf = pd.concat(frames, ignore_index=True)
+    if verbose:
+        print(f"Found {len(gdf)} items in {len(child_ids)} child collections.")
 
     if return_gdf:
-        return gdf
+        return _maxar_select_assets(gdf, assets)
     else:
-        return items_all
+        return pystac.ItemCollection(
+            [pystac.Item.from_dict(json.loads(item)) for item in gdf["stac_item"]]
+        )
 
 
-def maxar_refresh():
-    """Refresh the cached Maxar STAC items."""
-    import tempfile
+def maxar_index(
+    collection_id: str,
+    assets: Optional[List] = ["visual"],
+    validate: Optional[bool] = True,
+    max_workers: Optional[int] = 16,
+):
+    """Returns a spatio-temporal index of the items of a Maxar collection.
+
+    The index of each child collection is persisted next to its cached GeoParquet file
+    (see maxar_items()) and kept in memory, so that repeated bbox, date and geometry
+    queries, e.g., from an interactive map, do not read or crawl the items again.
+
+    Args:
+        collection_id (str): The collection ID, e.g., Kahramanmaras-turkey-earthquake-23
+            Use maxar_collections() to retrieve all available collection IDs.
+        assets (list, optional): A list of asset names to include in the indexed
+            GeoDataFrame. Defaults to ['visual'].
+        validate (bool, optional): Whether to check that the cached child collections
+            are up to date, which takes a request per child collection. Defaults to True.
+        max_workers (int, optional): The maximum number of concurrent requests. Defaults to 16.
 
-    temp_dir = tempfile.gettempdir()
-    for f in os.listdir(temp_dir):
-        if f.startswith("maxar-"):
-            os.remove(os.path.join(temp_dir, f))
+    Returns:
+        StacItemIndex: The index, whose search() method returns the matching items.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    child_ids = maxar_child_collections(collection_id, max_workers=max_workers)
+    collection_url = []
+
+    def child_index(child_id):
+        key = f"{collection_id}/{child_id}"
+        if not maxar_cache.valid(key, validate):
+            if len(collection_url) == 0:
+                collection_url.append(
+                    _stac_child(_maxar_catalog_url(), collection_id, max_workers)
+                )
+            _maxar_child_items(collection_id, child_id, max_workers, collection_url[0])
+        return maxar_cache.index(key)
+
+    with ThreadPoolExecutor(max_workers=max(1, min(4, len(child_ids)))) as executor:
+        indexes = [i for i in executor.map(child_index, child_ids) if i is not None]
+
+    # The concatenated index is reused as long as the child indexes are the same.
+    key = (collection_id, json.dumps(assets))
+    cached = _recall_index(_maxar_indexes, key)
+    if (
+        cached is not None
+        and len(cached[0]) == len(indexes)
+        and all(a is b for a, b in zip(cached[0], indexes))
+    ):
+        return cached[1]
+    index = StacItemIndex.concat(indexes)
+    index.data = _maxar_select_assets(index.data, assets)
+    _remember_index(_maxar_indexes, key, (indexes, index))
+    return index
 
-    print("Maxar STAC items cache has been refreshed.")
+
+_maxar_indexes = collections.OrderedDict()
+
+
+def maxar_refresh(
+    action: Optional[str] = "clear",
+    collection_id: Optional[str] = None,
+    max_size: Optional[int] = None,
+    max_age: Optional[float] = None,
+):
+    """Manage the cache of Maxar STAC items.
+
+    The items of each child collection are cached as a GeoParquet file in a folder per
+    collection in the maxar folder of the leafmap cache directory (see get_cache_dir()),
+    with keys of the form "<collection_id>/<child_id>".
+
+    Args:
+        action (str, optional): One of "list" (return the cache entries), "size" (return
+            the total size of the cache in bytes), "prune" (remove the least recently
+            used entries) and "clear" (remove the entries). Defaults to "clear".
+        collection_id (str, optional): Only list or clear the entries of a collection.
+            Defaults to None (all collections).
+        max_size (int, optional): For "prune", the maximum size of the cache in bytes.
+            Defaults to None.
+        max_age (float, optional): For "prune", the maximum time in seconds since an
+            entry was used. Defaults to None.
+
+    Returns:
+        pd.DataFrame | int | list: The entries for "list", the size for "size" and the
+            removed entries for "prune" and "clear".
+    """
+    import tempfile
+
+    if action == "list":
+        entries = maxar_cache.list()
+        if collection_id is not None:
+            entries = entries[entries["key"].str.startswith(f"{collection_id}/")]
+        return entries.reset_index(drop=True)
+    elif action == "size":
+        return maxar_cache.size()
+    elif action == "prune":
+        return maxar_cache.prune(max_size=max_size, max_age=max_age)
+    elif action == "clear":
+        if collection_id is None:
+            removed = maxar_cache.clear()
+        else:
+            removed = maxar_cache.clear(f"{collection_id}/")
+        # Remove the files of the previous cache in the temporary directory.
+        temp_dir = tempfile.gettempdir()
+        prefix = "maxar-" if collection_id is None else f"maxar-{collection_id}"
+        for f in os.listdir(temp_dir):
+            if f.startswith(prefix):
+                os.remove(os.path.join(temp_dir, f))
+        print("Maxar STAC items cache has been refreshed.")
+        return removed
+    else:
+        raise ValueError(
+            f"Invalid action {action}. It must be one of list, size, prune or clear."
+        )
 
 
 def maxar_search(
-    collection, start_date=None, end_date=None, bbox=None, within=False, align=True
+    collection,
+    start_date=None,
+    end_date=None,
+    bbox=None,
+    within=False,
+    align=True,
+    crawl=False,
 ):
     """Search Maxar Open Data by collection ID, date range, and/or bounding box.
 
@@ -1921,6 +4090,9 @@ def maxar_search(
         bbox (list | GeoDataFrame): The bounding box to filter by. Can be a list of 4 coordinates or a file path or a GeoDataFrame.
         within (bool, optional): Whether to filter by the bounding box or the bounding box's interior. Defaults to False.
         align (bool, optional): If True, automatically aligns GeoSeries based on their indices. If False, the order of elements is preserved.
+        crawl (bool, optional): If True, crawl the items from the Maxar STAC catalog
+            and query their cached index (see maxar_index()) rather than reading a
+            GeoJSON snapshot of the collection from GitHub. Defaults to False.
 
     Returns:
         GeoDataFrame: A GeoDataFrame containing the search results.
@@ -1930,14 +4102,20 @@ def maxar_search(
     import geopandas as gpd
     from shapely.geometry import Polygon
 
-    collections = maxar_collections()
-    if collection not in collections:
-        raise ValueError(
-            f"Invalid collection name. Use maxar_collections() to retrieve all available collection IDs."
-        )
+    if crawl:
+        index = maxar_index(collection)
+        if end_date is None:
+            end_date = datetime.datetime.now().strftime("%Y-%m-%d")
+        return index.search(bbox, start_date, end_date, within=within)
+    else:
+        collections = maxar_collections()
+        if collection not in collections:
+            raise ValueError(
+                f"Invalid collection name. Use maxar_collections() to retrieve all available collection IDs."
+            )
 
-    url = f"https://raw.githubusercontent.com/giswqs/maxar-open-data/master/datasets/{collection}.geojson"
-    data = gpd.read_file(url)
+        url = f"https://raw.githubusercontent.com/giswqs/maxar-open-data/master/datasets/{collection}.geojson"
+        data = gpd.read_file(url)
 
     if bbox is not None:
         bbox = gpd.GeoDataFrame(
@@ -1961,7 +4139,7 @@ def maxar_search(
 
     mask = (data[new_field] >= start_date) & (data[new_field] <= end_date)
     result = data.loc[mask]
-    return result.drop(columns=[new_field], axis=1)
+    return result.drop(columns=[new_field])
 
 
 def maxar_collection_url(collection, dtype="geojson", raw=True):
@@ -2199,7 +4377,7 @@ def oam_search(
         kwargs["limit"] = limit
 
     try:
-        r = requests.get(url, params=kwargs).json()
+        r = http_client.get(url, params=kwargs).json()
         if "results" in r:
             results = []
             for result in r["results"]:
@@ -0,0 +1,1362 @@
+"""This module contains functions for downloading, caching and writing XYZ map tiles.
+
+The module only depends on numpy, pillow, rasterio and httpx or requests (imported
+within each function), so it can be used without the notebook widget stack.
+"""
+
+import io
+import itertools
+import math
+import os
+import random
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+from email.utils import parsedate_to_datetime
+from typing import Optional, Tuple, List, Iterable, Iterator, Any, Union
+from urllib.parse import urlparse
+
+EARTH_EQUATORIAL_RADIUS = 6378137.0
+
+# Half of the width of the Web Mercator (EPSG:3857) extent in meters.
+WEB_MERCATOR_EXTENT = math.pi * EARTH_EQUATORIAL_RADIUS
+
+
+def deg2num(lat: float, lon: float, zoom: int) -> Tuple[float, float]:
+    """Converts a latitude and longitude to fractional XYZ tile coordinates.
+
+    Args:
+        lat (float): The latitude in degrees.
+        lon (float): The longitude in degrees.
+        zoom (int): The zoom level.
+
+    Returns:
+        tuple: The fractional (x, y) tile coordinates.
+    """
+    lat_r = math.radians(lat)
+    n = 2**zoom
+    xtile = (lon + 180) / 360 * n
+    ytile = (1 - math.log(math.tan(lat_r) + 1 / math.cos(lat_r)) / math.pi) / 2 * n
+    return (xtile, ytile)
+
+
+def num2deg(xtile: float, ytile: float, zoom: int) -> Tuple[float, float]:
+    """Converts XYZ tile coordinates to the latitude and longitude of the tile's top-left corner.
+
+    Args:
+        xtile (float): The x tile coordinate.
+        ytile (float): The y tile coordinate.
+        zoom (int): The zoom level.
+
+    Returns:
+        tuple: The (lat, lon) coordinates in degrees.
+    """
+    n = 2**zoom
+    lon = xtile / n * 360 - 180
+    lat = math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * ytile / n))))
+    return (lat, lon)
+
+
+def bbox_to_tile_range(
+    bbox: List[float], zoom: int
+) -> Tuple[float, float, float, float]:
+    """Returns the fractional tile coordinates covered by a bounding box.
+
+    Args:
+        bbox (list): The bounding box [minx, miny, maxx, maxy] in EPSG:4326.
+        zoom (int): The zoom level.
+
+    Returns:
+        tuple: The fractional tile coordinates (x0, y0, x1, y1), where (x0, y0) is the
+            top-left corner and (x1, y1) is the bottom-right corner.
+    """
+    west, south, east, north = bbox
+    x0, y0 = deg2num(south, west, zoom)
+    x1, y1 = deg2num(north, east, zoom)
+    x0, x1 = sorted([x0, x1])
+    y0, y1 = sorted([y0, y1])
+    return (x0, y0, x1, y1)
+
+
+def iter_bbox_tiles(bbox: List[float], zoom: int) -> Iterator[Tuple[int, int]]:
+    """Iterates over the XYZ tiles that intersect a bounding box without listing them.
+
+    Args:
+        bbox (list): The bounding box [minx, miny, maxx, maxy] in EPSG:4326.
+        zoom (int): The zoom level.
+
+    Returns:
+        iterator: An iterator of (x, y) tile coordinates.
+    """
+    x0, y0, x1, y1 = bbox_to_tile_range(bbox, zoom)
+    n = 2**zoom
+    return itertools.product(
+        range(max(math.floor(x0), 0), min(math.ceil(x1), n)),
+        range(max(math.floor(y0), 0), min(math.ceil(y1), n)),
+    )
+
+
+def bbox_to_tiles(bbox: List[float], zoom: int) -> List[Tuple[int, int]]:
+    """Returns the XYZ tiles that intersect a bounding box.
+
+    Args:
+        bbox (list): The bounding box [minx, miny, maxx, maxy] in EPSG:4326.
+        zoom (int): The zoom level.
+
+    Returns:
+        list: A list of (x, y) tile coordinates.
+    """
+    return list(iter_bbox_tiles(bbox, zoom))
+
+
+def tile_url(template: str, x: int, y: int, z: int, subdomains: str = "abc") -> str:
+    """Fills in the placeholders of an XYZ tile URL template.
+
+    Args:
+        template (str): The URL template with {x}, {y}, {z} and optionally {s} placeholders.
+        x (int): The x tile coordinate.
+        y (int): The y tile coordinate.
+        z (int): The zoom level.
+        subdomains (str, optional): The subdomains used for the {s} placeholder.
+            Tiles are spread over the subdomains. Defaults to "abc".
+
+    Returns:
+        str: The tile URL.
+    """
+    if "{s}" in template:
+        template = template.replace("{s}", subdomains[(x + y) % len(subdomains)])
+    return template.format(x=x, y=y, z=z)
+
+
+class HostRateLimiter:
+    """A thread-safe rate limiter that spaces out requests to each host.
+
+    Args:
+        rate (float): The maximum number of requests per second per host.
+    """
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate
+        self._next_time = {}
+        self._lock = threading.Lock()
+
+    def wait(self, url: str) -> None:
+        """Blocks until a request to the host of the URL is allowed.
+
+        Args:
+            url (str): The URL to be requested.
+        """
+        host = urlparse(url).netloc
+        with self._lock:
+            now = time.monotonic()
+            next_time = max(self._next_time.get(host, now), now)
+            self._next_time[host] = next_time + self.interval
+        delay = next_time - now
+        if delay > 0:
+            time.sleep(delay)
+
+
+TileCacheEntry = namedtuple("TileCacheEntry", ["data", "etag", "expires"])
+
+
+def cache_expiry(headers: Any, default_ttl: float) -> Optional[float]:
+    """Returns the time until which a response may be served from a cache.
+
+    The Cache-Control header takes precedence over the Expires header. A response
+    with neither header is considered fresh for default_ttl seconds.
+
+    Args:
+        headers (dict): The response headers.
+        default_ttl (float): The freshness lifetime in seconds if the server does not set one.
+
+    Returns:
+        float: The expiry time as a Unix timestamp, or None if the response must not
+            be cached.
+    """
+    now = time.time()
+    cache_control = headers.get("Cache-Control")
+    if cache_control:
+        directives = {}
+        for directive in cache_control.lower().split(","):
+            key, _, value = directive.strip().partition("=")
+            directives[key] = value.strip('"')
+        if "no-store" in directives:
+            return None
+        if "no-cache" in directives:
+            return now
+        if "max-age" in directives:
+            try:
+                return now + int(directives["max-age"])
+            except ValueError:
+                return now
+
+    expires = headers.get("Expires")
+    if expires:
+        try:
+            return parsedate_to_datetime(expires).timestamp()
+        except (TypeError, ValueError):
+            return now
+    return now + default_ttl
+
+
+class TileCache:
+    """A persistent map tile cache backed by SQLite.
+
+    Tiles are keyed by the URL template of the tile source and the z, x and y tile
+    coordinates, so they are shared by all downloads of overlapping areas. Each tile
+    is stored with its ETag and expiry time. Expired tiles with an ETag are revalidated
+    with a conditional request instead of being downloaded again. When the cache grows
+    beyond max_size, the least recently used tiles are evicted. Missing (404) tiles
+    are cached too, so that they are not requested again.
+
+    The cache is safe to use from multiple threads, and several processes can share
+    the same database file.
+
+    Args:
+        path (str, optional): The SQLite database file. Defaults to tiles.sqlite in the
+            tiles folder of the leafmap cache directory (see leafmap.core.get_cache_dir).
+        max_size (int, optional): The maximum total size of the cached tiles in bytes.
+            Defaults to 2 GB. None means no limit.
+        default_ttl (float, optional): The time in seconds that a tile is fresh if the
+            server sets neither Cache-Control nor Expires headers. Defaults to 7 days.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        max_size: Optional[int] = 2 * 1024**3,
+        default_ttl: float = 7 * 24 * 3600,
+    ):
+        if path is None:
+            from .core import get_cache_dir
+
+            path = os.path.join(get_cache_dir("tiles"), "tiles.sqlite")
+        else:
+            path = os.path.abspath(path)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        self.path = path
+        self.max_size = max_size
+        self.default_ttl = default_ttl
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        self._lock = threading.Lock()
+
+        self._conn = sqlite3.connect(
+            path, timeout=60, check_same_thread=False, isolation_level=None
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS tiles (
+                template TEXT NOT NULL,
+                z INTEGER NOT NULL,
+                x INTEGER NOT NULL,
+                y INTEGER NOT NULL,
+                data BLOB,
+                etag TEXT,
+                expires REAL,
+                accessed REAL NOT NULL,
+                size INTEGER NOT NULL,
+                PRIMARY KEY (template, z, x, y)
+            )"""
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS tiles_accessed ON tiles (accessed)"
+        )
+        self._size = self._total_size()
+
+    def _total_size(self) -> int:
+        """Returns the total size of the cached tiles in bytes."""
+        return self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM tiles"
+        ).fetchone()[0]
+
+    def get(self, template: str, x: int, y: int, z: int) -> Optional[TileCacheEntry]:
+        """Looks up a tile in the cache.
+
+        Lookups of fresh tiles count as hits, and lookups of missing or expired tiles
+        count as misses.
+
+        Args:
+            template (str): The URL template of the tile source.
+            x (int): The x tile coordinate.
+            y (int): The y tile coordinate.
+            z (int): The zoom level.
+
+        Returns:
+            TileCacheEntry: The (data, etag, expires) of the tile, or None if it is not
+                cached. The data is None for missing tiles. The entry may have expired.
+        """
+        now = time.time()
+        key = (template, z, x, y)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data, etag, expires FROM tiles "
+                "WHERE template = ? AND z = ? AND x = ? AND y = ?",
+                key,
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute(
+                "UPDATE tiles SET accessed = ? "
+                "WHERE template = ? AND z = ? AND x = ? AND y = ?",
+                (now,) + key,
+            )
+            entry = TileCacheEntry(*row)
+            if entry.expires is not None and entry.expires > now:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return entry
+
+    def put(
+        self,
+        template: str,
+        x: int,
+        y: int,
+        z: int,
+        data: Optional[bytes],
+        etag: Optional[str] = None,
+        expires: Optional[float] = None,
+    ) -> None:
+        """Stores a tile in the cache, evicting old tiles if the cache is full.
+
+        Args:
+            template (str): The URL template of the tile source.
+            x (int): The x tile coordinate.
+            y (int): The y tile coordinate.
+            z (int): The zoom level.
+            data (bytes): The encoded tile, or None for a missing tile.
+            etag (str, optional): The ETag of the tile. Defaults to None.
+            expires (float, optional): The expiry time of the tile as a Unix timestamp.
+                Defaults to None, which uses default_ttl.
+        """
+        now = time.time()
+        if expires is None:
+            expires = now + self.default_ttl
+        size = len(data) if data else 0
+        with self._lock:
+            # A replaced tile no longer counts towards the size of the cache.
+            row = self._conn.execute(
+                "SELECT size FROM tiles "
+                "WHERE template = ? AND z = ? AND x = ? AND y = ?",
+                (template, z, x, y),
+            ).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO tiles "
+                "(template, z, x, y, data, etag, expires, accessed, size) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (template, z, x, y, data, etag, expires, now, size),
+            )
+            self._size += size - (row[0] if row is not None else 0)
+            if self.max_size is not None and self._size > self.max_size:
+                self._evict(self.max_size)
+
+    def refresh(
+        self, template: str, x: int, y: int, z: int, expires: Optional[float] = None
+    ) -> None:
+        """Extends the lifetime of a cached tile after the server confirmed it is unchanged.
+
+        Args:
+            template (str): The URL template of the tile source.
+            x (int): The x tile coordinate.
+            y (int): The y tile coordinate.
+            z (int): The zoom level.
+            expires (float, optional): The new expiry time as a Unix timestamp.
+                Defaults to None, which uses default_ttl.
+        """
+        now = time.time()
+        if expires is None:
+            expires = now + self.default_ttl
+        with self._lock:
+            self._conn.execute(
+                "UPDATE tiles SET expires = ?, accessed = ? "
+                "WHERE template = ? AND z = ? AND x = ? AND y = ?",
+                (expires, now, template, z, x, y),
+            )
+            self.revalidated += 1
+
+    def _evict(self, max_size: int) -> None:
+        """Deletes the least recently used tiles until the cache is below 90% of max_size."""
+        # Other processes may have added or evicted tiles since the last count.
+        self._size = self._total_size()
+        excess = self._size - int(max_size * 0.9)
+        if self._size <= max_size or excess <= 0:
+            return
+
+        rows = []
+        freed = 0
+        for rowid, size in self._conn.execute(
+            "SELECT rowid, size FROM tiles ORDER BY accessed"
+        ):
+            rows.append((rowid,))
+            freed += size
+            if freed >= excess:
+                break
+        self._conn.executemany("DELETE FROM tiles WHERE rowid = ?", rows)
+        self._size -= freed
+
+    def evict(self, max_size: Optional[int] = None) -> None:
+        """Evicts the least recently used tiles if the cache is larger than max_size.
+
+        Args:
+            max_size (int, optional): The maximum size in bytes. Defaults to the
+                max_size of the cache.
+        """
+        max_size = self.max_size if max_size is None else max_size
+        if max_size is None:
+            return
+        with self._lock:
+            self._evict(max_size)
+
+    def clear(self) -> None:
+        """Deletes all tiles from the cache and resets the counters."""
+        with self._lock:
+            self._conn.execute("DELETE FROM tiles")
+            self._conn.execute("VACUUM")
+            self._size = 0
+            self.hits = self.misses = self.revalidated = 0
+
+    def stats(self) -> dict:
+        """Returns the cache counters and size.
+
+        Returns:
+            dict: The number of hits, misses and revalidated tiles since the cache was
+                opened, and the number of tiles and their total size in bytes.
+        """
+        with self._lock:
+            count, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM tiles"
+            ).fetchone()
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "revalidated": self.revalidated,
+                "tiles": count,
+                "size": size,
+            }
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM tiles").fetchone()[0]
+
+    def __repr__(self) -> str:
+        return f"TileCache({self.path!r}, max_size={self.max_size})"
+
+    def close(self) -> None:
+        """Closes the database connection."""
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class TileFetcher:
+    """Downloads map tiles concurrently over pooled HTTP connections.
+
+    The fetcher uses an httpx client with HTTP/2 if httpx and h2 are installed, and
+    falls back to a pooled requests session otherwise. Failed requests, including
+    429 and 5xx responses, are retried with exponential backoff and full jitter,
+    honouring Retry-After headers. A fetcher can be shared by several downloads and
+    is safe to use from multiple threads.
+
+    Args:
+        max_workers (int, optional): The number of concurrent requests. Defaults to 8.
+        max_in_flight (int, optional): The maximum number of tiles requested or
+            downloaded but not yet consumed by fetch(). Defaults to 4 * max_workers.
+        retries (int, optional): The number of retries for a failed request. Defaults to 5.
+        backoff_factor (float, optional): The base delay in seconds of the exponential
+            backoff. Defaults to 0.5.
+        max_backoff (float, optional): The maximum delay in seconds between retries.
+            Defaults to 60.
+        rate_limit (float, optional): The maximum number of requests per second per
+            host. Defaults to None (no limit).
+        timeout (float, optional): The request timeout in seconds. Defaults to 60.
+        headers (dict, optional): Additional HTTP headers. Defaults to None.
+        http2 (bool, optional): Whether to use HTTP/2 if available. Defaults to True.
+        retry_status (tuple, optional): The HTTP status codes to retry.
+            Defaults to (429, 500, 502, 503, 504).
+        cache (bool | str | TileCache, optional): The tile cache used by get_tile() and
+            fetch_tiles(). It can be a TileCache, the path to a cache database, or True
+            for the default cache. Defaults to None (no cache).
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 8,
+        max_in_flight: Optional[int] = None,
+        retries: int = 5,
+        backoff_factor: float = 0.5,
+        max_backoff: float = 60,
+        rate_limit: Optional[float] = None,
+        timeout: float = 60,
+        headers: Optional[dict] = None,
+        http2: bool = True,
+        retry_status: Tuple[int, ...] = (429, 500, 502, 503, 504),
+        cache: Union[bool, str, TileCache, None] = None,
+    ):
+        self.max_workers = max_workers
+        self.max_in_flight = max_in_flight or 4 * max_workers
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.rate_limiter = HostRateLimiter(rate_limit) if rate_limit else None
+        self.timeout = timeout
+        self.retry_status = tuple(retry_status)
+
+        self.headers = {
+            "Accept": "*/*",
+            "Accept-Encoding": "gzip, deflate",
+            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; rv:91.0) Gecko/20100101 Firefox/91.0",
+        }
+        if headers is not None:
+            self.headers.update(headers)
+        self.client = self._create_client(http2)
+
+        self._owns_cache = cache is True or isinstance(cache, str)
+        if cache is True:
+            cache = TileCache()
+        elif isinstance(cache, str):
+            cache = TileCache(cache)
+        self.cache = cache if isinstance(cache, TileCache) else None
+
+    def _create_client(self, http2: bool) -> Any:
+        """Creates a pooled HTTP client sized for the number of workers."""
+        try:
+            import httpx
+
+            if http2:
+                try:
+                    import h2  # noqa: F401
+                except ImportError:
+                    http2 = False
+            limits = httpx.Limits(
+                max_connections=self.max_workers,
+                max_keepalive_connections=self.max_workers,
+            )
+            client = httpx.Client(http2=http2, limits=limits, follow_redirects=True)
+        except ImportError:
+            import requests
+            from requests.adapters import HTTPAdapter
+
+            client = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=self.max_workers, pool_maxsize=self.max_workers
+            )
+            client.mount("http://", adapter)
+            client.mount("https://", adapter)
+        client.headers.update(self.headers)
+        return client
+
+    def _backoff(self, attempt: int, response: Any = None) -> float:
+        """Returns the delay before the next retry."""
+        if response is not None:
+            retry_after = response.headers.get("Retry-After")
+            if retry_after is not None:
+                try:
+                    return min(float(retry_after), self.max_backoff)
+                except ValueError:
+                    pass
+        delay = min(self.max_backoff, self.backoff_factor * 2**attempt)
+        return random.uniform(0, delay)
+
+    def _request(self, url: str, headers: Optional[dict] = None) -> Any:
+        """Sends a GET request, retrying failed requests, and returns the last response."""
+        attempt = 0
+        while True:
+            if self.rate_limiter is not None:
+                self.rate_limiter.wait(url)
+            try:
+                response = self.client.get(url, headers=headers, timeout=self.timeout)
+            except Exception:
+                if attempt >= self.retries:
+                    raise
+                time.sleep(self._backoff(attempt))
+                attempt += 1
+                continue
+
+            if response.status_code in self.retry_status and attempt < self.retries:
+                time.sleep(self._backoff(attempt, response))
+                attempt += 1
+                continue
+            return response
+
+    def get(self, url: str) -> Optional[bytes]:
+        """Downloads a tile.
+
+        Args:
+            url (str): The tile URL.
+
+        Returns:
+            bytes: The tile content, or None if the tile does not exist or is empty.
+        """
+        response = self._request(url)
+        if response.status_code == 404:
+            return None
+        response.raise_for_status()
+        return response.content or None
+
+    def get_tile(self, template: str, x: int, y: int, z: int) -> Optional[bytes]:
+        """Downloads a tile from a tile source, using the tile cache if there is one.
+
+        Args:
+            template (str): The URL template of the tile source. See tile_url().
+            x (int): The x tile coordinate.
+            y (int): The y tile coordinate.
+            z (int): The zoom level.
+
+        Returns:
+            bytes: The tile content, or None if the tile does not exist or is empty.
+        """
+        url = tile_url(template, x, y, z)
+        if self.cache is None:
+            return self.get(url)
+
+        entry = self.cache.get(template, x, y, z)
+        if entry is not None and entry.expires is not None:
+            if entry.expires > time.time():
+                return entry.data
+
+        headers = None
+        if entry is not None and entry.etag:
+            headers = {"If-None-Match": entry.etag}
+        response = self._request(url, headers)
+        expires = cache_expiry(response.headers, self.cache.default_ttl)
+        if response.status_code == 304 and entry is not None:
+            self.cache.refresh(template, x, y, z, expires or time.time())
+            return entry.data
+
+        if response.status_code == 404:
+            data = None
+        else:
+            response.raise_for_status()
+            data = response.content or None
+        if expires is not None:
+            etag = response.headers.get("ETag")
+            self.cache.put(template, x, y, z, data, etag, expires)
+        return data
+
+    def fetch(
+        self, tasks: Iterable[Tuple[Any, str]]
+    ) -> Iterator[Tuple[Any, Optional[bytes]]]:
+        """Downloads tiles concurrently and yields them as they complete.
+
+        Tasks are submitted lazily, so that at most max_in_flight tiles are requested
+        or waiting to be consumed at any time.
+
+        Args:
+            tasks (iterable): An iterable of (key, url) tuples, where key identifies the
+                tile, e.g., its (x, y) coordinates.
+
+        Yields:
+            tuple: The key and the content of each tile, in completion order.
+        """
+        return self._map(self.get, ((key, (url,)) for key, url in tasks))
+
+    def fetch_tiles(
+        self, template: str, tiles: Iterable[Tuple[int, int]], zoom: int
+    ) -> Iterator[Tuple[Tuple[int, int], Optional[bytes]]]:
+        """Downloads tiles of a tile source concurrently, using the tile cache if there is one.
+
+        Args:
+            template (str): The URL template of the tile source. See tile_url().
+            tiles (iterable): An iterable of (x, y) tile coordinates.
+            zoom (int): The zoom level.
+
+        Yields:
+            tuple: The (x, y) coordinates and the content of each tile, in completion order.
+        """
+        return self._map(
+            self.get_tile, (((x, y), (template, x, y, zoom)) for x, y in tiles)
+        )
+
+    def _map(
+        self, func: Any, tasks: Iterable[Tuple[Any, tuple]]
+    ) -> Iterator[Tuple[Any, Any]]:
+        """Calls func(*args) for each (key, args) task in the thread pool and yields the results."""
+        import concurrent.futures
+
+        tasks = iter(tasks)
+        with concurrent.futures.ThreadPoolExecutor(self.max_workers) as executor:
+            pending = {}
+            try:
+                while True:
+                    for key, args in tasks:
+                        pending[executor.submit(func, *args)] = key
+                        if len(pending) >= self.max_in_flight:
+                            break
+                    if not pending:
+                        break
+                    done, _ = concurrent.futures.wait(
+                        pending, return_when=concurrent.futures.FIRST_COMPLETED
+                    )
+                    for future in done:
+                        key = pending.pop(future)
+                        yield key, future.result()
+            finally:
+                for future in pending:
+                    future.cancel()
+
+    def close(self) -> None:
+        """Closes the HTTP connections, and the tile cache if it was created by the fetcher."""
+        self.client.close()
+        if self._owns_cache:
+            self.cache.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def decode_tile(data: bytes):
+    """Decodes an image tile into RGB bands and a validity mask.
+
+    Args:
+        data (bytes): The encoded image, e.g., PNG, JPEG or WebP.
+
+    Returns:
+        tuple: A uint8 array of shape (3, height, width) and a uint8 mask of shape
+            (height, width), where 0 means transparent and 255 means opaque.
+    """
+    import numpy as np
+    from PIL import Image
+
+    with Image.open(io.BytesIO(data)) as im:
+        if im.mode == "RGB":
+            rgb = np.asarray(im)
+            mask = np.full(rgb.shape[:2], 255, dtype="uint8")
+        else:
+            rgba = np.asarray(im.convert("RGBA"))
+            rgb = rgba[..., :3]
+            mask = rgba[..., 3]
+    return np.ascontiguousarray(rgb.transpose(2, 0, 1)), np.ascontiguousarray(mask)
+
+
+class GeoTiffTileWriter:
+    """Writes XYZ map tiles into a tiled GeoTIFF as they arrive.
+
+    Each tile is decoded and written straight into its window of the output, so the
+    memory use does not depend on the size of the output. The output covers the
+    bounding box exactly: it is aligned to the pixel grid of the zoom level, and
+    tiles that extend beyond the bounding box are clipped when written. The output
+    is an RGB image in EPSG:3857 with an internal mask for transparent or missing tiles.
+
+    The file is created when the first tile is written, because the tile size is
+    only known then.
+
+    If min_zoom is lower than zoom, the tiles of the lower zoom levels fill the
+    overviews of the output, one overview per zoom level, so no overview is computed
+    by resampling. The extent of the output is then the bounding box expanded to the
+    pixel grid of min_zoom, so that every overview pixel lines up with a tile pixel,
+    and the output is an RGBA image, because rasterio cannot write the overviews
+    of an internal mask.
+
+    In resumable mode, the completed tiles are recorded in a manifest file next to
+    the output (the output file name with a .manifest suffix). Every `checkpoint`
+    tiles, the output is flushed to disk and the tiles written since the previous
+    checkpoint are appended to the manifest. If the export is interrupted, a new
+    writer for the same output, bounding box and zoom level continues where the
+    previous one stopped; only the tiles returned by missing_tiles() need to be
+    downloaded again. The manifest is removed once all tiles have been written.
+
+    Args:
+        filename (str): The output GeoTIFF file.
+        bbox (list): The bounding box [minx, miny, maxx, maxy] in EPSG:4326.
+        zoom (int): The zoom level of the tiles.
+        min_zoom (int, optional): The lowest zoom level, whose tiles fill the last
+            overview. Defaults to None (no overviews).
+        resume (bool, optional): Whether to record progress in a manifest and resume
+            an interrupted export of the same output. Defaults to False.
+        checkpoint (int, optional): The number of tiles between checkpoints in
+            resumable mode. Defaults to 1000.
+        metadata (dict, optional): Additional JSON-serializable properties of the
+            export, e.g., the tile source, that must match for an export to be
+            resumed. Defaults to None.
+        **kwargs: Creation options passed to rasterio.open(), e.g., compress="jpeg".
+            GDAL-style options such as options=["COMPRESS=DEFLATE"] are also accepted.
+    """
+
+    MANIFEST_VERSION = 1
+
+    def __init__(
+        self,
+        filename: str,
+        bbox: List[float],
+        zoom: int,
+        min_zoom: Optional[int] = None,
+        resume: bool = False,
+        checkpoint: int = 1000,
+        metadata: Optional[dict] = None,
+        **kwargs,
+    ):
+        self.filename = os.path.abspath(filename)
+        self.bbox = [float(value) for value in bbox]
+        if min_zoom is None:
+            min_zoom = zoom
+        if not 0 <= min_zoom <= zoom:
+            raise ValueError("min_zoom must be between 0 and zoom")
+        self.zoom = zoom
+        self.min_zoom = min_zoom
+        self.zooms = list(range(zoom, min_zoom - 1, -1))
+        self.tile_size = None
+        self.width = None
+        self.height = None
+        self.dataset = None
+        self.tiles_written = 0
+        self.resume = resume
+        self.checkpoint = checkpoint
+        self.metadata = metadata or {}
+        self.manifest = self.filename + ".manifest"
+        self.completed = set()
+        self._pending = []
+        self._tile_range = bbox_to_tile_range(bbox, zoom)
+        self._origin = None
+        self._level = 0
+        self.options = self._parse_options(
+            {"compress": "DEFLATE", "predictor": 2, "zlevel": 9}, kwargs
+        )
+        self._check_manifest()
+
+    @staticmethod
+    def _parse_options(defaults: dict, kwargs: dict) -> dict:
+        """Merges rasterio-style and GDAL-style creation options into lowercase keys."""
+        options = dict(defaults)
+        for option in kwargs.pop("options", []):
+            key, value = option.split("=", 1)
+            options[key.lower()] = value
+        kwargs.pop("overwrite", None)
+        options.update({key.lower(): value for key, value in kwargs.items()})
+        return options
+
+    def _check_manifest(self) -> None:
+        """Resumes an interrupted export, or removes a stale manifest."""
+        if self.resume and os.path.exists(self.manifest):
+            if os.path.exists(self.dataset_path):
+                self._resume()
+                return
+        if os.path.exists(self.manifest):
+            os.remove(self.manifest)
+
+    @property
+    def dataset_path(self) -> str:
+        """The path of the GeoTIFF that the tiles are written to."""
+        return self.filename
+
+    @property
+    def transform(self):
+        """The affine transform of the output, or None before the first tile is written."""
+        from rasterio.transform import from_origin
+
+        if self._origin is None:
+            return None
+        res = 2 * WEB_MERCATOR_EXTENT / (self.tile_size * 2**self.zoom)
+        px0, py0 = self._origin
+        return from_origin(
+            -WEB_MERCATOR_EXTENT + px0 * res, WEB_MERCATOR_EXTENT - py0 * res, res, res
+        )
+
+    def _set_tile_size(self, tile_size: int) -> None:
+        """Sets up the pixel grid of the output for tiles of the given size."""
+        x0, y0, x1, y1 = self._tile_range
+        self.tile_size = tile_size
+        # Cropping to the bounding box is an offset of the geotransform origin.
+        self._origin = (round(x0 * tile_size), round(y0 * tile_size))
+        self.width = max(round((x1 - x0) * tile_size), 1)
+        self.height = max(round((y1 - y0) * tile_size), 1)
+
+        # Align the extent to the pixel grid of the lowest zoom level.
+        factor = 2 ** (self.zoom - self.min_zoom)
+        px0, py0 = self._origin
+        px1, py1 = px0 + self.width, py0 + self.height
+        px0, py0 = px0 // factor * factor, py0 // factor * factor
+        px1, py1 = -(-px1 // factor) * factor, -(-py1 // factor) * factor
+        self._origin = (px0, py0)
+        self.width, self.height = px1 - px0, py1 - py0
+
+    def _profile(self) -> dict:
+        """Returns the rasterio profile of the output."""
+        block_size = 512 if self.tile_size >= 512 else 256
+        profile = {
+            "driver": "GTiff",
+            "width": self.width,
+            "height": self.height,
+            "count": 3,
+            "dtype": "uint8",
+            "crs": "EPSG:3857",
+            "transform": self.transform,
+            "tiled": True,
+            "blockxsize": block_size,
+            "blockysize": block_size,
+            "bigtiff": "IF_SAFER",
+            "photometric": "RGB",
+        }
+        if len(self.zooms) > 1:
+            profile.update(count=4, alpha="YES")
+        profile.update(self.options)
+        return profile
+
+    def _manifest_header(self) -> dict:
+        """Returns the properties of the export recorded in the first line of the manifest."""
+        return {
+            "version": self.MANIFEST_VERSION,
+            "bbox": self.bbox,
+            "zooms": self.zooms,
+            "tile_size": self.tile_size,
+            "metadata": self.metadata,
+        }
+
+    def _resume(self) -> None:
+        """Reads the manifest of an interrupted export and reopens its output."""
+        import json
+
+        import rasterio
+
+        with open(self.manifest) as f:
+            lines = f.read().splitlines()
+        header = json.loads(lines[0]) if lines else {}
+        self._set_tile_size(header.get("tile_size") or 0)
+        if header != self._manifest_header():
+            raise ValueError(
+                f"{self.manifest} belongs to an export with different parameters. "
+                "Remove it or write to another file."
+            )
+
+        for line in lines[1:]:
+            try:
+                z, x, y, written = (int(value) for value in line.split())
+            except ValueError:
+                # A partially written last line from an interrupted export.
+                continue
+            self.completed.add((z, x, y))
+            self.tiles_written += written
+        self.dataset = rasterio.open(self.dataset_path, "r+")
+
+    def _open(self, tile_size: int) -> None:
+        """Creates the output file for tiles of the given size."""
+        import json
+
+        import rasterio
+
+        from rasterio.enums import Resampling
+
+        self._set_tile_size(tile_size)
+        os.makedirs(os.path.dirname(self.filename), exist_ok=True)
+        self.dataset = rasterio.open(self.dataset_path, "w", **self._profile())
+        if len(self.zooms) > 1:
+            # Empty overviews, which are filled with the tiles of the lower zoom levels.
+            factors = [2**level for level in range(1, len(self.zooms))]
+            self.dataset.build_overviews(factors, Resampling.nearest)
+        if self.resume:
+            with open(self.manifest, "w") as f:
+                f.write(json.dumps(self._manifest_header()) + "\n")
+
+    def _select_level(self, level: int) -> None:
+        """Reopens the output at an overview level (0 is full resolution)."""
+        import rasterio
+
+        self.dataset.close()
+        if level:
+            self.dataset = rasterio.open(
+                self.dataset_path, "r+", overview_level=level - 1
+            )
+        else:
+            self.dataset = rasterio.open(self.dataset_path, "r+")
+        self._level = level
+
+    def tile_window(self, x: int, y: int, zoom: Optional[int] = None):
+        """Returns the window of the output covered by a tile and the matching tile slices.
+
+        Args:
+            x (int): The x tile coordinate.
+            y (int): The y tile coordinate.
+            zoom (int, optional): The zoom level of the tile. Defaults to the zoom
+                level of the output.
+
+        Returns:
+            tuple: A rasterio Window and the (rows, cols) slices of the tile that fall
+                within the output (or the overview of the zoom level), or None if the
+                tile is outside the output.
+        """
+        from rasterio.windows import Window
+
+        level = self.zoom - (self.zoom if zoom is None else zoom)
+        factor = 2**level
+        px0, py0 = self._origin[0] // factor, self._origin[1] // factor
+        width, height = -(-self.width // factor), -(-self.height // factor)
+        col = x * self.tile_size - px0
+        row = y * self.tile_size - py0
+        col_start, row_start = max(col, 0), max(row, 0)
+        col_stop = min(col + self.tile_size, width)
+        row_stop = min(row + self.tile_size, height)
+        if col_start >= col_stop or row_start >= row_stop:
+            return None
+
+        window = Window(
+            col_start, row_start, col_stop - col_start, row_stop - row_start
+        )
+        slices = (
+            slice(row_start - row, row_stop - row),
+            slice(col_start - col, col_stop - col),
+        )
+        return window, slices
+
+    def missing_tiles(self, zoom: Optional[int] = None) -> List[Tuple[int, int]]:
+        """Returns the tiles of the bounding box that have not been written yet.
+
+        Args:
+            zoom (int, optional): The zoom level. Defaults to the zoom level of the output.
+
+        Returns:
+            list: A list of (x, y) tile coordinates.
+        """
+        zoom = self.zoom if zoom is None else zoom
+        return [
+            (x, y)
+            for x, y in bbox_to_tiles(self.bbox, zoom)
+            if (zoom, x, y) not in self.completed
+        ]
+
+    def _write(self, rgb, mask, window) -> None:
+        """Writes decoded tile pixels into a window of the output."""
+        import numpy as np
+
+        if self.dataset.count == 4:
+            self.dataset.write(np.concatenate([rgb, mask[np.newaxis]]), window=window)
+        else:
+            self.dataset.write(rgb, window=window)
+            self.dataset.write_mask(mask, window=window)
+
+    def write_tile(
+        self, x: int, y: int, data: Optional[bytes], zoom: Optional[int] = None
+    ) -> None:
+        """Writes an encoded tile into its window of the output.
+
+        Args:
+            x (int): The x tile coordinate.
+            y (int): The y tile coordinate.
+            data (bytes): The encoded tile image. Missing tiles (None) are left masked.
+            zoom (int, optional): The zoom level of the tile. Defaults to the zoom
+                level of the output.
+        """
+        zoom = self.zoom if zoom is None else zoom
+        if zoom not in self.zooms:
+            raise ValueError(f"zoom must be one of {self.zooms}")
+
+        written = 0
+        if data is not None:
+            rgb, mask = decode_tile(data)
+            if self.dataset is None:
+                self._open(rgb.shape[-1])
+            if self.zoom - zoom != self._level:
+                self._select_level(self.zoom - zoom)
+
+            result = self.tile_window(x, y, zoom)
+            if result is not None:
+                window, (rows, cols) = result
+                self._write(rgb[:, rows, cols], mask[rows, cols], window)
+                self.tiles_written += 1
+                written = 1
+
+        self.completed.add((zoom, x, y))
+        if self.resume:
+            self._pending.append((zoom, x, y, written))
+            if self.dataset is not None and len(self._pending) >= self.checkpoint:
+                self.flush()
+
+    def flush(self) -> None:
+        """Flushes the output to disk and records the tiles written since the last checkpoint.
+
+        In resumable mode, this is called every `checkpoint` tiles.
+        """
+        if self.dataset is None:
+            return
+        # Closing the dataset is the only way to make GDAL write its block cache.
+        self._select_level(self._level)
+        self._record_pending()
+
+    def _record_pending(self) -> None:
+        """Appends the pending tiles to the manifest."""
+        if not (self.resume and self._pending):
+            return
+        with open(self.manifest, "a") as f:
+            f.writelines(" ".join(map(str, tile)) + "\n" for tile in self._pending)
+            f.flush()
+            os.fsync(f.fileno())
+        self._pending = []
+
+    def is_complete(self) -> bool:
+        """Returns True if all tiles of the bounding box have been written."""
+        return not any(self.missing_tiles(zoom) for zoom in self.zooms)
+
+    def close(self) -> None:
+        """Closes the output file.
+
+        In resumable mode, the progress is recorded in the manifest, which is removed
+        if all tiles of the bounding box have been written.
+        """
+        if self.dataset is None:
+            return
+        self.dataset.close()
+        self.dataset = None
+        self._level = 0
+        if self.resume:
+            self._record_pending()
+            if self.is_complete():
+                os.remove(self.manifest)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class CogPyramidWriter(GeoTiffTileWriter):
+    """Writes XYZ map tiles of a range of zoom levels into a Cloud Optimized GeoTIFF.
+
+    The tiles of the highest zoom level fill the full-resolution image, and the tiles
+    of each lower zoom level fill the overview with the matching resolution (see
+    GeoTiffTileWriter). The tiles are written into a lossless working GeoTIFF (the
+    output file name with a .part.tif suffix), which is copied into the COG with its
+    overviews once all tiles have been written, so the COG is compressed only once.
+
+    Args:
+        filename (str): The output COG file.
+        bbox (list): The bounding box [minx, miny, maxx, maxy] in EPSG:4326.
+        zoom (int): The zoom level of the full-resolution image.
+        min_zoom (int): The lowest zoom level, whose tiles fill the last overview.
+        resume (bool, optional): Whether to record progress in a manifest and resume
+            an interrupted export of the same output. Defaults to False.
+        checkpoint (int, optional): The number of tiles between checkpoints in
+            resumable mode. Defaults to 1000.
+        metadata (dict, optional): Additional JSON-serializable properties of the
+            export, e.g., the tile source, that must match for an export to be
+            resumed. Defaults to None.
+        **kwargs: Creation options of the COG driver, e.g., compress="webp" or
+            quality=90. See https://gdal.org/drivers/raster/cog.html. GTiff-style
+            options such as zlevel or blockxsize are translated. JPEG compression is
+            not supported, because the COG driver drops the overviews when it
+            converts the alpha band to a mask.
+    """
+
+    # GTiff creation options and their COG equivalents.
+    COG_OPTIONS = {
+        "zlevel": "level",
+        "zstd_level": "level",
+        "jpeg_quality": "quality",
+        "webp_level": "quality",
+        "blockxsize": "blocksize",
+    }
+    # GTiff creation options that do not apply to the COG driver.
+    GTIFF_ONLY_OPTIONS = {"tiled", "blockysize", "photometric", "interleave", "alpha"}
+
+    def __init__(
+        self,
+        filename: str,
+        bbox: List[float],
+        zoom: int,
+        min_zoom: int,
+        resume: bool = False,
+        checkpoint: int = 1000,
+        metadata: Optional[dict] = None,
+        **kwargs,
+    ):
+        cog_options = {}
+        for key, value in self._parse_options({"compress": "DEFLATE"}, kwargs).items():
+            if key not in self.GTIFF_ONLY_OPTIONS:
+                cog_options[self.COG_OPTIONS.get(key, key)] = value
+        if str(cog_options["compress"]).upper() == "JPEG":
+            raise ValueError(
+                "JPEG compression is not supported for tile pyramids. Use WEBP instead."
+            )
+        self.cog_options = cog_options
+        # The working file is lossless and fast to write.
+        super().__init__(
+            filename,
+            bbox,
+            zoom,
+            min_zoom,
+            resume,
+            checkpoint,
+            metadata,
+            compress="DEFLATE",
+            zlevel=6,
+        )
+
+    @property
+    def dataset_path(self) -> str:
+        """The path of the working GeoTIFF that the tiles are written to."""
+        return self.filename + ".part.tif"
+
+    def close(self) -> None:
+        """Closes the working GeoTIFF and, once all tiles have been written, creates the COG.
+
+        The working GeoTIFF is kept for resuming in resumable mode, and removed otherwise.
+        """
+        from rasterio.shutil import copy
+
+        if self.dataset is None:
+            return
+        complete = self.is_complete()
+        super().close()
+        if complete:
+            copy(
+                self.dataset_path,
+                self.filename,
+                driver="COG",
+                overviews="FORCE_USE_EXISTING",
+                **self.cog_options,
+            )
+        if complete or not self.resume:
+            os.remove(self.dataset_path)
+
+
+def tile_format(data: bytes) -> Optional[str]:
+    """Returns the image format of an encoded tile.
+
+    Args:
+        data (bytes): The encoded tile.
+
+    Returns:
+        str: The format as used in MBTiles metadata ("png", "jpg" or "webp"), or
+            None if the format is not recognized.
+    """
+    if data.startswith(b"\x89PNG"):
+        return "png"
+    if data.startswith(b"\xff\xd8"):
+        return "jpg"
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "webp"
+    return None
+
+
+class MBTilesWriter:
+    """Writes XYZ map tiles into an MBTiles archive, storing identical tiles once.
+
+    The archive uses the deduplicated MBTiles layout: the tile images are stored in
+    an images table keyed by a hash of their content, a map table points each tile
+    to its image, and the standard tiles view joins the two for readers. Uniform
+    tiles, such as ocean or empty tiles, therefore take up the space of one tile.
+
+    Args:
+        filename (str): The output MBTiles file. An existing file is replaced.
+        metadata (dict, optional): MBTiles metadata, e.g., name, attribution or
+            bounds. The format, minzoom and maxzoom are set from the written tiles
+            unless given. Defaults to None.
+        commit_every (int, optional): The number of tiles per database transaction.
+            Defaults to 1000.
+    """
+
+    def __init__(
+        self,
+        filename: str,
+        metadata: Optional[dict] = None,
+        commit_every: int = 1000,
+    ):
+        self.filename = os.path.abspath(filename)
+        self.metadata = dict(metadata or {})
+        self.commit_every = commit_every
+        self.tiles_written = 0
+        self.zooms = set()
+        self._formats = set()
+        self._hashes = set()
+
+        os.makedirs(os.path.dirname(self.filename), exist_ok=True)
+        if os.path.exists(self.filename):
+            os.remove(self.filename)
+        self._conn = sqlite3.connect(self.filename)
+        self._conn.executescript(
+            """
+            CREATE TABLE metadata (name TEXT PRIMARY KEY, value TEXT);
+            CREATE TABLE images (tile_id TEXT PRIMARY KEY, tile_data BLOB);
+            CREATE TABLE map (
+                zoom_level INTEGER,
+                tile_column INTEGER,
+                tile_row INTEGER,
+                tile_id TEXT,
+                PRIMARY KEY (zoom_level, tile_column, tile_row)
+            );
+            CREATE VIEW tiles AS
+                SELECT map.zoom_level AS zoom_level,
+                       map.tile_column AS tile_column,
+                       map.tile_row AS tile_row,
+                       images.tile_data AS tile_data
+                FROM map JOIN images ON images.tile_id = map.tile_id;
+            """
+        )
+
+    @property
+    def unique_tiles(self) -> int:
+        """The number of distinct tile images in the archive."""
+        return len(self._hashes)
+
+    def write_tile(self, x: int, y: int, data: Optional[bytes], zoom: int) -> None:
+        """Adds an encoded tile to the archive.
+
+        Args:
+            x (int): The x tile coordinate.
+            y (int): The y tile coordinate.
+            data (bytes): The encoded tile image. Missing tiles (None) are skipped.
+            zoom (int): The zoom level.
+        """
+        import hashlib
+
+        if data is None:
+            return
+        tile_id = hashlib.sha256(data).hexdigest()
+        if tile_id not in self._hashes:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO images (tile_id, tile_data) VALUES (?, ?)",
+                (tile_id, data),
+            )
+            self._hashes.add(tile_id)
+            self._formats.add(tile_format(data))
+        # MBTiles rows are numbered from the bottom (TMS scheme).
+        self._conn.execute(
+            "INSERT OR REPLACE INTO map VALUES (?, ?, ?, ?)",
+            (zoom, x, (1 << zoom) - 1 - y, tile_id),
+        )
+        self.zooms.add(zoom)
+        self.tiles_written += 1
+        if self.tiles_written % self.commit_every == 0:
+            self._conn.commit()
+
+    def close(self) -> None:
+        """Writes the metadata and closes the archive."""
+        if self._conn is None:
+            return
+        metadata = {"name": os.path.splitext(os.path.basename(self.filename))[0]}
+        metadata["type"] = "baselayer"
+        if self.zooms:
+            metadata["minzoom"] = min(self.zooms)
+            metadata["maxzoom"] = max(self.zooms)
+        formats = self._formats - {None}
+        if len(formats) == 1:
+            metadata["format"] = formats.pop()
+        metadata.update(self.metadata)
+        if isinstance(metadata.get("bounds"), (list, tuple)):
+            metadata["bounds"] = ",".join(str(value) for value in metadata["bounds"])
+
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO metadata VALUES (?, ?)",
+            [(key, str(value)) for key, value in metadata.items()],
+        )
+        self._conn.commit()
+        self._conn.close()
+        self._conn = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
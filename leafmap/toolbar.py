@@ -1826,21 +1826,25 @@ def time_slider(
     position: Optional[str] = "bottomright",
     slider_length: Optional[str] = "150px",
     zoom_to_layer: Optional[bool] = False,
+    preload: Optional[int] = 2,
     **kwargs,
 ):
     """Adds a time slider to the map.
 
+    Each time step keeps its own layer. The next time steps are preloaded as transparent
+    layers, and playback waits for them to load, so frames are not shown half-loaded.
+
     Args:
         layers (dict, optional): The dictionary containing a set of XYZ tile layers.
         labels (list, optional): The list of labels to be used for the time series. Defaults to None.
-        time_interval (int, optional): Time interval in seconds. Defaults to 1.
+        time_interval (int, optional): Minimum time interval in seconds. Playback slows down if tiles take longer to load. Defaults to 1.
         position (str, optional): Position to place the time slider, can be any of ['topleft', 'topright', 'bottomleft', 'bottomright']. Defaults to "bottomright".
         slider_length (str, optional): Length of the time slider. Defaults to "150px".
         zoom_to_layer (bool, optional): Whether to zoom to the extent of the layer. Defaults to False.
+        preload (int, optional): The number of time steps to load ahead of the current one. Defaults to 2.
 
     """
-    import time
-    import threading
+    from .playback import FramePlayer
 
     bounds = None
 
@@ -1909,46 +1913,40 @@ def time_slider(
         layout=widgets.Layout(width="32px"),
     )
 
-    play_chk = widgets.Checkbox(value=False)
-
     slider_widget = widgets.HBox([label, slider, play_btn, pause_btn, close_btn])
 
-    def play_click(b):
-        play_chk.value = True
-
-        def work(slider):
-            while play_chk.value:
-                if slider.value < len(labels):
-                    slider.value += 1
-                else:
-                    slider.value = 1
-                time.sleep(time_interval)
+    keys = list(layers.keys())
+    frames = [layers[key] for key in keys]
+    player = FramePlayer(
+        m,
+        frames,
+        interval=time_interval,
+        preload=preload,
+        opacity=frames[0].opacity,
+    )
 
-        thread = threading.Thread(target=work, args=(slider,))
-        thread.start()
+    def play_click(b):
+        player.play()
 
     def pause_click(b):
-        play_chk.value = False
+        player.pause()
 
     play_btn.on_click(play_click)
     pause_btn.on_click(pause_click)
 
-    keys = list(layers.keys())
-    layer = layers[keys[0]]
-    m.add(layer)
+    def frame_shown(index):
+        label.value = labels[index]
+        slider.value = index + 1
+
+    player.on_frame(frame_shown)
 
     def slider_changed(change):
-        m.default_style = {"cursor": "wait"}
-        index = slider.value - 1
-        label.value = labels[index]
-        layer.url = layers[label.value].url
-        layer.name = layers[label.value].name
-        m.default_style = {"cursor": "default"}
+        player.show(slider.value - 1)
 
     slider.observe(slider_changed, "value")
 
     def close_click(b):
-        play_chk.value = False
+        player.close()
         m.toolbar_reset()
 
         if m.slider_ctrl is not None and m.slider_ctrl in m.controls:
@@ -2824,17 +2822,20 @@ def inspector_gui(
                         bounds = m.cog_layer_dict[m.inspector_dropdown.value]["bounds"]
                         m.zoom_to_bounds(bounds)
 
-            elif layer_dict["type"] == "LOCAL":
+            elif layer_dict["type"] in ["LOCAL", "ARRAY"]:
                 try:
-                    data = local_tile_pixel_value(
-                        lon, lat, layer_dict["tile_client"], verbose=False
-                    )
+                    if layer_dict["type"] == "ARRAY":
+                        result = layer_dict["renderer"].point(lon, lat)
+                    else:
+                        data = local_tile_pixel_value(
+                            lon, lat, layer_dict["tile_client"], verbose=False
+                        )
 
-                    result = {}
-                    band_names = data.band_names
-                    values = data.array.data.tolist()
-                    for i, band in enumerate(band_names):
-                        result[band] = values[i]
+                        result = {}
+                        band_names = data.band_names
+                        values = data.array.data.tolist()
+                        for i, band in enumerate(band_names):
+                            result[band] = values[i]
 
                     if m.inspector_bands_chk.value:
                         vis_bands = m.cog_layer_dict[m.inspector_dropdown.value][
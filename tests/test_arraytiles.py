@@ -0,0 +1,173 @@
+#!/usr/bin/env python
+
+"""Tests for `arraytiles` module."""
+
+import importlib.util
+import io
+import os
+import tempfile
+import unittest
+import urllib.request
+import numpy as np
+import rasterio
+from PIL import Image
+from leafmap.arraytiles import *
+from leafmap.common import raster_to_tiles
+
+
+class TestArrayTiles(unittest.TestCase):
+    """Tests for `arraytiles` module."""
+
+    def setUp(self):
+        """Set up test fixtures, if any."""
+        # A global 1-degree grid whose values increase from west to east.
+        self.array = np.tile(np.arange(360, dtype="float32"), (180, 1))
+        self.array[:90, :180] = -9999
+        self.transform = (1.0, 0.0, -180.0, 0.0, -1.0, 90.0)
+
+    def renderer(self, **kwargs):
+        return ArrayTileRenderer(
+            self.array,
+            crs="EPSG:4326",
+            transform=self.transform,
+            nodata=-9999,
+            **kwargs,
+        )
+
+    def test_array_tile_renderer(self):
+        renderer = self.renderer(colormap="viridis")
+        self.assertEqual(renderer.band_names, ["b1"])
+        self.assertEqual(renderer.vmin, 0)
+        self.assertEqual(renderer.vmax, 359)
+        np.testing.assert_allclose(renderer.bounds, [-180, -90, 180, 90], atol=1e-6)
+
+        image = np.asarray(Image.open(io.BytesIO(renderer.render(0, 0, 1))))
+        self.assertEqual(image.shape, (256, 256, 4))
+        # The north-west quarter of the array is nodata.
+        self.assertEqual(image[200, 128, 3], 0)
+        image = np.asarray(Image.open(io.BytesIO(renderer.render(1, 1, 1))))
+        self.assertTrue((image[..., 3] == 255).all())
+        self.assertTrue((image[:, 0, :3] != image[:, 255, :3]).any())
+
+        renderer.render(1, 1, 1)
+        self.assertEqual((renderer.hits, renderer.misses), (1, 2))
+
+        data = renderer.render_array(3, 2, 2)
+        self.assertTrue(np.isfinite(data).all())
+        self.assertTrue(270 <= data.min() < data.max() < 360)
+
+        self.assertEqual(renderer.point(10.5, -20.5), {"b1": 190.0})
+        with self.assertRaises(ValueError):
+            renderer.point(200.5, 0.5)
+
+    def test_array_tile_renderer_cache_size(self):
+        renderer = self.renderer(cache_size=2, tile_format="webp")
+        for x in range(4):
+            renderer.render(x, 1, 2)
+        self.assertEqual(list(renderer._cache), [(2, 2, 1), (2, 3, 1)])
+        image = Image.open(io.BytesIO(renderer.render(3, 1, 2)))
+        self.assertEqual(image.format, "WEBP")
+
+    @unittest.skipUnless(importlib.util.find_spec("xarray"), "xarray is not installed")
+    def test_array_tile_renderer_xarray(self):
+        import xarray as xr
+
+        data = xr.DataArray(
+            np.stack([self.array, self.array * 0]),
+            dims=("band", "y", "x"),
+            coords={"band": ["a", "b"]},
+        )
+        renderer = array_tile_renderer(
+            data, {"crs": "EPSG:4326", "transform": self.transform, "dtype": "int16"}
+        )
+        self.assertEqual(renderer.band_names, ["a", "b"])
+        self.assertEqual(renderer.indexes, [1])
+        self.assertEqual(renderer.point(10.5, -20.5), {"a": 190.0, "b": 0.0})
+
+    def test_array_tile_server(self):
+        renderer = self.renderer()
+        url = renderer.url
+        self.assertTrue(url.endswith("/{z}/{x}/{y}.png"))
+        self.assertEqual(renderer.url, url)
+
+        response = urllib.request.urlopen(url.format(z=1, x=1, y=1))
+        self.assertEqual(response.headers["Content-Type"], "image/png")
+        self.assertEqual(response.headers["Access-Control-Allow-Origin"], "*")
+        self.assertEqual(response.read(), renderer.render(1, 1, 1))
+
+        del renderer
+        with self.assertRaises(urllib.error.HTTPError):
+            urllib.request.urlopen(url.format(z=1, x=1, y=1))
+
+    def write_raster(self, tmpdir):
+        source = os.path.join(tmpdir, "raster.tif")
+        with rasterio.open(
+            source,
+            "w",
+            driver="GTiff",
+            height=180,
+            width=360,
+            count=1,
+            dtype="float32",
+            crs="EPSG:4326",
+            transform=rasterio.Affine(*self.transform),
+            nodata=-9999,
+        ) as dst:
+            dst.write(self.array, 1)
+        return source
+
+    def test_render_tiles_in_flight(self):
+        import concurrent.futures
+        from unittest.mock import patch
+
+        submitted = []
+
+        class Executor(concurrent.futures.ThreadPoolExecutor):
+            def submit(self, fn, *args, **kwargs):
+                submitted.append(len(args[0]))
+                return super().submit(fn, *args, **kwargs)
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            source = self.write_raster(tmpdir)
+            with patch("concurrent.futures.ProcessPoolExecutor", Executor):
+                tiles = render_tiles(source, [2, 3], workers=2, batch_size=4)
+                next(tiles)
+                # Two batches per worker are submitted before the first is consumed,
+                # and one more once it is.
+                self.assertEqual(submitted, [4] * 5)
+                rest = list(tiles)
+        # The 16 + 64 tiles, less the 4 + 16 in the nodata north-west quarter.
+        self.assertEqual(sum(submitted), 80)
+        self.assertEqual(len(rest) + 1, 60)
+
+    def test_raster_to_tiles(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            source = self.write_raster(tmpdir)
+
+            renderer = RasterTileRenderer(source, colormap="viridis")
+            self.assertEqual((renderer.vmin, renderer.vmax), (0, 359))
+            self.assertEqual(renderer.native_zoom, 1)
+            self.assertEqual(renderer.point(10.5, -20.5), {"b1": 190.0})
+            self.assertIsNone(renderer.render_tile(0, 0, 2))
+            renderer.close()
+
+            output = os.path.join(tmpdir, "tiles")
+            raster_to_tiles(
+                source, output, max_zoom=2, colormap="viridis", workers=2, quiet=True
+            )
+            tiles = sorted(
+                os.path.relpath(os.path.join(root, name), output)
+                for root, _, names in os.walk(output)
+                for name in names
+            )
+            # Of the 21 tiles, the five in the nodata north-west quarter are skipped.
+            self.assertEqual(len(tiles), 16)
+            self.assertNotIn(os.path.join("2", "0", "0.png"), tiles)
+            with open(os.path.join(output, "2", "3", "2.png"), "rb") as f:
+                tile = f.read()
+            array_renderer = self.renderer(colormap="viridis")
+            self.assertEqual(tile, array_renderer.render_tile(3, 2, 2))
+
+
+if __name__ == "__main__":
+    unittest.main()
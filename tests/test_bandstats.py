@@ -0,0 +1,141 @@
+#!/usr/bin/env python
+
+"""Tests for `bandstats` module."""
+
+import json
+import os
+import tempfile
+import time
+import unittest
+import numpy as np
+import rasterio
+from leafmap.bandstats import *
+
+
+class TestBandStats(unittest.TestCase):
+    """Tests for `bandstats` module."""
+
+    def setUp(self):
+        """Set up test fixtures, if any."""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        clear_statistics_cache()
+
+    def tearDown(self):
+        """Tear down test fixtures, if any."""
+        self.tmpdir.cleanup()
+
+    def write(self, name, data, overviews=None, **kwargs):
+        path = os.path.join(self.tmpdir.name, name)
+        with rasterio.open(
+            path,
+            "w",
+            driver="GTiff",
+            width=data.shape[2],
+            height=data.shape[1],
+            count=data.shape[0],
+            dtype=data.dtype,
+            crs="EPSG:4326",
+            transform=rasterio.transform.from_origin(0, 1, 0.001, 0.001),
+            **kwargs,
+        ) as dst:
+            dst.write(data)
+            if overviews:
+                dst.build_overviews(overviews)
+        return path
+
+    def test_band_statistics_full(self):
+        data = np.arange(2 * 32 * 32, dtype="int16").reshape(2, 32, 32)
+        path = self.write("small.tif", data, nodata=0)
+        stats = band_statistics(path)
+        self.assertEqual(list(stats), ["b1", "b2"])
+        self.assertEqual(stats["b1"]["method"], "full")
+        self.assertEqual(stats["b1"]["rank_error"], 0)
+        self.assertEqual(stats["b1"]["min"], 1)
+        self.assertEqual(stats["b1"]["masked_pixels"], 1)
+        self.assertEqual(stats["b2"]["max"], 2047)
+        self.assertAlmostEqual(stats["b2"]["percentile_98"], np.percentile(data[1], 98))
+        self.assertEqual(band_min_max(path, 2), (1024, 2047))
+        self.assertEqual(band_min_max(path, nodata=1023, cache=False), (1, 2047))
+
+    def test_band_statistics_overview(self):
+        data = np.random.default_rng(0).integers(0, 255, (1, 256, 256), "uint8")
+        path = self.write("overview.tif", data, overviews=[2, 4, 8])
+        stats = band_statistics(path, max_size=64)["b1"]
+        # The coarsest overview with at least 64 pixels is the 1:4 one.
+        self.assertEqual(stats["method"], "overview")
+        self.assertEqual(stats["sample_size"], 64 * 64)
+        self.assertGreater(stats["rank_error"], 0)
+
+    def test_band_statistics_blocks(self):
+        data = np.random.default_rng(0).random((1, 512, 512), "float32")
+        path = self.write("blocks.tif", data, tiled=True, blockxsize=64, blockysize=64)
+        stats = band_statistics(path, max_size=32, sample_size=8192)["b1"]
+        self.assertEqual(stats["method"], "blocks")
+        self.assertEqual(stats["sample_size"], 8192)
+        # The estimated percentiles are within the stated rank error.
+        for p in [2, 98]:
+            rank = np.mean(data <= stats[f"percentile_{p}"])
+            self.assertLessEqual(abs(rank - p / 100), stats["rank_error"])
+
+    def test_sidecar_cache(self):
+        data = np.ones((1, 16, 16), dtype="uint8")
+        path = self.write("cached.tif", data)
+        self.assertEqual(band_min_max(path), (1, 1))
+        with open(path + ".stats.json") as f:
+            sidecar = json.load(f)
+        self.assertEqual(sidecar["identity"]["size"], os.path.getsize(path))
+        self.assertEqual(len(sidecar["entries"]), 1)
+
+        # The sidecar is used by new processes, here simulated by clearing memory.
+        clear_statistics_cache()
+        with rasterio.open(path, "r+") as dst:
+            dst.write(np.full((1, 16, 16), 5, dtype="uint8"))
+        # With the identity unchanged, the cached result is used.
+        os.utime(path, ns=(0, sidecar["identity"]["mtime_ns"]))
+        self.assertEqual(band_min_max(path), (1, 1))
+
+        # Changing the file invalidates the cached statistics.
+        time.sleep(0.01)
+        os.utime(path)
+        self.assertEqual(band_min_max(path), (5, 5))
+
+        clear_statistics_cache(path)
+        self.assertFalse(os.path.exists(path + ".stats.json"))
+
+    def test_memory_cache(self):
+        from unittest import mock
+        import rasterio.shutil
+        from leafmap import bandstats
+
+        # A raster that is not a local file, like a remote COG.
+        path = "/vsimem/remote.tif"
+        profile = {
+            "driver": "GTiff",
+            "width": 16,
+            "height": 16,
+            "count": 1,
+            "dtype": "uint8",
+            "crs": "EPSG:4326",
+            "transform": rasterio.transform.from_origin(0, 1, 0.001, 0.001),
+        }
+        with rasterio.open(path, "w", **profile) as dst:
+            dst.write(np.ones((1, 16, 16), dtype="uint8"))
+        with mock.patch.object(bandstats, "MEMORY_TTL", 0):
+            self.assertEqual(band_min_max(path), (1, 1))
+        with rasterio.open(path, "r+") as dst:
+            dst.write(np.full((1, 16, 16), 5, dtype="uint8"))
+        # The statistics of rasters without a file identity expire.
+        self.assertEqual(band_min_max(path), (5, 5))
+        with rasterio.open(path, "r+") as dst:
+            dst.write(np.full((1, 16, 16), 7, dtype="uint8"))
+        self.assertEqual(band_min_max(path), (5, 5))
+
+        with mock.patch.object(bandstats, "MEMORY_ENTRIES", 2):
+            for max_size in [8, 16, 32]:
+                band_statistics(path, max_size=max_size)
+            self.assertEqual(len(bandstats._memory_cache), 2)
+        rasterio.shutil.delete(path)
+
+
+if __name__ == "__main__":
+    unittest.main()
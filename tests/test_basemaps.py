@@ -0,0 +1,58 @@
+#!/usr/bin/env python
+
+"""Tests for `basemaps` module."""
+
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from leafmap.basemaps import *
+
+
+class TestBasemaps(unittest.TestCase):
+    """Tests for `basemaps` module."""
+
+    def setUp(self):
+        """Set up test fixtures, if any."""
+        self.cache_dir = tempfile.TemporaryDirectory()
+        self.env = patch.dict(os.environ, {"LEAFMAP_CACHE_DIR": self.cache_dir.name})
+        self.env.start()
+
+    def tearDown(self):
+        """Tear down test fixtures, if any."""
+        self.env.stop()
+        self.cache_dir.cleanup()
+
+    def test_provider_index_cached_on_disk(self):
+        index = get_provider_index(refresh=True)
+        self.assertIsInstance(index, list)
+        cache_files = os.listdir(os.path.join(self.cache_dir.name, "basemaps"))
+        self.assertEqual(len(cache_files), 1)
+        self.assertIs(get_provider_index(), index)
+
+    def test_registry_builds_layers_lazily(self):
+        registry = BasemapRegistry("folium")
+        self.assertIn("OpenTopoMap", registry)
+        self.assertEqual(len(registry._layers), 0)
+        layer = registry.OpenTopoMap
+        self.assertIs(registry["OpenTopoMap"], layer)
+        self.assertEqual(len(registry._layers), 1)
+
+    def test_registry_ipyleaflet(self):
+        registry = BasemapRegistry("ipyleaflet")
+        self.assertEqual(registry["OpenStreetMap"].name, "OpenStreetMap")
+        self.assertEqual(registry["FWS NWI Wetlands"]["type"], "wms")
+        with self.assertRaises(KeyError):
+            registry["Not a basemap"]
+
+    def test_registry_search(self):
+        registry = BasemapRegistry("ipyleaflet")
+        self.assertIn("OpenTopoMap", registry.search("topo"))
+
+    def test_search_provider_index(self):
+        keys = [entry["key"] for entry in search_provider_index("esri")]
+        self.assertIn("Esri.WorldImagery", keys)
+
+
+if __name__ == "__main__":
+    unittest.main()
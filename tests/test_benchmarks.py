@@ -0,0 +1,221 @@
+#!/usr/bin/env python
+
+"""Import-time and map construction benchmarks for the `leafmap` package.
+
+Each benchmark runs in a fresh Python process with network access disabled.
+It records the wall time, the peak resident set size (RSS), and the number of
+modules imported, and fails if the number of modules or the peak RSS exceeds the
+budget defined in benchmark_budgets.json. Wall times depend on the machine and its
+load, so the time budgets are only checked if the LEAFMAP_BENCHMARK environment
+variable is set to 1. The budgets can be replaced by setting the
+LEAFMAP_BENCHMARK_BUDGETS environment variable to the path of another JSON
+file, and the time budgets can be scaled for slower machines with
+LEAFMAP_BENCHMARK_SCALE. Set LEAFMAP_BENCHMARK_OUTPUT to a file path to save
+the measurements as JSON.
+"""
+
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+import unittest
+
+BUDGETS_FILE = os.environ.get(
+    "LEAFMAP_BENCHMARK_BUDGETS",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_budgets.json"),
+)
+
+# The benchmark runner executed in a child process. It disables network access,
+# runs the setup code (the import) and the statement (e.g., Map construction),
+# and prints the measurements as JSON.
+RUNNER = """
+import json
+import socket
+import sys
+import time
+
+
+def _offline(*args, **kwargs):
+    raise OSError("Network access is disabled during benchmarks.")
+
+
+socket.socket.connect = _offline
+socket.create_connection = _offline
+
+modules = set(sys.modules)
+start = time.perf_counter()
+exec(sys.argv[1])
+setup_time = time.perf_counter() - start
+setup_modules = set(sys.modules) - modules
+
+modules = set(sys.modules)
+start = time.perf_counter()
+exec(sys.argv[2])
+stmt_time = time.perf_counter() - start
+stmt_modules = set(sys.modules) - modules
+
+peak_rss = None
+try:
+    # VmHWM is the peak RSS of this process. ru_maxrss is not used on Linux
+    # because it includes the memory of the parent process at fork time.
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmHWM:"):
+                peak_rss = int(line.split()[1]) / 1024
+except OSError:
+    try:
+        import resource
+
+        # ru_maxrss is in bytes on macOS and in kilobytes elsewhere.
+        peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        peak_rss = peak_rss / 1024**2 if sys.platform == "darwin" else peak_rss / 1024
+    except ImportError:
+        pass
+
+print(
+    json.dumps(
+        {
+            "setup_time": setup_time,
+            "setup_modules": len(setup_modules),
+            "stmt_time": stmt_time,
+            "stmt_modules": len(stmt_modules),
+            "peak_rss_mb": peak_rss,
+        }
+    )
+)
+"""
+
+# name: (required package, setup code, statement)
+BENCHMARKS = {
+    "import_leafmap": (None, "import leafmap", "pass"),
+    "import_core": (None, "import leafmap.core", "pass"),
+    "import_common": (None, "import leafmap.common", "pass"),
+    "import_leafmap_backend": (
+        "ipyleaflet",
+        "import leafmap.leafmap as backend",
+        "pass",
+    ),
+    "import_foliumap": ("folium", "import leafmap.foliumap as backend", "pass"),
+    "import_maplibregl": ("maplibre", "import leafmap.maplibregl as backend", "pass"),
+    "import_deckgl": ("lonboard", "import leafmap.deckgl as backend", "pass"),
+    "leafmap_map": ("ipyleaflet", "import leafmap.leafmap as backend", "backend.Map()"),
+    "foliumap_map": ("folium", "import leafmap.foliumap as backend", "backend.Map()"),
+    # The default dark-matter style is fetched over the network.
+    "maplibregl_map": (
+        "maplibre",
+        "import leafmap.maplibregl as backend",
+        "backend.Map(style='background-white')",
+    ),
+    "deckgl_map": ("lonboard", "import leafmap.deckgl as backend", "backend.Map()"),
+}
+
+
+def run_benchmark(setup, stmt):
+    """Runs a benchmark in a fresh Python process.
+
+    Args:
+        setup (str): The code to run before the statement, e.g., an import.
+        stmt (str): The statement to measure, e.g., a Map construction.
+
+    Returns:
+        dict: The wall time and number of modules imported by the setup code and the
+            statement, and the peak RSS of the process in MB.
+    """
+    output = subprocess.run(
+        [sys.executable, "-c", RUNNER, setup, stmt],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+
+class TestBenchmarks(unittest.TestCase):
+    """Benchmarks for import time and map construction time."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Set up test fixtures, if any."""
+        with open(BUDGETS_FILE) as f:
+            cls.budgets = json.load(f)
+        cls.scale = float(os.environ.get("LEAFMAP_BENCHMARK_SCALE", 1))
+        cls.check_time = os.environ.get("LEAFMAP_BENCHMARK") == "1"
+        cls.results = {}
+
+    @classmethod
+    def tearDownClass(cls):
+        """Tear down test fixtures, if any."""
+        output = os.environ.get("LEAFMAP_BENCHMARK_OUTPUT")
+        if output:
+            with open(output, "w") as f:
+                json.dump(cls.results, f, indent=2)
+
+    def check_budget(self, name):
+        package, setup, stmt = BENCHMARKS[name]
+        if package is not None and importlib.util.find_spec(package) is None:
+            self.skipTest(f"{package} is not installed.")
+
+        result = run_benchmark(setup, stmt)
+        self.results[name] = result
+        budget = self.budgets[name]
+
+        # Import benchmarks measure the setup code, map benchmarks the statement.
+        key = "setup" if stmt == "pass" else "stmt"
+        seconds = result[f"{key}_time"]
+        modules = result[f"{key}_modules"]
+        if "max_seconds" in budget and self.check_time:
+            self.assertLessEqual(
+                seconds,
+                budget["max_seconds"] * self.scale,
+                f"{name} took {seconds:.3f}s (budget: {budget['max_seconds']}s)",
+            )
+        if "max_modules" in budget:
+            self.assertLessEqual(
+                modules,
+                budget["max_modules"],
+                f"{name} imported {modules} modules (budget: {budget['max_modules']})",
+            )
+        if "max_rss_mb" in budget and result["peak_rss_mb"] is not None:
+            self.assertLessEqual(
+                result["peak_rss_mb"],
+                budget["max_rss_mb"],
+                f"{name} used {result['peak_rss_mb']:.0f} MB (budget: {budget['max_rss_mb']} MB)",
+            )
+
+    def test_import_leafmap(self):
+        self.check_budget("import_leafmap")
+
+    def test_import_core(self):
+        self.check_budget("import_core")
+
+    def test_import_common(self):
+        self.check_budget("import_common")
+
+    def test_import_leafmap_backend(self):
+        self.check_budget("import_leafmap_backend")
+
+    def test_import_foliumap(self):
+        self.check_budget("import_foliumap")
+
+    def test_import_maplibregl(self):
+        self.check_budget("import_maplibregl")
+
+    def test_import_deckgl(self):
+        self.check_budget("import_deckgl")
+
+    def test_leafmap_map(self):
+        self.check_budget("leafmap_map")
+
+    def test_foliumap_map(self):
+        self.check_budget("foliumap_map")
+
+    def test_maplibregl_map(self):
+        self.check_budget("maplibregl_map")
+
+    def test_deckgl_map(self):
+        self.check_budget("deckgl_map")
+
+
+if __name__ == "__main__":
+    unittest.main()
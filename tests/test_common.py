@@ -2,6 +2,7 @@
 
 """Tests for `leafmap` package."""
 
+import importlib.util
 import os
 import unittest
 import geopandas
@@ -63,6 +64,109 @@ class TestCommon(unittest.TestCase):
         self.assertIsInstance(cog_center(self.in_cog), tuple)
         self.assertEqual(len(cog_center(self.in_cog)), 2)
 
+    @unittest.skipUnless(
+        importlib.util.find_spec("localtileserver"), "localtileserver is not installed"
+    )
+    def test_tile_client_registry(self):
+        registry = TileClientRegistry(idle_timeout=None)
+        client = registry.get("examples/data/cog.tif")
+        self.assertIs(registry.get(os.path.abspath("examples/data/cog.tif")), client)
+        self.assertIsNot(registry.get("examples/data/cog.tif", cors_all=True), client)
+        self.assertEqual(len(registry), 2)
+
+        class Layer:
+            pass
+
+        layer = Layer()
+        registry.track(client, layer)
+        self.assertEqual(registry.close_idle(0), 1)
+        self.assertIs(registry.get("examples/data/cog.tif"), client)
+        del layer
+        self.assertEqual(registry.close_idle(0), 1)
+        self.assertEqual(len(registry), 0)
+
+    @unittest.skipUnless(
+        importlib.util.find_spec("localtileserver"), "localtileserver is not installed"
+    )
+    def test_local_tile_vmin_vmax(self):
+        import tempfile
+        import numpy as np
+        import rasterio
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "image.tif")
+            with rasterio.open(
+                path,
+                "w",
+                driver="GTiff",
+                width=8,
+                height=8,
+                count=2,
+                dtype="uint8",
+                crs="EPSG:4326",
+                transform=rasterio.transform.from_origin(0, 8, 1, 1),
+                nodata=0,
+            ) as dst:
+                dst.write(np.zeros((8, 8), dtype="uint8"), 1)
+                dst.write(np.arange(64, dtype="uint8").reshape(8, 8), 2)
+            self.assertEqual(local_tile_vmin_vmax(path, cache=False), (1, 63))
+            self.assertEqual(
+                local_tile_vmin_vmax(path, bands=["b1"], cache=False), (None, None)
+            )
+
+    def test_refresh_inventory(self):
+        import threading
+        import time
+
+        fetched = []
+        lock = threading.Lock()
+        release = threading.Event()
+
+        def fetch(key):
+            with lock:
+                fetched.append(key)
+            if key == "slow":
+                release.wait(5)
+            elif key == "broken":
+                raise ValueError("broken")
+            elif key == "empty":
+                return None
+            else:
+                time.sleep(0.1)
+            return {"value": key.upper()}
+
+        previous = {
+            "same": {"value": "OLD", "updated": "1"},
+            "changed": {"value": "OLD", "updated": "1"},
+            "slow": {"value": "OLD"},
+            "broken": {"value": "OLD"},
+        }
+        keys = ["same", "changed", "slow", "broken", "empty"] + list("abcdef")
+        start = time.monotonic()
+        inventory = refresh_inventory(
+            keys,
+            fetch,
+            previous,
+            versions={"same": "1", "changed": "2"},
+            max_workers=8,
+            timeout=0.5,
+        )
+        elapsed = time.monotonic() - start
+        release.set()
+
+        # Unchanged entries are reused and the others are fetched concurrently.
+        self.assertNotIn("same", fetched)
+        self.assertLess(elapsed, 2)
+        self.assertEqual(
+            list(inventory), ["same", "changed", "slow", "broken"] + list("abcdef")
+        )
+        self.assertEqual(inventory["same"], {"value": "OLD", "updated": "1"})
+        self.assertEqual(inventory["changed"], {"value": "CHANGED", "updated": "2"})
+        # Entries that time out or fail keep their previous value.
+        self.assertEqual(inventory["slow"], {"value": "OLD"})
+        self.assertEqual(inventory["broken"], {"value": "OLD"})
+        self.assertEqual(inventory["a"], {"value": "A"})
+
     @patch("os.environ", {})
     @patch("requests.get")
     def test_set_proxy_successful_request(self, mock_get):
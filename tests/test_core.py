@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+
+"""Tests for `core` module."""
+
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+import geopandas
+from leafmap.core import *
+
+
+class TestCore(unittest.TestCase):
+    """Tests for `core` module."""
+
+    def setUp(self):
+        """Set up test fixtures, if any."""
+        self.in_shp = os.path.abspath("examples/data/countries.shp")
+
+    def tearDown(self):
+        """Tear down test fixtures, if any."""
+
+    def test_no_widget_imports(self):
+        code = (
+            "import sys, leafmap.core; "
+            "print(','.join(m for m in ['folium', 'ipyleaflet', 'ipywidgets', "
+            "'whitebox'] if m in sys.modules))"
+        )
+        output = subprocess.check_output([sys.executable, "-c", code], text=True)
+        self.assertEqual(output.strip(), "")
+
+    def test_lazy_submodules(self):
+        code = (
+            "import sys, leafmap; core = leafmap.core; "
+            "print(','.join(m for m in ['folium', 'ipyleaflet'] if m in sys.modules)); "
+            "names = ['arraytiles', 'bandstats', 'core', 'playback', 'tiles']; "
+            "print(all(getattr(leafmap, n).__name__ == 'leafmap.' + n for n in names))"
+        )
+        output = subprocess.check_output([sys.executable, "-c", code], text=True)
+        self.assertEqual(output.split("\n")[:2], ["", "True"])
+
+    def test_basemaps_registry(self):
+        code = (
+            "import leafmap.basemaps, leafmap; "
+            "print(type(leafmap.basemaps).__name__)"
+        )
+        output = subprocess.check_output([sys.executable, "-c", code], text=True)
+        self.assertEqual(output.strip().split("\n")[-1], "BasemapRegistry")
+
+    def test_common_reexports(self):
+        from leafmap import common
+
+        self.assertIs(common.zonal_stats, zonal_stats)
+        self.assertIs(common.reproject, reproject)
+
+    def test_geometry_bounds(self):
+        geometry = {
+            "type": "Polygon",
+            "coordinates": [[[-1, -2], [3, -2], [3, 4], [-1, 4], [-1, -2]]],
+        }
+        self.assertEqual(geometry_bounds(geometry), [-1, -2, 3, 4])
+
+    def test_gdf_bounds(self):
+        gdf = geopandas.read_file(self.in_shp)
+        self.assertEqual(len(gdf_bounds(gdf)), 4)
+
+    def test_reproject(self):
+        import numpy as np
+        import rasterio
+        from rasterio.transform import from_bounds
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            image = os.path.join(tmp_dir, "image.tif")
+            output = os.path.join(tmp_dir, "output.tif")
+            array = np.arange(100, dtype="uint8").reshape(10, 10)
+            profile = {
+                "driver": "GTiff",
+                "width": 10,
+                "height": 10,
+                "count": 1,
+                "dtype": "uint8",
+                "crs": "EPSG:4326",
+                "transform": from_bounds(-10, -10, 10, 10, 10, 10),
+            }
+            with rasterio.open(image, "w", **profile) as dst:
+                dst.write(array, 1)
+            reproject(image, output, dst_crs="EPSG:3857", to_cog=False)
+            self.assertTrue(os.path.exists(output))
+
+
+if __name__ == "__main__":
+    unittest.main()
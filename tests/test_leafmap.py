@@ -2,6 +2,7 @@
 
 """Tests for `leafmap` module."""
 
+import importlib.util
 import os
 import unittest
 from leafmap import leafmap
@@ -65,6 +66,33 @@ class TestLeafmap(unittest.TestCase):
     #     out_str = m.to_html()
     #     assert "Elevation" in out_str
 
+    @unittest.skipUnless(importlib.util.find_spec("xarray"), "xarray is not installed")
+    def test_add_raster_array(self):
+        """Check that an array layer receives the tile layer arguments"""
+        import numpy as np
+        import rasterio.transform
+
+        m = leafmap.Map()
+        array = np.arange(180 * 360, dtype="float32").reshape(180, 360)
+        array_args = {
+            "crs": "EPSG:4326",
+            "transform": rasterio.transform.from_origin(-180, 90, 1, 1),
+        }
+        m.add_raster(
+            array,
+            cmap="viridis",
+            array_args=array_args,
+            attribution="Test data",
+            layer_name="Array",
+            zoom_to_layer=False,
+            max_zoom=12,
+        )
+        layer = m.find_layer("Array")
+        self.assertEqual(layer.attribution, "Test data")
+        self.assertEqual(layer.max_zoom, 12)
+        self.assertEqual(layer.renderer.colormap, "viridis")
+        self.assertEqual(m.cog_layer_dict["Array"]["colormap"], "viridis")
+
     def test_add_gdf(self):
         """Check GeoDataFrame"""
         m = leafmap.Map()
@@ -0,0 +1,48 @@
+#!/usr/bin/env python
+
+"""Tests for `maplibregl` module."""
+
+import importlib.util
+import unittest
+
+
+@unittest.skipUnless(
+    importlib.util.find_spec("maplibre") and importlib.util.find_spec("xarray"),
+    "maplibre and xarray are not installed",
+)
+class TestMaplibregl(unittest.TestCase):
+    """Tests for `maplibregl` module."""
+
+    def setUp(self):
+        """Set up test fixtures, if any."""
+
+    def tearDown(self):
+        """Tear down test fixtures, if any."""
+
+    def test_add_raster_array(self):
+        """Check that an array layer receives the legacy colormap and band aliases"""
+        import numpy as np
+        import rasterio.transform
+        from leafmap import maplibregl
+
+        m = maplibregl.Map(style="background-white")
+        array = np.arange(2 * 180 * 360, dtype="float32").reshape(2, 180, 360)
+        array_args = {
+            "crs": "EPSG:4326",
+            "transform": rasterio.transform.from_origin(-180, 90, 1, 1),
+        }
+        m.add_raster(
+            array,
+            cmap="viridis",
+            band=2,
+            array_args=array_args,
+            name="Array",
+            fit_bounds=False,
+        )
+        renderer = m.array_renderers["Array"]
+        self.assertEqual(renderer.colormap, "viridis")
+        self.assertEqual(renderer.indexes, [2])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+
+"""Tests for `playback` module."""
+
+import time
+import unittest
+import ipyleaflet
+from leafmap.playback import *
+
+
+class TestPlayback(unittest.TestCase):
+    """Tests for `playback` module."""
+
+    def setUp(self):
+        """Set up test fixtures, if any."""
+        self.m = ipyleaflet.Map()
+        self.layers = [
+            ipyleaflet.TileLayer(url=f"https://example.com/{i}/{{z}}/{{x}}/{{y}}.png")
+            for i in range(5)
+        ]
+
+    def on_map(self):
+        return [i for i, layer in enumerate(self.layers) if layer in self.m.layers]
+
+    def test_frame_player(self):
+        player = FramePlayer(self.m, self.layers, preload=2, opacity=0.8)
+        shown = []
+        player.on_frame(shown.append)
+        self.assertEqual(self.on_map(), [0, 1, 2])
+        self.assertEqual([layer.opacity for layer in self.layers[:3]], [0.8, 0, 0])
+
+        player.show(4)
+        self.assertEqual(self.on_map(), [0, 1, 4])
+        self.assertEqual(self.layers[4].opacity, 0.8)
+        self.assertEqual(self.layers[0].opacity, 0)
+        player.next()
+        player.previous()
+        self.assertEqual(shown, [4, 0, 4])
+
+        player.close()
+        self.assertEqual(self.on_map(), [4])
+
+    def test_frame_player_load_time(self):
+        player = FramePlayer(self.m, self.layers, interval=0.01, preload=1)
+        # A frame is not loaded until the front end reports the end of its loading,
+        # as the trait is False before the front end syncs it.
+        self.assertFalse(self.layers[1].loading)
+        start = time.monotonic()
+        self.assertFalse(player.wait_until_loaded(1, timeout=0.05))
+        self.assertGreaterEqual(time.monotonic() - start, 0.05)
+
+        # The frontend reports tile loading through the loading trait.
+        self.layers[1].set_trait("loading", True)
+        self.assertFalse(player.wait_until_loaded(1, timeout=0))
+        time.sleep(0.1)
+        self.layers[1].set_trait("loading", False)
+        self.assertTrue(player.wait_until_loaded(1, timeout=0))
+        self.assertGreater(player.frame_interval, 0.01)
+
+    def test_frame_player_play(self):
+        # Without a front end, frames are shown after waiting max_wait for them.
+        player = FramePlayer(self.m, self.layers, interval=0.01, max_wait=0.01)
+        player.play()
+        time.sleep(0.2)
+        player.pause()
+        self.assertFalse(player.playing)
+        time.sleep(0.1)
+        index = player.index
+        time.sleep(0.1)
+        self.assertEqual(player.index, index)
+
+        # After a wait times out, the frames are shown without waiting.
+        player = FramePlayer(self.m, self.layers, interval=0.01, max_wait=0.3)
+        shown = []
+        player.on_frame(shown.append)
+        player.play()
+        time.sleep(0.5)
+        player.pause()
+        self.assertGreater(len(shown), 5)
+        time.sleep(0.1)
+        index = player.index
+
+        self.layers[(index + 1) % 5].set_trait("loading", True)
+        player.max_wait = 0.1
+        player.play()
+        time.sleep(0.05)
+        # Playback waits for the next frame to load.
+        self.assertEqual(player.index, index)
+        player.pause()
+
+
+if __name__ == "__main__":
+    unittest.main()
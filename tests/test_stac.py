@@ -0,0 +1,667 @@
+#!/usr/bin/env python
+
+"""Tests for `stac` module."""
+
+import asyncio
+import concurrent.futures
+import http.server
+import importlib.util
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+import urllib.parse
+import uuid
+from unittest import mock
+import numpy as np
+import pandas as pd
+import pystac
+import rasterio
+from leafmap.stac import *
+from leafmap import stac
+from leafmap.common import filter_bounds, filter_date
+
+
+class TitilerHandler(http.server.BaseHTTPRequestHandler):
+    """Answers TiTiler metadata requests with the request path and query."""
+
+    protocol_version = "HTTP/1.1"
+    requests = []
+    clients = set()
+
+    def do_GET(self):
+        first_request = self.path not in self.requests
+        self.requests.append(self.path)
+        self.clients.add(self.client_address)
+        if "/slow" in self.path:
+            time.sleep(0.2)
+        if self.path.startswith("/api"):
+            body = json.dumps(self.stac_api()).encode()
+            self.send_response(200)
+        elif "/flaky" in self.path and first_request:
+            body = b"{}"
+            self.send_response(503)
+        elif "/stac/point/" in self.path:
+            # TiTiler returns a list of band values per asset.
+            body = json.dumps({"values": [[1], [2, 3]]}).encode()
+            self.send_response(200)
+        elif "/missing" in self.path:
+            body = json.dumps({"detail": "Not found"}).encode()
+            self.send_response(404)
+        else:
+            body = json.dumps(
+                {
+                    "path": self.path,
+                    "bounds": [0, 0, 1, 1],
+                    "values": [1, 2],
+                    "band_descriptions": [["b1", ""], ["b2", ""]],
+                    "tiles": [f"http://tiles{self.path}/{{z}}/{{x}}/{{y}}"],
+                }
+            ).encode()
+            self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def stac_api(self):
+        """Answers a STAC API with five items in pages of two."""
+        base = f"http://{self.headers['Host']}/api"
+        query = urllib.parse.parse_qs(urllib.parse.urlparse(self.path).query)
+        if not self.path.startswith("/api/search"):
+            return {
+                "type": "Catalog",
+                "stac_version": "1.0.0",
+                "id": "api",
+                "description": "Test API",
+                "conformsTo": [
+                    "https://api.stacspec.org/v1.0.0/core",
+                    "https://api.stacspec.org/v1.0.0/item-search",
+                ],
+                "links": [
+                    {"rel": "self", "href": base},
+                    {"rel": "root", "href": base},
+                    {"rel": "search", "href": f"{base}/search", "method": "GET"},
+                ],
+            }
+        page = int(query.get("page", ["0"])[0])
+        features = []
+        for i in range(2 * page, min(2 * page + 2, 5)):
+            properties = {"datetime": f"2024-01-0{i + 1}T00:00:00Z"}
+            properties["eo:cloud_cover"] = "cloudy" if i == 3 else i
+            if i == 4:
+                properties["platform"] = "sentinel-2a"
+            features.append(
+                {
+                    "type": "Feature",
+                    "stac_version": "1.0.0",
+                    "id": f"item{i}",
+                    "collection": "test",
+                    "bbox": [i, 0, i + 1, 1],
+                    "geometry": {
+                        "type": "Polygon",
+                        "coordinates": [
+                            [[i, 0], [i + 1, 0], [i + 1, 1], [i, 1], [i, 0]]
+                        ],
+                    },
+                    "properties": properties,
+                    "assets": {"B1": {"href": f"https://data/{i}/B1.tif"}},
+                    "links": [{"rel": "self", "href": f"{base}/items/item{i}"}],
+                }
+            )
+        links = []
+        if 2 * page + 2 < 5:
+            links.append(
+                {
+                    "rel": "next",
+                    "href": f"{base}/search?page={page + 1}",
+                    "method": "GET",
+                }
+            )
+        return {"type": "FeatureCollection", "features": features, "links": links}
+
+    def log_message(self, *args):
+        pass
+
+
+class TestStac(unittest.TestCase):
+    """Tests for `stac` module."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), TitilerHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.endpoint = f"http://127.0.0.1:{cls.server.server_port}"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        """Set up test fixtures, if any."""
+        TitilerHandler.requests.clear()
+        TitilerHandler.clients.clear()
+        self.cache = set_metadata_cache()
+        self.client = set_http_client(timeout=5, backoff_factor=0)
+
+    def test_metadata_cache_key(self):
+        key = MetadataCache.key(
+            "https://titiler.xyz/cog/info/",
+            {"url": "a.tif", "bidx": [3, 1], "nodata": None},
+        )
+        self.assertEqual(key, "https://titiler.xyz/cog/info?bidx=3&bidx=1&url=a.tif")
+        self.assertEqual(
+            key,
+            MetadataCache.key(
+                "https://titiler.xyz/cog/info", {"bidx": [3, 1], "url": "a.tif"}
+            ),
+        )
+
+    def test_fetch_json(self):
+        url = f"{self.endpoint}/cog/info"
+        first = fetch_json(url, {"url": "a.tif"})
+        first["path"] = "changed"
+        self.assertEqual(
+            fetch_json(url, {"url": "a.tif"})["path"], "/cog/info?url=a.tif"
+        )
+        self.assertEqual(len(TitilerHandler.requests), 1)
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+        fetch_json(url, {"url": "b.tif"})
+        self.assertEqual(len(TitilerHandler.requests), 2)
+
+        # Errors are not cached.
+        for _ in range(2):
+            self.assertIn("detail", fetch_json(f"{self.endpoint}/missing"))
+        self.assertEqual(len(TitilerHandler.requests), 4)
+
+        set_metadata_cache(ttl=0)
+        fetch_json(url, {"url": "a.tif"})
+        self.assertEqual(len(TitilerHandler.requests), 5)
+
+    def test_metadata_cache_disk(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "titiler.sqlite")
+            set_metadata_cache(path=path)
+            fetch_json(f"{self.endpoint}/cog/info", {"url": "a.tif"})
+            cache = set_metadata_cache(path=path)
+            self.assertEqual(len(cache), 0)
+            fetch_json(f"{self.endpoint}/cog/info", {"url": "a.tif"})
+            self.assertEqual(len(TitilerHandler.requests), 1)
+            cache.close()
+
+            # Expired responses are deleted and the disk tier keeps the newest ones.
+            path = os.path.join(tmpdir, "pruned.sqlite")
+            cache = MetadataCache(path=path, max_disk_entries=100)
+            cache.put("expired", 1, ttl=-1)
+            for i in range(MetadataCache.PRUNE_INTERVAL - 1):
+                cache.put(str(i), i, ttl=i + 1)
+            count = "SELECT COUNT(*) FROM responses"
+            self.assertEqual(cache._conn.execute(count).fetchone()[0], 100)
+            cache.close()
+            cache = MetadataCache(path=path, max_disk_entries=10)
+            self.assertEqual(cache._conn.execute(count).fetchone()[0], 10)
+            self.assertIsNone(cache.get("expired"))
+            self.assertEqual(cache.get("254"), 254)
+            cache.close()
+
+    def test_cog_tile_cache(self):
+        for _ in range(3):
+            url = cog_tile("a.tif", titiler_endpoint=self.endpoint, rescale="0,1")
+        self.assertTrue(
+            url.startswith("http://tiles/cog/WebMercatorQuad/tilejson.json")
+        )
+        # The band names and the TileJSON are requested once.
+        self.assertEqual(len(TitilerHandler.requests), 2)
+
+        endpoint = TitilerEndpoint(self.endpoint)
+        for _ in range(2):
+            self.assertEqual(
+                stac_bounds(f"{self.endpoint}/item.json", titiler_endpoint=endpoint),
+                [0, 0, 1, 1],
+            )
+        self.assertEqual(len(TitilerHandler.requests), 4)
+
+    def test_http_client(self):
+        # A 503 response is retried.
+        r = fetch_json(f"{self.endpoint}/flaky")
+        self.assertEqual(r["path"], "/flaky")
+        self.assertEqual(len(TitilerHandler.requests), 2)
+
+        for i in range(5):
+            fetch_json(f"{self.endpoint}/cog/info", {"url": f"{i}.tif"})
+        # All requests reuse one kept-alive connection.
+        self.assertEqual(len(TitilerHandler.clients), 1)
+
+    def test_fetch_json_many(self):
+        requests_list = [f"{self.endpoint}/cog/info"] + [
+            (f"{self.endpoint}/cog/info", {"url": f"{i}.tif"}) for i in range(8)
+        ]
+        results = asyncio.run(fetch_json_many(requests_list, concurrency=4))
+        self.assertEqual(results[0]["path"], "/cog/info")
+        self.assertEqual(results[8]["path"], "/cog/info?url=7.tif")
+        self.assertEqual(len(TitilerHandler.requests), 9)
+
+    def test_cog_tiles(self):
+        urls = ["a.tif", "b.tif", "a.tif"]
+        tiles = cog_tiles(urls, titiler_endpoint=self.endpoint, rescale="0,1")
+        self.assertEqual(len(tiles), 3)
+        self.assertEqual(tiles[0], tiles[2])
+        self.assertIn("url=b.tif", tiles[1])
+        # Band names and TileJSON for each of the two distinct COGs.
+        self.assertEqual(len(TitilerHandler.requests), 4)
+
+        tiles = stac_tiles(
+            [f"{self.endpoint}/item{i}.json" for i in range(3)],
+            assets=["B4", "B3", "B2"],
+            titiler_endpoint=self.endpoint,
+            rescale="0,1",
+        )
+        self.assertEqual(len(set(tiles)), 3)
+        with self.assertRaises(ValueError):
+            stac_tiles(collection="landsat")
+
+    def test_fetch_json_concurrent(self):
+        url = f"{self.endpoint}/slow"
+        with concurrent.futures.ThreadPoolExecutor(8) as executor:
+            results = list(executor.map(lambda i: fetch_json(url), range(8)))
+        self.assertTrue(all(result["path"] == "/slow" for result in results))
+        self.assertEqual(len(TitilerHandler.requests), 1)
+
+    def test_sample_pixel_values(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "image.tif")
+            data = np.arange(2 * 64 * 64, dtype="float32").reshape(2, 64, 64)
+            with rasterio.open(
+                path,
+                "w",
+                driver="GTiff",
+                width=64,
+                height=64,
+                count=2,
+                dtype="float32",
+                crs="EPSG:4326",
+                transform=rasterio.transform.from_origin(0, 64, 1, 1),
+                nodata=0,
+                tiled=True,
+                blockxsize=16,
+                blockysize=16,
+            ) as dst:
+                dst.write(data)
+                dst.set_band_description(1, "red")
+
+            points = np.array([[0.5, 63.5], [10.5, 50.5], [100, 0], [63.5, 0.5]])
+            result = sample_pixel_values(points, path)
+            self.assertEqual(
+                list(result.columns), ["longitude", "latitude", "red", "b2"]
+            )
+            np.testing.assert_array_equal(
+                result["red"], [np.nan, data[0, 13, 10], np.nan, data[0, 63, 63]]
+            )
+            self.assertEqual(result["b2"][0], data[1, 0, 0])
+
+            frame = pd.DataFrame(
+                {"x": points[:, 0], "y": points[:, 1], "id": list("abcd")}
+            )
+            result = sample_pixel_values(frame, path, bidx=2, max_workers=2)
+            self.assertEqual(list(result["id"]), list("abcd"))
+            self.assertEqual(result["b2"][1], data[1, 13, 10])
+
+        frame = pd.DataFrame(
+            {
+                "lon": [0, 1, 2],
+                "lat": [0, 1, 2],
+                "url": [f"{self.endpoint}/item{i % 2}.json" for i in range(3)],
+            }
+        )
+        result = sample_pixel_values(
+            frame, source_column="url", assets="B4,B3", titiler_endpoint=self.endpoint
+        )
+        self.assertEqual(list(result.columns[-3:]), ["B4", "B3_b1", "B3_b2"])
+        self.assertEqual(list(result["B4"]), [1, 1, 1])
+        self.assertEqual(list(result["B3_b2"]), [3, 3, 3])
+        with self.assertRaises(ValueError):
+            sample_pixel_values(frame)
+
+        # Points without a source are left as NaN.
+        frame.loc[1, "url"] = None
+        frame.loc[2, "url"] = np.nan
+        result = sample_pixel_values(
+            frame, source_column="url", assets="B4,B3", titiler_endpoint=self.endpoint
+        )
+        self.assertEqual(result["B4"][0], 1)
+        self.assertTrue(result["B4"][1:].isna().all())
+
+    def test_local_endpoint(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "image.tif")
+            data = np.arange(2 * 64 * 64, dtype="uint16").reshape(2, 64, 64)
+            with rasterio.open(
+                path,
+                "w",
+                driver="GTiff",
+                width=64,
+                height=64,
+                count=2,
+                dtype="uint16",
+                crs="EPSG:4326",
+                transform=rasterio.transform.from_origin(0, 64, 1, 1),
+                nodata=0,
+            ) as dst:
+                dst.write(data)
+                profile = dst.profile
+            profile.update(count=1)
+            with rasterio.open(os.path.join(tmpdir, "nir.tif"), "w", **profile) as dst:
+                dst.write(np.full((1, 64, 64), 100, dtype="uint16"))
+            item = {
+                "type": "Feature",
+                "bbox": [0, 0, 64, 64],
+                "assets": {"visual": {"href": "image.tif"}, "nir": {"href": "nir.tif"}},
+            }
+            item_path = os.path.join(tmpdir, "item.json")
+            with open(item_path, "w") as f:
+                json.dump(item, f)
+
+            # Local files do not need a titiler server.
+            np.testing.assert_allclose(cog_bounds(path), [0, 0, 64, 64])
+            self.assertEqual(cog_bands(path), ["b1", "b2"])
+            self.assertEqual(
+                cog_pixel_value(10.5, 50.5, path, None), {"b1": 842, "b2": 4938}
+            )
+            self.assertIsNone(cog_pixel_value(0.5, 63.5, path, None)["b1"])
+            self.assertIsNone(cog_pixel_value(100, 0, path, None, verbose=False))
+
+            stats = cog_stats(path, titiler_endpoint="local")
+            self.assertEqual(stats["b1"]["min"], 1)
+            self.assertEqual(stats["b2"]["max"], 8191)
+            self.assertEqual(stats["b1"]["masked_pixels"], 1)
+            endpoint = LocalEndpoint(max_size=16)
+            self.assertEqual(cog_stats(path, endpoint)["b1"]["valid_pixels"], 256)
+            info = cog_info(path, return_geojson=True)
+            self.assertEqual(info["properties"]["count"], 2)
+
+            self.assertEqual(stac_assets(item_path), ["visual", "nir"])
+            self.assertEqual(stac_bounds(item_path), [0, 0, 64, 64])
+            # Multi-band assets get a list of band values.
+            self.assertEqual(
+                stac_pixel_value(10.5, 50.5, item_path, verbose=False),
+                {"visual": [842, 4938], "nir": 100},
+            )
+            self.assertEqual(
+                stac_pixel_value(10.5, 50.5, item_path, assets="nir,visual"),
+                {"nir": 100, "visual": [842, 4938]},
+            )
+            # Local STAC items are sampled through the endpoint, not rasterio.
+            result = sample_pixel_values([[10.5, 50.5]], item_path)
+            self.assertEqual(
+                list(result.columns[-3:]), ["visual_b1", "visual_b2", "nir"]
+            )
+            self.assertEqual(list(result.iloc[0, -3:]), [842, 4938, 100])
+            self.assertIn("visual_b2", stac_stats(item_path))
+            self.assertEqual(stac_min_max(item_path), (1, 8191))
+        self.assertEqual(len(TitilerHandler.requests), 0)
+        self.assertIn("detail", endpoint.get("local/cog/info", {"url": path}))
+
+    @unittest.skipUnless(
+        importlib.util.find_spec("pyarrow"), "pyarrow is not installed"
+    )
+    def test_stac_search_streaming(self):
+        import geopandas as gpd
+        import pyarrow.parquet as pq
+
+        url = f"{self.endpoint}/api"
+        batches = list(stac_search(url, method="GET", limit=2, get_arrow=True))
+        self.assertEqual([batch.num_rows for batch in batches], [2, 2, 1])
+        self.assertTrue(all(b.schema == batches[0].schema for b in batches))
+        self.assertEqual(batches[1]["eo:cloud_cover"].to_pylist(), [2, None])
+        self.assertEqual(
+            [json.loads(e) for e in batches[1]["extra_properties"].to_pylist()[1:]],
+            [{"eo:cloud_cover": "cloudy"}],
+        )
+        self.assertEqual(
+            json.loads(batches[2]["extra_properties"][0].as_py()),
+            {"platform": "sentinel-2a"},
+        )
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            output = stac_search(
+                url, method="GET", limit=2, output=os.path.join(tmpdir, "items.parquet")
+            )
+            self.assertEqual(pq.read_metadata(output).num_row_groups, 3)
+            gdf = gpd.read_parquet(output)
+        self.assertEqual(list(gdf["id"]), [f"item{i}" for i in range(5)])
+        self.assertEqual(gdf.crs.to_epsg(), 4326)
+        self.assertEqual(gdf.total_bounds.tolist(), [0, 0, 5, 1])
+        self.assertEqual(str(gdf["datetime"].dtype), "datetime64[us, UTC]")
+        self.assertEqual(gdf["href"][0], f"{url}/items/item0")
+
+        assets = stac_search(url, method="GET", limit=2, get_assets=True)
+        self.assertEqual(assets["item4"], {"B1": "https://data/4/B1.tif"})
+
+    def test_stac_item_index(self):
+        url = f"{self.endpoint}/api"
+        index = stac_search(url, method="GET", limit=2, get_index=True)
+        self.assertEqual(len(index), 5)
+        # Item i covers [i, i + 1] x [0, 1] on 2024-01-0{i + 1}.
+        self.assertEqual(list(index.query(bbox=[1.5, 0, 2.5, 1])), [1, 2])
+        self.assertEqual(list(index.query([0.5, 0, 3.5, 1], within=True)), [1, 2])
+        self.assertEqual(
+            list(index.query(start_date="2024-01-02", end_date="2024-01-04")), [1, 2, 3]
+        )
+        point = {"type": "Point", "coordinates": [4.5, 0.5]}
+        self.assertEqual(list(index.search(intersects=point)["id"]), ["item4"])
+        self.assertEqual(
+            list(filter_bounds(index, [0, 0, 2.5, 1], within=True)["id"]),
+            ["item0", "item1"],
+        )
+        result = filter_date(index, "2024-01-04")
+        self.assertEqual(list(result["id"]), ["item3", "item4"])
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            output = os.path.join(tmpdir, "items.parquet")
+            index = stac_search(url, method="GET", output=output, get_index=True)
+            self.assertTrue(os.path.exists(os.path.join(tmpdir, "items.index.npz")))
+            self.assertIs(StacItemIndex.from_parquet(output), index)
+            # Only the most recently used indexes are kept in memory.
+            with mock.patch.object(stac, "INDEX_MEMORY_ENTRIES", 1):
+                StacItemIndex.from_parquet(output, columns=["id", "geometry"])
+                self.assertEqual(len(stac._index_memory), 1)
+                self.assertIsNot(StacItemIndex.from_parquet(output), index)
+            loaded = StacItemIndex.load(
+                os.path.join(tmpdir, "items.index.npz"),
+                index.data,
+                "{}-{}".format(os.stat(output).st_size, os.stat(output).st_mtime_ns),
+            )
+            self.assertEqual(
+                list(loaded.query([1.5, 0, 5, 1], "2024-01-01", "2024-01-03")), [1, 2]
+            )
+            self.assertIsNone(StacItemIndex.load(output + ".missing", index.data))
+
+    def write_catalog(self, root):
+        """Writes a static catalog with an event collection of two children."""
+
+        def write(path, obj):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w") as f:
+                json.dump(obj, f)
+
+        def catalog(id, links):
+            return {
+                "type": "Catalog",
+                "stac_version": "1.0.0",
+                "id": id,
+                "description": id,
+                "links": links,
+            }
+
+        event = f"event-{uuid.uuid4().hex}"
+        write(
+            os.path.join(root, "catalog.json"),
+            catalog("root", [{"rel": "child", "href": f"./{event}/collection.json"}]),
+        )
+        write(
+            os.path.join(root, event, "collection.json"),
+            catalog(
+                event,
+                [
+                    {"rel": "child", "href": "./b/catalog.json"},
+                    {"rel": "child", "href": "./a/catalog.json"},
+                ],
+            ),
+        )
+        for child in ["a", "b"]:
+            links = [
+                {"rel": "item", "href": f"./{child}{i}/{child}{i}.json"}
+                for i in range(3)
+            ]
+            write(
+                os.path.join(root, event, child, "catalog.json"), catalog(child, links)
+            )
+            for i in range(3):
+                item = {
+                    "type": "Feature",
+                    "stac_version": "1.0.0",
+                    "id": f"{child}{i}",
+                    "bbox": [i, 0, i + 1, 1],
+                    "geometry": {
+                        "type": "Polygon",
+                        "coordinates": [
+                            [[i, 0], [i + 1, 0], [i + 1, 1], [i, 1], [i, 0]]
+                        ],
+                    },
+                    "properties": {
+                        "datetime": f"2023-02-0{i + 1}T00:00:00Z",
+                        "proj:bbox": [0, 0, 1, 1],
+                    },
+                    "assets": {"visual": {"href": "./visual.tif"}},
+                    "links": [],
+                }
+                write(
+                    os.path.join(root, event, child, f"{child}{i}", f"{child}{i}.json"),
+                    item,
+                )
+        return event
+
+    def test_stac_crawl(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            event = self.write_catalog(tmpdir)
+            root = os.path.join(tmpdir, "catalog.json")
+            catalogs, items = stac_crawl(root, max_workers=4)
+            self.assertEqual([c["id"] for c in catalogs], ["root", event, "b", "a"])
+            self.assertEqual(
+                [item["id"] for item in items], ["b0", "b1", "b2", "a0", "a1", "a2"]
+            )
+            self.assertEqual(
+                items[0]["assets"]["visual"]["href"],
+                os.path.join(tmpdir, event, "b", "b0", "visual.tif"),
+            )
+            catalogs, items = stac_crawl(root, max_depth=1, get_items=False)
+            self.assertEqual((len(catalogs), len(items)), (2, 0))
+
+            os.environ["MAXAR_STAC_API"] = root
+            os.environ["LEAFMAP_CACHE_DIR"] = os.path.join(tmpdir, "cache")
+            try:
+                self.assertEqual(maxar_child_collections(event), ["b", "a"])
+                # Changing the collection invalidates the cached child IDs.
+                collection = os.path.join(tmpdir, event, "collection.json")
+                with open(collection) as f:
+                    content = json.load(f)
+                content["links"] = content["links"][1:]
+                with open(collection, "w") as f:
+                    json.dump(content, f)
+                self.assertEqual(maxar_child_collections(event), ["a"])
+                content["links"] = content["links"] + [
+                    {"rel": "child", "href": "./b/catalog.json"}
+                ]
+                with open(collection, "w") as f:
+                    json.dump(content, f)
+                # A pystac StacIO, e.g., for authentication, reads the catalogs.
+                stac_io = pystac.stac_io.DefaultStacIO()
+                hrefs = []
+                read_json = stac_io.read_json
+                stac_io.read_json = lambda href: hrefs.append(href) or read_json(href)
+                collections = maxar_collections(return_ids=False, stac_io=stac_io)
+                self.assertEqual([c.id for c in collections], [event])
+                self.assertEqual(len(hrefs), 2)
+                with self.assertRaises(TypeError):
+                    maxar_items(event, "a", headers={})
+                gdf = maxar_items(event, "a")
+                self.assertEqual(
+                    list(gdf["visual"].str[-13:]),
+                    ["a0/visual.tif", "a1/visual.tif", "a2/visual.tif"],
+                )
+                self.assertEqual(gdf["proj:bbox"][0], "0,0,1,1")
+                gdf = maxar_all_items(event, verbose=False)
+                self.assertEqual(len(gdf), 6)
+                result = maxar_search(event, "2023-02-02", "2023-02-28", crawl=True)
+                self.assertEqual(
+                    list(result["datetime"].str[:10]), ["2023-02-02", "2023-02-03"] * 2
+                )
+            finally:
+                del os.environ["MAXAR_STAC_API"]
+                del os.environ["LEAFMAP_CACHE_DIR"]
+
+    def test_maxar_cache(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            event = self.write_catalog(tmpdir)
+            os.environ["MAXAR_STAC_API"] = os.path.join(tmpdir, "catalog.json")
+            os.environ["LEAFMAP_CACHE_DIR"] = os.path.join(tmpdir, "cache")
+            try:
+                gdf = maxar_items(event, "a", assets=["visual", "missing"])
+                self.assertEqual(list(gdf["missing"]), [""] * 3)
+                entries = maxar_refresh("list")
+                self.assertEqual(list(entries["key"]), [f"{event}/a"])
+                self.assertEqual(maxar_refresh("size"), entries["size"][0])
+
+                # A cache hit reads the GeoParquet file without the catalog.
+                item = os.path.join(tmpdir, event, "a", "a0", "a0.json")
+                os.rename(item, item + ".bak")
+                cached = maxar_items(event, "a", assets=["visual", "missing"])
+                self.assertEqual(cached.to_json(), gdf.to_json())
+                items = maxar_items(event, "a", return_gdf=False)
+                self.assertEqual([item.id for item in items], ["a0", "a1", "a2"])
+                os.rename(item + ".bak", item)
+
+                # Changing the child catalog invalidates the entry.
+                child = os.path.join(tmpdir, event, "a", "catalog.json")
+                with open(child) as f:
+                    content = json.load(f)
+                content["links"] = content["links"][:2]
+                with open(child, "w") as f:
+                    json.dump(content, f)
+                self.assertEqual(len(maxar_items(event, "a")), 2)
+
+                maxar_all_items(event, verbose=False)
+                entries = maxar_refresh("list", event)
+                self.assertEqual(
+                    sorted(entries["key"]),
+                    [f"{event}/.children", f"{event}/a", f"{event}/b"],
+                )
+                self.assertEqual(len(maxar_refresh("prune", max_size=0)), 3)
+                self.assertEqual(maxar_refresh("size"), 0)
+                index = maxar_index(event, validate=False)
+                self.assertTrue(os.path.exists(maxar_cache.path(f"{event}/a")))
+                self.assertIs(maxar_index(event, validate=False), index)
+                result = index.search([0.5, 0, 1.5, 1], "2023-02-02", "2023-02-02")
+                self.assertEqual(
+                    list(result["visual"].str[-13:]), ["b1/visual.tif", "a1/visual.tif"]
+                )
+                # A collection whose ID starts with the ID of another is kept apart.
+                other = pd.DataFrame({"id": ["b"]})
+                maxar_cache.put(f"{event}-a/b", other)
+                self.assertNotEqual(
+                    maxar_cache.path(f"{event}-a/b"), maxar_cache.path(f"{event}/a-b")
+                )
+                self.assertEqual(len(maxar_refresh("list", event)), 3)
+                self.assertEqual(len(maxar_refresh("clear", event)), 5)
+                self.assertEqual(list(maxar_refresh("list")["key"]), [f"{event}-a/b"])
+            finally:
+                del os.environ["MAXAR_STAC_API"]
+                del os.environ["LEAFMAP_CACHE_DIR"]
+
+
+if __name__ == "__main__":
+    unittest.main()
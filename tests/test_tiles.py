@@ -0,0 +1,417 @@
+#!/usr/bin/env python
+
+"""Tests for `tiles` module."""
+
+import http.server
+import io
+import os
+import tempfile
+import threading
+import time
+import unittest
+import numpy as np
+import rasterio
+import rasterio.warp
+from PIL import Image
+from leafmap.tiles import *
+
+
+def make_tile(color, mode="RGB", size=256):
+    """Returns an encoded PNG tile filled with a color."""
+    image = Image.new(mode, (size, size), color)
+    buffer = io.BytesIO()
+    image.save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+class TileHandler(http.server.BaseHTTPRequestHandler):
+    """Serves red PNG tiles with an ETag. Each tile fails once with 503 before it is
+    served, and tiles with x + y divisible by 5 do not exist."""
+
+    requests = []
+
+    def do_GET(self):
+        _, z, x, y = self.path.split(".")[0].split("/")
+        first_request = self.path not in self.requests
+        self.requests.append(self.path)
+        if (int(x) + int(y)) % 5 == 0:
+            self.send_response(404)
+            self.end_headers()
+        elif first_request:
+            self.send_response(503)
+            self.end_headers()
+        elif self.headers.get("If-None-Match") == '"red"':
+            self.send_response(304)
+            self.end_headers()
+        else:
+            data = make_tile((255, 0, 0))
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(data)))
+            self.send_header("ETag", '"red"')
+            self.end_headers()
+            self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestTiles(unittest.TestCase):
+    """Tests for `tiles` module."""
+
+    def setUp(self):
+        """Set up test fixtures, if any."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.bbox = [-122.5216, 37.733, -122.3661, 37.8095]
+
+    def tearDown(self):
+        """Tear down test fixtures, if any."""
+        self.temp_dir.cleanup()
+
+    def start_server(self):
+        """Starts a local tile server and returns its URL template."""
+        TileHandler.requests = []
+        server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), TileHandler)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        return f"http://127.0.0.1:{server.server_port}/{{z}}/{{x}}/{{y}}.png"
+
+    def test_deg2num_num2deg(self):
+        x, y = deg2num(37.75, -122.45, 12)
+        lat, lon = num2deg(x, y, 12)
+        self.assertAlmostEqual(lat, 37.75)
+        self.assertAlmostEqual(lon, -122.45)
+
+    def test_bbox_to_tiles(self):
+        tiles = bbox_to_tiles(self.bbox, 12)
+        self.assertEqual(len(tiles), 6)
+        self.assertIn((655, 1582), tiles)
+
+    def test_geotiff_tile_writer(self):
+        output = os.path.join(self.temp_dir.name, "output.tif")
+        tiles = bbox_to_tiles(self.bbox, 14)
+        with GeoTiffTileWriter(output, self.bbox, 14) as writer:
+            for index, (x, y) in enumerate(tiles):
+                if index == 0:
+                    writer.write_tile(x, y, None)
+                else:
+                    writer.write_tile(x, y, make_tile((index % 256, 0, 0)))
+
+        with rasterio.open(output) as src:
+            self.assertEqual(src.count, 3)
+            self.assertEqual(src.crs.to_epsg(), 3857)
+            self.assertEqual((src.width, src.height), (writer.width, writer.height))
+            west, south, east, north = rasterio.warp.transform_bounds(
+                src.crs, "EPSG:4326", *src.bounds
+            )
+            resolution = 360 / (256 * 2**14)
+            self.assertAlmostEqual(west, self.bbox[0], delta=resolution)
+            self.assertAlmostEqual(east, self.bbox[2], delta=resolution)
+            # The missing first tile is masked out.
+            self.assertEqual(src.read_masks(1)[0, 0], 0)
+            self.assertEqual(src.read_masks(1)[-1, -1], 255)
+
+    def test_geotiff_tile_writer_resume(self):
+        output = os.path.join(self.temp_dir.name, "output.tif")
+        tiles = bbox_to_tiles(self.bbox, 14)
+        colors = {tile: make_tile((i * 10 % 256, 0, 0)) for i, tile in enumerate(tiles)}
+        with self.assertRaises(RuntimeError):
+            with GeoTiffTileWriter(
+                output, self.bbox, 14, resume=True, checkpoint=4
+            ) as writer:
+                for tile in tiles[:10]:
+                    writer.write_tile(*tile, colors[tile])
+                raise RuntimeError("interrupted")
+        self.assertTrue(os.path.exists(writer.manifest))
+
+        with GeoTiffTileWriter(output, self.bbox, 14, resume=True) as writer:
+            self.assertEqual(writer.tiles_written, 10)
+            self.assertEqual(writer.missing_tiles(), tiles[10:])
+            for tile in writer.missing_tiles():
+                writer.write_tile(*tile, colors[tile])
+        self.assertFalse(os.path.exists(writer.manifest))
+
+        expected = os.path.join(self.temp_dir.name, "expected.tif")
+        with GeoTiffTileWriter(expected, self.bbox, 14) as writer:
+            for tile in tiles:
+                writer.write_tile(*tile, colors[tile])
+        with rasterio.open(output) as src, rasterio.open(expected) as ref:
+            self.assertTrue(np.array_equal(src.read(), ref.read()))
+            self.assertTrue(np.array_equal(src.dataset_mask(), ref.dataset_mask()))
+
+    def test_geotiff_tile_writer_resume_mismatch(self):
+        output = os.path.join(self.temp_dir.name, "output.tif")
+        tiles = bbox_to_tiles(self.bbox, 14)
+        with GeoTiffTileWriter(output, self.bbox, 14, resume=True) as writer:
+            writer.write_tile(*tiles[0], make_tile((255, 0, 0)))
+        with self.assertRaises(ValueError):
+            GeoTiffTileWriter(output, self.bbox, 15, resume=True)
+
+    def test_cog_pyramid_writer(self):
+        output = os.path.join(self.temp_dir.name, "pyramid.tif")
+        with CogPyramidWriter(output, self.bbox, 14, 12) as writer:
+            for zoom in writer.zooms:
+                tiles = bbox_to_tiles(self.bbox, zoom)
+                for x, y in tiles[1:]:
+                    writer.write_tile(x, y, make_tile((zoom * 10, 0, 0)), zoom)
+                writer.write_tile(*tiles[0], None, zoom)
+        self.assertFalse(os.path.exists(writer.dataset_path))
+
+        with rasterio.open(output) as src:
+            self.assertEqual(src.tags(ns="IMAGE_STRUCTURE")["LAYOUT"], "COG")
+            self.assertEqual(src.count, 4)
+            self.assertEqual(src.overviews(1), [2, 4])
+            self.assertEqual(src.width % 4, 0)
+            for factor, zoom in [(1, 14), (2, 13), (4, 12)]:
+                shape = (src.height // factor, src.width // factor)
+                data = src.read(1, out_shape=shape)
+                mask = src.read_masks(1, out_shape=shape)
+                self.assertEqual(data[-1, -1], zoom * 10)
+                # The missing first tile is transparent.
+                self.assertEqual(mask[0, 0], 0)
+                self.assertEqual(mask[-1, -1], 255)
+
+    def test_mbtiles_writer(self):
+        import sqlite3
+
+        output = os.path.join(self.temp_dir.name, "tiles.mbtiles")
+        red, blue = make_tile((255, 0, 0)), make_tile((0, 0, 255))
+        with MBTilesWriter(output, {"name": "test"}) as writer:
+            writer.write_tile(0, 0, red, 1)
+            writer.write_tile(1, 0, red, 1)
+            writer.write_tile(1, 1, blue, 1)
+            writer.write_tile(0, 1, None, 1)
+        self.assertEqual(writer.tiles_written, 3)
+        self.assertEqual(writer.unique_tiles, 2)
+
+        with sqlite3.connect(output) as conn:
+            metadata = dict(conn.execute("SELECT name, value FROM metadata"))
+            self.assertEqual(metadata["name"], "test")
+            self.assertEqual(metadata["format"], "png")
+            self.assertEqual(metadata["minzoom"], "1")
+            (count,) = conn.execute("SELECT COUNT(*) FROM images").fetchone()
+            self.assertEqual(count, 2)
+            # Rows are flipped to the TMS scheme.
+            (data,) = conn.execute(
+                "SELECT tile_data FROM tiles WHERE zoom_level = 1 "
+                "AND tile_column = 1 AND tile_row = 0"
+            ).fetchone()
+            self.assertEqual(data, blue)
+        conn.close()
+
+    def test_map_tiles_to_geotiff(self):
+        from leafmap.common import map_tiles_to_geotiff
+
+        template = self.start_server()
+        output = os.path.join(self.temp_dir.name, "pyramid.tif")
+        cache = os.path.join(self.temp_dir.name, "tiles.sqlite")
+        map_tiles_to_geotiff(
+            output,
+            self.bbox,
+            zoom=14,
+            min_zoom=13,
+            source=template,
+            fetcher={"backoff_factor": 0.01},
+            cache=cache,
+            quiet=True,
+        )
+        with rasterio.open(output) as src:
+            self.assertEqual(src.tags(ns="IMAGE_STRUCTURE")["LAYOUT"], "COG")
+            self.assertEqual(src.overviews(1), [2])
+            self.assertEqual(src.read(1)[-1, -1], 255)
+
+        # A second download reads every tile from the cache.
+        num_requests = len(TileHandler.requests)
+        map_tiles_to_geotiff(
+            os.path.join(self.temp_dir.name, "cached.tif"),
+            self.bbox,
+            zoom=14,
+            min_zoom=13,
+            source=template,
+            cache=cache,
+            quiet=True,
+        )
+        self.assertEqual(len(TileHandler.requests), num_requests)
+
+    def test_map_tiles_to_geotiff_resume(self):
+        from leafmap.common import map_tiles_to_geotiff
+
+        class InterruptedFetcher(TileFetcher):
+            def fetch_tiles(self, template, tiles, zoom):
+                for index, result in enumerate(
+                    super().fetch_tiles(template, tiles, zoom)
+                ):
+                    if index == 10:
+                        raise RuntimeError("interrupted")
+                    yield result
+
+        template = self.start_server()
+        output = os.path.join(self.temp_dir.name, "output.tif")
+        args = dict(zoom=14, source=template, resume=True, quiet=True)
+        with InterruptedFetcher(backoff_factor=0.01) as fetcher:
+            with self.assertRaises(Exception):
+                map_tiles_to_geotiff(output, self.bbox, fetcher=fetcher, **args)
+        self.assertTrue(os.path.exists(output + ".manifest"))
+
+        # The rerun only requests the missing tiles.
+        TileHandler.requests = []
+        fetcher = {"backoff_factor": 0.01}
+        map_tiles_to_geotiff(output, self.bbox, fetcher=fetcher, **args)
+        self.assertFalse(os.path.exists(output + ".manifest"))
+        tiles = bbox_to_tiles(self.bbox, 14)
+        requested = {
+            tuple(map(int, p.split(".")[0].split("/")[2:]))
+            for p in TileHandler.requests
+        }
+        self.assertEqual(len(requested), len(tiles) - 10)
+
+        expected = os.path.join(self.temp_dir.name, "expected.tif")
+        map_tiles_to_geotiff(expected, self.bbox, fetcher=fetcher, **args)
+        with rasterio.open(output) as src, rasterio.open(expected) as ref:
+            self.assertTrue(np.array_equal(src.read(), ref.read()))
+            self.assertTrue(np.array_equal(src.dataset_mask(), ref.dataset_mask()))
+
+    def test_map_tiles_to_mbtiles_and_pmtiles(self):
+        import sqlite3
+        from leafmap.common import map_tiles_to_mbtiles, map_tiles_to_pmtiles
+
+        template = self.start_server()
+        fetcher = {"backoff_factor": 0.01}
+        output = os.path.join(self.temp_dir.name, "tiles.mbtiles")
+        map_tiles_to_mbtiles(
+            output, self.bbox, 13, 12, template, "test", fetcher=fetcher, quiet=True
+        )
+        num_tiles = sum(
+            (x + y) % 5 != 0
+            for zoom in [12, 13]
+            for x, y in bbox_to_tiles(self.bbox, zoom)
+        )
+        with sqlite3.connect(output) as conn:
+            metadata = dict(conn.execute("SELECT name, value FROM metadata"))
+            (count,) = conn.execute("SELECT COUNT(*) FROM tiles").fetchone()
+            (images,) = conn.execute("SELECT COUNT(*) FROM images").fetchone()
+        conn.close()
+        self.assertEqual(metadata["name"], "test")
+        self.assertEqual((metadata["minzoom"], metadata["maxzoom"]), ("12", "13"))
+        self.assertEqual(count, num_tiles)
+        # All the tiles are the same red tile.
+        self.assertEqual(images, 1)
+
+        from pmtiles.reader import MmapSource, Reader
+
+        output = os.path.join(self.temp_dir.name, "tiles.pmtiles")
+        map_tiles_to_pmtiles(
+            output, self.bbox, 13, 12, template, fetcher=fetcher, quiet=True
+        )
+        with open(output, "rb") as f:
+            reader = Reader(MmapSource(f))
+            header = reader.header()
+            self.assertEqual((header["min_zoom"], header["max_zoom"]), (12, 13))
+            self.assertEqual(header["addressed_tiles_count"], num_tiles)
+            x, y = next(t for t in bbox_to_tiles(self.bbox, 13) if sum(t) % 5)
+            self.assertTrue(reader.get(13, x, y).startswith(b"\x89PNG"))
+
+    def test_tile_format(self):
+        self.assertEqual(tile_format(make_tile((0, 0, 0))), "png")
+        self.assertIsNone(tile_format(b"<html>"))
+
+    def test_tile_url(self):
+        url = tile_url("https://{s}.tile.osm.org/{z}/{x}/{y}.png", 1, 2, 3)
+        self.assertEqual(url, "https://a.tile.osm.org/3/1/2.png")
+
+    def test_tile_fetcher(self):
+        template = self.start_server()
+        tiles = bbox_to_tiles(self.bbox, 14)
+        tasks = [((x, y), tile_url(template, x, y, 14)) for x, y in tiles]
+        with TileFetcher(
+            max_workers=4, max_in_flight=6, backoff_factor=0.01
+        ) as fetcher:
+            results = dict(fetcher.fetch(tasks))
+
+        self.assertEqual(set(results), set(tiles))
+        for (x, y), data in results.items():
+            if (x + y) % 5 == 0:
+                self.assertIsNone(data)
+            else:
+                self.assertTrue(data.startswith(b"\x89PNG"))
+
+    def test_tile_fetcher_gives_up(self):
+        template = self.start_server()
+        with TileFetcher(retries=0) as fetcher:
+            with self.assertRaises(Exception):
+                fetcher.get(tile_url(template, 1, 0, 3))
+
+    def test_tile_cache(self):
+        template = self.start_server()
+        tiles = bbox_to_tiles(self.bbox, 14)
+        path = os.path.join(self.temp_dir.name, "tiles.sqlite")
+        with TileFetcher(backoff_factor=0.01, cache=path) as fetcher:
+            first = dict(fetcher.fetch_tiles(template, tiles, 14))
+            num_requests = len(TileHandler.requests)
+            second = dict(fetcher.fetch_tiles(template, tiles, 14))
+            stats = fetcher.cache.stats()
+
+        self.assertEqual(first, second)
+        self.assertEqual(len(TileHandler.requests), num_requests)
+        self.assertEqual(stats["hits"], len(tiles))
+        self.assertEqual(stats["misses"], len(tiles))
+        self.assertEqual(stats["tiles"], len(tiles))
+
+    def test_tile_cache_revalidation(self):
+        template = self.start_server()
+        tiles = [(1, 1), (1, 2)]
+        with TileCache(os.path.join(self.temp_dir.name, "tiles.sqlite")) as cache:
+            cache.default_ttl = -1
+            with TileFetcher(backoff_factor=0.01, cache=cache) as fetcher:
+                first = dict(fetcher.fetch_tiles(template, tiles, 3))
+                second = dict(fetcher.fetch_tiles(template, tiles, 3))
+            self.assertEqual(first, second)
+            self.assertEqual(cache.get(template, 1, 1, 3).etag, '"red"')
+            self.assertEqual(cache.revalidated, 2)
+            self.assertEqual(cache.hits, 0)
+
+    def test_tile_cache_eviction(self):
+        path = os.path.join(self.temp_dir.name, "tiles.sqlite")
+        with TileCache(path, max_size=1000) as cache:
+            for x in range(5):
+                cache.put("t", x, 0, 1, bytes(300))
+                time.sleep(0.01)
+            self.assertEqual(len(cache), 3)
+            self.assertIsNone(cache.get("t", 0, 0, 1))
+            self.assertIsNone(cache.get("t", 1, 0, 1))
+            self.assertEqual(cache.get("t", 4, 0, 1).data, bytes(300))
+            self.assertLessEqual(cache.stats()["size"], 1000)
+
+        # Replacing a tile does not count its old size.
+        path = os.path.join(self.temp_dir.name, "replaced.sqlite")
+        with TileCache(path, max_size=1000) as cache:
+            for x in [0, 1, 1, 1, 2]:
+                cache.put("t", x, 0, 1, bytes(300))
+                self.assertEqual(cache._size, cache._total_size())
+            self.assertEqual(len(cache), 3)
+
+    def test_cache_expiry(self):
+        now = time.time()
+        self.assertIsNone(cache_expiry({"Cache-Control": "no-store"}, 60))
+        expires = cache_expiry({"Cache-Control": "public, max-age=3600"}, 60)
+        self.assertAlmostEqual(expires, now + 3600, delta=5)
+        expires = cache_expiry({"Expires": "Thu, 01 Jan 2015 00:00:00 GMT"}, 60)
+        self.assertEqual(expires, 1420070400)
+        self.assertAlmostEqual(cache_expiry({}, 60), now + 60, delta=5)
+
+    def test_host_rate_limiter(self):
+        limiter = HostRateLimiter(rate=50)
+        start = time.monotonic()
+        for _ in range(6):
+            limiter.wait("http://127.0.0.1/tile.png")
+        self.assertGreaterEqual(time.monotonic() - start, 0.09)
+
+    def test_decode_tile_transparency(self):
+        rgb, mask = decode_tile(make_tile((10, 20, 30, 0), mode="RGBA"))
+        self.assertEqual(rgb.shape, (3, 256, 256))
+        self.assertTrue(np.all(mask == 0))
+
+
+if __name__ == "__main__":
+    unittest.main()